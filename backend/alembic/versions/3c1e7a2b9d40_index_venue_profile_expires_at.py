@@ -0,0 +1,27 @@
+"""Index venue_profiles.expires_at
+
+Revision ID: 3c1e7a2b9d40
+Revises: f99aa361bd09
+Create Date: 2026-10-19 09:12:44.102311
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1e7a2b9d40"
+down_revision: str | None = "f99aa361bd09"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_venue_profiles_expires_at"), "venue_profiles", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_venue_profiles_expires_at"), table_name="venue_profiles")
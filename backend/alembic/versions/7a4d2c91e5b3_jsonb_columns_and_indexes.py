@@ -0,0 +1,85 @@
+"""Convert JSON columns to JSONB and add GIN / expression indexes
+
+Revision ID: 7a4d2c91e5b3
+Revises: 3c1e7a2b9d40
+Create Date: 2026-10-19 15:40:12.530914
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a4d2c91e5b3"
+down_revision: str | None = "3c1e7a2b9d40"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (table, column, nullable)
+JSON_COLUMNS = (
+    ("venues", "hours", True),
+    ("venue_profiles", "attribute_scores", False),
+    ("venue_profiles", "evidence_snippets", False),
+    ("user_events", "query_context", True),
+)
+INDEXED_ATTRIBUTES = ("quiet", "laptop_friendly", "romantic")
+
+
+def upgrade() -> None:
+    for table, column, nullable in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::jsonb",
+        )
+
+    op.create_index(
+        "ix_venues_hours",
+        "venues",
+        ["hours"],
+        postgresql_using="gin",
+        postgresql_ops={"hours": "jsonb_path_ops"},
+    )
+    op.create_index(
+        "ix_venue_profiles_attribute_scores",
+        "venue_profiles",
+        ["attribute_scores"],
+        postgresql_using="gin",
+        postgresql_ops={"attribute_scores": "jsonb_path_ops"},
+    )
+    for attribute in INDEXED_ATTRIBUTES:
+        op.create_index(
+            f"ix_venue_profiles_{attribute}",
+            "venue_profiles",
+            [sa.text(f"CAST(attribute_scores ->> '{attribute}' AS FLOAT)")],
+        )
+    op.create_index(
+        "ix_user_events_query_context_tile",
+        "user_events",
+        [sa.text("(query_context ->> 'tile')")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_events_query_context_tile", table_name="user_events")
+    for attribute in INDEXED_ATTRIBUTES:
+        op.drop_index(f"ix_venue_profiles_{attribute}", table_name="venue_profiles")
+    op.drop_index("ix_venue_profiles_attribute_scores", table_name="venue_profiles")
+    op.drop_index("ix_venues_hours", table_name="venues")
+
+    for table, column, nullable in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::json",
+        )
@@ -0,0 +1,47 @@
+"""Add venue_static_scores with per-mode (cell, score) indexes
+
+Revision ID: b52e8f1d6c47
+Revises: 7a4d2c91e5b3
+Create Date: 2026-10-19 17:05:48.211637
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b52e8f1d6c47"
+down_revision: str | None = "7a4d2c91e5b3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+MODES = ("work", "date", "quick_bite", "budget")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "venue_static_scores",
+        sa.Column("venue_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("cell", sa.String(length=12), nullable=False),
+        *(sa.Column(mode, sa.Float(), nullable=False) for mode in MODES),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["venue_id"], ["venues.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("venue_id"),
+    )
+    for mode in MODES:
+        op.create_index(
+            f"ix_venue_static_scores_cell_{mode}",
+            "venue_static_scores",
+            ["cell", sa.text(f"{mode} DESC")],
+        )
+    # Populate with: python -m app.repositories.scores
+
+
+def downgrade() -> None:
+    for mode in MODES:
+        op.drop_index(f"ix_venue_static_scores_cell_{mode}", table_name="venue_static_scores")
+    op.drop_table("venue_static_scores")
@@ -0,0 +1,31 @@
+"""Add user_events.sample_weight
+
+Revision ID: d3f6a1c8e925
+Revises: b52e8f1d6c47
+Create Date: 2026-10-19 19:22:07.418529
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d3f6a1c8e925"
+down_revision: str | None = "b52e8f1d6c47"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # A constant default: existing rows were all kept, with weight 1.
+    op.add_column(
+        "user_events",
+        sa.Column("sample_weight", sa.Float(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_events", "sample_weight")
@@ -0,0 +1,30 @@
+"""Add venue_profiles.refresh_failures
+
+Revision ID: e7b2c4d9f013
+Revises: d3f6a1c8e925
+Create Date: 2026-10-19 21:04:51.203877
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b2c4d9f013"
+down_revision: str | None = "d3f6a1c8e925"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "venue_profiles",
+        sa.Column("refresh_failures", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("venue_profiles", "refresh_failures")
@@ -0,0 +1,24 @@
+"""Two-level (in-process + Redis) caching with cross-process invalidation."""
+
+from app.cache.codec import CacheDecodeError, decode, encode
+from app.cache.invalidation import (
+    InvalidationListener,
+    invalidate,
+    invalidate_venues,
+    venue_tag,
+)
+from app.cache.local import LocalCache, local_cache
+from app.cache.tiered import TieredCache
+
+__all__ = [
+    "CacheDecodeError",
+    "InvalidationListener",
+    "LocalCache",
+    "TieredCache",
+    "decode",
+    "encode",
+    "invalidate",
+    "invalidate_venues",
+    "local_cache",
+    "venue_tag",
+]
@@ -0,0 +1,81 @@
+"""Compact cache payload encoding: msgpack, zstd-compressed when large.
+
+Every payload starts with a one-byte format marker, so compressed and plain
+payloads (and nodes with and without ``zstandard`` installed) can share a
+cache. Values must be msgpack types; UUIDs, datetimes, enums and NumPy
+scalars are converted to strings / numbers on the way in, which pydantic
+parses back on ``model_validate``.
+"""
+
+import datetime
+import enum
+import uuid
+from typing import Any
+
+import msgpack
+import numpy as np
+
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional: payloads are stored uncompressed
+    zstandard = None
+
+PLAIN = b"\x00"
+ZSTD = b"\x01"
+
+_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+class CacheDecodeError(ValueError):
+    """Raised when a payload cannot be decoded (corrupt or unknown format)."""
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime.datetime | datetime.date):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def encode(value: Any) -> bytes:
+    """Serialize a value to a cache payload."""
+    packed = msgpack.packb(value, default=_default, use_bin_type=True)
+    if (
+        _compressor is not None
+        and settings.cache_compression
+        and len(packed) >= settings.cache_compress_min_bytes
+    ):
+        return ZSTD + _compressor.compress(packed)
+    return PLAIN + packed
+
+
+def decode(payload: bytes) -> Any:
+    """Deserialize a cache payload.
+
+    Raises:
+        CacheDecodeError: If the payload is corrupt or compressed without
+            ``zstandard`` available
+    """
+    marker, body = payload[:1], payload[1:]
+    try:
+        if marker == ZSTD:
+            if _decompressor is None:
+                raise CacheDecodeError("zstd payload but zstandard is not installed")
+            body = _decompressor.decompress(body)
+        elif marker != PLAIN:
+            raise CacheDecodeError(f"Unknown cache payload format {marker!r}")
+        return msgpack.unpackb(body, raw=False)
+    except CacheDecodeError:
+        raise
+    except Exception as e:
+        raise CacheDecodeError(f"Corrupt cache payload: {e}") from e
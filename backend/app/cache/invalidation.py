@@ -0,0 +1,191 @@
+"""Cross-process cache invalidation over Redis pub/sub.
+
+``invalidate`` drops keys (and every key carrying one of the given tags) from
+this process's L1 and from Redis, then publishes them on
+``cache_invalidation_channel``. Each API process runs an
+``InvalidationListener`` that evicts published keys and tags from its own L1.
+If the subscription drops, the listener clears its L1 on reconnect, since
+messages may have been missed.
+
+Venue and profile writes invalidate ``venue_tag(venue_id)`` automatically:
+ORM writes through a session hook after commit, and bulk writers (e.g. the
+enrichment upsert) by calling ``invalidate_venues``.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.cache.local import LocalCache, local_cache
+from app.config import settings
+from app.db.redis import get_redis
+from app.db.routing import RoutingSession
+from app.repositories.scores import changed_venue_ids
+
+logger = logging.getLogger(__name__)
+
+# Delay before re-subscribing after the subscription fails.
+RECONNECT_DELAY_S = 1.0
+
+TAG_PREFIX = "cache:tag:"
+
+# Keep scheduled invalidations referenced until they finish.
+_pending: set[asyncio.Task] = set()
+
+
+def tag_key(tag: str) -> str:
+    """Redis set holding the keys of entries tagged ``tag``."""
+    return TAG_PREFIX + tag
+
+
+def venue_tag(venue_id: uuid.UUID | str) -> str:
+    """Tag of every cache entry derived from a venue or its profile."""
+    return f"venue:{venue_id}"
+
+
+async def invalidate(
+    keys: Iterable[str] = (),
+    tags: Iterable[str] = (),
+    redis: Redis | None = None,
+    local: LocalCache | None = None,
+) -> None:
+    """Drop cache entries everywhere.
+
+    Args:
+        keys: Full cache keys (``TieredCache.key``)
+        tags: Entry tags
+        redis: Async Redis client (default: the shared app client)
+        local: This process's L1 (default: ``local_cache``)
+    """
+    keys, tags = list(keys), list(tags)
+    if not (keys or tags) or not settings.cache_enabled:
+        return
+    (local if local is not None else local_cache).delete(keys, tags)
+    redis = redis or get_redis()
+    try:
+        tagged: set[str] = set()
+        for tag in tags:
+            tagged |= {_text(key) for key in await redis.smembers(tag_key(tag))}
+        doomed = [*keys, *tagged, *(tag_key(tag) for tag in tags)]
+        if doomed:
+            await redis.delete(*doomed)
+        message = json.dumps({"keys": keys + sorted(tagged), "tags": tags})
+        await redis.publish(settings.cache_invalidation_channel, message)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Cache invalidation not propagated ({len(keys)} keys, {tags}): {e!r}")
+
+
+async def invalidate_venues(venue_ids: Iterable[uuid.UUID]) -> None:
+    """Drop every cache entry derived from these venues."""
+    await invalidate(tags=[venue_tag(venue_id) for venue_id in venue_ids])
+
+
+def apply_message(data: bytes | str, local: LocalCache | None = None) -> int:
+    """Evict the keys and tags of one invalidation message from the L1.
+
+    Returns:
+        Number of entries removed
+    """
+    try:
+        message = json.loads(data)
+    except ValueError:
+        logger.warning(f"Ignoring malformed invalidation message: {data!r}")
+        return 0
+    local = local if local is not None else local_cache
+    return local.delete(message.get("keys", ()), message.get("tags", ()))
+
+
+class InvalidationListener:
+    """Background subscriber applying invalidation messages to the local L1."""
+
+    def __init__(self, redis: Redis | None = None, local: LocalCache | None = None):
+        self._redis = redis
+        self.local = local if local is not None else local_cache
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start listening on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="cache-invalidation")
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        connected_before = False
+        while True:
+            pubsub = (self._redis or get_redis()).pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.cache_invalidation_channel)
+                if connected_before:
+                    self.local.clear()  # messages may have been missed
+                connected_before = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        apply_message(message["data"], self.local)
+            except (RedisError, OSError) as e:
+                logger.warning(f"Cache invalidation subscription lost: {e!r}")
+            finally:
+                await _close_pubsub(pubsub)
+            await asyncio.sleep(RECONNECT_DELAY_S)
+
+
+async def _close_pubsub(pubsub: Any) -> None:
+    """Release a subscription's connection, ignoring errors from a dead one."""
+    try:
+        await pubsub.aclose()
+    except (RedisError, OSError) as e:
+        logger.debug(f"Closing cache invalidation subscription failed: {e!r}")
+
+
+def _text(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _collect_changed_venues(session: Session, flush_context: Any) -> None:
+    venue_ids = changed_venue_ids(session)
+    if venue_ids:
+        session.info.setdefault("changed_venue_ids", set()).update(venue_ids)
+
+
+def _invalidate_after_commit(session: Session) -> None:
+    venue_ids = session.info.pop("changed_venue_ids", None)
+    if not venue_ids:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:  # sync use outside the app's event loop
+        return
+    task = loop.create_task(invalidate_venues(venue_ids))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def _forget_changes(session: Session, *args: Any) -> None:
+    session.info.pop("changed_venue_ids", None)
+
+
+def track_venue_invalidation(session_class: type[Session]) -> None:
+    """Invalidate venue-tagged entries after ``session_class`` sessions commit venue writes."""
+    if not event.contains(session_class, "after_flush", _collect_changed_venues):
+        event.listen(session_class, "after_flush", _collect_changed_venues)
+        event.listen(session_class, "after_commit", _invalidate_after_commit)
+        event.listen(session_class, "after_soft_rollback", _forget_changes)
+
+
+track_venue_invalidation(RoutingSession)
@@ -0,0 +1,146 @@
+"""Bounded in-process LRU cache with per-entry TTLs (the L1 tier).
+
+Entries hold decoded values, so a hit costs no deserialization. Each entry is
+charged the size of its encoded payload; inserting evicts least recently used
+entries until both the byte and entry budgets hold. Expired entries are
+dropped when read or when they reach the LRU end.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.config import settings
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+    tags: frozenset[str] = field(default_factory=frozenset)
+
+
+class LocalCache:
+    """Thread-safe LRU/TTL cache bounded by total bytes and entry count."""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Budget for the summed payload sizes of all entries
+            max_entries: Maximum number of entries
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size_bytes = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None, now: float | None = None) -> Any:
+        """Return a live entry's value (marking it recently used), else ``default``."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry.expires_at <= now:
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        ttl_s: float,
+        tags: Iterable[str] = (),
+        now: float | None = None,
+    ) -> bool:
+        """Insert or replace an entry.
+
+        Args:
+            key: Cache key
+            value: Decoded value
+            size: Bytes charged against the budget (the encoded payload size)
+            ttl_s: Time to live in seconds
+            tags: Invalidation tags
+            now: Current monotonic time (for tests)
+
+        Returns:
+            False if the entry alone exceeds the byte budget (not cached)
+        """
+        if size > self.max_bytes:
+            return False
+        now = time.monotonic() if now is None else now
+        entry = _Entry(value, size, now + ttl_s, frozenset(tags))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.size_bytes += size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._evict(now)
+        return True
+
+    def delete(self, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> int:
+        """Remove entries by key and by tag.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            targets = set(keys)
+            for tag in tags:
+                targets |= self._tags.get(tag, set())
+            for key in targets:
+                if key in self._entries:
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.size_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _evict(self, now: float) -> None:
+        while self._entries and (
+            self.size_bytes > self.max_bytes or len(self._entries) > self.max_entries
+        ):
+            self._remove(next(iter(self._entries)))
+        # Drop expired entries that have aged to the LRU end.
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            self._remove(key)
+
+
+# The process-wide L1, shared by every TieredCache.
+local_cache = LocalCache(
+    max_bytes=settings.cache_l1_max_bytes, max_entries=settings.cache_l1_max_entries
+)
@@ -0,0 +1,243 @@
+"""Two-level cache: a process-local L1 in front of Redis (L2).
+
+Reads check the L1 first (no network hop, no decoding), then Redis, and
+promote L2 hits into the L1. Writes go to both. L1 entries live at most
+``cache_l1_ttl_seconds`` (capped by the entry's own TTL), which bounds
+staleness if an invalidation message is ever missed; all processes share one
+L1 budget (``local_cache``). L1 hits return the cached object itself, so
+callers must not mutate values they get back.
+
+Entries can carry tags (e.g. ``venue_tag(venue_id)``) so everything derived
+from a venue can be dropped at once; see ``app.cache.invalidation``. Redis
+failures degrade to L1-only caching rather than failing the caller. With
+``cache_enabled`` off every read misses and writes are dropped.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any, TypeVar
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.cache.codec import CacheDecodeError, decode, encode
+from app.cache.invalidation import invalidate, tag_key
+from app.cache.local import LocalCache, local_cache
+from app.config import settings
+from app.db.redis import get_redis
+from app.deadline import unbound_context
+from app.observability.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+KEY_PREFIX = "cache:"
+
+_MISSING = object()
+
+
+class TieredCache:
+    """One namespace of the two-level cache (e.g. "provider", "venue")."""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_s: float,
+        l1_ttl_s: float | None = None,
+        redis: Redis | None = None,
+        local: LocalCache | None = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            namespace: Key namespace, also the metrics label
+            ttl_s: Default L2 time to live in seconds
+            l1_ttl_s: L1 time to live (default: ``cache_l1_ttl_seconds``)
+            redis: Async Redis client. If None, uses the shared app client
+            local: L1 cache (default: the process-wide ``local_cache``)
+        """
+        self.namespace = namespace
+        self.ttl_s = ttl_s
+        self.l1_ttl_s = l1_ttl_s if l1_ttl_s is not None else settings.cache_l1_ttl_seconds
+        self._redis = redis
+        self.local = local if local is not None else local_cache
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def key(self, key: str) -> str:
+        """Full Redis / L1 key of ``key`` in this namespace."""
+        return f"{KEY_PREFIX}{self.namespace}:{key}"
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Return a cached value, or ``default`` on a miss."""
+        if not settings.cache_enabled:
+            return default
+        full_key = self.key(key)
+        value = self.local.get(full_key, _MISSING)
+        if value is not _MISSING:
+            record_cache(f"{self.namespace}.l1", "hit")
+            return value
+        record_cache(f"{self.namespace}.l1", "miss")
+
+        try:
+            payload = await self.redis.get(full_key)
+            if payload is None:
+                record_cache(f"{self.namespace}.l2", "miss")
+                return default
+            value = decode(payload)
+        except (RedisError, OSError, CacheDecodeError) as e:
+            logger.warning(f"Cache read failed for {full_key}: {e!r}")
+            record_cache(f"{self.namespace}.l2", "miss")
+            return default
+        record_cache(f"{self.namespace}.l2", "hit")
+        self.local.set(full_key, value, len(payload), self.l1_ttl_s)
+        return value
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Look up many keys: the L1 first, then one ``MGET`` for the rest.
+
+        Returns:
+            Cached values by key (misses are absent)
+        """
+        if not settings.cache_enabled:
+            return {}
+        found: dict[str, Any] = {}
+        remote: dict[str, str] = {}
+        for key in dict.fromkeys(keys):
+            full_key = self.key(key)
+            value = self.local.get(full_key, _MISSING)
+            if value is _MISSING:
+                remote[key] = full_key
+            else:
+                found[key] = value
+        record_cache(f"{self.namespace}.l1", "hit", len(found))
+        record_cache(f"{self.namespace}.l1", "miss", len(remote))
+        if not remote:
+            return found
+
+        try:
+            payloads = await self.redis.mget(list(remote.values()))
+        except (RedisError, OSError) as e:
+            logger.warning(f"Cache read failed for {len(remote)} {self.namespace} keys: {e!r}")
+            payloads = [None] * len(remote)
+        hits = 0
+        for (key, full_key), payload in zip(remote.items(), payloads, strict=True):
+            if payload is None:
+                continue
+            try:
+                value = decode(payload)
+            except CacheDecodeError as e:
+                logger.warning(f"Cache read failed for {full_key}: {e!r}")
+                continue
+            self.local.set(full_key, value, len(payload), self.l1_ttl_s)
+            found[key] = value
+            hits += 1
+        record_cache(f"{self.namespace}.l2", "hit", hits)
+        record_cache(f"{self.namespace}.l2", "miss", len(remote) - hits)
+        return found
+
+    async def set(
+        self, key: str, value: Any, ttl_s: float | None = None, tags: Iterable[str] = ()
+    ) -> None:
+        """Store a value in both tiers.
+
+        Args:
+            key: Cache key (within the namespace)
+            value: msgpack-serializable value
+            ttl_s: Time to live (default: the namespace TTL)
+            tags: Invalidation tags
+        """
+        await self.set_many({key: value}, ttl_s=ttl_s, tags={key: tags})
+
+    async def set_many(
+        self,
+        values: Mapping[str, Any],
+        ttl_s: float | None = None,
+        tags: Mapping[str, Iterable[str]] | None = None,
+    ) -> None:
+        """Store many values in both tiers with one Redis round trip.
+
+        Args:
+            values: Values by cache key
+            ttl_s: Time to live (default: the namespace TTL)
+            tags: Invalidation tags by cache key
+        """
+        if not settings.cache_enabled or not values:
+            return
+        ttl_s = ttl_s or self.ttl_s
+        expire_s = int(max(ttl_s, 1))
+        tags = tags or {}
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    full_key = self.key(key)
+                    entry_tags = tuple(tags.get(key, ()))
+                    payload = encode(value)
+                    self.local.set(
+                        full_key, value, len(payload), min(self.l1_ttl_s, ttl_s), entry_tags
+                    )
+                    pipe.set(full_key, payload, ex=expire_s)
+                    for tag in entry_tags:
+                        # The tag set must outlive its longest-lived entry:
+                        # extend its TTL (GT), or set one on a new set (NX).
+                        pipe.sadd(tag_key(tag), full_key)
+                        pipe.expire(tag_key(tag), expire_s, gt=True)
+                        pipe.expire(tag_key(tag), expire_s, nx=True)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.warning(f"Cache write failed for {len(values)} {self.namespace} keys: {e!r}")
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        ttl_s: float | None = None,
+        tags: Iterable[str] = (),
+    ) -> T:
+        """Return a cached value, loading and caching it on a miss.
+
+        Concurrent misses for the same key in this process share one
+        ``loader`` call. It runs in its own task, outside any caller's
+        deadline, so a caller that is cancelled or times out leaves the load
+        running for the others. Loader errors propagate and nothing is cached.
+        """
+        value = await self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(
+                self._load(key, loader, ttl_s, tags), context=unbound_context()
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._load_done(key, done))
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        ttl_s: float | None,
+        tags: Iterable[str],
+    ) -> T:
+        value = await loader()
+        await self.set(key, value, ttl_s=ttl_s, tags=tags)
+        return value
+
+    def _load_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone
+
+    async def delete(self, *keys: str) -> None:
+        """Drop entries in every process (see ``app.cache.invalidation``)."""
+        await invalidate(keys=[self.key(key) for key in keys], redis=self._redis, local=self.local)
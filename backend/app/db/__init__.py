@@ -1,6 +1,7 @@
 """Database package exports."""
 
 from app.db.base import Base
+from app.db.redis import get_redis
 from app.db.session import AsyncSessionLocal, engine, get_db
 
-__all__ = ["Base", "engine", "AsyncSessionLocal", "get_db"]
+__all__ = ["Base", "engine", "AsyncSessionLocal", "get_db", "get_redis"]
@@ -0,0 +1,208 @@
+"""SQL statement instrumentation: timing, slow-query log and N+1 detection.
+
+``instrument_engine`` hooks the engine's cursor events to:
+
+- time every statement (``modemap_db_query_duration_seconds``)
+- log statements slower than ``sql_slow_query_ms`` with their parameters, and
+  optionally their EXPLAIN plan (``sql_explain_slow``)
+- count statement shapes per request and flag any SELECT shape repeated
+  ``sql_n_plus_one_threshold`` times -- the signature of lazy-loading a
+  relationship (e.g. ``Venue.profile``) once per row
+
+Per-request counting needs ``QueryTrackingMiddleware`` (or ``track_queries``
+outside HTTP requests). With ``sql_instrumentation`` off no listeners are
+registered, so there is no per-statement cost at all.
+"""
+
+import functools
+import logging
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.observability.metrics import (
+    DB_N_PLUS_ONE,
+    DB_QUERIES_PER_REQUEST,
+    DB_QUERY_DURATION,
+    DB_SLOW_QUERIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest statement / parameter text written to a log line.
+MAX_LOG_CHARS = 1000
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|\?|(?<!:):\w+")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+_TABLE_RE = re.compile(r"\bFROM\s+\"?([\w.]+)", re.IGNORECASE)
+
+
+@dataclass
+class QueryStats:
+    """Statements executed within one request (or ``track_queries`` block)."""
+
+    name: str
+    count: int = 0
+    total_s: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+    n_plus_one: list[str] = field(default_factory=list)
+    closed: bool = False  # later statements (e.g. background tasks) are not counted
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement to its shape: literals, parameters and IN-lists collapsed."""
+    shape = _STRING_RE.sub("?", statement)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _LIST_RE.sub("(?)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+@functools.lru_cache(maxsize=2048)
+def _operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+def _table(shape: str) -> str:
+    match = _TABLE_RE.search(shape)
+    return match.group(1) if match else "unknown"
+
+
+def _truncate(value: Any) -> str:
+    text = str(value)
+    return text if len(text) <= MAX_LOG_CHARS else text[:MAX_LOG_CHARS] + "..."
+
+
+def current_query_stats() -> QueryStats | None:
+    """Return the statement stats of the current request, if tracked."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(name: str) -> Iterator[QueryStats]:
+    """Count statements (and detect N+1 patterns) for the duration of the block."""
+    stats = QueryStats(name)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_statement(statement: str, elapsed_s: float) -> None:
+    """Account one executed statement against the current request."""
+    stats = _current_stats.get()
+    if stats is None or stats.closed:
+        return
+    stats.count += 1
+    stats.total_s += elapsed_s
+    if _operation(statement) != "SELECT":
+        return
+    shape = fingerprint(statement)
+    stats.shapes[shape] += 1
+    if stats.shapes[shape] == settings.sql_n_plus_one_threshold:
+        stats.n_plus_one.append(shape)
+        DB_N_PLUS_ONE.labels(_table(shape)).inc()
+        logger.warning(
+            f"Possible N+1 in {stats.name}: statement repeated "
+            f"{settings.sql_n_plus_one_threshold}+ times: {_truncate(shape)}"
+        )
+
+
+def explain(conn: Any, statement: str, parameters: Any) -> list[str]:
+    """Return the query plan of ``statement`` on a sync ``Connection``."""
+    prefix = "EXPLAIN QUERY PLAN" if conn.dialect.name == "sqlite" else "EXPLAIN"
+    conn.info["explaining"] = True
+    try:
+        rows = conn.exec_driver_sql(f"{prefix} {statement}", parameters).fetchall()
+    finally:
+        conn.info.pop("explaining", None)
+    return [" ".join(str(column) for column in row) for row in rows]
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Register timing, slow-query and N+1 listeners on ``sync_engine``.
+
+    Pass ``AsyncEngine.sync_engine``. Does nothing if ``sql_instrumentation``
+    is off.
+    """
+    if not settings.sql_instrumentation:
+        return
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is None or conn.info.get("explaining"):
+            return
+        elapsed = perf_counter() - start
+        operation = _operation(statement)
+        DB_QUERY_DURATION.labels(operation).observe(elapsed)
+        record_statement(statement, elapsed)
+
+        if elapsed * 1000 < settings.sql_slow_query_ms:
+            return
+        DB_SLOW_QUERIES.labels(operation).inc()
+        plan = None
+        if settings.sql_explain_slow and operation == "SELECT" and not executemany:
+            try:
+                plan = "\n".join(explain(conn, statement, parameters))
+            except Exception as e:
+                plan = f"unavailable ({e!r})"
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.0f} ms): {_truncate(statement)} "
+            f"params={_truncate(parameters)}" + (f"\n{plan}" if plan else "")
+        )
+
+
+class QueryTrackingMiddleware:
+    """ASGI middleware that scopes statement counting and N+1 detection to a request.
+
+    Counting stops when the last body chunk is sent, so statements from
+    background tasks run after the response are not charged to the request.
+    """
+
+    def __init__(self, app: Callable[..., Any]):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}") as stats:
+
+            def close() -> None:
+                if not stats.closed:
+                    stats.closed = True
+                    DB_QUERIES_PER_REQUEST.observe(stats.count)
+
+            async def send_and_close(message: dict) -> None:
+                await send(message)
+                if message["type"] == "http.response.body" and not message.get("more_body"):
+                    close()
+
+            try:
+                await self.app(scope, receive, send_and_close)
+            finally:
+                close()
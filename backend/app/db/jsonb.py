@@ -0,0 +1,31 @@
+"""JSONB expression helpers.
+
+Expression indexes such as ``((attribute_scores ->> 'quiet')::float)`` are only
+used when a query contains the same expression with the key as a literal.
+SQLAlchemy's ``column["key"]`` binds the key as a parameter, which hides the
+index from generic (prepared) plans, so filters on indexed JSONB keys should be
+built with these helpers.
+"""
+
+import re
+from typing import Any
+
+from sqlalchemy import Float, Text, cast, literal_column
+
+_KEY_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def json_text(column: Any, key: str) -> Any:
+    """``column ->> 'key'`` with the key rendered inline.
+
+    Raises:
+        ValueError: If ``key`` is not a plain identifier
+    """
+    if not _KEY_RE.fullmatch(key):
+        raise ValueError(f"Invalid JSON key: {key!r}")
+    return column.op("->>", return_type=Text)(literal_column(f"'{key}'"))
+
+
+def json_float(column: Any, key: str) -> Any:
+    """``(column ->> 'key')::float`` with the key rendered inline."""
+    return cast(json_text(column, key), Float)
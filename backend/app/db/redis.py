@@ -0,0 +1,15 @@
+"""Redis client setup."""
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+_redis: Redis | None = None
+
+
+def get_redis() -> Redis:
+    """Return the process-wide async Redis client (created on first use)."""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.redis_url)
+    return _redis
@@ -0,0 +1,44 @@
+"""Read/write routing between the primary database and read replicas.
+
+``RoutingSession`` sends plain SELECTs to a replica and everything else --
+INSERT/UPDATE/DELETE, flushes, ``SELECT ... FOR UPDATE`` and raw SQL -- to the
+primary. Once a session has written, it sticks to the primary so it reads its
+own writes. With no replicas configured every statement goes to the primary.
+
+Replicas come from the session's ``info["replicas"]`` (sync engines), set once
+on the session factory. Sessions that must read from the primary (e.g. right
+after another session committed) can set ``session.info["primary"] = True``.
+"""
+
+import random
+from typing import Any
+
+from sqlalchemy import Delete, Insert, Select, Update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+class RoutingSession(Session):
+    """Session that routes read-only statements to a replica."""
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kw: Any) -> Any:
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        replicas: list[Engine] = self.info.get("replicas") or []
+        if not replicas or self._uses_primary(clause):
+            return primary
+
+        # One replica per session, so its reads see a consistent server.
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.info["replica"] = random.choice(replicas)
+        return replica
+
+    def _uses_primary(self, clause: Any) -> bool:
+        """Whether the statement (or session state) requires the primary."""
+        if self._flushing or isinstance(clause, Insert | Update | Delete):
+            self.info["primary"] = True
+        if self.info.get("primary"):
+            return True
+        if not isinstance(clause, Select):
+            return True
+        return clause._for_update_arg is not None
@@ -1,26 +1,94 @@
 """SQLAlchemy database session setup."""
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.db.instrumentation import instrument_engine
+from app.db.routing import RoutingSession
+from app.observability.metrics import DB_POOL_CHECKOUT_WAIT
+from app.observability.tracing import trace_engine
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.env == "dev",  # Log SQL queries in dev mode
-    future=True,
-)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each connection checkout waits."""
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(perf_counter() - start)
+
+
+def _engine_options(url: str) -> dict:
+    """Pool and driver options shared by the primary and replica engines."""
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if make_url(url).get_driver_name() == "psycopg":
+        # Server-side prepare statements run this many times on a connection
+        # (None disables, e.g. behind PgBouncer in transaction mode).
+        options["connect_args"] = {"prepare_threshold": settings.db_prepare_threshold}
+    return options
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """Create an instrumented async engine with the configured pool settings."""
+    new_engine = create_async_engine(
+        url,
+        echo=settings.sql_echo,
+        future=True,
+        poolclass=TimedQueuePool,
+        **_engine_options(url),
+    )
+    instrument_engine(new_engine.sync_engine)
+    trace_engine(new_engine.sync_engine)
+    return new_engine
+
+
+# Primary (all writes) and read replicas (plain SELECTs, see app.db.routing)
+engine = create_engine(settings.database_url)
+replica_engines = [
+    create_engine(url.strip()) for url in settings.database_replica_urls.split(",") if url.strip()
+]
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    info={"replicas": [replica.sync_engine for replica in replica_engines]},
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
 
+def _refresh_static_scores(session, flush_context) -> None:
+    # Imported on first flush: the repositories import the models, which import app.db.
+    from app.repositories.scores import refresh_after_flush
+
+    refresh_after_flush(session, flush_context)
+
+
+# ORM writes to venues and profiles keep venue_static_scores current.
+event.listen(RoutingSession, "after_flush", _refresh_static_scores)
+
+
 async def get_db() -> AsyncSession:
     """Dependency for getting database session."""
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,96 @@
+"""Request-scoped deadlines.
+
+A ``Deadline`` is created once per request (from the ``X-Deadline-Ms`` header
+or the configured default) and bound to the current context with
+``bind_deadline``. Every stage that can block -- provider calls, cache lookups,
+DB queries, ranking -- asks the bound deadline how much budget is left and caps
+its own timeout accordingly, so a slow dependency degrades the response instead
+of blowing the latency SLO.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+
+from app.config import settings
+
+_current_deadline: ContextVar["Deadline | None"] = ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """A point in (monotonic) time by which a request must respond."""
+
+    def __init__(self, budget_s: float):
+        """Start a deadline ``budget_s`` seconds from now.
+
+        Args:
+            budget_s: Total time budget in seconds
+        """
+        self.budget_s = budget_s
+        self.expires_at = time.monotonic() + budget_s
+
+    @classmethod
+    def from_header(cls, deadline_ms: int | None) -> "Deadline":
+        """Build a deadline from a client-supplied budget in milliseconds.
+
+        Missing or non-positive values fall back to the default budget; values
+        above the configured maximum are clamped to it.
+        """
+        if deadline_ms is None or deadline_ms <= 0:
+            deadline_ms = settings.request_deadline_ms
+        return cls(min(deadline_ms, settings.request_deadline_max_ms) / 1000)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is used up."""
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, cap: float | None = None, reserve: float = 0.0) -> float:
+        """Timeout for a stage: the remaining budget, optionally capped.
+
+        Args:
+            cap: Stage's own maximum timeout
+            reserve: Seconds to hold back for later stages
+
+        Returns:
+            Timeout in seconds (0 when the budget is exhausted)
+        """
+        remaining = max(self.remaining() - reserve, 0.0)
+        return remaining if cap is None else min(remaining, cap)
+
+
+def current_deadline() -> Deadline | None:
+    """Return the deadline bound to the current context, if any."""
+    return _current_deadline.get()
+
+
+def stage_timeout(cap: float, reserve: float = 0.0) -> float:
+    """Timeout for a stage under the current deadline, or ``cap`` if none is bound."""
+    deadline = _current_deadline.get()
+    return cap if deadline is None else deadline.timeout(cap=cap, reserve=reserve)
+
+
+@contextmanager
+def bind_deadline(deadline: Deadline) -> Iterator[Deadline]:
+    """Bind ``deadline`` to the current context for the duration of the block."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def unbound_context() -> Context:
+    """Copy of the current context with no deadline bound.
+
+    For work shared by several requests (a cache load that other callers
+    wait on), which must not be cut short by the request that started it.
+    """
+    context = copy_context()
+    context.run(_current_deadline.set, None)
+    return context
@@ -0,0 +1,18 @@
+"""Venue enrichment package (reviews ingestion + attribute scoring)."""
+
+from app.enrichment.attributes import (
+    ATTRIBUTES,
+    AttributeProfile,
+    score_attributes,
+    score_attributes_parallel,
+)
+from app.enrichment.pipeline import enrich_venues, upsert_profiles
+
+__all__ = [
+    "ATTRIBUTES",
+    "AttributeProfile",
+    "score_attributes",
+    "score_attributes_parallel",
+    "enrich_venues",
+    "upsert_profiles",
+]
@@ -0,0 +1,231 @@
+"""Vectorized keyword-based attribute scoring over review text.
+
+All snippets for a batch of venues are tokenized into one sparse term-count
+matrix ``X`` (snippets x terms). Multiplying by the signed keyword weight matrix
+``W`` (terms x attributes) scores every snippet for every attribute at once;
+per-venue scores and top evidence snippets are then reduced with NumPy group
+operations instead of Python loops.
+"""
+
+import re
+import uuid
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy import sparse
+
+# Signed keyword weights per attribute. Positive terms are evidence for the
+# attribute, negative terms are evidence against it.
+ATTRIBUTE_KEYWORDS: dict[str, dict[str, float]] = {
+    "quiet": {
+        "quiet": 1.0,
+        "peaceful": 1.0,
+        "calm": 0.8,
+        "relaxing": 0.6,
+        "study": 0.5,
+        "studying": 0.5,
+        "loud": -1.0,
+        "noisy": -1.0,
+        "crowded": -0.6,
+        "packed": -0.5,
+        "busy": -0.3,
+    },
+    "laptop_friendly": {
+        "laptop": 1.0,
+        "laptops": 1.0,
+        "wifi": 1.0,
+        "outlet": 0.9,
+        "outlets": 0.9,
+        "plugs": 0.8,
+        "work": 0.5,
+        "working": 0.6,
+        "remote": 0.4,
+        "study": 0.5,
+        "studying": 0.5,
+    },
+    "romantic": {
+        "romantic": 1.0,
+        "intimate": 0.9,
+        "candlelit": 1.0,
+        "date": 0.8,
+        "anniversary": 0.8,
+        "ambiance": 0.5,
+        "ambience": 0.5,
+        "cozy": 0.4,
+        "wine": 0.3,
+        "loud": -0.4,
+        "fluorescent": -0.5,
+    },
+}
+
+ATTRIBUTES: tuple[str, ...] = tuple(ATTRIBUTE_KEYWORDS)
+
+# Maximum evidence snippets kept per attribute.
+MAX_SNIPPETS = 3
+
+# Steepness of the logistic squashing raw keyword evidence into 0-1.
+SCORE_SCALE = 2.0
+
+# Below this many venues a process pool costs more than it saves.
+PARALLEL_MIN_VENUES = 1000
+
+
+def _build_weights() -> tuple[dict[str, int], np.ndarray]:
+    """Build the vocabulary (term -> column) and the terms x attributes weights."""
+    terms = sorted({term for keywords in ATTRIBUTE_KEYWORDS.values() for term in keywords})
+    vocabulary = {term: i for i, term in enumerate(terms)}
+    weights = np.zeros((len(vocabulary), len(ATTRIBUTES)), dtype=np.float32)
+    for j, attribute in enumerate(ATTRIBUTES):
+        for term, weight in ATTRIBUTE_KEYWORDS[attribute].items():
+            weights[vocabulary[term], j] = weight
+    return vocabulary, weights
+
+
+VOCABULARY, WEIGHTS = _build_weights()
+
+# Matches only vocabulary terms, so non-keyword words are skipped inside the
+# regex engine rather than tokenized and looked up one by one.
+_TERM_RE = re.compile(r"\b(?:" + "|".join(sorted(VOCABULARY, key=len, reverse=True)) + r")\b")
+
+
+@dataclass
+class AttributeProfile:
+    """Attribute scores and supporting snippets for one venue."""
+
+    attribute_scores: dict[str, float] = field(default_factory=dict)
+    evidence_snippets: dict[str, list[str]] = field(default_factory=dict)
+
+
+def term_counts(snippets: Iterable[str]) -> sparse.csr_matrix:
+    """Build the sparse snippets x vocabulary term-count matrix.
+
+    Tokens outside the keyword vocabulary are dropped, so the matrix stays
+    narrow regardless of review length.
+
+    Args:
+        snippets: Review snippets
+
+    Returns:
+        CSR matrix of shape (n_snippets, len(VOCABULARY))
+    """
+    rows: list[int] = []
+    cols: list[int] = []
+    n_snippets = 0
+    for row, snippet in enumerate(snippets):
+        n_snippets = row + 1
+        terms = _TERM_RE.findall(snippet.lower())
+        if terms:
+            rows.extend([row] * len(terms))
+            cols.extend([VOCABULARY[term] for term in terms])
+    data = np.ones(len(rows), dtype=np.float32)
+    # Duplicate (row, col) pairs are summed into counts on conversion.
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n_snippets, len(VOCABULARY)))
+
+
+def score_attributes(
+    reviews_by_venue: dict[uuid.UUID, list[str]],
+) -> dict[uuid.UUID, AttributeProfile]:
+    """Score every attribute for each venue from its review snippets.
+
+    A venue's raw score for an attribute is the mean keyword evidence per
+    snippet, squashed to 0-1 (0.5 means no evidence either way). The snippets
+    with the strongest positive evidence are kept as supporting evidence.
+
+    Args:
+        reviews_by_venue: Review snippets keyed by venue ID
+
+    Returns:
+        AttributeProfile keyed by venue ID
+    """
+    venue_ids = list(reviews_by_venue)
+    if not venue_ids:
+        return {}
+
+    snippets = [s for venue_id in venue_ids for s in reviews_by_venue[venue_id]]
+    counts = np.fromiter(
+        (len(reviews_by_venue[venue_id]) for venue_id in venue_ids),
+        dtype=np.int64,
+        count=len(venue_ids),
+    )
+    owner = np.repeat(np.arange(len(venue_ids)), counts)
+
+    # (snippets x terms) @ (terms x attributes) -> per-snippet attribute evidence.
+    snippet_scores = np.asarray(term_counts(snippets) @ WEIGHTS, dtype=np.float32)
+
+    # (venues x snippets) indicator @ snippet scores -> per-venue evidence totals.
+    membership = sparse.csr_matrix(
+        (np.ones(len(owner), dtype=np.float32), (owner, np.arange(len(owner)))),
+        shape=(len(venue_ids), len(owner)),
+    )
+    totals = np.asarray(membership @ snippet_scores, dtype=np.float32)
+    raw = np.divide(totals, counts[:, None], out=np.zeros_like(totals), where=counts[:, None] > 0)
+    scores = np.round(1.0 / (1.0 + np.exp(-SCORE_SCALE * raw)), 4)
+
+    evidence = _top_evidence(snippet_scores, owner, counts)
+
+    profiles = {}
+    for v, venue_id in enumerate(venue_ids):
+        profiles[venue_id] = AttributeProfile(
+            attribute_scores={a: float(scores[v, j]) for j, a in enumerate(ATTRIBUTES)},
+            evidence_snippets={
+                a: [snippets[i] for i in evidence[j].get(v, [])] for j, a in enumerate(ATTRIBUTES)
+            },
+        )
+    return profiles
+
+
+def _top_evidence(
+    snippet_scores: np.ndarray, owner: np.ndarray, counts: np.ndarray
+) -> list[dict[int, list[int]]]:
+    """Pick the top positive snippets per venue for each attribute.
+
+    Returns:
+        Per attribute, a mapping of venue index -> snippet indices (best first)
+    """
+    group_start = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    evidence = []
+    for j in range(snippet_scores.shape[1]):
+        column = snippet_scores[:, j]
+        # Sort by venue, then score descending; lexsort is stable so ties keep
+        # review order.
+        order = np.lexsort((-column, owner))
+        rank = np.arange(len(order)) - group_start[owner[order]]
+        keep = order[(rank < MAX_SNIPPETS) & (column[order] > 0)]
+        per_venue: dict[int, list[int]] = {}
+        for i in keep.tolist():
+            per_venue.setdefault(int(owner[i]), []).append(i)
+        evidence.append(per_venue)
+    return evidence
+
+
+def score_attributes_parallel(
+    reviews_by_venue: dict[uuid.UUID, list[str]],
+    workers: int | None = None,
+    chunk_size: int = 5000,
+) -> dict[uuid.UUID, AttributeProfile]:
+    """Score a large set of venues across a process pool.
+
+    Venues are split into chunks that are scored independently (each chunk is
+    one sparse matrix product), so throughput scales with CPU cores. Small
+    inputs are scored inline.
+
+    Args:
+        reviews_by_venue: Review snippets keyed by venue ID
+        workers: Worker processes (default: CPU count)
+        chunk_size: Venues per chunk
+
+    Returns:
+        AttributeProfile keyed by venue ID
+    """
+    if len(reviews_by_venue) < PARALLEL_MIN_VENUES or workers == 1:
+        return score_attributes(reviews_by_venue)
+
+    items = list(reviews_by_venue.items())
+    chunks = [dict(items[i : i + chunk_size]) for i in range(0, len(items), chunk_size)]
+    profiles: dict[uuid.UUID, AttributeProfile] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_profiles in pool.map(score_attributes, chunks):
+            profiles.update(chunk_profiles)
+    return profiles
@@ -0,0 +1,150 @@
+"""Batch enrichment pipeline: fetch reviews, score attributes, upsert profiles."""
+
+import asyncio
+import logging
+import uuid
+from datetime import UTC, datetime
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.invalidation import invalidate_venues
+from app.config import settings
+from app.enrichment.attributes import AttributeProfile, score_attributes
+from app.models.venue import Venue, VenueProfile
+from app.providers.google import GooglePlacesClient
+from app.repositories.scores import refresh_static_scores
+from app.worker.refresh import defer_refresh, next_expiry
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_reviews(
+    venues: list[Venue],
+    client: GooglePlacesClient,
+    concurrency: int | None = None,
+) -> dict[uuid.UUID, list[str]]:
+    """Fetch review texts for many venues over one shared HTTP client.
+
+    Venues whose fetch fails are left out, so their existing profile is kept
+    rather than overwritten with an empty one.
+
+    Args:
+        venues: Venues to fetch reviews for (Google venues only)
+        client: Google Places client
+        concurrency: Maximum requests in flight (default: settings)
+
+    Returns:
+        Review texts keyed by venue ID
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.enrichment_review_concurrency)
+
+    async with httpx.AsyncClient(timeout=10.0) as http_client:
+
+        async def fetch(venue: Venue) -> tuple[uuid.UUID, list[str] | None]:
+            async with semaphore:
+                try:
+                    reviews = await client.get_place_reviews(
+                        venue.provider_id, http_client=http_client
+                    )
+                    return venue.id, reviews
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    # Network errors and malformed bodies skip this venue only.
+                    logger.warning(f"Skipping venue {venue.id}: review fetch failed: {e!r}")
+                    return venue.id, None
+
+        results = await asyncio.gather(*(fetch(venue) for venue in venues))
+
+    return {venue_id: reviews for venue_id, reviews in results if reviews is not None}
+
+
+async def upsert_profiles(
+    session: AsyncSession,
+    profiles: dict[uuid.UUID, AttributeProfile],
+    now: datetime | None = None,
+) -> int:
+    """Write many venue profiles in a single ``INSERT ... ON CONFLICT`` statement.
+
+    The venues' static mode scores are refreshed in the same transaction, and
+    cache entries derived from the venues are invalidated after the commit.
+
+    Args:
+        session: Database session
+        profiles: AttributeProfile keyed by venue ID
+        now: Profiling time (default: current UTC time)
+
+    Returns:
+        Number of profiles written
+    """
+    if not profiles:
+        return 0
+
+    now = now or datetime.now(UTC)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "venue_id": venue_id,
+            "attribute_scores": profile.attribute_scores,
+            "evidence_snippets": profile.evidence_snippets,
+            "profiled_at": now,
+            "expires_at": next_expiry(now),
+            "refresh_failures": 0,
+        }
+        for venue_id, profile in profiles.items()
+    ]
+    stmt = insert(VenueProfile).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VenueProfile.venue_id],
+        set_={
+            "attribute_scores": stmt.excluded.attribute_scores,
+            "evidence_snippets": stmt.excluded.evidence_snippets,
+            "profiled_at": stmt.excluded.profiled_at,
+            "expires_at": stmt.excluded.expires_at,
+            "refresh_failures": stmt.excluded.refresh_failures,
+        },
+    )
+    await session.execute(stmt)
+    # Core upserts skip the ORM flush hook, so refresh the mode scores here.
+    await refresh_static_scores(session, list(profiles))
+    await session.commit()
+    # ...and the flush hook's cache invalidation too.
+    await invalidate_venues(list(profiles))
+    return len(rows)
+
+
+async def enrich_venues(
+    session: AsyncSession,
+    venue_ids: list[uuid.UUID],
+    client: GooglePlacesClient | None = None,
+) -> int:
+    """Enrich a batch of venues end to end.
+
+    Venues that are not re-profiled (not from Google, or their reviews failed
+    to load) have their next refresh deferred with backoff.
+
+    Args:
+        session: Database session
+        venue_ids: Venues to enrich
+        client: Google Places client (default: one built from settings)
+
+    Returns:
+        Number of profiles written
+    """
+    result = await session.execute(
+        select(Venue).where(Venue.id.in_(venue_ids), Venue.provider_name == GooglePlacesClient.name)
+    )
+    venues = list(result.scalars().all())
+
+    reviews = await fetch_reviews(venues, client or GooglePlacesClient()) if venues else {}
+    profiles = score_attributes(reviews)
+    written = await upsert_profiles(session, profiles)
+
+    skipped = [venue_id for venue_id in venue_ids if venue_id not in profiles]
+    if skipped:
+        await defer_refresh(session, skipped)
+        await session.commit()
+
+    logger.info(f"Enriched {written}/{len(venue_ids)} venues")
+    return written
@@ -0,0 +1,66 @@
+"""City-wide attribute re-score from a review dump.
+
+Usage: ``python -m app.enrichment.rescore reviews.jsonl [--workers N]``
+
+Each input line is ``{"venue_id": "<uuid>", "reviews": ["...", ...]}``. Venues
+are scored across a process pool and written back in bulk-upsert chunks.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import uuid
+
+from app.db.session import AsyncSessionLocal
+from app.enrichment.attributes import score_attributes_parallel
+from app.enrichment.pipeline import upsert_profiles
+
+logger = logging.getLogger(__name__)
+
+# Profiles per INSERT ... ON CONFLICT statement.
+UPSERT_CHUNK_SIZE = 1000
+
+
+def load_reviews(path: str) -> dict[uuid.UUID, list[str]]:
+    """Load review snippets keyed by venue ID from a JSONL dump."""
+    reviews: dict[uuid.UUID, list[str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                reviews[uuid.UUID(record["venue_id"])] = list(record.get("reviews", []))
+    return reviews
+
+
+async def rescore(path: str, workers: int | None = None) -> int:
+    """Re-score every venue in a review dump and upsert the profiles.
+
+    Args:
+        path: JSONL review dump
+        workers: Scoring processes (default: CPU count)
+
+    Returns:
+        Number of profiles written
+    """
+    profiles = score_attributes_parallel(load_reviews(path), workers=workers)
+    items = list(profiles.items())
+    written = 0
+    async with AsyncSessionLocal() as session:
+        for i in range(0, len(items), UPSERT_CHUNK_SIZE):
+            written += await upsert_profiles(session, dict(items[i : i + UPSERT_CHUNK_SIZE]))
+    logger.info(f"Re-scored {written} venue profiles")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="JSONL review dump")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(rescore(args.path, workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""User event ingest."""
+
+from app.events.ingest import EventIngestor, IngestQueueFull, event_ingestor
+
+__all__ = ["EventIngestor", "IngestQueueFull", "event_ingestor"]
@@ -0,0 +1,294 @@
+"""Buffered user event ingest.
+
+``POST /events`` only validates events and queues them in process
+(``EventIngestor.submit``). Repeated impressions are dropped and events
+sampled by type on the way in (see ``app.events.sampling``); kept events
+carry their ``sample_weight``. A background task drains the queue in batches:
+
+1. one query for the venues referenced (their static features); events
+   naming an unknown venue are dropped here rather than failing the batch's
+   foreign key
+2. one multi-row INSERT into ``user_events``
+3. one preference-vector update per user (``PreferenceStore.apply``)
+
+so request latency does not depend on the database, and each user's events in
+a batch cost a single Redis round trip. Queue depth is exported as
+``modemap_event_ingest_queue_depth``; events still queued at shutdown are
+flushed by ``stop()``.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import numpy as np
+from redis.exceptions import RedisError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.events.sampling import WindowedBloomFilter, dedup_key, parse_sample_rates
+from app.models.user_event import EventType, UserEvent
+from app.observability.metrics import EVENT_INGEST_DROPPED, EVENT_INGEST_QUEUE_DEPTH
+from app.ranking.features import build_static_features
+from app.ranking.personalization import EVENT_SIGNALS, PreferenceStore, PreferenceUpdate
+from app.repositories.scores import score_inputs_statement
+from app.schemas.venue import UserEventCreate
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingest queue cannot take a batch (writer is behind)."""
+
+
+@dataclass(frozen=True)
+class QueuedEvent:
+    """A validated event, its arrival time and sampling weight."""
+
+    event: UserEventCreate
+    received_at: datetime
+    sample_weight: float = 1.0
+
+
+class EventIngestor:
+    """In-process event queue with a batching background writer."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        store: PreferenceStore | None = None,
+        batch_size: int | None = None,
+        flush_seconds: float | None = None,
+        max_queued: int | None = None,
+        dedup_window_s: float | None = None,
+        sample_rates: dict[EventType, float] | None = None,
+        rng: Callable[[], float] = random.random,
+    ):
+        """Initialize the ingestor.
+
+        Args:
+            session_factory: Session factory for event writes
+            store: Preference vectors (default: Redis-backed, if personalization is on)
+            batch_size: Maximum events per write (default: settings)
+            flush_seconds: Longest a queued event waits for a batch to fill
+            max_queued: Queue capacity (default: settings)
+            dedup_window_s: Drop impressions repeated within this many
+                seconds; 0 disables (default: settings)
+            sample_rates: Fraction of events kept per type; types not listed
+                keep all (default: parsed from settings)
+            rng: Uniform [0, 1) source for sampling (for tests)
+        """
+        self.session_factory = session_factory
+        self.store = store
+        self.batch_size = batch_size or settings.event_ingest_batch_size
+        self.flush_seconds = flush_seconds or settings.event_ingest_flush_seconds
+        self._queue: asyncio.Queue[QueuedEvent] = asyncio.Queue(
+            maxsize=max_queued or settings.event_ingest_queue_size
+        )
+        self._task: asyncio.Task | None = None
+        self._batch: list[QueuedEvent] = []
+        window = settings.event_dedup_window_seconds if dedup_window_s is None else dedup_window_s
+        self.deduper = (
+            WindowedBloomFilter(settings.event_dedup_capacity, window) if window > 0 else None
+        )
+        self.sample_rates = (
+            parse_sample_rates(settings.event_sample_rates)
+            if sample_rates is None
+            else sample_rates
+        )
+        self._random = rng
+
+    @property
+    def depth(self) -> int:
+        """Events waiting to be written."""
+        return self._queue.qsize()
+
+    def submit(self, events: Sequence[UserEventCreate]) -> int:
+        """Queue events for writing (all or none), less repeats and sampled-out events.
+
+        Returns:
+            Number of events accepted (including those dropped as repeats or
+            by sampling)
+
+        Raises:
+            IngestQueueFull: If the queue has no room for the whole batch
+        """
+        # Checked before deduplicating, so a rejected batch can be resent.
+        if self._queue.maxsize - self._queue.qsize() < len(events):
+            raise IngestQueueFull(f"Event queue full ({self._queue.qsize()} pending)")
+        received_at = datetime.now(UTC)
+        for event, weight in self._admit(events):
+            self._queue.put_nowait(QueuedEvent(event, received_at, weight))
+        EVENT_INGEST_QUEUE_DEPTH.set(self._queue.qsize())
+        return len(events)
+
+    def _admit(self, events: Sequence[UserEventCreate]) -> list[tuple[UserEventCreate, float]]:
+        admitted = []
+        dropped: Counter[tuple[str, str]] = Counter()
+        for event in events:
+            key = dedup_key(event) if self.deduper is not None else None
+            if key is not None and self.deduper.add(key):
+                dropped[event.event_type.value, "duplicate"] += 1
+                continue
+            rate = self.sample_rates.get(event.event_type, 1.0)
+            if rate < 1.0 and self._random() >= rate:
+                dropped[event.event_type.value, "sampled"] += 1
+                continue
+            admitted.append((event, 1.0 / rate))
+        for (event_type, reason), count in dropped.items():
+            EVENT_INGEST_DROPPED.labels(event_type, reason).inc(count)
+        return admitted
+
+    def start(self) -> None:
+        """Start the background writer on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="event-ingest")
+
+    async def stop(self) -> None:
+        """Stop the writer and flush whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        batch, self._batch = self._batch, []
+        await self.flush(batch)
+        while self._queue.qsize():
+            await self.flush(self._drain(self.batch_size))
+
+    async def _run(self) -> None:
+        while True:
+            # Events taken off the queue live in self._batch until written, so
+            # stop() can flush a partially filled batch.
+            self._batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(self._batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            await self.flush(batch)
+
+    def _drain(self, limit: int) -> list[QueuedEvent]:
+        batch = []
+        while len(batch) < limit and self._queue.qsize():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def flush(self, batch: list[QueuedEvent]) -> int:
+        """Write a batch of events and fold them into preference vectors.
+
+        Events whose ``venue_id`` is not in ``venues`` are dropped (counted
+        as ``unknown_venue``) so one bad reference cannot fail the INSERT for
+        the rest. Other failures are logged and the batch dropped: events are
+        telemetry, and retrying would only let the queue back up behind a
+        failing database.
+
+        Returns:
+            Number of events written
+        """
+        EVENT_INGEST_QUEUE_DEPTH.set(self._queue.qsize())
+        if not batch:
+            return 0
+        venue_ids = list({item.event.venue_id for item in batch if item.event.venue_id})
+        async with self.session_factory() as session:
+            try:
+                venues = await self._load_venues(session, venue_ids)
+                batch = self._drop_unknown_venues(batch, venues)
+                if not batch:
+                    return 0
+                rows = [
+                    {
+                        "id": uuid.uuid4(),
+                        **item.event.model_dump(),
+                        "created_at": item.received_at,
+                        "sample_weight": item.sample_weight,
+                    }
+                    for item in batch
+                ]
+                await session.execute(insert(UserEvent).values(rows))
+                await session.commit()
+            except (SQLAlchemyError, OSError) as e:
+                logger.error(f"Dropped {len(batch)} events: {e!r}")
+                return 0
+        try:
+            await self._update_preferences(batch, venues)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Preference update skipped for {len(batch)} events: {e!r}")
+        return len(rows)
+
+    @staticmethod
+    async def _load_venues(
+        session: AsyncSession, venue_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, tuple[np.ndarray, int | None]]:
+        """Static features and price level of the referenced venues that exist."""
+        if not venue_ids:
+            return {}
+        rows = list((await session.execute(score_inputs_statement(venue_ids))).all())
+        static = build_static_features(rows, [row.attribute_scores for row in rows])
+        return {row.id: (static[i], row.price_level) for i, row in enumerate(rows)}
+
+    @staticmethod
+    def _drop_unknown_venues(
+        batch: list[QueuedEvent], venues: dict[uuid.UUID, tuple[np.ndarray, int | None]]
+    ) -> list[QueuedEvent]:
+        kept = []
+        unknown: Counter[str] = Counter()
+        for item in batch:
+            if item.event.venue_id is None or item.event.venue_id in venues:
+                kept.append(item)
+            else:
+                unknown[item.event.event_type.value] += 1
+        for event_type, count in unknown.items():
+            EVENT_INGEST_DROPPED.labels(event_type, "unknown_venue").inc(count)
+        if unknown:
+            logger.warning(f"Dropped {unknown.total()} events referencing unknown venues")
+        return kept
+
+    async def _update_preferences(
+        self,
+        batch: list[QueuedEvent],
+        venues: dict[uuid.UUID, tuple[np.ndarray, int | None]],
+    ) -> None:
+        if not settings.personalization_enabled:
+            return
+        updates: dict[str, list[PreferenceUpdate]] = defaultdict(list)
+        for item in batch:
+            event = item.event
+            if not event.user_id or event.event_type not in EVENT_SIGNALS:
+                continue
+            venue = venues.get(event.venue_id)
+            if venue is None:
+                continue
+            updates[event.user_id].append(
+                PreferenceUpdate(
+                    event_type=event.event_type,
+                    at=item.received_at.timestamp(),
+                    mode=event.mode,
+                    static_features=venue[0],
+                    price_level=venue[1],
+                )
+            )
+        if not updates:
+            return
+        store = self.store or PreferenceStore()
+        await asyncio.gather(*(store.apply(user_id, items) for user_id, items in updates.items()))
+
+
+# Process-wide ingestor, started and stopped with the app.
+event_ingestor = EventIngestor()
@@ -0,0 +1,137 @@
+"""Ingest-side impression deduplication and per-type sampling.
+
+Scroll jitter re-sends the impression of a venue the user is already looking
+at. ``WindowedBloomFilter`` remembers the (user, venue, mode, search) keys of
+recent impressions (``dedup_key``) in two rotating Bloom filters, so a repeat
+within ``event_dedup_window_seconds`` is dropped before it is queued. Memory
+is fixed by ``event_dedup_capacity`` whatever the traffic; a false positive
+(an impression wrongly taken for a repeat) happens at most ``error_rate`` of
+the time. Each process has its own filter, so repeats that land on different
+workers are each kept once.
+
+Sampling then keeps each event with its type's rate from
+``event_sample_rates`` and stores ``1 / rate`` as its ``sample_weight``, so
+summing weights instead of counting rows estimates the unsampled totals.
+Engagement events (``EVENT_SIGNALS``) cannot be sampled: each one updates the
+user's preference vector and labels evaluation data, neither of which reads
+``sample_weight``.
+"""
+
+import hashlib
+import math
+import time
+from collections.abc import Callable
+
+from app.models.user_event import EventType
+from app.ranking.personalization import EVENT_SIGNALS
+from app.schemas.venue import UserEventCreate
+
+
+class WindowedBloomFilter:
+    """Approximate set of keys seen within the last one to two windows."""
+
+    def __init__(
+        self,
+        capacity: int,
+        window_s: float,
+        error_rate: float = 0.001,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the filter.
+
+        Args:
+            capacity: Keys per window at which false positives reach ``error_rate``
+            window_s: Keys are remembered for at least this long
+            error_rate: Target false positive rate
+            clock: Monotonic time source (for tests)
+        """
+        self.size_bits = max(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size_bits / capacity * math.log(2)), 1)
+        self.window_s = window_s
+        self._clock = clock
+        self._current = bytearray((self.size_bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._started = clock()
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hashes)]
+
+    def _rotate(self) -> None:
+        elapsed = self._clock() - self._started
+        if elapsed < self.window_s:
+            return
+        if elapsed < 2 * self.window_s:
+            self._previous = self._current
+        else:
+            self._previous = bytearray(len(self._current))
+        self._current = bytearray(len(self._current))
+        self._started = self._clock()
+
+    def __contains__(self, key: str) -> bool:
+        self._rotate()
+        positions = self._positions(key)
+        return any(
+            all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+            for bits in (self._current, self._previous)
+        )
+
+    def add(self, key: str) -> bool:
+        """Record a key.
+
+        Returns:
+            True if the key was (probably) already recorded within the window
+        """
+        self._rotate()
+        seen_current = seen_previous = True
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            seen_current &= bool(self._current[byte] & mask)
+            seen_previous &= bool(self._previous[byte] & mask)
+            self._current[byte] |= mask
+        return seen_current or seen_previous
+
+
+def dedup_key(event: UserEventCreate) -> str | None:
+    """Deduplication key of an impression: user, venue, mode and search.
+
+    The search is the ``query_context``'s ``search_id`` if the client sends
+    one, else its tile (or rounded center) and radius.
+
+    Returns:
+        Key, or None if the event is not deduplicated (not an impression, or
+        anonymous: different users would share keys)
+    """
+    if event.event_type != EventType.IMPRESSION or not event.user_id or event.venue_id is None:
+        return None
+    context = event.query_context or {}
+    search = context.get("search_id") or context.get("tile")
+    if search is None and "lat" in context and "lng" in context:
+        try:
+            search = f"{float(context['lat']):.4f},{float(context['lng']):.4f}"
+        except (TypeError, ValueError):
+            search = None
+    mode = event.mode.value if event.mode else ""
+    return f"{event.user_id}|{event.venue_id}|{mode}|{search or ''}|{context.get('radius', '')}"
+
+
+def parse_sample_rates(spec: str) -> dict[EventType, float]:
+    """Parse per-type sampling rates ("impression=0.1,click=1").
+
+    Raises:
+        ValueError: If a type is unknown, a rate is not in (0, 1] or an
+            engagement type (``EVENT_SIGNALS``) is sampled
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        event_type = EventType(name.strip())
+        value = float(rate)
+        if not 0 < value <= 1:
+            raise ValueError(f"Sampling rate for {name} must be in (0, 1], got {rate}")
+        if event_type in EVENT_SIGNALS and value < 1:
+            raise ValueError(f"{name} events feed personalization and cannot be sampled")
+        rates[event_type] = value
+    return rates
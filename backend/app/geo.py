@@ -0,0 +1,312 @@
+"""Geographic helpers: distances and geohash cells.
+
+Scalar functions (``haversine_m``, ``geohash_encode``) are for single points
+on request paths; the NumPy versions take arrays and are for bulk work
+(feature matrices, cache keys, analytics over event logs).
+
+Geohash cells are handled either as strings ("9q8yy") or as integer cell ids:
+the geohash's ``5 * precision`` interleaved bits as a uint64 (longitude bit
+first). Integer ids are what the vectorized functions compute on; convert
+with ``cells_to_geohashes`` / ``geohashes_to_cells`` at the edges.
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# Meters per degree of latitude (approximately constant).
+METERS_PER_DEGREE_LAT = 111_320.0
+
+# Geohash base32 alphabet (no a, i, l, o).
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+MAX_PRECISION = 12  # 60 bits, fits a uint64 cell id
+
+# Largest covering returned by ``covering_cells`` before refusing.
+MAX_COVERING_CELLS = 4096
+
+_ALPHABET_CODES = np.frombuffer(GEOHASH_ALPHABET.encode(), dtype=np.uint8)
+_DECODE_TABLE = np.full(256, 255, dtype=np.uint8)
+_DECODE_TABLE[_ALPHABET_CODES] = np.arange(32, dtype=np.uint8)
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def haversine_m_array(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distances in meters, broadcasting over array arguments."""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = np.radians(np.subtract(lng2, lng1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def geohash_encode(lat: float, lng: float, precision: int = 5) -> str:
+    """Encode a point as a geohash (precision 5 is a ~4.9 x 4.9 km cell)."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # Bits alternate longitude, latitude, starting with longitude.
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+# ---------------------------------------------------------------------------
+# Vectorized geohash cells
+# ---------------------------------------------------------------------------
+
+
+def _bit_counts(precision: int) -> tuple[int, int]:
+    """(longitude bits, latitude bits) of a geohash precision."""
+    if not 1 <= precision <= MAX_PRECISION:
+        raise ValueError(f"Geohash precision must be 1-{MAX_PRECISION}, got {precision}")
+    bits = 5 * precision
+    return (bits + 1) // 2, bits // 2
+
+
+def _spread(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit above every bit of 32-bit values (0b111 -> 0b10101)."""
+    v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    return (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+
+
+def _compact(v: np.ndarray) -> np.ndarray:
+    """Inverse of ``_spread``: keep every other bit, starting with bit 0."""
+    v = v.astype(np.uint64) & np.uint64(0x5555555555555555)
+    v = (v | (v >> np.uint64(1))) & np.uint64(0x3333333333333333)
+    v = (v | (v >> np.uint64(2))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    return (v | (v >> np.uint64(16))) & np.uint64(0xFFFFFFFF)
+
+
+def _interleave(lng_q: np.ndarray, lat_q: np.ndarray, precision: int) -> np.ndarray:
+    # The most significant bit is a longitude bit, so longitude takes the odd
+    # bit positions when the total bit count is even, the even ones otherwise.
+    if (5 * precision) % 2 == 0:
+        return (_spread(lng_q) << np.uint64(1)) | _spread(lat_q)
+    return _spread(lng_q) | (_spread(lat_q) << np.uint64(1))
+
+
+def _deinterleave(cells: np.ndarray, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    cells = np.asarray(cells, dtype=np.uint64)
+    if (5 * precision) % 2 == 0:
+        return _compact(cells >> np.uint64(1)), _compact(cells)
+    return _compact(cells), _compact(cells >> np.uint64(1))
+
+
+def _quantize(values, low: float, span: float, bits: int) -> np.ndarray:
+    q = np.floor((np.asarray(values, dtype=np.float64) - low) / span * (1 << bits))
+    return np.clip(q, 0, (1 << bits) - 1).astype(np.uint64)
+
+
+def encode_cells(lats, lngs, precision: int = 5) -> np.ndarray:
+    """Integer geohash cell ids of many points.
+
+    Args:
+        lats: Latitudes (array-like)
+        lngs: Longitudes (array-like, same shape)
+        precision: Geohash length (1-12)
+
+    Returns:
+        uint64 cell ids
+
+    Raises:
+        ValueError: If the precision is out of range
+    """
+    lng_bits, lat_bits = _bit_counts(precision)
+    lng_q = _quantize(lngs, -180.0, 360.0, lng_bits)
+    lat_q = _quantize(lats, -90.0, 180.0, lat_bits)
+    return _interleave(lng_q, lat_q, precision)
+
+
+def cells_to_geohashes(cells, precision: int = 5) -> np.ndarray:
+    """Render integer cell ids as geohash strings (NumPy ``str`` array)."""
+    _bit_counts(precision)
+    cells = np.asarray(cells, dtype=np.uint64).reshape(-1)
+    shifts = np.arange(precision - 1, -1, -1, dtype=np.uint64) * np.uint64(5)
+    digits = (cells[:, None] >> shifts) & np.uint64(31)
+    chars = np.ascontiguousarray(_ALPHABET_CODES[digits])
+    return chars.view(f"S{precision}").reshape(-1).astype(str)
+
+
+def geohashes_to_cells(geohashes) -> np.ndarray:
+    """Parse equal-length geohash strings into integer cell ids.
+
+    Raises:
+        ValueError: If lengths differ or a character is not in the alphabet
+    """
+    raw = np.asarray(geohashes, dtype=str).reshape(-1)
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.uint64)
+    precision = len(raw[0])
+    _bit_counts(precision)
+    # Before the cast, which would truncate longer strings to ``precision``.
+    if np.any(np.char.str_len(raw) != precision):
+        raise ValueError("Geohashes must all have the same length")
+    encoded = np.char.lower(raw).astype(f"S{precision}")
+    digits = _DECODE_TABLE[np.frombuffer(encoded.tobytes(), dtype=np.uint8)]
+    if np.any(digits == 255):
+        raise ValueError("Invalid geohash character")
+    digits = digits.reshape(-1, precision).astype(np.uint64)
+    shifts = np.arange(precision - 1, -1, -1, dtype=np.uint64) * np.uint64(5)
+    return np.bitwise_or.reduce(digits << shifts, axis=1)
+
+
+def geohash_encode_array(lats, lngs, precision: int = 5) -> np.ndarray:
+    """Geohash strings of many points (vectorized ``geohash_encode``)."""
+    return cells_to_geohashes(encode_cells(lats, lngs, precision), precision)
+
+
+def cell_size_deg(precision: int) -> tuple[float, float]:
+    """(latitude, longitude) size in degrees of a cell at ``precision``."""
+    lng_bits, lat_bits = _bit_counts(precision)
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def decode_cells(cells, precision: int = 5) -> tuple[np.ndarray, np.ndarray]:
+    """Centers of integer geohash cells.
+
+    Returns:
+        (latitudes, longitudes) of the cell centers; the cells extend half of
+        ``cell_size_deg(precision)`` either side
+    """
+    lng_q, lat_q = _deinterleave(cells, precision)
+    lat_size, lng_size = cell_size_deg(precision)
+    return (
+        -90.0 + (lat_q.astype(np.float64) + 0.5) * lat_size,
+        -180.0 + (lng_q.astype(np.float64) + 0.5) * lng_size,
+    )
+
+
+def geohash_decode_array(geohashes) -> tuple[np.ndarray, np.ndarray]:
+    """Centers (latitudes, longitudes) of equal-length geohash strings."""
+    raw = np.asarray(geohashes, dtype=str).reshape(-1)
+    precision = len(raw[0]) if raw.size else 1
+    return decode_cells(geohashes_to_cells(raw), precision)
+
+
+def neighbor_cells(cells, precision: int = 5) -> np.ndarray:
+    """The 3x3 block of cells around each cell (the cell itself included).
+
+    Longitude wraps at the antimeridian; rows past a pole are clamped, so
+    polar cells repeat some neighbors.
+
+    Returns:
+        (n, 9) uint64 cell ids, row-major from south-west to north-east
+    """
+    lng_bits, lat_bits = _bit_counts(precision)
+    lng_q, lat_q = _deinterleave(np.asarray(cells, dtype=np.uint64).reshape(-1), precision)
+    offsets = np.array([-1, 0, 1], dtype=np.int64)
+    lat_n = np.clip(lat_q.astype(np.int64)[:, None] + offsets, 0, (1 << lat_bits) - 1)
+    lng_n = (lng_q.astype(np.int64)[:, None] + offsets) % (1 << lng_bits)
+    lat_grid = np.repeat(lat_n, 3, axis=1)
+    lng_grid = np.tile(lng_n, (1, 3))
+    return _interleave(lng_grid.astype(np.uint64), lat_grid.astype(np.uint64), precision)
+
+
+def bbox_cells(
+    min_lat: float,
+    min_lng: float,
+    max_lat: float,
+    max_lng: float,
+    precision: int = 5,
+    max_cells: int = MAX_COVERING_CELLS,
+) -> np.ndarray:
+    """Cells intersecting a bounding box.
+
+    A box with ``min_lng > max_lng`` crosses the antimeridian.
+
+    Returns:
+        uint64 cell ids, south-west first
+
+    Raises:
+        ValueError: If the covering would exceed ``max_cells``
+    """
+    lng_bits, lat_bits = _bit_counts(precision)
+    lat_lo, lat_hi = _quantize([min_lat, max_lat], -90.0, 180.0, lat_bits)
+    lng_lo, lng_hi = (int(q) for q in _quantize([min_lng, max_lng], -180.0, 360.0, lng_bits))
+    lat_range = np.arange(int(lat_lo), int(lat_hi) + 1, dtype=np.int64)
+    if lng_hi >= lng_lo:
+        lng_range = np.arange(lng_lo, lng_hi + 1, dtype=np.int64)
+    else:
+        lng_range = np.arange(lng_lo, lng_hi + 1 + (1 << lng_bits), dtype=np.int64)
+        lng_range %= 1 << lng_bits
+    if len(lat_range) * len(lng_range) > max_cells:
+        raise ValueError(
+            f"Covering needs {len(lat_range) * len(lng_range)} cells (max {max_cells}); "
+            "use a lower precision"
+        )
+    lat_grid, lng_grid = np.meshgrid(lat_range, lng_range, indexing="ij")
+    return _interleave(
+        lng_grid.reshape(-1).astype(np.uint64), lat_grid.reshape(-1).astype(np.uint64), precision
+    )
+
+
+def covering_cells(
+    lat: float,
+    lng: float,
+    radius_m: float,
+    precision: int = 5,
+    max_cells: int = MAX_COVERING_CELLS,
+) -> np.ndarray:
+    """Cells intersecting a circle.
+
+    Starts from the circle's bounding box and drops the cells whose nearest
+    point is farther than ``radius_m`` from the center.
+
+    Returns:
+        uint64 cell ids
+
+    Raises:
+        ValueError: If the covering would exceed ``max_cells``
+    """
+    dlat = radius_m / METERS_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(radius_m / (METERS_PER_DEGREE_LAT * cos_lat), 180.0)
+    min_lng, max_lng = lng - dlng, lng + dlng
+    if dlng >= 180.0:
+        min_lng, max_lng = -180.0, 180.0
+    else:
+        min_lng = (min_lng + 180.0) % 360.0 - 180.0
+        max_lng = (max_lng + 180.0) % 360.0 - 180.0
+    cells = bbox_cells(
+        max(lat - dlat, -90.0), min_lng, min(lat + dlat, 90.0), max_lng, precision, max_cells
+    )
+
+    # Distance to each cell's nearest point: clamp the center into the cell.
+    centers_lat, centers_lng = decode_cells(cells, precision)
+    lat_size, lng_size = cell_size_deg(precision)
+    nearest_lat = np.clip(lat, centers_lat - lat_size / 2, centers_lat + lat_size / 2)
+    offset = (lng - centers_lng + 180.0) % 360.0 - 180.0  # signed, across the antimeridian
+    nearest_lng = centers_lng + np.clip(offset, -lng_size / 2, lng_size / 2)
+    keep = haversine_m_array(lat, lng, nearest_lat, nearest_lng) <= radius_m
+    return cells[keep]
@@ -1,8 +1,90 @@
 """FastAPI application main module."""
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Annotated
 
-app = FastAPI(title="ModeMap API")
+from fastapi import BackgroundTasks, Body, FastAPI, Header, HTTPException, Query, Response
+
+from app.cache import InvalidationListener
+from app.config import settings
+from app.db.instrumentation import QueryTrackingMiddleware
+from app.deadline import Deadline
+from app.events import IngestQueueFull, event_ingestor
+from app.models.user_event import Mode
+from app.observability import MetricsMiddleware, TracingMiddleware, render_metrics
+from app.providers.registry import get_providers
+from app.schemas.search import (
+    BatchQuery,
+    BatchResponse,
+    ModeComparisonResponse,
+    NearbyResponse,
+    RerankRequest,
+)
+from app.schemas.venue import UserEventCreate
+from app.services.nearby import NearbyQuery, compare_modes
+from app.services.results import (
+    MAX_RESULT_SET,
+    Cursor,
+    InvalidCursor,
+    InvalidWeights,
+    SearchExpired,
+    rerank,
+    search_batch,
+    search_nearby_page,
+    time_bucket,
+)
+from app.services.warmup import prefetch_neighbors, warm_hot_tiles
+from app.worker.refresh import enqueue_visible_venues
+
+logger = logging.getLogger(__name__)
+
+# Largest batch accepted by POST /events.
+MAX_EVENTS_PER_REQUEST = 500
+
+# Most searches accepted by POST /venues/nearby/batch.
+MAX_BATCH_QUERIES = 50
+
+# Longest accepted page cursor (encoded cursors are well under 100 characters).
+MAX_CURSOR_LENGTH = 256
+
+
+# Applies other processes' cache invalidations to this process's L1.
+invalidation_listener = InvalidationListener()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run the event ingest writer, cache invalidation listener and warm-up with the app."""
+    event_ingestor.start()
+    warmup = None
+    if settings.cache_enabled:
+        invalidation_listener.start()
+        if settings.warmup_on_startup:
+            warmup = asyncio.create_task(_warm_up())
+    try:
+        yield
+    finally:
+        if warmup is not None:
+            warmup.cancel()
+        await invalidation_listener.stop()
+        await event_ingestor.stop()
+
+
+async def _warm_up() -> None:
+    try:
+        await warm_hot_tiles(get_providers())
+    except Exception as e:
+        logger.warning(f"Startup cache warm-up failed: {e}")
+
+
+app = FastAPI(title="ModeMap API", lifespan=lifespan)
+if settings.sql_instrumentation:
+    app.add_middleware(QueryTrackingMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/health")
@@ -11,6 +93,13 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+
 @app.get("/hello")
 def hello():
     """Hello endpoint."""
@@ -49,3 +138,218 @@ async def test_google_places(lat: float = 37.7749, lng: float = -122.4194, radiu
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching places: {str(e)}") from e
+
+
+@app.get("/venues/nearby", response_model=NearbyResponse)
+async def nearby_venues(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    lat: float | None = Query(None, ge=-90, le=90),
+    lng: float | None = Query(None, ge=-180, le=180),
+    radius: int = Query(1000, gt=0, le=50000),
+    mode: Mode = Mode.WORK,
+    open_now: bool = False,
+    price_level: int | None = Query(None, ge=0, le=4),
+    limit: int = Query(20, ge=1, le=50),
+    min_results: int | None = Query(None, ge=1, le=MAX_RESULT_SET),
+    cursor: str | None = Query(None, max_length=MAX_CURSOR_LENGTH),
+    x_deadline_ms: int | None = Header(None),
+    x_user_id: str | None = Header(None, max_length=255),
+):
+    """Search nearby venues ranked for a mode, one page at a time.
+
+    The full ranking is cached, so later pages (``cursor`` from the previous
+    page's ``next_cursor``) are served without re-running the search. The
+    ``X-Cache`` response header is ``hit`` when the page came from a cached
+    ranking. After a miss, the page's venues whose profile is missing or
+    expiring are queued for enrichment ahead of scheduled refreshes, and with
+    ``prefetch_neighbors`` on, a first-page miss also searches the adjacent
+    tiles; both run after the response is sent.
+
+    Args:
+        response: Response (for the ``X-Cache`` header)
+        background_tasks: Background tasks (enrichment, neighbor prefetch)
+        lat: Latitude (required without ``cursor``)
+        lng: Longitude (required without ``cursor``)
+        radius: Search radius in meters
+        mode: Recommendation mode
+        open_now: Only venues open now
+        price_level: Only venues at this price level (0-4)
+        limit: Maximum number of venues per page
+        min_results: Expand the radius in rings until this many candidates
+            are found (sparse areas); ``radius_m`` in the response is the
+            radius searched
+        cursor: Page cursor; replaces the search parameters above
+        x_deadline_ms: Request time budget in milliseconds (X-Deadline-Ms header)
+        x_user_id: User to personalize the ranking for (X-User-Id header)
+
+    Returns:
+        Ranked venues; ``degraded`` is true if the budget ran out or a
+        dependency failed and the results are best-effort
+    """
+    deadline = Deadline.from_header(x_deadline_ms)
+    if cursor is not None:
+        try:
+            position = Cursor.decode(cursor, limit=limit, user_id=x_user_id)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+    elif lat is None or lng is None:
+        raise HTTPException(status_code=422, detail="lat and lng are required without a cursor")
+    else:
+        query = NearbyQuery(
+            lat=lat,
+            lng=lng,
+            radius_m=radius,
+            mode=mode,
+            open_now=open_now,
+            price_level=price_level,
+            limit=limit,
+            user_id=x_user_id,
+            min_results=min_results,
+        )
+        position = Cursor(query, bucket=time_bucket())
+
+    try:
+        providers = get_providers()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    page, hit = await search_nearby_page(position, providers, deadline)
+    response.headers["X-Cache"] = "hit" if hit else "miss"
+    if settings.enrich_visible_venues and not hit and page.venues:
+        background_tasks.add_task(enqueue_visible_venues, [v.provider_id for v in page.venues])
+    if settings.prefetch_neighbors and not hit and cursor is None:
+        background_tasks.add_task(prefetch_neighbors, position.query, providers)
+    return page
+
+
+@app.get("/venues/nearby/modes", response_model=ModeComparisonResponse)
+async def nearby_venues_all_modes(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: int = Query(1000, gt=0, le=50000),
+    open_now: bool = False,
+    price_level: int | None = Query(None, ge=0, le=4),
+    limit: int = Query(10, ge=1, le=50),
+    x_deadline_ms: int | None = Header(None),
+    x_user_id: str | None = Header(None, max_length=255),
+):
+    """Search nearby venues once and rank them for every mode side by side.
+
+    Args:
+        lat: Latitude
+        lng: Longitude
+        radius: Search radius in meters
+        open_now: Only venues open now
+        price_level: Only venues at this price level (0-4)
+        limit: Maximum number of venues per mode
+        x_deadline_ms: Request time budget in milliseconds (X-Deadline-Ms header)
+        x_user_id: User to personalize the rankings for (X-User-Id header)
+
+    Returns:
+        Each mode's top venues as indices into one deduplicated venue list
+    """
+    deadline = Deadline.from_header(x_deadline_ms)
+    try:
+        providers = get_providers()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    query = NearbyQuery(
+        lat=lat,
+        lng=lng,
+        radius_m=radius,
+        open_now=open_now,
+        price_level=price_level,
+        limit=limit,
+        user_id=x_user_id,
+    )
+    return await compare_modes(query, providers, deadline)
+
+
+@app.post("/venues/nearby/batch", response_model=BatchResponse)
+async def nearby_venues_batch(
+    queries: Annotated[list[BatchQuery], Body(min_length=1, max_length=MAX_BATCH_QUERIES)],
+    x_deadline_ms: int | None = Header(None),
+    x_user_id: str | None = Header(None, max_length=255),
+):
+    """Run many nearby searches in one request.
+
+    Searches from the same tile with the same radius and filters share one
+    cache lookup pass and one provider call; groups run concurrently. Each
+    result is the search's first page, with ``next_cursor`` for
+    ``/venues/nearby``.
+
+    Args:
+        queries: Searches (location, radius, mode, filters, page size)
+        x_deadline_ms: Time budget for the whole batch in milliseconds
+            (X-Deadline-Ms header)
+        x_user_id: User to personalize the rankings for (X-User-Id header)
+
+    Returns:
+        One result per query, in request order
+    """
+    deadline = Deadline.from_header(x_deadline_ms)
+    try:
+        providers = get_providers()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    nearby = [
+        NearbyQuery(
+            lat=q.lat,
+            lng=q.lng,
+            radius_m=q.radius,
+            mode=q.mode,
+            open_now=q.open_now,
+            price_level=q.price_level,
+            limit=q.limit,
+            user_id=x_user_id,
+            min_results=q.min_results,
+        )
+        for q in queries
+    ]
+    return BatchResponse(results=await search_batch(nearby, providers, deadline))
+
+
+@app.post("/venues/rerank", response_model=NearbyResponse)
+async def rerank_venues(request: RerankRequest):
+    """Re-rank an earlier search's candidates with custom feature weights.
+
+    For ranking sliders: re-scores the search's cached feature matrix, so no
+    provider or database calls are made.
+
+    Args:
+        request: Search ID, feature weights and limit
+
+    Returns:
+        Top venues under the new weights
+    """
+    try:
+        return await rerank(request.search_id, request.weights, limit=request.limit)
+    except SearchExpired as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except InvalidWeights as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+
+@app.post("/events", status_code=202)
+async def ingest_events(
+    events: Annotated[list[UserEventCreate], Body(max_length=MAX_EVENTS_PER_REQUEST)],
+):
+    """Record user events (impressions, clicks, saves, ...).
+
+    Events are queued and written in the background; engagement events also
+    update the user's preference vector.
+
+    Args:
+        events: Events to record
+
+    Returns:
+        Number of events accepted
+    """
+    try:
+        accepted = event_ingestor.submit(events)
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    return {"accepted": accepted}
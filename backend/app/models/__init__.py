@@ -1,6 +1,6 @@
 """Models package exports."""
 
 from app.models.user_event import UserEvent
-from app.models.venue import Venue, VenueProfile
+from app.models.venue import Venue, VenueProfile, VenueStaticScore
 
-__all__ = ["Venue", "VenueProfile", "UserEvent"]
+__all__ = ["Venue", "VenueProfile", "VenueStaticScore", "UserEvent"]
@@ -4,12 +4,13 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, ForeignKey, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.db.jsonb import json_text
 
 
 class EventType(str, enum.Enum):
@@ -68,7 +69,12 @@ class UserEvent(Base):
 
     # Query context (lat/lng tile, radius, filters)
     # Example: {"lat": 37.7749, "lng": -122.4194, "radius": 1000, "tile": "9q8yy", ...}
-    query_context: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    query_context: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    # Inverse of the rate the event was sampled at (sum it to estimate totals)
+    sample_weight: Mapped[float] = mapped_column(
+        Float, nullable=False, default=1.0, server_default="1"
+    )
 
     # Timestamp
     created_at: Mapped[datetime] = mapped_column(
@@ -77,3 +83,6 @@ class UserEvent(Base):
 
     def __repr__(self) -> str:
         return f"<UserEvent(id={self.id}, type={self.event_type.value}, user_id={self.user_id})>"
+
+
+Index("ix_user_events_query_context_tile", json_text(UserEvent.query_context, "tile"))
@@ -4,11 +4,19 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ARRAY, JSON, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import ARRAY, DateTime, Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.jsonb import json_float
+from app.models.user_event import Mode
+
+# Profile attributes with an expression index for threshold filters.
+INDEXED_ATTRIBUTES: tuple[str, ...] = ("quiet", "laptop_friendly", "romantic")
+
+# Per-mode static score columns of venue_static_scores (Mode values).
+STATIC_SCORE_MODES: tuple[str, ...] = tuple(mode.value for mode in Mode)
 
 
 class Venue(Base):
@@ -41,8 +49,8 @@ class Venue(Base):
     rating: Mapped[float | None] = mapped_column(Float)
     price_level: Mapped[int | None] = mapped_column(Integer)  # 0-4 scale
 
-    # Hours (stored as JSON for flexibility)
-    hours: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Hours (stored as JSONB for flexibility; GIN-indexed for @> filters)
+    hours: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     raw_hours: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     # Timestamps
@@ -55,8 +63,9 @@ class Venue(Base):
     )
 
     # Relationships
+    # Never lazy-loaded: load it with the venue (see app.repositories.venue).
     profile: Mapped[Optional["VenueProfile"]] = relationship(
-        "VenueProfile", back_populates="venue", uselist=False
+        "VenueProfile", back_populates="venue", uselist=False, lazy="raise_on_sql"
     )
 
     def __repr__(self) -> str:
@@ -87,12 +96,12 @@ class VenueProfile(Base):
 
     # Attribute scores (0-1 scale for each attribute)
     # Example: {"quiet": 0.85, "laptop_friendly": 0.72, "romantic": 0.15, ...}
-    attribute_scores: Mapped[dict[str, float]] = mapped_column(JSON, default=dict, nullable=False)
+    attribute_scores: Mapped[dict[str, float]] = mapped_column(JSONB, default=dict, nullable=False)
 
     # Evidence snippets (top 1-3 snippets per attribute)
     # Example: {"quiet": ["Great for studying", "Very peaceful atmosphere"], ...}
     evidence_snippets: Mapped[dict[str, list[str]]] = mapped_column(
-        JSON, default=dict, nullable=False
+        JSONB, default=dict, nullable=False
     )
 
     # Optional embedding reference (for vector search)
@@ -100,10 +109,73 @@ class VenueProfile(Base):
 
     # Timestamps
     profiled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
-    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True
+    )
+    # Refreshes skipped or failed since the last successful profile (retry backoff)
+    refresh_failures: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     # Relationships
     venue: Mapped["Venue"] = relationship("Venue", back_populates="profile")
 
     def __repr__(self) -> str:
         return f"<VenueProfile(id={self.id}, venue_id={self.venue_id})>"
+
+
+class VenueStaticScore(Base):
+    """Precomputed static part of each mode's score, one row per venue.
+
+    Maintained on write by ``app.repositories.scores``; ``cell`` is the
+    venue's geohash so the top venues per mode in a region are an index scan.
+    """
+
+    __tablename__ = "venue_static_scores"
+
+    venue_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("venues.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    cell: Mapped[str] = mapped_column(String(12), nullable=False)
+
+    # Static score per mode (column names are Mode values)
+    work: Mapped[float] = mapped_column(Float, nullable=False)
+    date: Mapped[float] = mapped_column(Float, nullable=False)
+    quick_bite: Mapped[float] = mapped_column(Float, nullable=False)
+    budget: Mapped[float] = mapped_column(Float, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    def __repr__(self) -> str:
+        return f"<VenueStaticScore(venue_id={self.venue_id}, cell={self.cell})>"
+
+
+Index(
+    "ix_venues_hours",
+    Venue.hours,
+    postgresql_using="gin",
+    postgresql_ops={"hours": "jsonb_path_ops"},
+)
+Index(
+    "ix_venue_profiles_attribute_scores",
+    VenueProfile.attribute_scores,
+    postgresql_using="gin",
+    postgresql_ops={"attribute_scores": "jsonb_path_ops"},
+)
+for _attribute in INDEXED_ATTRIBUTES:
+    Index(
+        f"ix_venue_profiles_{_attribute}",
+        json_float(VenueProfile.attribute_scores, _attribute),
+    )
+for _mode in STATIC_SCORE_MODES:
+    Index(
+        f"ix_venue_static_scores_cell_{_mode}",
+        VenueStaticScore.cell,
+        getattr(VenueStaticScore, _mode).desc(),
+    )
@@ -0,0 +1,22 @@
+"""Observability package (metrics and tracing)."""
+
+from app.observability.metrics import (
+    MetricsMiddleware,
+    observe_duration,
+    record_cache,
+    render_metrics,
+    timed,
+)
+from app.observability.tracing import TracingMiddleware, current_trace, span, start_trace
+
+__all__ = [
+    "MetricsMiddleware",
+    "TracingMiddleware",
+    "current_trace",
+    "observe_duration",
+    "record_cache",
+    "render_metrics",
+    "span",
+    "start_trace",
+    "timed",
+]
@@ -0,0 +1,209 @@
+"""Prometheus metrics.
+
+All metrics are module-level collectors; import them and record with the
+``observe_duration`` context manager or the ``timed`` decorator (one
+``perf_counter`` pair per observation).
+
+Multiple uvicorn workers: set ``PROMETHEUS_MULTIPROC_DIR`` to an empty,
+writable directory shared by the workers (and wipe it on deploy). Each worker
+then writes its samples to memory-mapped files and ``/metrics`` aggregates all
+of them, whichever worker serves the scrape.
+"""
+
+import functools
+import inspect
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Latency buckets (seconds) tuned for an API with a ~2s budget.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+# Finer buckets for in-process work (ranking, pool waits).
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "modemap_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_REQUEST_DURATION = Histogram(
+    "modemap_provider_request_duration_seconds",
+    "Upstream places provider call latency by provider, billing SKU and outcome",
+    ["provider", "sku", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "modemap_cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, stale)",
+    ["cache", "result"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "modemap_db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the DB pool",
+    buckets=FAST_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "modemap_db_query_duration_seconds",
+    "SQL statement execution time by operation",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+DB_SLOW_QUERIES = Counter(
+    "modemap_db_slow_queries_total",
+    "SQL statements slower than the slow-query threshold",
+    ["operation"],
+)
+DB_N_PLUS_ONE = Counter(
+    "modemap_db_n_plus_one_total",
+    "Requests that repeated one SELECT shape past the N+1 threshold",
+    ["table"],
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "modemap_db_queries_per_request",
+    "SQL statements executed per HTTP request",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+RANKING_DURATION = Histogram(
+    "modemap_ranking_duration_seconds",
+    "Time spent building features and ranking candidates",
+    ["mode"],
+    buckets=FAST_BUCKETS,
+)
+EVENT_INGEST_QUEUE_DEPTH = Gauge(
+    "modemap_event_ingest_queue_depth",
+    "User events waiting to be written",
+    multiprocess_mode="livesum",
+)
+EVENT_INGEST_DROPPED = Counter(
+    "modemap_event_ingest_dropped_total",
+    "User events dropped at ingest by type and reason (duplicate, sampled, unknown_venue)",
+    ["event_type", "reason"],
+)
+
+
+@contextmanager
+def observe_duration(histogram: Histogram, **labels: str) -> Iterator[dict[str, str]]:
+    """Time a block and record it in ``histogram``.
+
+    Yields the label dict, so the block can fill in labels only known at the
+    end (e.g. ``labels["status"] = "200"``).
+
+    Args:
+        histogram: Histogram to observe into
+        **labels: Initial label values
+    """
+    start = perf_counter()
+    try:
+        yield labels
+    finally:
+        elapsed = perf_counter() - start
+        (histogram.labels(**labels) if labels else histogram).observe(elapsed)
+
+
+def timed(histogram: Histogram, **labels: str) -> Callable[[F], F]:
+    """Decorator recording each call's duration in ``histogram`` (sync or async)."""
+    child = histogram.labels(**labels) if labels else histogram
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    child.observe(perf_counter() - start)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def record_cache(cache: str, result: str, count: int = 1) -> None:
+    """Count cache lookups (``result`` is "hit", "miss" or "stale")."""
+    if count:
+        CACHE_REQUESTS.labels(cache=cache, result=result).inc(count)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text format.
+
+    Returns:
+        Tuple of (payload, content type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request latency.
+
+    Routes are labeled by their path template ("/venues/nearby"), not the raw
+    URL, to keep label cardinality bounded. Latency ends when the last body
+    chunk is sent, so background tasks run after the response are not counted.
+    """
+
+    def __init__(self, app: Callable[..., Any]):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = 500
+        observed = False
+
+        def observe() -> None:
+            nonlocal observed
+            if not observed:
+                observed = True
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(
+                    perf_counter() - start
+                )
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                observe()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            observe()
@@ -0,0 +1,360 @@
+"""Lightweight request tracing.
+
+OpenTelemetry-style spans for the hot path (provider calls, normalization,
+SQL statements, ranking) without an external collector:
+
+- ``TracingMiddleware`` starts one trace per HTTP request. Traces are sampled
+  at the head (``trace_sample_rate``); unsampled requests pay one random draw
+  and a context variable lookup per span.
+- ``span(name, **attributes)`` times a block as a child of the current span.
+  Child tasks inherit the current span through ``contextvars``, so concurrent
+  provider calls nest under the request correctly.
+- Finished sampled traces are written as one JSON line each to stdout or to
+  ``trace_export_path``.
+- The ``X-Debug-Trace`` header forces sampling of a single request and adds its
+  span tree to the JSON response body under ``"trace"``. It is honored when it
+  matches ``trace_debug_token`` (or, with no token configured, in dev).
+"""
+
+import json
+import logging
+import random
+import secrets
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEBUG_HEADER = b"x-debug-trace"
+TRACE_ID_HEADER = b"x-trace-id"
+
+_current_trace: ContextVar["Trace | None"] = ContextVar("trace", default=None)
+_current_span: ContextVar["Span | None"] = ContextVar("span", default=None)
+
+_export_lock = threading.Lock()
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace."""
+
+    name: str
+    span_id: str
+    parent_id: str | None
+    start: float  # perf_counter() at start
+    attributes: dict[str, Any] = field(default_factory=dict)
+    end: float | None = None
+    status: str = "ok"
+
+    @property
+    def duration_ms(self) -> float | None:
+        """Span duration in milliseconds (None while still open)."""
+        return None if self.end is None else (self.end - self.start) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """Close the span, marking it failed if ``error`` is given."""
+        self.end = time.perf_counter()
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = repr(error)
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, name: str, forced: bool = False):
+        self.trace_id = secrets.token_hex(16)
+        self.name = name
+        self.forced = forced
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans: list[Span] = []
+
+    def new_span(self, name: str, parent: Span | None, attributes: dict[str, Any]) -> Span:
+        """Create and register a span in this trace."""
+        span = Span(
+            name=name,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start=time.perf_counter(),
+            attributes=attributes,
+        )
+        self.spans.append(span)
+        return span
+
+    def tree(self) -> list[dict[str, Any]]:
+        """Return the spans as a nested tree (roots first, children by start time).
+
+        Offsets and durations are in milliseconds relative to the trace start.
+        """
+        nodes: dict[str, dict[str, Any]] = {}
+        roots: list[dict[str, Any]] = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            duration = span.duration_ms
+            node = {
+                "name": span.name,
+                "span_id": span.span_id,
+                "start_ms": round((span.start - self.start) * 1000, 3),
+                "duration_ms": round(duration, 3) if duration is not None else None,
+                "status": span.status,
+                "attributes": span.attributes,
+                "children": [],
+            }
+            nodes[span.span_id] = node
+            parent = nodes.get(span.parent_id) if span.parent_id else None
+            (parent["children"] if parent else roots).append(node)
+        return roots
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the trace for export."""
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": self.tree(),
+        }
+
+
+def current_trace() -> Trace | None:
+    """Return the sampled trace bound to the current context, if any."""
+    return _current_trace.get()
+
+
+def start_span(name: str, **attributes: Any) -> Span | None:
+    """Open a child span of the current span without binding it.
+
+    For callbacks that cannot wrap a block (e.g. SQLAlchemy cursor events);
+    the caller must ``finish()`` the returned span. Returns None when the
+    current request is not sampled.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    return trace.new_span(name, _current_span.get(), attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Trace a block as a child of the current span.
+
+    Yields None (and records nothing) when the current request is not sampled.
+
+    Args:
+        name: Span name, e.g. "google.search_nearby"
+        **attributes: Span attributes
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = trace.new_span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(error=e)
+        raise
+    finally:
+        _current_span.reset(token)
+        if current.end is None:
+            current.finish()
+
+
+def should_sample(rate: float | None = None) -> bool:
+    """Head-based sampling decision for a new trace."""
+    rate = settings.trace_sample_rate if rate is None else rate
+    return rate > 0 and random.random() < rate
+
+
+@contextmanager
+def start_trace(
+    name: str, sampled: bool | None = None, forced: bool = False, export: bool = True
+) -> Iterator[Trace | None]:
+    """Start a trace and its root span for the duration of the block.
+
+    Args:
+        name: Root span name
+        sampled: Sampling decision (default: head-based sampling)
+        forced: Whether sampling was forced by the debug header
+        export: Export the trace when the block exits
+
+    Yields:
+        The trace, or None if not sampled
+    """
+    if not (forced or (should_sample() if sampled is None else sampled)):
+        yield None
+        return
+
+    trace = Trace(name, forced=forced)
+    token = _current_trace.set(trace)
+    try:
+        with span(name):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+        if export:
+            export_trace(trace)
+
+
+def export_trace(trace: Trace) -> None:
+    """Write a finished trace as one JSON line to the configured exporter."""
+    if settings.trace_exporter == "none":
+        return
+    line = json.dumps(trace.to_dict(), default=str) + "\n"
+    try:
+        with _export_lock:
+            if settings.trace_exporter == "file":
+                with open(settings.trace_export_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            else:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+    except OSError as e:
+        logger.warning(f"Trace export failed: {e}")
+
+
+def debug_header_allowed(value: str) -> bool:
+    """Whether an ``X-Debug-Trace`` header value may force sampling."""
+    if settings.trace_debug_token:
+        return secrets.compare_digest(value, settings.trace_debug_token)
+    return settings.env == "dev" and value not in ("", "0", "false")
+
+
+class TracingMiddleware:
+    """ASGI middleware that starts a trace per request.
+
+    Sampled responses carry an ``X-Trace-Id`` header. Forced (debug header)
+    requests have their JSON response buffered and the span tree added under
+    ``"trace"``. The root span ends with the last body chunk, so background
+    tasks run after the response are not part of it.
+    """
+
+    def __init__(self, app: Callable[..., Any]):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = dict(scope.get("headers") or []).get(DEBUG_HEADER)
+        forced = header is not None and debug_header_allowed(header.decode("latin-1"))
+        name = f"{scope['method']} {scope['path']}"
+
+        with start_trace(name, forced=forced) as trace:
+            if trace is None:
+                await self.app(scope, receive, send)
+                return
+            if not forced:
+                await self.app(scope, receive, _with_trace_id(send, trace))
+                return
+            await self._call_forced(scope, receive, send, trace)
+
+    async def _call_forced(
+        self, scope: dict, receive: Callable, send: Callable, trace: Trace
+    ) -> None:
+        """Run the request, re-sending its response with the span tree attached."""
+        start: dict | None = None
+        chunks: list[bytes] = []
+
+        async def buffer(message: dict) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if start is not None and not message.get("more_body"):
+                    await _send_with_trace(send, start, b"".join(chunks), trace)
+
+        await self.app(scope, receive, buffer)
+
+
+def _finish_root(trace: Trace) -> None:
+    """Close the trace's root span, ending it at the response."""
+    root = next((s for s in trace.spans if s.parent_id is None), None)
+    if root is not None and root.end is None:
+        root.finish()
+
+
+async def _send_with_trace(send: Callable, start: dict, body: bytes, trace: Trace) -> None:
+    """Send a buffered response with the span tree added to its JSON body."""
+    # Close the root span before rendering so its duration is included.
+    _finish_root(trace)
+    headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+    content_type = dict(headers).get(b"content-type", b"")
+    if content_type.startswith(b"application/json"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict):
+            payload["trace"] = trace.to_dict()
+            body = json.dumps(payload, default=str).encode()
+
+    headers.append((b"content-length", str(len(body)).encode()))
+    headers.append((TRACE_ID_HEADER, trace.trace_id.encode()))
+    await send({**start, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _with_trace_id(send: Callable, trace: Trace) -> Callable:
+    """Wrap ``send`` to add the ``X-Trace-Id`` header and end the root span."""
+
+    async def send_with_trace_id(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            headers = [*message.get("headers", []), (TRACE_ID_HEADER, trace.trace_id.encode())]
+            message = {**message, "headers": headers}
+        await send(message)
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            _finish_root(trace)
+
+    return send_with_trace_id
+
+
+# Longest SQL statement prefix kept as a span attribute.
+MAX_STATEMENT_CHARS = 500
+
+
+def trace_engine(sync_engine: Any) -> None:
+    """Record a "db.query" span for every statement run on ``sync_engine``.
+
+    Pass ``AsyncEngine.sync_engine``. Parameters are not recorded.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current_trace.get() is None or context is None:
+            return
+        context._trace_span = start_span(
+            "db.query", statement=statement[:MAX_STATEMENT_CHARS], executemany=executemany
+        )
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        current = getattr(context, "_trace_span", None)
+        if current is not None:
+            current.set_attribute("rowcount", cursor.rowcount)
+            current.finish()
+            context._trace_span = None
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        current = getattr(exception_context.execution_context, "_trace_span", None)
+        if current is not None:
+            current.finish(error=exception_context.original_exception)
+            exception_context.execution_context._trace_span = None
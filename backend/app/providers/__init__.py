@@ -1,5 +1,19 @@
-"""Google Places provider package."""
+"""Places provider package."""
 
+from app.providers.base import PlacesProvider
+from app.providers.cached import CachedPlacesProvider
+from app.providers.fanout import FanOutResult, dedupe_venues, search_all
 from app.providers.google import GooglePlacesClient
+from app.providers.registry import get_providers
+from app.providers.stub import StubPlacesProvider
 
-__all__ = ["GooglePlacesClient"]
+__all__ = [
+    "PlacesProvider",
+    "GooglePlacesClient",
+    "StubPlacesProvider",
+    "CachedPlacesProvider",
+    "FanOutResult",
+    "search_all",
+    "dedupe_venues",
+    "get_providers",
+]
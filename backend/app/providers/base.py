@@ -0,0 +1,39 @@
+"""Places provider interface."""
+
+from abc import ABC, abstractmethod
+
+from app.schemas.venue import VenueCreate
+
+
+class PlacesProvider(ABC):
+    """Interface implemented by every nearby-places provider.
+
+    Implementations normalize provider results to ``VenueCreate`` and set
+    ``provider_name`` to their ``name``.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def search_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: int = 1000,
+        max_results: int = 20,
+        open_now: bool = False,
+        price_level: int | None = None,
+    ) -> list[VenueCreate]:
+        """Search for venues within ``radius_m`` of a point.
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+            radius_m: Search radius in meters
+            max_results: Maximum number of results
+            open_now: Filter for places open now
+            price_level: Filter by price level (0-4)
+
+        Returns:
+            List of VenueCreate schemas
+        """
@@ -0,0 +1,69 @@
+"""Provider results cached in the two-level cache.
+
+``CachedPlacesProvider`` wraps any provider. Results are keyed by the
+provider, the search center's geohash tile (``provider_cache_precision``)
+and the search parameters, so nearby searches from the same tile share one
+upstream call until ``provider_cache_ttl_seconds`` passes. Ranking recomputes
+distances from the caller's own point, so reusing a neighbor's candidates only
+shifts the candidate circle by at most a tile.
+
+Failed searches raise as usual and are not cached.
+"""
+
+from app.cache.tiered import TieredCache
+from app.config import settings
+from app.geo import geohash_encode
+from app.providers.base import PlacesProvider
+from app.schemas.venue import VenueCreate
+
+provider_cache = TieredCache("provider", ttl_s=settings.provider_cache_ttl_seconds)
+
+
+class CachedPlacesProvider(PlacesProvider):
+    """Read-through cache in front of another provider."""
+
+    def __init__(self, provider: PlacesProvider, cache: TieredCache | None = None):
+        """Initialize the wrapper.
+
+        Args:
+            provider: Provider to cache
+            cache: Cache namespace (default: ``provider_cache``)
+        """
+        self.provider = provider
+        self.name = provider.name
+        self.cache = cache if cache is not None else provider_cache
+
+    def cache_key(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: int,
+        max_results: int,
+        open_now: bool,
+        price_level: int | None,
+    ) -> str:
+        """Cache key of one search."""
+        tile = geohash_encode(lat, lng, settings.provider_cache_precision)
+        price = "" if price_level is None else price_level
+        return f"{self.name}:{tile}:{radius_m}:{max_results}:{int(open_now)}:{price}"
+
+    async def search_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: int = 1000,
+        max_results: int = 20,
+        open_now: bool = False,
+        price_level: int | None = None,
+    ) -> list[VenueCreate]:
+        """Search via the cache; see ``PlacesProvider.search_nearby``."""
+        key = self.cache_key(lat, lng, radius_m, max_results, open_now, price_level)
+
+        async def load() -> list[dict]:
+            venues = await self.provider.search_nearby(
+                lat, lng, radius_m, max_results, open_now, price_level
+            )
+            return [venue.model_dump() for venue in venues]
+
+        rows = await self.cache.get_or_load(key, load)
+        return [VenueCreate.model_validate(row) for row in rows]
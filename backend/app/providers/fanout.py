@@ -0,0 +1,237 @@
+"""Concurrent multi-provider search with cross-provider deduplication."""
+
+import asyncio
+import logging
+import math
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from app.config import settings
+from app.deadline import stage_timeout
+from app.geo import METERS_PER_DEGREE_LAT, haversine_m
+from app.observability.tracing import span
+from app.providers.base import PlacesProvider
+from app.schemas.venue import VenueCreate
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9 ]+")
+_STOPWORDS = {"the", "and", "a", "an", "of"}
+
+
+@dataclass
+class FanOutResult:
+    """Merged results from a multi-provider search."""
+
+    venues: list[VenueCreate] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)  # providers that errored or timed out
+
+    @property
+    def partial(self) -> bool:
+        """Whether any provider failed to contribute results."""
+        return bool(self.failed)
+
+
+async def search_all(
+    providers: list[PlacesProvider],
+    lat: float,
+    lng: float,
+    radius_m: int = 1000,
+    max_results: int = 20,
+    open_now: bool = False,
+    price_level: int | None = None,
+    timeout_s: float | None = None,
+    timeouts: dict[str, float] | None = None,
+) -> FanOutResult:
+    """Query every provider concurrently and merge their results.
+
+    Each provider gets its own deadline (further capped by the request deadline,
+    if one is bound), so the whole call returns within the slowest deadline; a
+    provider that errors or times out is reported in ``failed`` and the others'
+    results are still returned. Providers are listed in priority order: when
+    two providers return the same venue, the earlier provider's record wins and
+    the later one only fills in missing fields.
+
+    Args:
+        providers: Providers to query, highest priority first
+        lat: Latitude
+        lng: Longitude
+        radius_m: Search radius in meters
+        max_results: Maximum results per provider
+        open_now: Filter for places open now
+        price_level: Filter by price level (0-4)
+        timeout_s: Default per-provider deadline (default: settings)
+        timeouts: Per-provider deadline overrides keyed by provider name
+
+    Returns:
+        FanOutResult with deduplicated venues
+    """
+    timeout_s = timeout_s if timeout_s is not None else settings.provider_timeout_seconds
+    timeouts = timeouts or {}
+
+    async def query(provider: PlacesProvider) -> list[VenueCreate]:
+        with span("provider.search", provider=provider.name):
+            return await asyncio.wait_for(
+                provider.search_nearby(
+                    lat=lat,
+                    lng=lng,
+                    radius_m=radius_m,
+                    max_results=max_results,
+                    open_now=open_now,
+                    price_level=price_level,
+                ),
+                timeout=stage_timeout(
+                    timeouts.get(provider.name, timeout_s),
+                    reserve=settings.deadline_reserve_ms / 1000,
+                ),
+            )
+
+    results = await asyncio.gather(*(query(p) for p in providers), return_exceptions=True)
+
+    result = FanOutResult()
+    venues: list[VenueCreate] = []
+    for provider, outcome in zip(providers, results, strict=True):
+        if isinstance(outcome, BaseException):
+            if isinstance(outcome, TimeoutError):
+                logger.warning(f"Provider {provider.name} timed out")
+            else:
+                logger.error(f"Provider {provider.name} failed: {outcome}")
+            result.failed.append(provider.name)
+            continue
+        venues.extend(outcome)
+
+    result.venues = dedupe_venues(venues)
+    return result
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a venue name for fuzzy comparison.
+
+    Strips accents, punctuation and stopwords, maps "&" to "and", and
+    collapses whitespace: "Café de l'Opéra & Bar" -> "cafe de l opera bar".
+    """
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    name = _NON_ALNUM_RE.sub(" ", name.lower().replace("&", " and "))
+    return " ".join(token for token in name.split() if token not in _STOPWORDS)
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Similarity in [0, 1] between two normalized names.
+
+    The larger of the character-level ratio and token containment, so a
+    provider's longer name ("blue bottle coffee mint plaza") still matches the
+    shorter one ("blue bottle coffee"). Containment needs at least two shared
+    tokens, so a generic one-word name ("cafe") does not match everything.
+    """
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    shorter = min(len(tokens_a), len(tokens_b))
+    containment = len(tokens_a & tokens_b) / shorter if shorter >= 2 else 0.0
+    return max(SequenceMatcher(None, a, b).ratio(), containment)
+
+
+def dedupe_venues(
+    venues: list[VenueCreate],
+    max_distance_m: float | None = None,
+    min_similarity: float | None = None,
+) -> list[VenueCreate]:
+    """Merge venues from different providers that are close together and have similar names.
+
+    A provider never returns the same place twice, so two of its venues are
+    never merged however alike they look (two nearby "Starbucks" are two
+    branches), and neither is a venue into a group that already holds one
+    from its provider. Venues are bucketed into a grid whose cells are ``max_distance_m`` wide, so
+    each venue is only compared with those in its own and the 8 neighboring
+    cells rather than with every other venue.
+
+    Args:
+        venues: Venues in priority order
+        max_distance_m: Maximum distance between duplicates (default: settings)
+        min_similarity: Minimum normalized-name similarity (default: settings)
+
+    Returns:
+        Deduplicated venues, in first-seen order
+    """
+    if not venues:
+        return []
+
+    max_distance_m = max_distance_m or settings.dedupe_distance_m
+    min_similarity = min_similarity or settings.dedupe_name_similarity
+
+    cell_deg = max_distance_m / METERS_PER_DEGREE_LAT
+    # Scale longitude so cells are roughly square at this latitude.
+    lng_scale = max(math.cos(math.radians(venues[0].lat)), 0.01)
+
+    kept: list[VenueCreate] = []
+    names: list[str] = []
+    providers: list[set[str]] = []  # providers merged into each kept venue
+    grid: dict[tuple[int, int], list[int]] = {}
+    by_provider_id: dict[tuple[str, str], int] = {}
+
+    for venue in venues:
+        provider_key = (venue.provider_name, venue.provider_id)
+        if provider_key in by_provider_id:
+            continue
+
+        name = normalize_name(venue.name)
+        row = math.floor(venue.lat / cell_deg)
+        col = math.floor(venue.lng * lng_scale / cell_deg)
+
+        match = _find_duplicate(
+            venue, name, grid, row, col, kept, names, providers, max_distance_m, min_similarity
+        )
+        if match is not None:
+            kept[match] = _merge(kept[match], venue)
+            providers[match].add(venue.provider_name)
+            by_provider_id[provider_key] = match
+            continue
+
+        by_provider_id[provider_key] = len(kept)
+        grid.setdefault((row, col), []).append(len(kept))
+        kept.append(venue)
+        names.append(name)
+        providers.append({venue.provider_name})
+
+    return kept
+
+
+def _find_duplicate(
+    venue: VenueCreate,
+    name: str,
+    grid: dict[tuple[int, int], list[int]],
+    row: int,
+    col: int,
+    kept: list[VenueCreate],
+    names: list[str],
+    providers: list[set[str]],
+    max_distance_m: float,
+    min_similarity: float,
+) -> int | None:
+    """Return the index of a kept venue in the 3x3 cell neighborhood matching ``venue``."""
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            for i in grid.get((row + dr, col + dc), ()):
+                other = kept[i]
+                if (
+                    venue.provider_name not in providers[i]
+                    and haversine_m(venue.lat, venue.lng, other.lat, other.lng) <= max_distance_m
+                    and name_similarity(name, names[i]) >= min_similarity
+                ):
+                    return i
+    return None
+
+
+def _merge(primary: VenueCreate, duplicate: VenueCreate) -> VenueCreate:
+    """Fill fields missing from ``primary`` with values from ``duplicate``."""
+    updates = {
+        field_name: getattr(duplicate, field_name)
+        for field_name in ("address", "rating", "price_level", "hours", "raw_hours")
+        if getattr(primary, field_name) is None and getattr(duplicate, field_name) is not None
+    }
+    extra_categories = [c for c in duplicate.categories if c not in primary.categories]
+    if extra_categories:
+        updates["categories"] = (primary.categories + extra_categories)[:5]
+    return primary.model_copy(update=updates) if updates else primary
@@ -5,23 +5,39 @@ import logging
 import httpx
 
 from app.config import settings
+from app.deadline import stage_timeout
+from app.observability.metrics import PROVIDER_REQUEST_DURATION, observe_duration
+from app.observability.tracing import span
+from app.providers.base import PlacesProvider
 from app.schemas.venue import VenueCreate
 
 logger = logging.getLogger(__name__)
 
 
-class GooglePlacesClient:
+class GooglePlacesClient(PlacesProvider):
     """Client for Google Places API (New) using REST API with API key."""
 
-    BASE_URL = "https://places.googleapis.com/v1/places:searchNearby"
+    name = "google"
 
-    def __init__(self, api_key: str | None = None):
+    SEARCH_PATH = "/places:searchNearby"
+    DETAILS_PATH = "/places/{place_id}"
+    TIMEOUT_S = 10.0
+
+    # Billing SKUs, used to label upstream latency/status metrics (the field
+    # masks below decide which SKU a call is billed as).
+    NEARBY_SKU = "nearby_search_enterprise"
+    REVIEWS_SKU = "place_details_enterprise_atmosphere"
+
+    def __init__(self, api_key: str | None = None, base_url: str | None = None):
         """Initialize Google Places client.
 
         Args:
             api_key: Google Places API key. If None, uses settings.google_places_api_key
+            base_url: API root. If None, uses settings.google_places_base_url
+                (point it at a fake server for benchmarks)
         """
         self.api_key = api_key or settings.google_places_api_key
+        self.base_url = str(base_url or settings.google_places_base_url).rstrip("/")
         if not self.api_key:
             raise ValueError("Google Places API key is required. Set GOOGLE_PLACES_API_KEY in .env")
 
@@ -116,33 +132,106 @@ class GooglePlacesClient:
             ),
         }
 
-        # Make API request
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    self.BASE_URL,
-                    json=body,
-                    headers=headers,
+        # Make API request (bounded by the request deadline, if one is bound)
+        timeout = stage_timeout(self.TIMEOUT_S)
+        if timeout <= 0:
+            raise TimeoutError("Request deadline exceeded before Google Places call")
+        with (
+            span("google.search_nearby", radius_m=radius_m, sku=self.NEARBY_SKU) as current,
+            observe_duration(
+                PROVIDER_REQUEST_DURATION, provider=self.name, sku=self.NEARBY_SKU, status="error"
+            ) as labels,
+        ):
+            try:
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    response = await client.post(
+                        self.base_url + self.SEARCH_PATH,
+                        json=body,
+                        headers=headers,
+                    )
+                    labels["status"] = str(response.status_code)
+                    if current is not None:
+                        current.set_attribute("http.status_code", response.status_code)
+                    response.raise_for_status()
+                    data = response.json()
+            except httpx.HTTPStatusError as e:
+                logger.error(
+                    f"Google Places API error: {e.response.status_code} - {e.response.text}"
                 )
-                response.raise_for_status()
-                data = response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Google Places API error: {e.response.status_code} - {e.response.text}")
-            raise
-        except httpx.RequestError as e:
-            logger.error(f"Google Places API request error: {e}")
-            raise
+                raise
+            except httpx.TimeoutException as e:
+                labels["status"] = "timeout"
+                logger.error(f"Google Places API request timed out: {e}")
+                raise
+            except httpx.RequestError as e:
+                logger.error(f"Google Places API request error: {e}")
+                raise
 
         # Normalize to VenueCreate schemas
-        venues = []
-        for place in data.get("places", []):
-            venue = self._normalize_place(place)
-            if venue:
-                venues.append(venue)
+        places = data.get("places", [])
+        with span("google.normalize_places", count=len(places)):
+            venues = []
+            for place in places:
+                venue = self._normalize_place(place)
+                if venue:
+                    venues.append(venue)
 
         logger.info(f"Found {len(venues)} venues from Google Places API")
         return venues
 
+    async def get_place_reviews(
+        self, place_id: str, http_client: httpx.AsyncClient | None = None
+    ) -> list[str]:
+        """Fetch review texts for a place using Place Details (New).
+
+        Args:
+            place_id: Google place ID (Venue.provider_id)
+            http_client: Optional shared client, so batch callers reuse connections
+
+        Returns:
+            List of review texts (may be empty)
+
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        headers = {
+            "X-Goog-Api-Key": self.api_key,
+            "X-Goog-FieldMask": "reviews",
+        }
+        url = self.base_url + self.DETAILS_PATH.format(place_id=place_id)
+
+        with observe_duration(
+            PROVIDER_REQUEST_DURATION, provider=self.name, sku=self.REVIEWS_SKU, status="error"
+        ) as labels:
+            try:
+                if http_client is not None:
+                    response = await http_client.get(url, headers=headers)
+                else:
+                    async with httpx.AsyncClient(timeout=self.TIMEOUT_S) as client:
+                        response = await client.get(url, headers=headers)
+                labels["status"] = str(response.status_code)
+                response.raise_for_status()
+                data = response.json()
+            except httpx.HTTPStatusError as e:
+                logger.error(
+                    f"Google Places API error: {e.response.status_code} - {e.response.text}"
+                )
+                raise
+            except httpx.TimeoutException as e:
+                labels["status"] = "timeout"
+                logger.error(f"Google Places API request timed out: {e}")
+                raise
+            except httpx.RequestError as e:
+                logger.error(f"Google Places API request error: {e}")
+                raise
+
+        reviews = []
+        for review in data.get("reviews", []):
+            text = (review.get("text") or {}).get("text")
+            if text:
+                reviews.append(text)
+        return reviews
+
     def _normalize_place(self, place: dict) -> VenueCreate | None:
         """Normalize Google Places API response to VenueCreate schema.
 
@@ -213,7 +302,7 @@ class GooglePlacesClient:
 
             return VenueCreate(
                 provider_id=place.get("id", ""),
-                provider_name="google",
+                provider_name=self.name,
                 name=name,
                 categories=categories,
                 lat=lat,
@@ -0,0 +1,43 @@
+"""Provider lookup by name."""
+
+from collections.abc import Callable
+
+from app.config import settings
+from app.providers.base import PlacesProvider
+from app.providers.cached import CachedPlacesProvider
+from app.providers.google import GooglePlacesClient
+from app.providers.stub import StubPlacesProvider
+
+PROVIDER_FACTORIES: dict[str, Callable[[], PlacesProvider]] = {
+    "google": GooglePlacesClient,
+    "stub": StubPlacesProvider,
+}
+
+
+def get_providers(names: str | None = None) -> list[PlacesProvider]:
+    """Build the configured providers in priority order.
+
+    Providers are wrapped in ``CachedPlacesProvider`` unless
+    ``provider_cache_ttl_seconds`` is 0.
+
+    Args:
+        names: Comma-separated provider names (default: settings.places_providers)
+
+    Returns:
+        List of provider instances
+
+    Raises:
+        ValueError: If a provider name is unknown (or a provider is misconfigured)
+    """
+    names = names if names is not None else settings.places_providers
+    providers = []
+    for name in (n.strip() for n in names.split(",")):
+        if not name:
+            continue
+        if name not in PROVIDER_FACTORIES:
+            raise ValueError(f"Unknown places provider: {name}")
+        provider = PROVIDER_FACTORIES[name]()
+        if settings.provider_cache_ttl_seconds:
+            provider = CachedPlacesProvider(provider)
+        providers.append(provider)
+    return providers
@@ -0,0 +1,105 @@
+"""Offline stub provider for local development and tests."""
+
+import asyncio
+import math
+import random
+
+from app.geo import METERS_PER_DEGREE_LAT, haversine_m
+from app.providers.base import PlacesProvider
+from app.schemas.venue import VenueCreate
+
+_NAMES = (
+    "Blue Bottle Coffee",
+    "Tartine Bakery",
+    "Sightglass Coffee",
+    "Zuni Cafe",
+    "La Taqueria",
+    "Philz Coffee",
+    "House of Prime Rib",
+    "Nopa",
+    "Souvla",
+    "The Mill",
+    "Burma Superstar",
+    "Swan Oyster Depot",
+)
+_CATEGORIES = (["Cafe"], ["Bakery"], ["Restaurant"], ["Bar"], ["Meal Takeaway"])
+
+
+class StubPlacesProvider(PlacesProvider):
+    """Provider that serves fixed or synthetic venues without network access.
+
+    With ``venues`` it returns the fixtures within the search radius; otherwise
+    it synthesizes ``density`` venues per search, deterministically for a given
+    seed and (rounded) search center.
+    """
+
+    def __init__(
+        self,
+        venues: list[VenueCreate] | None = None,
+        name: str = "stub",
+        density: int = 20,
+        seed: int = 0,
+        latency_s: float = 0.0,
+    ):
+        """Initialize stub provider.
+
+        Args:
+            venues: Fixed venues to serve. If None, venues are synthesized
+            name: Provider name reported in ``provider_name``
+            density: Venues synthesized per search
+            seed: Seed for synthesized venues
+            latency_s: Artificial delay per search (to exercise deadlines)
+        """
+        self.venues = venues
+        self.name = name
+        self.density = density
+        self.seed = seed
+        self.latency_s = latency_s
+
+    async def search_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: int = 1000,
+        max_results: int = 20,
+        open_now: bool = False,
+        price_level: int | None = None,
+    ) -> list[VenueCreate]:
+        """Return stub venues within ``radius_m`` of a point."""
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+        venues = self.venues if self.venues is not None else self._synthesize(lat, lng, radius_m)
+        results = []
+        for venue in venues:
+            if haversine_m(lat, lng, venue.lat, venue.lng) > radius_m:
+                continue
+            if open_now and not (venue.hours or {}).get("open_now", False):
+                continue
+            if price_level is not None and venue.price_level != price_level:
+                continue
+            results.append(venue)
+        return results[:max_results]
+
+    def _synthesize(self, lat: float, lng: float, radius_m: int) -> list[VenueCreate]:
+        rng = random.Random(f"{self.seed}:{lat:.4f}:{lng:.4f}:{radius_m}")
+        meters_per_degree_lng = METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01)
+        venues = []
+        for i in range(self.density):
+            # Uniform over the disc: sqrt for radius, uniform angle.
+            distance = radius_m * math.sqrt(rng.random())
+            bearing = rng.uniform(0, 2 * math.pi)
+            venues.append(
+                VenueCreate(
+                    provider_id=f"{self.name}-{rng.getrandbits(48):012x}",
+                    provider_name=self.name,
+                    name=f"{rng.choice(_NAMES)} #{i}",
+                    categories=list(rng.choice(_CATEGORIES)),
+                    lat=lat + distance * math.cos(bearing) / METERS_PER_DEGREE_LAT,
+                    lng=lng + distance * math.sin(bearing) / meters_per_degree_lng,
+                    rating=round(rng.uniform(3.0, 5.0), 1),
+                    price_level=rng.randint(1, 4),
+                    hours={"open_now": rng.random() < 0.7},
+                )
+            )
+        return venues
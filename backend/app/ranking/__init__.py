@@ -0,0 +1,6 @@
+"""Mode-aware ranking package."""
+
+from app.ranking.features import FEATURES, build_feature_matrix
+from app.ranking.scoring import MODE_WEIGHTS, MODES, score, top_k
+
+__all__ = ["FEATURES", "MODES", "MODE_WEIGHTS", "build_feature_matrix", "score", "top_k"]
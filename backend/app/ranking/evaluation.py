@@ -0,0 +1,424 @@
+"""Offline ranking evaluation over logged impressions.
+
+Replays ``user_events``. Each impression is labeled with the strongest
+engagement (click, save, thumbs up, navigate; see ``LABEL_GAINS``) by the same
+user with the same venue within ``LABEL_WINDOW``, and impressions are grouped
+back into the searches that showed them. Every search is then re-ranked with
+one or more ``RankingConfig`` weightings and scored as NDCG@k, MRR and CTR@k
+(share of the top k slots with a positive label), per mode.
+
+History is read in keyset-paginated chunks of impressions ordered by user and
+time, so memory is bounded by the chunk size whatever the log's length. A
+chunk is featurized and ranked with array operations over all of its
+searches at once: one lexsort per configuration, no per-search Python loop.
+
+Reconstruction is approximate:
+
+- a search is a run of one user's impressions with the same mode, center and
+  radius, less than ``QUERY_GAP_S`` apart
+- ``open_now`` is not logged, so it is neutral for every candidate
+- ratings and profiles are read as they are now, not as they were when shown
+- anonymous impressions cannot be labeled and are skipped
+- with impression sampling on (``event_sample_rates``), searches are rebuilt
+  from the impressions that were kept
+
+Run: ``python -m app.ranking.evaluation [--days N] [--k K] [--weights FILE]``
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import numpy as np
+from sqlalchemy import case, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from app.db.jsonb import json_float
+from app.geo import haversine_m_array
+from app.models.user_event import EventType, Mode, UserEvent
+from app.models.venue import Venue, VenueProfile
+from app.ranking.features import FEATURE_INDEX, FEATURES, NEUTRAL, STATIC_FEATURES
+from app.ranking.personalization import EVENT_SIGNALS
+from app.ranking.scoring import MODE_WEIGHTS, MODES, custom_weights
+
+logger = logging.getLogger(__name__)
+
+# Label gain per engagement type (a thumbs down labels the impression 0).
+LABEL_GAINS: dict[EventType, float] = {t: s for t, s in EVENT_SIGNALS.items() if s > 0}
+
+# Engagement this soon after an impression labels it.
+LABEL_WINDOW = timedelta(minutes=30)
+
+# Impressions of one search further apart than this start a new search.
+QUERY_GAP_S = 120.0
+
+# Impressions per chunk.
+CHUNK_SIZE = 50_000
+
+# Static features read from the profile's attribute scores.
+PROFILE_ATTRIBUTES = tuple(f for f in STATIC_FEATURES if f not in ("rating", "affordability"))
+
+_MODE_INDEX = {mode: i for i, mode in enumerate(MODES)}
+
+
+@dataclass(frozen=True, eq=False)
+class RankingConfig:
+    """A ranking to evaluate: (features x modes) weights, like ``MODE_WEIGHTS``."""
+
+    name: str
+    weights: np.ndarray = field(default_factory=lambda: MODE_WEIGHTS)
+
+    @classmethod
+    def from_mode_weights(
+        cls, name: str, mode_weights: dict[Mode | str, dict[str, float]]
+    ) -> "RankingConfig":
+        """Build a config from per-mode feature weights.
+
+        Modes not in ``mode_weights`` keep their production weights.
+
+        Raises:
+            ValueError: If a mode, feature or weight is invalid
+        """
+        weights = MODE_WEIGHTS.copy()
+        for mode, feature_weights in mode_weights.items():
+            weights[:, _MODE_INDEX[Mode(mode)]] = custom_weights(feature_weights)
+        return cls(name, weights)
+
+
+BASELINE = RankingConfig("baseline")
+
+
+@dataclass
+class ModeMetrics:
+    """Accumulated ranking metrics of one mode."""
+
+    queries: int = 0
+    judged: int = 0  # queries with at least one positive label
+    ndcg_sum: float = 0.0
+    rr_sum: float = 0.0
+    hits: int = 0  # positive labels in the top k
+    slots: int = 0  # impressions in the top k
+
+    @property
+    def ndcg(self) -> float:
+        """Mean NDCG@k over judged queries."""
+        return self.ndcg_sum / self.judged if self.judged else 0.0
+
+    @property
+    def mrr(self) -> float:
+        """Mean reciprocal rank of the first positive, over judged queries."""
+        return self.rr_sum / self.judged if self.judged else 0.0
+
+    @property
+    def ctr(self) -> float:
+        """Share of top-k slots holding a positively labeled venue."""
+        return self.hits / self.slots if self.slots else 0.0
+
+
+@dataclass
+class Impressions:
+    """Labeled, featurized impressions grouped into searches."""
+
+    query_ids: np.ndarray  # (n,) int64, non-decreasing
+    modes: np.ndarray  # (n,) int64 indices into MODES
+    features: np.ndarray  # (n x features) float32
+    gains: np.ndarray  # (n,) float32 labels, 0 if not engaged
+
+
+def impressions_statement(
+    since: datetime,
+    until: datetime,
+    after: tuple[str, datetime, Any] | None = None,
+    limit: int = CHUNK_SIZE,
+):
+    """Select one chunk of labeled impressions with their venues' features.
+
+    Args:
+        since: Earliest impression
+        until: Latest impression (exclusive)
+        after: Keyset (user ID, time, event ID) of the previous chunk's last row
+        limit: Chunk size
+
+    Returns:
+        SELECT ordered by user, time and event ID
+    """
+    engagement = aliased(UserEvent)
+    gain = case(
+        {event_type: value for event_type, value in LABEL_GAINS.items()},
+        value=engagement.event_type,
+        else_=0.0,
+    )
+    label = (
+        select(func.max(gain))
+        .where(
+            engagement.user_id == UserEvent.user_id,
+            engagement.venue_id == UserEvent.venue_id,
+            engagement.event_type.in_([*LABEL_GAINS, EventType.THUMBS_DOWN]),
+            engagement.created_at >= UserEvent.created_at,
+            engagement.created_at < UserEvent.created_at + LABEL_WINDOW,
+        )
+        .scalar_subquery()
+    )
+    context = UserEvent.query_context
+    key = tuple_(UserEvent.user_id, UserEvent.created_at, UserEvent.id)
+    stmt = (
+        select(
+            UserEvent.id,
+            UserEvent.user_id,
+            UserEvent.created_at,
+            UserEvent.mode,
+            json_float(context, "lat").label("query_lat"),
+            json_float(context, "lng").label("query_lng"),
+            func.coalesce(json_float(context, "radius"), 1000.0).label("radius"),
+            Venue.lat,
+            Venue.lng,
+            Venue.rating,
+            Venue.price_level,
+            *(
+                json_float(VenueProfile.attribute_scores, attribute).label(attribute)
+                for attribute in PROFILE_ATTRIBUTES
+            ),
+            func.coalesce(label, 0.0).label("gain"),
+        )
+        .join(Venue, Venue.id == UserEvent.venue_id)
+        .join(VenueProfile, VenueProfile.venue_id == Venue.id, isouter=True)
+        .where(
+            UserEvent.event_type == EventType.IMPRESSION,
+            UserEvent.user_id.is_not(None),
+            UserEvent.mode.is_not(None),
+            json_float(context, "lat").is_not(None),
+            json_float(context, "lng").is_not(None),
+            UserEvent.created_at >= since,
+            UserEvent.created_at < until,
+        )
+        .order_by(UserEvent.user_id, UserEvent.created_at, UserEvent.id)
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(key > tuple_(*after))
+    return stmt
+
+
+def build_impressions(rows: Sequence[Any]) -> Impressions:
+    """Featurize ``impressions_statement`` rows and group them into searches."""
+    n = len(rows)
+
+    def column(name: str, dtype: Any = np.float64) -> np.ndarray:
+        return np.array([getattr(row, name) for row in rows], dtype=dtype)
+
+    users = column("user_id", object)
+    modes = np.array([_MODE_INDEX[Mode(row.mode)] for row in rows], dtype=np.int64)
+    times = np.array([row.created_at.timestamp() for row in rows], dtype=np.float64)
+    query_lat, query_lng, radius = column("query_lat"), column("query_lng"), column("radius")
+
+    new_query = np.ones(n, dtype=bool)
+    new_query[1:] = (
+        (users[1:] != users[:-1])
+        | (modes[1:] != modes[:-1])
+        | (query_lat[1:] != query_lat[:-1])
+        | (query_lng[1:] != query_lng[:-1])
+        | (radius[1:] != radius[:-1])
+        | (np.diff(times) > QUERY_GAP_S)
+    )
+
+    features = np.full((n, len(FEATURES)), NEUTRAL, dtype=np.float32)
+    distances = haversine_m_array(query_lat, query_lng, column("lat"), column("lng"))
+    features[:, FEATURE_INDEX["proximity"]] = 1.0 - np.minimum(
+        distances / np.maximum(radius, 1.0), 1.0
+    )
+    static = {
+        "rating": column("rating") / 5.0,
+        "affordability": 1.0 - column("price_level") / 4.0,
+        **{attribute: column(attribute) for attribute in PROFILE_ATTRIBUTES},
+    }
+    for name, values in static.items():
+        features[:, FEATURE_INDEX[name]] = np.where(np.isnan(values), NEUTRAL, values)
+
+    return Impressions(
+        query_ids=np.cumsum(new_query) - 1,
+        modes=modes,
+        features=features,
+        gains=column("gain", np.float32),
+    )
+
+
+def _ranks(groups: np.ndarray, starts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """0-based rank of each row within its group by descending value (ties keep order)."""
+    order = np.lexsort((-values, groups))
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values)) - starts[groups[order]]
+    return ranks
+
+
+def evaluate_impressions(
+    impressions: Impressions,
+    config: RankingConfig,
+    k: int,
+    metrics: dict[Mode, ModeMetrics],
+) -> None:
+    """Re-rank every search in a chunk and add its metrics to ``metrics``.
+
+    Args:
+        impressions: Chunk of impressions
+        config: Ranking to evaluate
+        k: Cutoff for NDCG@k and CTR@k
+        metrics: Per-mode accumulators, updated in place
+    """
+    q = impressions.query_ids
+    if not len(q):
+        return
+    boundary = np.r_[True, q[1:] != q[:-1]]
+    starts = np.flatnonzero(boundary)
+    groups = np.cumsum(boundary) - 1
+    n_queries = len(starts)
+
+    # Each row dotted with its own mode's weight column.
+    scores = np.einsum("ij,ji->i", impressions.features, config.weights[:, impressions.modes])
+    gains = impressions.gains
+    ranks = _ranks(groups, starts, scores)
+    ideal = _ranks(groups, starts, gains)
+
+    graded = np.exp2(gains) - 1.0
+    in_k = ranks < k
+    dcg = np.bincount(groups, np.where(in_k, graded / np.log2(ranks + 2.0), 0.0), n_queries)
+    idcg = np.bincount(groups, np.where(ideal < k, graded / np.log2(ideal + 2.0), 0.0), n_queries)
+    relevant = gains > 0
+    first = np.full(n_queries, np.inf)
+    np.minimum.at(first, groups[relevant], ranks[relevant])
+    reciprocal = 1.0 / (first + 1.0)
+    hits = np.bincount(groups, in_k & relevant, n_queries)
+    slots = np.bincount(groups, in_k, n_queries)
+    judged = idcg > 0
+    ndcg = np.divide(dcg, idcg, out=np.zeros(n_queries), where=judged)
+
+    query_modes = impressions.modes[starts]
+    for j, mode in enumerate(MODES):
+        selected = query_modes == j
+        if not selected.any():
+            continue
+        m = metrics[mode]
+        m.queries += int(selected.sum())
+        m.judged += int((selected & judged).sum())
+        m.ndcg_sum += float(ndcg[selected].sum())
+        m.rr_sum += float(reciprocal[selected].sum())
+        m.hits += int(hits[selected].sum())
+        m.slots += int(slots[selected].sum())
+
+
+async def evaluate(
+    session_factory: async_sessionmaker[AsyncSession],
+    configs: Sequence[RankingConfig] = (BASELINE,),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    k: int = 10,
+    chunk_size: int = CHUNK_SIZE,
+) -> dict[str, dict[Mode, ModeMetrics]]:
+    """Evaluate rankings over the impression log, one chunk at a time.
+
+    A chunk's last search may continue into the next chunk, so its rows are
+    held back and evaluated with the next one.
+
+    Args:
+        session_factory: Session factory (one short session per chunk)
+        configs: Rankings to evaluate (each chunk is read once for all of them)
+        since: Earliest impression (default: 28 days before ``until``)
+        until: Latest impression, exclusive (default: now)
+        k: Cutoff for NDCG@k and CTR@k
+        chunk_size: Impressions per chunk
+
+    Returns:
+        Config name -> mode -> metrics
+    """
+    until = until or datetime.now(UTC)
+    since = since or until - timedelta(days=28)
+    results = {config.name: {mode: ModeMetrics() for mode in MODES} for config in configs}
+    carry: list[Any] = []
+    after = None
+    impressions_read = 0
+    while True:
+        async with session_factory() as session:
+            chunk = list(
+                await session.execute(impressions_statement(since, until, after, chunk_size))
+            )
+        impressions_read += len(chunk)
+        done = len(chunk) < chunk_size
+        if chunk:
+            last = chunk[-1]
+            after = (last.user_id, last.created_at, last.id)
+        rows = carry + chunk
+        if not rows:
+            break
+        impressions = build_impressions(rows)
+        cut = len(rows)
+        if not done:
+            cut = int(np.searchsorted(impressions.query_ids, impressions.query_ids[-1]))
+            if cut == 0:  # one search spans the whole chunk; keep reading
+                carry = rows
+                continue
+            impressions = Impressions(
+                impressions.query_ids[:cut],
+                impressions.modes[:cut],
+                impressions.features[:cut],
+                impressions.gains[:cut],
+            )
+        carry = rows[cut:]
+        for config in configs:
+            evaluate_impressions(impressions, config, k, results[config.name])
+        if done:
+            break
+    logger.info(f"Evaluated {impressions_read} impressions")
+    return results
+
+
+def format_report(results: dict[str, dict[Mode, ModeMetrics]], k: int) -> str:
+    """Render evaluation results as a plain-text table."""
+    lines = [f"{'config':<16}{'mode':<12}{'queries':>9}{'judged':>8}"]
+    lines[0] += f"{f'ndcg@{k}':>10}{'mrr':>8}{f'ctr@{k}':>9}"
+    for name, modes in results.items():
+        for mode, m in modes.items():
+            lines.append(
+                f"{name:<16}{mode.value:<12}{m.queries:>9}{m.judged:>8}"
+                f"{m.ndcg:>10.4f}{m.mrr:>8.4f}{m.ctr:>9.4f}"
+            )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    from app.db.session import AsyncSessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=28, help="history to replay")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--weights", help='JSON file of candidate weights: {"mode": {"feature": weight}}'
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    configs = [BASELINE]
+    if args.weights:
+        with open(args.weights) as f:
+            configs.append(RankingConfig.from_mode_weights("candidate", json.load(f)))
+    until = datetime.now(UTC)
+    results = asyncio.run(
+        evaluate(
+            AsyncSessionLocal,
+            configs,
+            since=until - timedelta(days=args.days),
+            until=until,
+            k=args.k,
+            chunk_size=args.chunk_size,
+        )
+    )
+    print(format_report(results, args.k))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Candidate feature matrix for mode-aware ranking.
+
+Each candidate venue becomes one row of a float32 matrix whose columns are the
+features in ``FEATURES``, all scaled to 0-1 (higher is better). Missing data
+maps to a neutral value so unknown venues are neither boosted nor buried.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from app.geo import haversine_m_array
+from app.schemas.venue import VenueCreate
+
+# Features that depend on the request (where the user is, what time it is).
+DYNAMIC_FEATURES: tuple[str, ...] = ("proximity", "open_now")
+
+# Features that depend only on the venue and its profile.
+STATIC_FEATURES: tuple[str, ...] = (
+    "rating",
+    "affordability",
+    "quiet",
+    "laptop_friendly",
+    "romantic",
+)
+
+FEATURES: tuple[str, ...] = DYNAMIC_FEATURES + STATIC_FEATURES
+FEATURE_INDEX: dict[str, int] = {name: i for i, name in enumerate(FEATURES)}
+
+# Value used when a venue has no data for a feature.
+NEUTRAL = 0.5
+
+
+def build_static_features(
+    venues: Sequence[Any],
+    attribute_scores: Sequence[dict[str, float] | None] | None = None,
+) -> np.ndarray:
+    """Build the (candidates x STATIC_FEATURES) block for a set of venues.
+
+    These columns depend only on the venue and its profile, so they can be
+    precomputed when either changes (see ``app.repositories.scores``).
+
+    Args:
+        venues: Objects with ``rating`` and ``price_level`` (schemas, ORM rows)
+        attribute_scores: Per-venue profile attribute scores (None if unprofiled)
+
+    Returns:
+        float32 matrix, columns in STATIC_FEATURES order
+    """
+    n = len(venues)
+    static = np.full((n, len(STATIC_FEATURES)), NEUTRAL, dtype=np.float32)
+    column = {name: i for i, name in enumerate(STATIC_FEATURES)}
+    attribute_scores = attribute_scores or [None] * n
+    for i, venue in enumerate(venues):
+        if venue.rating is not None:
+            static[i, column["rating"]] = venue.rating / 5.0
+        if venue.price_level is not None:
+            static[i, column["affordability"]] = 1.0 - venue.price_level / 4.0
+        for attribute, score in (attribute_scores[i] or {}).items():
+            j = column.get(attribute)
+            if j is not None:
+                static[i, j] = score
+    return static
+
+
+def build_feature_matrix(
+    venues: list[VenueCreate],
+    lat: float,
+    lng: float,
+    radius_m: float,
+    attribute_scores: list[dict[str, float] | None] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Build the (candidates x features) matrix for a search.
+
+    Args:
+        venues: Candidate venues
+        lat: Search latitude
+        lng: Search longitude
+        radius_m: Search radius (distance at which proximity reaches 0)
+        attribute_scores: Per-venue profile attribute scores (None if unprofiled)
+
+    Returns:
+        Tuple of (feature matrix, distances in meters)
+    """
+    n = len(venues)
+    features = np.full((n, len(FEATURES)), NEUTRAL, dtype=np.float32)
+    coordinates = np.array([(v.lat, v.lng) for v in venues], dtype=np.float64).reshape(n, 2)
+    distances = haversine_m_array(lat, lng, coordinates[:, 0], coordinates[:, 1]).astype(np.float32)
+    features[:, FEATURE_INDEX["proximity"]] = 1.0 - np.minimum(distances / max(radius_m, 1), 1.0)
+    for i, venue in enumerate(venues):
+        open_now = (venue.hours or {}).get("open_now")
+        if open_now is not None:
+            features[i, FEATURE_INDEX["open_now"]] = 1.0 if open_now else 0.0
+    features[:, len(DYNAMIC_FEATURES) :] = build_static_features(venues, attribute_scores)
+
+    return features, distances
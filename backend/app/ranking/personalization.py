@@ -0,0 +1,212 @@
+"""Per-user preference vectors and personalized re-ranking.
+
+Each user's preferences are one fixed-size float32 vector (``VECTOR_SIZE``
+floats, 52 bytes) stored as raw bytes in Redis:
+
+- mode affinities: decayed engagement per ``Mode``
+- feature weights: decayed mean of the centered static features (rating,
+  affordability, profile attributes) of venues the user engaged with, signed
+  by the event (a thumbs down pulls away from the venue's features)
+- price tolerance: decayed mean price level (0-1) of positively engaged venues
+- evidence mass and last update time, for decay and confidence
+
+Vectors are updated online as events arrive (``update_vector``): the stored
+state is decayed by ``0.5 ** (elapsed / half_life)`` and the event folded in,
+so the user's event history is never read. ``personalize`` then adjusts a
+search's scores with one matrix-vector product over its feature matrix.
+"""
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.db.redis import get_redis
+from app.models.user_event import EventType, Mode
+from app.ranking.features import DYNAMIC_FEATURES, FEATURE_INDEX, NEUTRAL, STATIC_FEATURES
+from app.ranking.scoring import MODES
+
+# Engagement signal per event type; types not listed (impressions) are ignored.
+EVENT_SIGNALS: dict[EventType, float] = {
+    EventType.CLICK: 1.0,
+    EventType.SAVE: 2.0,
+    EventType.THUMBS_UP: 2.0,
+    EventType.NAVIGATE: 3.0,
+    EventType.THUMBS_DOWN: -2.0,
+}
+
+# Vector layout.
+MODE_SLOTS = slice(0, len(MODES))
+FEATURE_SLOTS = slice(MODE_SLOTS.stop, MODE_SLOTS.stop + len(STATIC_FEATURES))
+PRICE_SLOT = FEATURE_SLOTS.stop
+PRICE_MASS_SLOT = PRICE_SLOT + 1
+MASS_SLOT = PRICE_SLOT + 2
+UPDATED_SLOT = PRICE_SLOT + 3  # hours since the epoch (float32 keeps ~2 min precision)
+VECTOR_SIZE = UPDATED_SLOT + 1
+
+# Candidates may be this much pricier (0-1 scale) than the tolerance unpenalized.
+PRICE_SLACK = 0.125
+
+
+@dataclass(frozen=True)
+class PreferenceUpdate:
+    """One engagement event, with the venue data the update needs."""
+
+    event_type: EventType
+    at: float  # epoch seconds
+    mode: Mode | None = None
+    static_features: np.ndarray | None = None  # (STATIC_FEATURES,) row of the venue
+    price_level: int | None = None
+
+
+def empty_vector() -> np.ndarray:
+    """A vector with no evidence (leaves rankings unchanged)."""
+    return np.zeros(VECTOR_SIZE, dtype=np.float32)
+
+
+def _decay(vector: np.ndarray, at: float, half_life_s: float) -> float:
+    elapsed = max(at - float(vector[UPDATED_SLOT]) * 3600, 0.0)
+    return 0.5 ** (elapsed / half_life_s) if vector[MASS_SLOT] > 0 else 0.0
+
+
+def update_vector(
+    vector: np.ndarray, update: PreferenceUpdate, half_life_s: float | None = None
+) -> np.ndarray:
+    """Fold one event into a preference vector.
+
+    Args:
+        vector: Current vector (not modified)
+        update: The event
+        half_life_s: Decay half-life (default: settings)
+
+    Returns:
+        The updated vector (unchanged copy for ignored event types)
+    """
+    signal = EVENT_SIGNALS.get(update.event_type)
+    vector = vector.astype(np.float32, copy=True)
+    if signal is None or update.static_features is None:
+        return vector
+    half_life_s = half_life_s or settings.personalization_half_life_days * 86400
+    decay = _decay(vector, update.at, half_life_s)
+    weight = abs(signal)
+
+    vector[MODE_SLOTS] *= decay
+    if update.mode is not None:
+        vector[MODE_SLOTS.start + MODES.index(update.mode)] += weight
+
+    mass = float(vector[MASS_SLOT]) * decay
+    centered = update.static_features.astype(np.float32) - NEUTRAL
+    vector[FEATURE_SLOTS] = (mass * vector[FEATURE_SLOTS] + signal * centered) / (mass + weight)
+    vector[MASS_SLOT] = mass + weight
+
+    price_mass = float(vector[PRICE_MASS_SLOT]) * decay
+    if signal > 0 and update.price_level is not None:
+        price = update.price_level / 4.0
+        vector[PRICE_SLOT] = (price_mass * vector[PRICE_SLOT] + weight * price) / (
+            price_mass + weight
+        )
+        price_mass += weight
+    vector[PRICE_MASS_SLOT] = price_mass
+
+    vector[UPDATED_SLOT] = update.at / 3600
+    return vector
+
+
+def mode_affinities(vector: np.ndarray) -> np.ndarray:
+    """Share of the user's (decayed) engagement in each mode, MODES order."""
+    total = float(vector[MODE_SLOTS].sum())
+    if total <= 0:
+        return np.full(len(MODES), 1.0 / len(MODES), dtype=np.float32)
+    return vector[MODE_SLOTS] / total
+
+
+def personalize(
+    scores: np.ndarray,
+    features: np.ndarray,
+    vector: np.ndarray | None,
+    mode: Mode,
+    now: float | None = None,
+) -> np.ndarray:
+    """Adjust a search's scores toward one user's preferences.
+
+    The adjustment is the candidates' centered static features dotted with the
+    user's feature weights, minus a penalty for candidates pricier than the
+    user's tolerance. It is scaled by ``personalization_strength``, by the
+    user's confidence (decayed evidence mass against a prior), and up for
+    modes the user engages in most.
+
+    Args:
+        scores: (candidates,) mode scores
+        features: (candidates x features) matrix the scores came from
+        vector: The user's preference vector (None: unchanged)
+        mode: Mode being ranked
+        now: Current time, epoch seconds (default: now)
+
+    Returns:
+        (candidates,) float32 scores
+    """
+    if vector is None or vector[MASS_SLOT] <= 0 or len(scores) == 0:
+        return scores
+    now = time.time() if now is None else now
+    mass = float(vector[MASS_SLOT]) * _decay(
+        vector, now, settings.personalization_half_life_days * 86400
+    )
+    confidence = mass / (mass + settings.personalization_prior_mass)
+    affinity = float(mode_affinities(vector)[MODES.index(mode)])
+
+    static = features[:, len(DYNAMIC_FEATURES) :] - NEUTRAL
+    adjustment = static @ vector[FEATURE_SLOTS]
+    if vector[PRICE_MASS_SLOT] > 0:
+        price = 1.0 - features[:, FEATURE_INDEX["affordability"]]
+        adjustment -= np.maximum(price - vector[PRICE_SLOT] - PRICE_SLACK, 0.0)
+
+    scale = settings.personalization_strength * confidence * (0.5 + affinity)
+    return (scores + scale * adjustment).astype(np.float32)
+
+
+class PreferenceStore:
+    """Redis-backed preference vectors, one raw float32 string per user."""
+
+    KEY = "prefs:{user_id}"
+
+    def __init__(self, redis: Redis | None = None):
+        """Initialize the store.
+
+        Args:
+            redis: Async Redis client. If None, uses the shared app client
+        """
+        self.redis = redis or get_redis()
+
+    def _key(self, user_id: str) -> str:
+        return self.KEY.format(user_id=user_id)
+
+    async def get(self, user_id: str) -> np.ndarray | None:
+        """Return the user's vector, or None if they have none (or it is malformed)."""
+        raw = await self.redis.get(self._key(user_id))
+        if raw is None or len(raw) != VECTOR_SIZE * 4:
+            return None
+        return np.frombuffer(raw, dtype=np.float32)
+
+    async def apply(self, user_id: str, updates: Iterable[PreferenceUpdate]) -> np.ndarray:
+        """Fold events into the user's vector and store it.
+
+        Read-modify-write without a lock: a concurrent update for the same
+        user can drop one batch's contribution, which the decayed average
+        absorbs. Ingest batches a user's events into one call to keep that rare.
+
+        Returns:
+            The stored vector
+        """
+        vector = await self.get(user_id)
+        vector = empty_vector() if vector is None else vector
+        for update in sorted(updates, key=lambda u: u.at):
+            vector = update_vector(vector, update)
+        await self.redis.set(
+            self._key(user_id),
+            vector.tobytes(),
+            ex=int(settings.personalization_ttl_days * 86400),
+        )
+        return vector
@@ -0,0 +1,150 @@
+"""Rule-based mode scoring.
+
+Each ``Mode`` is a weight vector over ``FEATURES``; stacking them gives the
+(features x modes) matrix ``MODE_WEIGHTS``. A candidate's score for a mode is
+its feature row dotted with that mode's weights, so scoring any number of
+candidates is a single matrix-vector product.
+
+Because scoring is linear, each score splits into a static part (venue and
+profile features, precomputed per mode in ``venue_static_scores``) and a
+dynamic part (proximity, open now) that is only known at request time.
+Request-time ranking still builds every feature column, since
+personalization and re-ranking read them all; the stored static part ranks
+venues in bulk without a request (see ``app.repositories.scores``).
+"""
+
+import numpy as np
+
+from app.models.user_event import Mode
+from app.ranking.features import DYNAMIC_FEATURES, FEATURE_INDEX, FEATURES
+
+# Per-mode feature weights (each mode's weights sum to 1).
+MODE_FEATURE_WEIGHTS: dict[Mode, dict[str, float]] = {
+    # Open now, close by, and suitable for working.
+    Mode.WORK: {
+        "proximity": 0.2,
+        "open_now": 0.25,
+        "rating": 0.1,
+        "affordability": 0.05,
+        "quiet": 0.15,
+        "laptop_friendly": 0.25,
+    },
+    # Ratings, ambience proxy, and price.
+    Mode.DATE: {
+        "proximity": 0.1,
+        "open_now": 0.1,
+        "rating": 0.35,
+        "affordability": 0.05,
+        "quiet": 0.1,
+        "romantic": 0.3,
+    },
+    # Distance, open now, and speed.
+    Mode.QUICK_BITE: {
+        "proximity": 0.45,
+        "open_now": 0.35,
+        "rating": 0.15,
+        "affordability": 0.05,
+    },
+    # Low price and value.
+    Mode.BUDGET: {
+        "proximity": 0.15,
+        "open_now": 0.15,
+        "rating": 0.2,
+        "affordability": 0.5,
+    },
+}
+
+MODES: tuple[Mode, ...] = tuple(Mode)
+
+
+def weight_vector(weights: dict[str, float]) -> np.ndarray:
+    """Convert a feature -> weight mapping into a dense float32 vector.
+
+    Raises:
+        ValueError: If a feature name is unknown
+    """
+    vector = np.zeros(len(FEATURES), dtype=np.float32)
+    for feature, weight in weights.items():
+        if feature not in FEATURE_INDEX:
+            raise ValueError(f"Unknown ranking feature: {feature}")
+        vector[FEATURE_INDEX[feature]] = weight
+    return vector
+
+
+def custom_weights(weights: dict[str, float]) -> np.ndarray:
+    """Weight vector for user-chosen feature weights (e.g. ranking sliders).
+
+    Weights are normalized to sum to 1, like the built-in modes, so custom
+    scores share their 0-1 range.
+
+    Raises:
+        ValueError: If a feature is unknown, a weight is negative or not
+            finite, or all are zero
+    """
+    vector = weight_vector(weights)
+    if not np.isfinite(vector).all():
+        raise ValueError("Ranking weights must be finite")
+    if (vector < 0).any():
+        raise ValueError("Ranking weights must be non-negative")
+    total = float(vector.sum())
+    if not np.isfinite(total):
+        raise ValueError("Ranking weights are too large")
+    if total <= 0:
+        raise ValueError("At least one ranking weight must be positive")
+    return vector / total
+
+
+# (features x modes), columns in MODES order.
+MODE_WEIGHTS = np.stack([weight_vector(MODE_FEATURE_WEIGHTS[m]) for m in MODES], axis=1)
+
+# Rows of MODE_WEIGHTS for the precomputable features.
+STATIC_MODE_WEIGHTS = MODE_WEIGHTS[len(DYNAMIC_FEATURES) :]
+
+
+def score(features: np.ndarray, mode: Mode) -> np.ndarray:
+    """Score every candidate for one mode.
+
+    Args:
+        features: (candidates x features) matrix
+        mode: Recommendation mode
+
+    Returns:
+        (candidates,) float32 scores
+    """
+    return features @ MODE_WEIGHTS[:, MODES.index(mode)]
+
+
+def score_modes(features: np.ndarray) -> np.ndarray:
+    """Score every candidate for every mode in one matrix product.
+
+    Args:
+        features: (candidates x features) matrix
+
+    Returns:
+        (candidates x modes) float32 scores, columns in MODES order
+    """
+    return features @ MODE_WEIGHTS
+
+
+def static_scores(static_features: np.ndarray) -> np.ndarray:
+    """Static part of every mode's score.
+
+    Args:
+        static_features: (candidates x STATIC_FEATURES) matrix
+
+    Returns:
+        (candidates x modes) float32 scores, columns in MODES order
+    """
+    return static_features @ STATIC_MODE_WEIGHTS
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first (ties keep input order).
+
+    Uses a partial partition, so it costs O(n + k log k) rather than a full sort.
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k)[:k]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
@@ -0,0 +1,24 @@
+"""Repository layer: batched, projected database reads and derived score rows."""
+
+from app.repositories.scores import refresh_static_scores, top_static_candidates
+from app.repositories.venue import (
+    attribute_score,
+    find_unprofiled_venues,
+    find_venues_by_attributes,
+    get_venues_with_profiles,
+    load_attribute_scores,
+    load_venues,
+    venue_with_profile_from_row,
+)
+
+__all__ = [
+    "attribute_score",
+    "find_unprofiled_venues",
+    "find_venues_by_attributes",
+    "get_venues_with_profiles",
+    "load_attribute_scores",
+    "load_venues",
+    "refresh_static_scores",
+    "top_static_candidates",
+    "venue_with_profile_from_row",
+]
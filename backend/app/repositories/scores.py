@@ -0,0 +1,266 @@
+"""Precomputed per-mode static scores (``venue_static_scores``).
+
+A venue's score for a mode is linear in its features (see
+``app.ranking.scoring``). The part that depends only on the venue and its
+profile -- rating, price and profile attributes -- changes only when one of
+them is written, so it is computed on write and stored per mode. Request time
+then only adds the dynamic part (proximity, open now).
+
+Rows are kept current two ways:
+
+- an ``after_flush`` hook (``refresh_after_flush``, registered on the app's
+  session class in ``app.db.session``) refreshes venues and profiles written
+  through the ORM, in the same transaction
+- bulk Core statements (e.g. ``upsert_profiles``) bypass the ORM and call
+  ``refresh_static_scores`` before committing
+
+Nearby search reads them (``top_static_candidates``) when every provider
+fails, to serve the best known venues of the region for the mode.
+
+Backfill: ``python -m app.repositories.scores [--chunk-size N]``
+"""
+
+import argparse
+import asyncio
+import logging
+import uuid
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import inspect, select, union_all
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.geo import cells_to_geohashes, covering_cells, geohash_encode
+from app.models.user_event import Mode
+from app.models.venue import STATIC_SCORE_MODES, Venue, VenueProfile, VenueStaticScore
+from app.ranking.features import build_static_features
+from app.ranking.scoring import MODES, static_scores
+from app.repositories.venue import _ids_param
+
+logger = logging.getLogger(__name__)
+
+# Geohash precision of ``venue_static_scores.cell`` (~4.9 x 4.9 km cells).
+CELL_PRECISION = 5
+
+# Most cells a region read scans (a 20 km radius needs about 80).
+MAX_REGION_CELLS = 128
+
+# Venues per refresh statement when backfilling.
+BACKFILL_CHUNK_SIZE = 1000
+
+# Columns whose changes invalidate a venue's static scores.
+SCORE_INPUTS: dict[type, tuple[str, ...]] = {
+    Venue: ("lat", "lng", "rating", "price_level"),
+    VenueProfile: ("attribute_scores",),
+}
+
+
+def cell_for(lat: float, lng: float) -> str:
+    """Return the ``venue_static_scores.cell`` of a point."""
+    return geohash_encode(lat, lng, CELL_PRECISION)
+
+
+def region_cells(lat: float, lng: float, radius_m: float) -> list[str]:
+    """Return the ``venue_static_scores`` cells covering a circle.
+
+    Raises:
+        ValueError: If the circle needs more than ``MAX_REGION_CELLS`` cells
+    """
+    cells = covering_cells(lat, lng, radius_m, CELL_PRECISION, max_cells=MAX_REGION_CELLS)
+    return list(cells_to_geohashes(cells, CELL_PRECISION))
+
+
+def score_inputs_statement(venue_ids: Sequence[uuid.UUID]):
+    """Select the columns static scores are computed from, one row per venue."""
+    return (
+        select(
+            Venue.id,
+            Venue.lat,
+            Venue.lng,
+            Venue.rating,
+            Venue.price_level,
+            VenueProfile.attribute_scores,
+        )
+        .join(VenueProfile, VenueProfile.venue_id == Venue.id, isouter=True)
+        .where(Venue.id == _ids_param("venue_ids", venue_ids, UUID(as_uuid=True)))
+    )
+
+
+def static_score_rows(rows: Iterable[Any], now: datetime | None = None) -> list[dict[str, Any]]:
+    """Compute ``venue_static_scores`` rows from ``score_inputs_statement`` rows.
+
+    Args:
+        rows: Rows with ``id``, ``lat``, ``lng``, ``rating``, ``price_level``
+            and ``attribute_scores``
+        now: Update time (default: current UTC time)
+
+    Returns:
+        Insert parameters, one dict per venue
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    now = now or datetime.now(UTC)
+    scores = static_scores(build_static_features(rows, [row.attribute_scores for row in rows]))
+    return [
+        {
+            "venue_id": row.id,
+            "cell": cell_for(row.lat, row.lng),
+            **{mode.value: float(scores[i, j]) for j, mode in enumerate(MODES)},
+            "updated_at": now,
+        }
+        for i, row in enumerate(rows)
+    ]
+
+
+def upsert_statement(rows: list[dict[str, Any]]):
+    """Single ``INSERT ... ON CONFLICT`` writing many static score rows."""
+    stmt = insert(VenueStaticScore).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[VenueStaticScore.venue_id],
+        set_={name: stmt.excluded[name] for name in ("cell", *STATIC_SCORE_MODES, "updated_at")},
+    )
+
+
+async def refresh_static_scores(session: AsyncSession, venue_ids: Sequence[uuid.UUID]) -> int:
+    """Recompute static scores for venues in the session's transaction.
+
+    Reads go to the primary so rows written earlier in the transaction are
+    seen. The caller commits.
+
+    Args:
+        session: Database session
+        venue_ids: Venues whose venue or profile columns changed
+
+    Returns:
+        Number of rows written
+    """
+    if not venue_ids:
+        return 0
+    session.info["primary"] = True
+    result = await session.execute(score_inputs_statement(venue_ids))
+    rows = static_score_rows(result)
+    if rows:
+        await session.execute(upsert_statement(rows))
+    return len(rows)
+
+
+def changed_venue_ids(session: Session) -> set[uuid.UUID]:
+    """Venues whose score inputs are pending in ``session`` (new or modified)."""
+    venue_ids: set[uuid.UUID] = set()
+    for obj in chain(session.new, session.dirty):
+        columns = SCORE_INPUTS.get(type(obj))
+        if columns is None:
+            continue
+        state = inspect(obj)
+        if state.pending or any(state.attrs[name].history.has_changes() for name in columns):
+            venue_ids.add(obj.id if isinstance(obj, Venue) else obj.venue_id)
+    venue_ids.discard(None)
+    return venue_ids
+
+
+def refresh_after_flush(session: Session, flush_context: Any) -> None:
+    """``after_flush`` listener refreshing the static scores of flushed venues.
+
+    Registered on the app's sync session class by ``app.db.session``.
+    """
+    # new/dirty still hold the pre-flush state here; the rows are already written.
+    venue_ids = changed_venue_ids(session)
+    if not venue_ids:
+        return
+    connection = session.connection()
+    rows = static_score_rows(connection.execute(score_inputs_statement(list(venue_ids))))
+    if rows:
+        connection.execute(upsert_statement(rows))
+
+
+async def top_static_candidates(
+    session: AsyncSession,
+    mode: Mode,
+    cells: Sequence[str],
+    limit: int = 100,
+) -> list[tuple[uuid.UUID, float]]:
+    """Best venues for a mode by static score within a set of cells.
+
+    Each cell is read with its own ``ORDER BY <mode> DESC LIMIT n`` range scan
+    on ``ix_venue_static_scores_cell_<mode>``, so the cost is bounded by
+    ``limit`` per cell regardless of how many venues a cell holds.
+
+    Args:
+        session: Database session
+        mode: Recommendation mode
+        cells: Geohash cells (``cell_for``) covering the region
+        limit: Maximum venues
+
+    Returns:
+        (venue ID, static score) pairs, best first
+    """
+    if not cells:
+        return []
+    column = getattr(VenueStaticScore, mode.value)
+    per_cell = [
+        select(VenueStaticScore.venue_id, column.label("score"))
+        .where(VenueStaticScore.cell == cell)
+        .order_by(column.desc())
+        .limit(limit)
+        .subquery()
+        for cell in dict.fromkeys(cells)
+    ]
+    candidates = union_all(*(select(part) for part in per_cell)).subquery()
+    result = await session.execute(
+        select(candidates.c.venue_id, candidates.c.score)
+        .order_by(candidates.c.score.desc())
+        .limit(limit)
+    )
+    return [(row.venue_id, row.score) for row in result]
+
+
+async def backfill_static_scores(
+    session: AsyncSession, chunk_size: int = BACKFILL_CHUNK_SIZE
+) -> int:
+    """Recompute static scores for every venue, committing per chunk.
+
+    Args:
+        session: Database session
+        chunk_size: Venues per refresh
+
+    Returns:
+        Number of rows written
+    """
+    written = 0
+    last_id: uuid.UUID | None = None
+    while True:
+        stmt = select(Venue.id).order_by(Venue.id).limit(chunk_size)
+        if last_id is not None:
+            stmt = stmt.where(Venue.id > last_id)
+        venue_ids = list((await session.execute(stmt)).scalars())
+        if not venue_ids:
+            break
+        written += await refresh_static_scores(session, venue_ids)
+        await session.commit()
+        last_id = venue_ids[-1]
+    logger.info(f"Backfilled static scores for {written} venues")
+    return written
+
+
+def main() -> None:
+    from app.db.session import AsyncSessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run() -> int:
+        async with AsyncSessionLocal() as session:
+            return await backfill_static_scores(session, chunk_size=args.chunk_size)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Venue and profile reads for candidate sets.
+
+Every function here fetches a whole candidate set in one round trip. Never
+touch ``Venue.profile`` on loaded objects unless it was eager-loaded: in async
+SQLAlchemy a lazy load raises, and in sync code it costs one query per venue.
+
+Candidate IDs are bound as a single array parameter (``= ANY(:ids)``) rather
+than an expanding ``IN`` list, so the SQL text is the same for every candidate
+set size and Postgres can reuse one prepared statement.
+"""
+
+import uuid
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import String, any_, bindparam, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.db.jsonb import json_float
+from app.models.venue import INDEXED_ATTRIBUTES, Venue, VenueProfile
+from app.schemas.venue import VenueProfileResponse, VenueWithProfile
+
+# Columns needed to build responses, derived from the response schemas.
+VENUE_FIELDS: tuple[str, ...] = tuple(
+    name for name in VenueWithProfile.model_fields if name != "profile"
+)
+PROFILE_FIELDS: tuple[str, ...] = tuple(VenueProfileResponse.model_fields)
+PROFILE_PREFIX = "profile_"
+
+
+def _ids_param(name: str, values: Sequence[Any], item_type: Any) -> Any:
+    return any_(bindparam(name, list(values), type_=ARRAY(item_type)))
+
+
+def venues_with_profiles_statement(profiled_only: bool = False):
+    """Projected venue + profile columns, one row per venue.
+
+    Args:
+        profiled_only: Inner-join profiles (skip unprofiled venues)
+    """
+    stmt = select(
+        *(getattr(Venue, name) for name in VENUE_FIELDS),
+        *(getattr(VenueProfile, name).label(PROFILE_PREFIX + name) for name in PROFILE_FIELDS),
+    )
+    return stmt.join(VenueProfile, VenueProfile.venue_id == Venue.id, isouter=not profiled_only)
+
+
+def attribute_score(attribute: str):
+    """Indexed SQL expression for one profile attribute score.
+
+    Raises:
+        ValueError: If the attribute has no expression index
+    """
+    if attribute not in INDEXED_ATTRIBUTES:
+        raise ValueError(f"Attribute {attribute!r} is not indexed")
+    return json_float(VenueProfile.attribute_scores, attribute)
+
+
+def venue_with_profile_from_row(row: Any) -> VenueWithProfile:
+    """Build a response straight from a projected row.
+
+    Skips ORM object materialization (identity map, attribute instrumentation)
+    and validates a plain dict, which pydantic does in compiled code -- about
+    5x cheaper per row than loading a ``Venue`` and calling ``model_validate``
+    on it with ``from_attributes``.
+
+    Args:
+        row: Row from ``venues_with_profiles_statement()``
+
+    Returns:
+        VenueWithProfile (``profile`` is None for unprofiled venues)
+    """
+    values = row._mapping
+    data = {name: values[name] for name in VENUE_FIELDS}
+    if data["categories"] is None:
+        data["categories"] = []
+    if values[PROFILE_PREFIX + "id"] is not None:
+        data["profile"] = {name: values[PROFILE_PREFIX + name] for name in PROFILE_FIELDS}
+    return VenueWithProfile.model_validate(data)
+
+
+async def get_venues_with_profiles(
+    session: AsyncSession,
+    venue_ids: Sequence[uuid.UUID] | None = None,
+    provider_ids: Sequence[str] | None = None,
+) -> list[VenueWithProfile]:
+    """Fetch venues with their profiles in one query.
+
+    Args:
+        session: Database session
+        venue_ids: Venue IDs to fetch
+        provider_ids: Provider IDs to fetch (alternative to ``venue_ids``)
+
+    Returns:
+        Responses for the venues found (order not guaranteed)
+
+    Raises:
+        ValueError: If neither ``venue_ids`` nor ``provider_ids`` is given
+    """
+    if venue_ids is None and provider_ids is None:
+        raise ValueError("venue_ids or provider_ids is required")
+    if not (venue_ids or provider_ids):
+        return []
+
+    stmt = venues_with_profiles_statement()
+    if venue_ids is not None:
+        stmt = stmt.where(Venue.id == _ids_param("venue_ids", venue_ids, UUID(as_uuid=True)))
+    if provider_ids is not None:
+        stmt = stmt.where(Venue.provider_id == _ids_param("provider_ids", provider_ids, String))
+    result = await session.execute(stmt)
+    return [venue_with_profile_from_row(row) for row in result]
+
+
+async def find_venues_by_attributes(
+    session: AsyncSession,
+    thresholds: Mapping[str, float],
+    provider_ids: Sequence[str] | None = None,
+    open_now: bool = False,
+    limit: int = 100,
+) -> list[VenueWithProfile]:
+    """Find profiled venues whose attribute scores meet every threshold.
+
+    Each threshold is a range condition on an expression index
+    (``ix_venue_profiles_<attribute>``); ``open_now`` uses the GIN index on
+    ``venues.hours``. Results are ordered by the first attribute, best first.
+
+    Args:
+        session: Database session
+        thresholds: Minimum score per attribute, e.g. ``{"quiet": 0.7}``
+        provider_ids: Restrict to these candidates
+        open_now: Only venues whose stored hours say they are open
+        limit: Maximum venues
+
+    Returns:
+        Matching venues with profiles
+
+    Raises:
+        ValueError: If ``thresholds`` is empty or names an unindexed attribute
+    """
+    if not thresholds:
+        raise ValueError("At least one attribute threshold is required")
+    stmt = venues_with_profiles_statement(profiled_only=True).where(
+        *(attribute_score(name) >= minimum for name, minimum in thresholds.items())
+    )
+    if open_now:
+        stmt = stmt.where(Venue.hours.contains({"open_now": True}))
+    if provider_ids is not None:
+        if not provider_ids:
+            return []
+        stmt = stmt.where(Venue.provider_id == _ids_param("provider_ids", provider_ids, String))
+    stmt = stmt.order_by(attribute_score(next(iter(thresholds))).desc()).limit(limit)
+    result = await session.execute(stmt)
+    return [venue_with_profile_from_row(row) for row in result]
+
+
+async def load_venues(session: AsyncSession, venue_ids: Sequence[uuid.UUID]) -> list[Venue]:
+    """Load Venue ORM objects with ``profile`` eager-loaded (same query, joined).
+
+    For callers that need ORM objects (e.g. to modify them); read paths should
+    prefer ``get_venues_with_profiles``.
+    """
+    if not venue_ids:
+        return []
+    result = await session.execute(
+        select(Venue)
+        .options(joinedload(Venue.profile))
+        .where(Venue.id == _ids_param("venue_ids", venue_ids, UUID(as_uuid=True)))
+    )
+    return list(result.scalars())
+
+
+async def load_attribute_scores(
+    session: AsyncSession, provider_ids: Sequence[str]
+) -> dict[str, tuple[uuid.UUID, dict[str, float]]]:
+    """Fetch profile attribute scores for known venues in one query.
+
+    Args:
+        session: Database session
+        provider_ids: Provider IDs of the candidate venues
+
+    Returns:
+        (venue ID, attribute scores) keyed by provider ID (unprofiled venues
+        are absent)
+    """
+    if not provider_ids:
+        return {}
+    result = await session.execute(
+        select(Venue.provider_id, Venue.id, VenueProfile.attribute_scores)
+        .join(VenueProfile, VenueProfile.venue_id == Venue.id)
+        .where(Venue.provider_id == _ids_param("provider_ids", provider_ids, String))
+    )
+    return {row.provider_id: (row.id, row.attribute_scores) for row in result}
+
+
+async def find_unprofiled_venues(
+    session: AsyncSession,
+    provider_ids: Sequence[str],
+    provider_name: str,
+    expiring_before: datetime,
+) -> list[uuid.UUID]:
+    """Find known venues whose profile is missing or expires soon, in one query.
+
+    Args:
+        session: Database session
+        provider_ids: Provider IDs of the candidate venues
+        provider_name: Only venues from this provider (the one enrichment reads)
+        expiring_before: Profiles expiring before this count as missing
+
+    Returns:
+        Venue IDs (venues not in the database are absent)
+    """
+    if not provider_ids:
+        return []
+    result = await session.execute(
+        select(Venue.id)
+        .join(VenueProfile, VenueProfile.venue_id == Venue.id, isouter=True)
+        .where(
+            Venue.provider_id == _ids_param("provider_ids", provider_ids, String),
+            Venue.provider_name == provider_name,
+            or_(VenueProfile.id.is_(None), VenueProfile.expires_at < expiring_before),
+        )
+    )
+    return list(result.scalars())
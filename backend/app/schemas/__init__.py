@@ -1,5 +1,6 @@
 """Schemas package exports."""
 
+from app.schemas.search import NearbyResponse, RankedVenue
 from app.schemas.venue import (
     UserEventCreate,
     UserEventResponse,
@@ -25,6 +26,9 @@ __all__ = [
     # VenueProfile schemas
     "VenueProfileCreate",
     "VenueProfileResponse",
+    # Search schemas
+    "RankedVenue",
+    "NearbyResponse",
     # UserEvent schemas
     "UserEventCreate",
     "UserEventResponse",
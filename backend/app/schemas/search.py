@@ -0,0 +1,104 @@
+"""Pydantic schemas for nearby search."""
+
+from uuid import UUID
+
+from pydantic import Field
+
+from app.models.user_event import Mode
+from app.schemas.venue import VenueCreate, _BaseSchema
+
+
+class RankedVenue(VenueCreate):
+    """Provider venue with its ranking data for one search."""
+
+    distance_m: float = Field(..., description="Distance from the search center in meters")
+    score: float | None = Field(None, description="Mode-fit score (None if unranked)")
+    attribute_scores: dict[str, float] | None = Field(
+        None, description="Profile attribute scores (None if not yet profiled)"
+    )
+    venue_id: UUID | None = Field(
+        None, description="Venue ID for ``POST /events`` (None if not yet profiled)"
+    )
+
+
+class NearbyResponse(_BaseSchema):
+    """Schema for nearby search responses."""
+
+    mode: Mode
+    count: int
+    degraded: bool = Field(
+        False, description="True if the deadline or a dependency cut the search short"
+    )
+    venues: list[RankedVenue]
+    radius_m: int | None = Field(
+        None, description="Radius searched (past the requested one after adaptive expansion)"
+    )
+    search_id: str | None = Field(
+        None, description="Pass to /venues/rerank to re-rank these candidates"
+    )
+    next_cursor: str | None = Field(
+        None, description="Pass as ``cursor`` to fetch the next page (None on the last page)"
+    )
+
+
+class RerankRequest(_BaseSchema):
+    """Schema for re-ranking a search's candidates with custom weights."""
+
+    search_id: str = Field(..., max_length=64, description="``search_id`` of a nearby response")
+    weights: dict[str, float] = Field(
+        ..., description="Feature -> weight (non-negative; normalized to sum to 1)"
+    )
+    limit: int = Field(20, ge=1, le=50, description="Maximum number of venues")
+
+
+class CandidateVenue(VenueCreate):
+    """Provider venue with the search data shared by every mode's ranking."""
+
+    distance_m: float = Field(..., description="Distance from the search center in meters")
+    attribute_scores: dict[str, float] | None = Field(
+        None, description="Profile attribute scores (None if not yet profiled)"
+    )
+    venue_id: UUID | None = Field(
+        None, description="Venue ID for ``POST /events`` (None if not yet profiled)"
+    )
+
+
+class ModeRanking(_BaseSchema):
+    """One mode's top venues, as positions in ``ModeComparisonResponse.venues``."""
+
+    mode: Mode
+    venues: list[int] = Field(..., description="Indices into ``venues``, best first")
+    scores: list[float] | None = Field(None, description="Mode-fit scores (None if unranked)")
+
+
+class ModeComparisonResponse(_BaseSchema):
+    """Schema for ranking one candidate set for every mode."""
+
+    degraded: bool = Field(
+        False, description="True if the deadline or a dependency cut the search short"
+    )
+    venues: list[CandidateVenue] = Field(
+        ..., description="Every venue in any mode's top list, each listed once"
+    )
+    rankings: list[ModeRanking]
+
+
+class BatchQuery(_BaseSchema):
+    """One search of a batch nearby request."""
+
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    radius: int = Field(1000, gt=0, le=50000, description="Search radius in meters")
+    mode: Mode = Mode.WORK
+    open_now: bool = False
+    price_level: int | None = Field(None, ge=0, le=4)
+    limit: int = Field(20, ge=1, le=50, description="Maximum number of venues")
+    min_results: int | None = Field(
+        None, ge=1, le=100, description="Expand the radius until this many candidates"
+    )
+
+
+class BatchResponse(_BaseSchema):
+    """Schema for batch nearby responses."""
+
+    results: list[NearbyResponse] = Field(..., description="One first page per query, in order")
@@ -142,6 +142,9 @@ class UserEventResponse(_BaseSchema):
     venue_id: UUID | None
     mode: Mode | None
     query_context: dict[str, Any] | None
+    sample_weight: float | None = Field(
+        None, description="Inverse of the event's sampling rate (set when written)"
+    )
     created_at: datetime
 
 
@@ -157,7 +160,8 @@ def venue_to_response(
 
     Args:
         venue: SQLAlchemy Venue instance
-        include_profile: If True, include profile data in response
+        include_profile: If True, include profile data in response (the profile
+            must be eager-loaded, e.g. via ``app.repositories.load_venues``)
 
     Returns:
         VenueResponse or VenueWithProfile schema instance
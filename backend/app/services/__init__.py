@@ -0,0 +1,32 @@
+"""Application services package."""
+
+from app.services.nearby import NearbyQuery, compare_modes, search_nearby_venues
+from app.services.results import (
+    Cursor,
+    InvalidCursor,
+    InvalidWeights,
+    SearchExpired,
+    rerank,
+    search_batch,
+    search_nearby_page,
+    time_bucket,
+)
+from app.services.venues import get_venues
+from app.services.warmup import prefetch_neighbors, warm_hot_tiles
+
+__all__ = [
+    "Cursor",
+    "InvalidCursor",
+    "InvalidWeights",
+    "NearbyQuery",
+    "SearchExpired",
+    "compare_modes",
+    "get_venues",
+    "prefetch_neighbors",
+    "rerank",
+    "search_batch",
+    "search_nearby_page",
+    "search_nearby_venues",
+    "time_bucket",
+    "warm_hot_tiles",
+]
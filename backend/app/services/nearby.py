@@ -0,0 +1,444 @@
+"""Nearby search: provider retrieval, profile lookup and mode ranking.
+
+Every stage runs under the request ``Deadline``. A stage that fails or runs
+out of budget is skipped rather than failing the request, and the response is
+flagged ``degraded``:
+
+- providers: slow/failing providers are dropped (others' results are kept);
+  if they all fail, the region's best known venues for the mode are served
+  from the precomputed static scores instead
+- profiles: venues are ranked without profile attributes
+- ranking: venues are returned in provider order, unscored
+
+Searches with a ``user_id`` are re-ranked toward that user's preference
+vector, fetched from Redis while the providers are queried. A missing or slow
+vector just leaves the ranking unpersonalized (not ``degraded``).
+
+Searches with ``min_results`` expand adaptively: if the requested radius
+yields fewer candidates, the radius grows by ``adaptive_radius_growth`` per
+ring until the target, the 50 km provider limit or ``adaptive_max_rings``
+searches is reached, keeping every ring's venues. Providers only search
+circles, so each ring is one circle search per provider; the inner rings are
+the same searches as earlier, smaller requests from the tile, so behind the
+provider cache only the new outer ring goes upstream.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.deadline import Deadline, bind_deadline
+from app.geo import haversine_m
+from app.models.user_event import Mode
+from app.observability.metrics import RANKING_DURATION, observe_duration
+from app.observability.tracing import span
+from app.providers.base import PlacesProvider
+from app.providers.fanout import search_all
+from app.ranking.features import build_feature_matrix
+from app.ranking.personalization import PreferenceStore, personalize
+from app.ranking.scoring import MODES, score, score_modes, top_k
+from app.repositories.scores import region_cells, top_static_candidates
+from app.repositories.venue import get_venues_with_profiles, load_attribute_scores
+from app.schemas.search import (
+    CandidateVenue,
+    ModeComparisonResponse,
+    ModeRanking,
+    NearbyResponse,
+    RankedVenue,
+)
+from app.schemas.venue import VenueCreate
+
+logger = logging.getLogger(__name__)
+
+# Results requested from each provider (Google Places caps a page at 20).
+PROVIDER_PAGE_SIZE = 20
+
+# Largest radius providers accept.
+MAX_RADIUS_M = 50000
+
+
+@dataclass(frozen=True)
+class NearbyQuery:
+    """Parameters of one nearby search."""
+
+    lat: float
+    lng: float
+    radius_m: int = 1000
+    mode: Mode = Mode.WORK
+    open_now: bool = False
+    price_level: int | None = None
+    limit: int = 20
+    user_id: str | None = None
+    min_results: int | None = None  # expand the radius until this many candidates
+
+
+@dataclass
+class Candidates:
+    """Venues retrieved for one search, with what ranking them needs."""
+
+    venues: list[VenueCreate]
+    profiles: dict[str, dict[str, float]] = field(default_factory=dict)
+    venue_ids: dict[str, uuid.UUID] = field(default_factory=dict)  # of profiled venues
+    fallback_mode: Mode | None = None  # venues are the static fallback for this mode
+    preferences: np.ndarray | None = None  # the user's preference vector
+    degraded: bool = False
+    radius_m: int | None = None  # radius searched, if expanded past the query's
+
+
+@dataclass
+class Ranking:
+    """Feature matrix and mode ranking of a ``Candidates`` set."""
+
+    features: np.ndarray  # (candidates x features)
+    distances: np.ndarray  # (candidates,) meters from the search center
+    scores: np.ndarray | None  # (candidates,); None if the deadline cut ranking
+    order: list[int]  # candidate indices, best first
+
+
+async def search_nearby_venues(
+    query: NearbyQuery,
+    providers: list[PlacesProvider],
+    deadline: Deadline,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    preferences: PreferenceStore | None = None,
+) -> NearbyResponse:
+    """Run a nearby search within the request deadline.
+
+    Args:
+        query: Search parameters
+        providers: Providers to query, highest priority first
+        deadline: Request deadline
+        session_factory: Session factory for profile lookups
+        preferences: Preference vectors (default: Redis-backed store)
+
+    Returns:
+        NearbyResponse (``degraded`` if any stage was cut short)
+    """
+    candidates = await retrieve_candidates(query, providers, deadline, session_factory, preferences)
+    ranking = rank_candidates(candidates, query, deadline)
+    ranked = ranked_venues(candidates, ranking)
+    return NearbyResponse(
+        mode=query.mode,
+        count=len(ranked),
+        degraded=candidates.degraded or ranking.scores is None,
+        venues=ranked,
+        radius_m=candidates.radius_m or query.radius_m,
+    )
+
+
+async def retrieve_candidates(
+    query: NearbyQuery,
+    providers: list[PlacesProvider],
+    deadline: Deadline,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    preferences: PreferenceStore | None = None,
+) -> Candidates:
+    """Fetch a search's candidates, their profiles and the user's preferences.
+
+    Args:
+        query: Search parameters
+        providers: Providers to query, highest priority first
+        deadline: Request deadline
+        session_factory: Session factory for profile lookups
+        preferences: Preference vectors (default: Redis-backed store)
+
+    Returns:
+        Candidates (``degraded`` if providers or profiles were cut short)
+    """
+    reserve = settings.deadline_reserve_ms / 1000
+
+    preference_task = None
+    if query.user_id and settings.personalization_enabled:
+        preference_task = asyncio.create_task(
+            _load_preferences(preferences or PreferenceStore(), query.user_id)
+        )
+
+    with bind_deadline(deadline):
+        if query.min_results:
+            candidates = await _search_rings(query, providers, deadline)
+        else:
+            fanout = await search_all(
+                providers,
+                lat=query.lat,
+                lng=query.lng,
+                radius_m=query.radius_m,
+                max_results=PROVIDER_PAGE_SIZE,
+                open_now=query.open_now,
+                price_level=query.price_level,
+            )
+            candidates = Candidates(venues=fanout.venues, degraded=fanout.partial)
+        venues = candidates.venues
+
+        db_timeout = deadline.timeout(cap=settings.db_timeout_seconds, reserve=reserve)
+        if venues and db_timeout > 0:
+            try:
+                with span("profiles.load", candidates=len(venues)):
+                    async with session_factory() as session:
+                        profiled = await asyncio.wait_for(
+                            load_attribute_scores(session, [v.provider_id for v in venues]),
+                            timeout=db_timeout,
+                        )
+                candidates.profiles = {p: scores for p, (_, scores) in profiled.items()}
+                candidates.venue_ids = {p: venue_id for p, (venue_id, _) in profiled.items()}
+            except (TimeoutError, SQLAlchemyError, OSError) as e:
+                logger.warning(f"Profile lookup skipped: {e!r}")
+                candidates.degraded = True
+        elif venues:
+            candidates.degraded = True
+        elif candidates.degraded:
+            candidates = await fallback_candidates(candidates, query, deadline, session_factory)
+
+        if preference_task is not None:
+            candidates.preferences = await preference_task
+    return candidates
+
+
+async def fallback_candidates(
+    candidates: Candidates,
+    query: NearbyQuery,
+    deadline: Deadline,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> Candidates:
+    """Serve the region's best known venues for ``query.mode`` after a provider outage.
+
+    The static scores rank venues per mode, so a fallback serves one mode;
+    searches for other modes need their own.
+
+    Args:
+        candidates: Candidates whose providers all failed
+        query: Search parameters
+        deadline: Request deadline
+        session_factory: Session factory for the static score lookup
+
+    Returns:
+        Candidates with the fallback venues (``fallback_mode`` set), or with no
+        venues if the lookup is skipped or fails
+    """
+    empty = replace(candidates, venues=[], profiles={}, venue_ids={}, fallback_mode=None)
+    reserve = settings.deadline_reserve_ms / 1000
+    db_timeout = deadline.timeout(cap=settings.db_timeout_seconds, reserve=reserve)
+    if db_timeout <= 0:
+        return empty
+    try:
+        with bind_deadline(deadline), span("static_fallback", mode=query.mode.value):
+            async with session_factory() as session:
+                venues, profiles, venue_ids = await asyncio.wait_for(
+                    _static_fallback(session, query, candidates.radius_m or query.radius_m),
+                    timeout=db_timeout,
+                )
+    except (TimeoutError, SQLAlchemyError, OSError, ValueError) as e:
+        logger.warning(f"Static fallback skipped: {e!r}")
+        return empty
+    return replace(
+        empty, venues=venues, profiles=profiles, venue_ids=venue_ids, fallback_mode=query.mode
+    )
+
+
+def rank_candidates(candidates: Candidates, query: NearbyQuery, deadline: Deadline) -> Ranking:
+    """Build the feature matrix and rank the candidates for the query's mode.
+
+    If the deadline has passed, candidates keep provider order, unscored.
+
+    Args:
+        candidates: Retrieved candidates
+        query: Search parameters (center, radius, mode, limit)
+        deadline: Request deadline
+
+    Returns:
+        Ranking of the top ``query.limit`` candidates
+    """
+    venues = candidates.venues
+    with (
+        span("ranking", mode=query.mode.value, candidates=len(venues)),
+        observe_duration(RANKING_DURATION, mode=query.mode.value),
+    ):
+        features, distances = build_feature_matrix(
+            venues,
+            lat=query.lat,
+            lng=query.lng,
+            radius_m=candidates.radius_m or query.radius_m,
+            attribute_scores=[candidates.profiles.get(v.provider_id) for v in venues],
+        )
+        if deadline.expired:
+            return Ranking(features, distances, None, list(range(min(query.limit, len(venues)))))
+        scores = score(features, query.mode)
+        if candidates.preferences is not None:
+            scores = personalize(scores, features, candidates.preferences, query.mode)
+        return Ranking(features, distances, scores, top_k(scores, query.limit).tolist())
+
+
+def ranked_venues(
+    candidates: Candidates, ranking: Ranking, order: list[int] | None = None
+) -> list[RankedVenue]:
+    """Response rows for ranked candidates.
+
+    Args:
+        candidates: Retrieved candidates
+        ranking: Their ranking
+        order: Candidate indices to return (default: ``ranking.order``)
+
+    Returns:
+        RankedVenue per index, in order
+    """
+    scores = ranking.scores
+    return [
+        RankedVenue(
+            **candidates.venues[i].model_dump(),
+            distance_m=round(float(ranking.distances[i]), 1),
+            score=round(float(scores[i]), 4) if scores is not None else None,
+            attribute_scores=candidates.profiles.get(candidates.venues[i].provider_id),
+            venue_id=candidates.venue_ids.get(candidates.venues[i].provider_id),
+        )
+        for i in (ranking.order if order is None else order)
+    ]
+
+
+async def compare_modes(
+    query: NearbyQuery,
+    providers: list[PlacesProvider],
+    deadline: Deadline,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    preferences: PreferenceStore | None = None,
+) -> ModeComparisonResponse:
+    """Rank one candidate set for every mode.
+
+    Candidates, profiles and the feature matrix are fetched and built once;
+    all modes are scored with a single (candidates x modes) matrix product.
+    Venues in several modes' top lists appear once in the response.
+
+    Args:
+        query: Search parameters (``mode`` is ignored; ``limit`` is per mode)
+        providers: Providers to query, highest priority first
+        deadline: Request deadline
+        session_factory: Session factory for profile lookups
+        preferences: Preference vectors (default: Redis-backed store)
+
+    Returns:
+        ModeComparisonResponse with one ranking per mode, in MODES order
+    """
+    candidates = await retrieve_candidates(query, providers, deadline, session_factory, preferences)
+    venues = candidates.venues
+    with (
+        span("ranking", mode="all", candidates=len(venues)),
+        observe_duration(RANKING_DURATION, mode="all"),
+    ):
+        features, distances = build_feature_matrix(
+            venues,
+            lat=query.lat,
+            lng=query.lng,
+            radius_m=candidates.radius_m or query.radius_m,
+            attribute_scores=[candidates.profiles.get(v.provider_id) for v in venues],
+        )
+        scores = None if deadline.expired else score_modes(features)
+        orders: list[list[int]] = []
+        for j, mode in enumerate(MODES):
+            if scores is None:
+                orders.append(list(range(min(query.limit, len(venues)))))
+                continue
+            if candidates.preferences is not None:
+                scores[:, j] = personalize(scores[:, j], features, candidates.preferences, mode)
+            orders.append(top_k(scores[:, j], query.limit).tolist())
+
+    # Shared payloads: each candidate once, in order of first appearance.
+    positions = {i: n for n, i in enumerate(dict.fromkeys(i for order in orders for i in order))}
+    return ModeComparisonResponse(
+        degraded=candidates.degraded or scores is None,
+        venues=[
+            CandidateVenue(
+                **venues[i].model_dump(),
+                distance_m=round(float(distances[i]), 1),
+                attribute_scores=candidates.profiles.get(venues[i].provider_id),
+                venue_id=candidates.venue_ids.get(venues[i].provider_id),
+            )
+            for i in positions
+        ],
+        rankings=[
+            ModeRanking(
+                mode=mode,
+                venues=[positions[i] for i in order],
+                scores=[round(float(scores[i, j]), 4) for i in order]
+                if scores is not None
+                else None,
+            )
+            for j, (mode, order) in enumerate(zip(MODES, orders, strict=True))
+        ],
+    )
+
+
+async def _search_rings(
+    query: NearbyQuery, providers: list[PlacesProvider], deadline: Deadline
+) -> Candidates:
+    """Search growing radii until ``query.min_results`` venues are found."""
+    venues: dict[tuple[str, str], VenueCreate] = {}
+    degraded = False
+    radius = query.radius_m
+    for ring in range(max(settings.adaptive_max_rings, 1)):
+        if ring:
+            radius = min(int(radius * settings.adaptive_radius_growth), MAX_RADIUS_M)
+        fanout = await search_all(
+            providers,
+            lat=query.lat,
+            lng=query.lng,
+            radius_m=radius,
+            max_results=PROVIDER_PAGE_SIZE,
+            open_now=query.open_now,
+            price_level=query.price_level,
+        )
+        degraded = degraded or fanout.partial
+        for venue in fanout.venues:
+            venues.setdefault((venue.provider_name, venue.provider_id), venue)
+        if len(venues) >= query.min_results or radius >= MAX_RADIUS_M or deadline.expired:
+            break
+    return Candidates(venues=list(venues.values()), degraded=degraded, radius_m=radius)
+
+
+async def _static_fallback(
+    session: AsyncSession, query: NearbyQuery, radius_m: int
+) -> tuple[list[VenueCreate], dict[str, dict[str, float]], dict[str, uuid.UUID]]:
+    """Best known venues for the query's mode within its radius, with profiles.
+
+    Returns:
+        (venues, attribute scores and venue IDs of the profiled ones, both
+        keyed by provider ID)
+
+    Raises:
+        ValueError: If the radius covers too many static score cells
+    """
+    cells = region_cells(query.lat, query.lng, radius_m)
+    top = await top_static_candidates(session, query.mode, cells, limit=PROVIDER_PAGE_SIZE)
+    rank = {venue_id: i for i, (venue_id, _) in enumerate(top)}
+    rows = await get_venues_with_profiles(session, venue_ids=list(rank))
+    rows.sort(key=lambda row: rank[row.id])
+    venues, profiles, venue_ids = [], {}, {}
+    for row in rows:
+        if haversine_m(query.lat, query.lng, row.lat, row.lng) > radius_m:
+            continue
+        if query.price_level is not None and row.price_level != query.price_level:
+            continue
+        if query.open_now and not (row.hours or {}).get("open_now"):
+            continue
+        venues.append(
+            VenueCreate.model_validate(row.model_dump(include=set(VenueCreate.model_fields)))
+        )
+        if row.profile is not None:
+            profiles[row.provider_id] = row.profile.attribute_scores
+            venue_ids[row.provider_id] = row.id
+    return venues, profiles, venue_ids
+
+
+async def _load_preferences(store: PreferenceStore, user_id: str) -> np.ndarray | None:
+    try:
+        return await asyncio.wait_for(
+            store.get(user_id), timeout=settings.personalization_timeout_seconds
+        )
+    except (TimeoutError, RedisError, OSError) as e:
+        logger.warning(f"Preference lookup skipped: {e!r}")
+        return None
@@ -0,0 +1,422 @@
+"""Ranked result sets cached for paging.
+
+The first page of a nearby search ranks every candidate and caches the whole
+ranked list under a key of the search tile (geohash of the center at
+``result_cache_precision``), radius, mode, filters, user and time bucket
+(``result_cache_bucket_seconds``). Later pages -- and first pages of other
+searches from the same tile in the same bucket -- are slices of that list:
+no provider calls, profile lookups or scoring.
+
+Cursors are opaque to clients (base64url msgpack). They carry the search
+parameters, the time bucket and the offset, so every page of one scroll reads
+the same list in the same order. If that list has expired, the page is
+re-ranked from scratch. Degraded searches are not cached, so their first page
+has no ``next_cursor``.
+
+Result sets and searches are tagged with ``venue_tag`` of every profiled
+candidate, so profile writes drop the rankings that used the old scores.
+
+Scores and order are those of the tile; distances are recomputed from the
+caller's own center for the rows returned.
+
+Every search also caches its candidates -- response rows and the float32
+feature matrix -- under a ``search_id`` returned with each page, for
+``search_cache_ttl_seconds``. ``rerank`` re-scores that matrix with custom
+weights (ranking sliders) without retrieving anything.
+
+``search_batch`` runs many first-page searches at once; searches from the
+same tile with the same radius and filters share one candidate retrieval.
+"""
+
+import asyncio
+import base64
+import binascii
+import time
+import uuid
+from dataclasses import dataclass, replace
+from typing import Any
+
+import msgpack
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache.invalidation import venue_tag
+from app.cache.tiered import TieredCache
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.deadline import Deadline
+from app.geo import geohash_encode, haversine_m
+from app.models.user_event import Mode
+from app.observability.tracing import span
+from app.providers.base import PlacesProvider
+from app.ranking.features import FEATURES
+from app.ranking.personalization import PreferenceStore
+from app.ranking.scoring import custom_weights, top_k
+from app.schemas.search import NearbyResponse, RankedVenue
+from app.services.nearby import (
+    Candidates,
+    NearbyQuery,
+    fallback_candidates,
+    rank_candidates,
+    ranked_venues,
+    retrieve_candidates,
+)
+
+# Most venues kept per ranked result set.
+MAX_RESULT_SET = 100
+
+CURSOR_VERSION = 2
+
+# Ranked result sets: search ID and candidate order, per result set key.
+result_cache = TieredCache("ranked", ttl_s=settings.result_cache_ttl_seconds)
+
+# Searches: candidate rows and feature matrix, per search ID. They outlive
+# the result sets pointing at them.
+search_cache = TieredCache(
+    "search",
+    ttl_s=max(settings.search_cache_ttl_seconds, settings.result_cache_ttl_seconds),
+)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a page cursor cannot be decoded."""
+
+
+class SearchExpired(LookupError):
+    """Raised when a search ID is unknown or has expired."""
+
+
+class InvalidWeights(ValueError):
+    """Raised when custom ranking weights are rejected."""
+
+
+def time_bucket(now: float | None = None) -> int:
+    """Index of the ``result_cache_bucket_seconds`` window containing ``now``."""
+    now = time.time() if now is None else now
+    return int(now // settings.result_cache_bucket_seconds)
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in a ranked result set: the search, its time bucket, an offset."""
+
+    query: NearbyQuery
+    bucket: int
+    offset: int = 0
+
+    @property
+    def key(self) -> str:
+        """Result set cache key (shared by searches from the same tile)."""
+        q = self.query
+        tile = geohash_encode(q.lat, q.lng, settings.result_cache_precision)
+        price = "" if q.price_level is None else q.price_level
+        return (
+            f"{tile}:{q.radius_m}:{q.mode.value}:{int(q.open_now)}:{price}:{self.bucket}:"
+            f"{q.min_results or ''}:{q.user_id or ''}"
+        )
+
+    def encode(self) -> str:
+        """Opaque, URL-safe form of the cursor."""
+        q = self.query
+        packed = msgpack.packb(
+            [
+                CURSOR_VERSION,
+                q.lat,
+                q.lng,
+                q.radius_m,
+                q.mode.value,
+                q.open_now,
+                q.price_level,
+                q.min_results,
+                self.bucket,
+                self.offset,
+            ]
+        )
+        return base64.urlsafe_b64encode(packed).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, token: str, limit: int = 20, user_id: str | None = None) -> "Cursor":
+        """Parse a cursor from ``encode``.
+
+        Args:
+            token: Encoded cursor
+            limit: Page size of the requested page
+            user_id: User the page is for (not part of the cursor)
+
+        Returns:
+            Cursor
+
+        Raises:
+            InvalidCursor: If the token is malformed or out of range
+        """
+        try:
+            packed = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            version, *fields = msgpack.unpackb(packed)
+            if version != CURSOR_VERSION:
+                raise ValueError(f"unsupported version {version}")
+            lat, lng, radius_m, mode, open_now, price, min_results, bucket, offset = fields
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180 and 0 < radius_m <= 50000):
+                raise ValueError("search out of range")
+            if offset < 0 or (price is not None and not 0 <= price <= 4):
+                raise ValueError("offset or price level out of range")
+            if min_results is not None and not 1 <= min_results <= MAX_RESULT_SET:
+                raise ValueError("min_results out of range")
+            query = NearbyQuery(
+                lat=float(lat),
+                lng=float(lng),
+                radius_m=int(radius_m),
+                mode=Mode(mode),
+                open_now=bool(open_now),
+                price_level=price,
+                limit=limit,
+                user_id=user_id,
+                min_results=min_results,
+            )
+            return cls(query=query, bucket=int(bucket), offset=int(offset))
+        except (ValueError, TypeError, binascii.Error, msgpack.UnpackException) as e:
+            raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+
+async def search_nearby_page(
+    cursor: Cursor,
+    providers: list[PlacesProvider],
+    deadline: Deadline,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    preferences: PreferenceStore | None = None,
+    results: TieredCache | None = None,
+    searches: TieredCache | None = None,
+) -> tuple[NearbyResponse, bool]:
+    """Return one page of a nearby search, from a cached ranking when possible.
+
+    Args:
+        cursor: Search and page position (``Cursor(query, time_bucket())`` for
+            a first page)
+        providers: Providers to query on a miss
+        deadline: Request deadline
+        session_factory: Session factory for profile lookups on a miss
+        preferences: Preference vectors (default: Redis-backed store)
+        results: Result set cache (default: ``result_cache``)
+        searches: Search cache (default: ``search_cache``)
+
+    Returns:
+        (page, True if it was served from a cached ranking)
+    """
+    results = results if results is not None else result_cache
+    searches = searches if searches is not None else search_cache
+
+    with span("results.lookup"):
+        ranked = await _cached_ranking(cursor, results, searches)
+    hit = ranked is not None
+    if not hit:
+        full = replace(cursor.query, limit=MAX_RESULT_SET)
+        candidates = await retrieve_candidates(
+            full, providers, deadline, session_factory, preferences
+        )
+        ranked = await _rank_and_store(cursor, candidates, deadline, results, searches)
+    return _page(cursor, ranked), hit
+
+
+async def search_batch(
+    queries: list[NearbyQuery],
+    providers: list[PlacesProvider],
+    deadline: Deadline,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    preferences: PreferenceStore | None = None,
+    results: TieredCache | None = None,
+    searches: TieredCache | None = None,
+    concurrency: int | None = None,
+) -> list[NearbyResponse]:
+    """Run many nearby searches (first pages), sharing work between them.
+
+    Queries are grouped by search tile (as in the result set key), radius,
+    filters and user. Each group reads its result sets with one cache lookup
+    per query and, for the queries that miss, retrieves candidates once --
+    one provider fan-out and profile lookup -- and ranks them per query. If
+    the providers all fail, the static fallback is looked up once per mode.
+    Groups run concurrently, at most ``concurrency`` at a time, under the one
+    deadline.
+
+    Args:
+        queries: Searches, each with its own mode and page size
+        providers: Providers to query on a miss
+        deadline: Deadline for the whole batch
+        session_factory: Session factory for profile lookups on a miss
+        preferences: Preference vectors (default: Redis-backed store)
+        results: Result set cache (default: ``result_cache``)
+        searches: Search cache (default: ``search_cache``)
+        concurrency: Groups in flight (default: ``batch_concurrency``)
+
+    Returns:
+        One first page per query, in query order
+    """
+    results = results if results is not None else result_cache
+    searches = searches if searches is not None else search_cache
+    semaphore = asyncio.Semaphore(concurrency or settings.batch_concurrency)
+    bucket = time_bucket()
+    cursors = [Cursor(query, bucket) for query in queries]
+    groups: dict[tuple, list[int]] = {}
+    for i, cursor in enumerate(cursors):
+        groups.setdefault(_retrieval_key(cursor.query), []).append(i)
+    pages: list[NearbyResponse | None] = [None] * len(queries)
+
+    async def run(indices: list[int]) -> None:
+        async with semaphore:
+            with span("results.lookup", queries=len(indices)):
+                cached = await asyncio.gather(
+                    *(_cached_ranking(cursors[i], results, searches) for i in indices)
+                )
+            ranked = dict(zip(indices, cached, strict=True))
+            misses = [i for i in indices if ranked[i] is None]
+            if misses:
+                full = replace(cursors[misses[0]].query, limit=MAX_RESULT_SET)
+                candidates = await retrieve_candidates(
+                    full, providers, deadline, session_factory, preferences
+                )
+                # A static fallback is chosen per mode: other modes get their own.
+                by_mode = {candidates.fallback_mode: candidates}
+                by_key: dict[str, _Ranked] = {}
+                for i in misses:
+                    key, mode = cursors[i].key, cursors[i].query.mode
+                    if key not in by_key:
+                        if candidates.fallback_mode is not None and mode not in by_mode:
+                            by_mode[mode] = await fallback_candidates(
+                                candidates, replace(full, mode=mode), deadline, session_factory
+                            )
+                        by_key[key] = await _rank_and_store(
+                            cursors[i], by_mode.get(mode, candidates), deadline, results, searches
+                        )
+                    ranked[i] = by_key[key]
+            for i in indices:
+                pages[i] = _page(cursors[i], ranked[i])
+
+    await asyncio.gather(*(run(indices) for indices in groups.values()))
+    return pages
+
+
+async def rerank(
+    search_id: str,
+    weights: dict[str, float],
+    limit: int = 20,
+    searches: TieredCache | None = None,
+) -> NearbyResponse:
+    """Re-rank a search's candidates with custom feature weights.
+
+    Re-scores the cached candidate feature matrix (one matrix-vector product);
+    nothing is fetched. Scores use only ``weights`` -- no mode weights or
+    personalization.
+
+    Args:
+        search_id: ``search_id`` of an earlier nearby response
+        weights: Feature -> weight (see ``custom_weights``)
+        limit: Maximum number of venues
+        searches: Search cache (default: ``search_cache``)
+
+    Returns:
+        The top ``limit`` candidates under the new weights
+
+    Raises:
+        SearchExpired: If the search is unknown or has expired
+        InvalidWeights: If the weights are invalid
+    """
+    try:
+        vector = custom_weights(weights)
+    except ValueError as e:
+        raise InvalidWeights(str(e)) from e
+    searches = searches if searches is not None else search_cache
+    search = await searches.get(search_id)
+    if search is None:
+        raise SearchExpired(f"Search {search_id} not found or expired")
+
+    rows = search["venues"]
+    features = np.frombuffer(search["features"], dtype=np.float32).reshape(len(rows), len(FEATURES))
+    scores = features @ vector
+    venues = [
+        RankedVenue.model_validate({**rows[i], "score": round(float(scores[i]), 4)})
+        for i in top_k(scores, limit).tolist()
+    ]
+    return NearbyResponse(
+        mode=Mode(search["mode"]), count=len(venues), venues=venues, search_id=search_id
+    )
+
+
+@dataclass
+class _Ranked:
+    search_id: str
+    order: list[int]
+    search: dict[str, Any]
+    degraded: bool = False
+
+
+def _retrieval_key(query: NearbyQuery) -> tuple:
+    tile = geohash_encode(query.lat, query.lng, settings.result_cache_precision)
+    return (
+        tile,
+        query.radius_m,
+        query.min_results,
+        query.open_now,
+        query.price_level,
+        query.user_id,
+    )
+
+
+async def _cached_ranking(
+    cursor: Cursor, results: TieredCache, searches: TieredCache
+) -> _Ranked | None:
+    result_set = await results.get(cursor.key)
+    if result_set is None:
+        return None
+    search = await searches.get(result_set["search_id"])
+    if search is None:
+        return None
+    return _Ranked(result_set["search_id"], result_set["order"], search)
+
+
+async def _rank_and_store(
+    cursor: Cursor,
+    candidates: Candidates,
+    deadline: Deadline,
+    results: TieredCache,
+    searches: TieredCache,
+) -> _Ranked:
+    query = cursor.query
+    full = replace(query, limit=MAX_RESULT_SET)
+    ranking = rank_candidates(candidates, full, deadline)
+    degraded = candidates.degraded or ranking.scores is None
+    search_id = uuid.uuid4().hex
+    search = {
+        "mode": query.mode.value,
+        "radius_m": candidates.radius_m or query.radius_m,
+        "features": ranking.features.astype(np.float32).tobytes(),
+        "venues": [
+            venue.model_dump()
+            for venue in ranked_venues(candidates, ranking, range(len(candidates.venues)))
+        ],
+    }
+    tags = [venue_tag(venue_id) for venue_id in candidates.venue_ids.values()]
+    await searches.set(search_id, search, tags=tags)
+    if not degraded:
+        await results.set(cursor.key, {"search_id": search_id, "order": ranking.order}, tags=tags)
+    return _Ranked(search_id, ranking.order, search, degraded)
+
+
+def _page(cursor: Cursor, ranked: _Ranked) -> NearbyResponse:
+    query = cursor.query
+    rows = ranked.search["venues"]
+    page = ranked.order[cursor.offset : cursor.offset + query.limit]
+    end = cursor.offset + len(page)
+    more = end < len(ranked.order) and not ranked.degraded  # degraded rankings are not cached
+    next_cursor = replace(cursor, offset=end).encode() if more else None
+    return NearbyResponse(
+        mode=query.mode,
+        count=len(page),
+        degraded=ranked.degraded,
+        venues=[_recentered(rows[i], query) for i in page],
+        radius_m=ranked.search.get("radius_m"),
+        search_id=ranked.search_id,
+        next_cursor=next_cursor,
+    )
+
+
+def _recentered(row: dict[str, Any], query: NearbyQuery) -> RankedVenue:
+    distance = haversine_m(query.lat, query.lng, row["lat"], row["lng"])
+    return RankedVenue.model_validate({**row, "distance_m": round(distance, 1)})
@@ -0,0 +1,57 @@
+"""Venue lookups by ID, read through the two-level cache.
+
+Entries are tagged with ``venue_tag(venue_id)``, so venue and profile writes
+(ORM commits and the enrichment upsert) evict them from every process. A
+lookup that read the database just before such a write can still store the
+old row afterwards; ``venue_cache_ttl_seconds`` bounds how long that lasts.
+"""
+
+import uuid
+from collections.abc import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache.invalidation import venue_tag
+from app.cache.tiered import TieredCache
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.venue import get_venues_with_profiles
+from app.schemas.venue import VenueWithProfile
+
+venue_cache = TieredCache("venue", ttl_s=settings.venue_cache_ttl_seconds)
+
+
+async def get_venues(
+    venue_ids: Sequence[uuid.UUID],
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    cache: TieredCache | None = None,
+) -> dict[uuid.UUID, VenueWithProfile]:
+    """Fetch venues with profiles, from the cache where possible.
+
+    Misses are fetched in one query and cached.
+
+    Args:
+        venue_ids: Venue IDs
+        session_factory: Session factory for cache misses
+        cache: Cache namespace (default: ``venue_cache``)
+
+    Returns:
+        Venues by ID (unknown IDs are absent)
+    """
+    cache = cache if cache is not None else venue_cache
+    cached = await cache.get_many(str(venue_id) for venue_id in venue_ids)
+    venues = {
+        uuid.UUID(key): VenueWithProfile.model_validate(value) for key, value in cached.items()
+    }
+    missing = [venue_id for venue_id in dict.fromkeys(venue_ids) if venue_id not in venues]
+    if not missing:
+        return venues
+
+    async with session_factory() as session:
+        loaded = await get_venues_with_profiles(session, venue_ids=missing)
+    await cache.set_many(
+        {str(venue.id): venue.model_dump() for venue in loaded},
+        tags={str(venue.id): [venue_tag(venue.id)] for venue in loaded},
+    )
+    venues.update((venue.id, venue) for venue in loaded)
+    return venues
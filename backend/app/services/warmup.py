@@ -0,0 +1,236 @@
+"""Result cache warm-up from query history, and neighbor-tile prefetch.
+
+``warm_hot_tiles`` finds the busiest (tile, mode, radius) searches in
+``user_events.query_context`` for an hour of the week -- over the last
+``warmup_lookback_days``, grouped on the result cache tile of each search's
+location -- and runs them as one ``search_batch``, so their ranked result
+sets (and the provider results beneath them) are in the shared cache when
+demand arrives. The worker runs it every ``warmup_interval_seconds`` for the
+hour starting within ``warmup_lead_minutes``; each API process also runs it
+once on startup. Result sets live in one time bucket, so a run only serves
+searches until the next bucket (the default interval matches
+``result_cache_bucket_seconds``). One run per bucket claims a Redis key
+(``SET NX``); the others -- every API worker on a deploy, or the beat task
+right after one -- are skipped.
+
+Warm-up searches are anonymous; personalized searches are keyed per user and
+still pay their own first miss.
+
+``prefetch_neighbors`` searches the tiles around a search in the background,
+so a user panning the map, or the next user a block away, hits the cache.
+"""
+
+import logging
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.jsonb import json_float, json_text
+from app.db.redis import get_redis
+from app.db.session import AsyncSessionLocal
+from app.deadline import Deadline
+from app.geo import cell_size_deg, decode_cells, encode_cells, neighbor_cells
+from app.models.user_event import UserEvent
+from app.providers.base import PlacesProvider
+from app.services.nearby import NearbyQuery
+from app.services.results import search_batch, time_bucket
+
+logger = logging.getLogger(__name__)
+
+# Key claimed by the one warm-up run of each time bucket.
+WARMUP_LOCK_PREFIX = "warmup:lock:"
+
+# Radius assumed for history rows that do not record one.
+DEFAULT_RADIUS_M = 1000
+
+# Center tiles with a neighbor prefetch in flight (one per tile per process).
+_prefetching: set[int] = set()
+
+
+@dataclass
+class WarmupResult:
+    """Summary of a single warm-up run."""
+
+    hour_of_week: int = 0
+    queries: int = 0
+    degraded: int = 0
+    skipped: bool = False  # another process warmed this time bucket
+
+
+def hour_of_week(at: datetime) -> int:
+    """Hour of the week of a UTC time (0 = Monday 00:00-01:00)."""
+    return at.weekday() * 24 + at.hour
+
+
+async def find_hot_queries(
+    session: AsyncSession,
+    hour: int,
+    since: datetime,
+    limit: int,
+) -> list[NearbyQuery]:
+    """Find the most frequent searches in one hour of the week.
+
+    Events are grouped by result cache tile (the ``result_cache_precision``
+    geohash cell of the ``query_context`` location), mode and radius and
+    weighted by ``sample_weight``, so sampled impressions still count fully;
+    each group becomes one query centered on its tile, whose result set is
+    the one later searches from the tile read. Events without a location or
+    mode are ignored.
+
+    Args:
+        session: Database session
+        hour: Hour of the week (see ``hour_of_week``), in UTC
+        since: Only count events after this time
+        limit: Maximum number of queries
+
+    Returns:
+        Queries, most frequent first
+    """
+    precision = settings.result_cache_precision
+    lat_size, lng_size = cell_size_deg(precision)
+    context = UserEvent.query_context
+    lat, lng = json_float(context, "lat"), json_float(context, "lng")
+    # Row and column of the geohash cell: the tile, without geohash support in SQL.
+    tile = (func.floor((lat + 90) / lat_size), func.floor((lng + 180) / lng_size))
+    radius = func.coalesce(json_float(context, "radius"), DEFAULT_RADIUS_M)
+    created = func.timezone("UTC", UserEvent.created_at)
+    event_hour = (func.extract("isodow", created) - 1) * 24 + func.extract("hour", created)
+    events = func.sum(UserEvent.sample_weight).label("events")
+    stmt = (
+        select(
+            func.avg(lat).label("lat"),
+            func.avg(lng).label("lng"),
+            radius.label("radius"),
+            UserEvent.mode,
+            events,
+        )
+        .where(
+            json_text(context, "lat").is_not(None),
+            json_text(context, "lng").is_not(None),
+            UserEvent.mode.is_not(None),
+            UserEvent.created_at >= since,
+            event_hour == hour,
+        )
+        .group_by(*tile, UserEvent.mode, radius)
+        .order_by(events.desc())
+        .limit(limit)
+    )
+    rows = list(await session.execute(stmt))
+    if not rows:
+        return []
+    # A group's mean location lies in its tile; search from the tile's center.
+    cells = encode_cells([row.lat for row in rows], [row.lng for row in rows], precision)
+    lats, lngs = decode_cells(cells, precision)
+    return [
+        NearbyQuery(
+            lat=center_lat,
+            lng=center_lng,
+            radius_m=min(max(int(row.radius), 1), 50000),
+            mode=row.mode,
+        )
+        for row, center_lat, center_lng in zip(rows, lats.tolist(), lngs.tolist(), strict=True)
+    ]
+
+
+async def warm_hot_tiles(
+    providers: list[PlacesProvider],
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    now: datetime | None = None,
+    max_tiles: int | None = None,
+    redis: Redis | None = None,
+) -> WarmupResult:
+    """Pre-populate the result cache with the coming hour's busiest searches.
+
+    Skipped if another process already warmed the current time bucket.
+
+    Args:
+        providers: Providers to search with
+        session_factory: Session factory for the history scan and profiles
+        now: Reference time (default: current UTC time)
+        max_tiles: Cap on searches per run (default: ``warmup_max_tiles``)
+        redis: Async Redis client for the run lock (default: the shared app client)
+
+    Returns:
+        WarmupResult summary
+    """
+    now = now or datetime.now(UTC)
+    hour = hour_of_week(now + timedelta(minutes=settings.warmup_lead_minutes))
+    if not await _claim_bucket(redis or get_redis(), time_bucket(now.timestamp())):
+        logger.info(f"Cache warm-up: hour_of_week={hour} skipped, bucket already warmed")
+        return WarmupResult(hour_of_week=hour, skipped=True)
+    async with session_factory() as session:
+        queries = await find_hot_queries(
+            session,
+            hour=hour,
+            since=now - timedelta(days=settings.warmup_lookback_days),
+            limit=max_tiles or settings.warmup_max_tiles,
+        )
+
+    result = WarmupResult(hour_of_week=hour, queries=len(queries))
+    if queries:
+        deadline = Deadline(settings.request_deadline_max_ms / 1000)
+        pages = await search_batch(queries, providers, deadline, session_factory)
+        result.degraded = sum(page.degraded for page in pages)
+    logger.info(
+        f"Cache warm-up: hour_of_week={result.hour_of_week} queries={result.queries} "
+        f"degraded={result.degraded}"
+    )
+    return result
+
+
+async def _claim_bucket(redis: Redis, bucket: int) -> bool:
+    """Claim the warm-up of one time bucket; False if another process has."""
+    try:
+        claimed = await redis.set(
+            f"{WARMUP_LOCK_PREFIX}{bucket}", "1", nx=True, ex=settings.result_cache_bucket_seconds
+        )
+    except (RedisError, OSError) as e:
+        logger.warning(f"Cache warm-up skipped: lock unavailable: {e!r}")
+        return False
+    return bool(claimed)
+
+
+async def prefetch_neighbors(
+    query: NearbyQuery,
+    providers: list[PlacesProvider],
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> int:
+    """Search the result cache tiles around a search's tile.
+
+    Meant to run after the response is sent. Tiles already cached cost one
+    lookup each; a tile with a prefetch already in flight is skipped.
+
+    Args:
+        query: The search just served
+        providers: Providers to search with
+        session_factory: Session factory for profile lookups
+
+    Returns:
+        Number of neighboring tiles searched
+    """
+    precision = settings.result_cache_precision
+    center = int(encode_cells([query.lat], [query.lng], precision)[0])
+    if center in _prefetching:
+        return 0
+    _prefetching.add(center)
+    try:
+        cells = np.unique(neighbor_cells([center], precision))
+        lats, lngs = decode_cells(cells[cells != center], precision)
+        neighbors = [
+            replace(query, lat=float(lat), lng=float(lng))
+            for lat, lng in zip(lats.tolist(), lngs.tolist(), strict=True)
+        ]
+        deadline = Deadline(settings.request_deadline_max_ms / 1000)
+        await search_batch(neighbors, providers, deadline, session_factory)
+        return len(neighbors)
+    except Exception as e:
+        logger.warning(f"Neighbor prefetch failed: {e}")
+        return 0
+    finally:
+        _prefetching.discard(center)
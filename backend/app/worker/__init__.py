@@ -0,0 +1,5 @@
+"""Background worker package (Celery app and tasks)."""
+
+from app.worker.celery_app import celery_app
+
+__all__ = ["celery_app"]
@@ -0,0 +1,70 @@
+"""Celery application for background jobs.
+
+Run workers (as many as needed) with::
+
+    celery -A app.worker.celery_app worker -l INFO \
+        -Q celery,enrich.user_visible,enrich.normal,enrich.refresh
+
+and the schedule (exactly one) with ``celery -A app.worker.celery_app beat -l INFO``.
+Workers poll their queues in the listed order: periodic tasks first, then the
+enrichment lanes (``Priority.queue``) from highest to lowest priority.
+"""
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from celery import Celery
+
+from app.config import settings
+
+T = TypeVar("T")
+
+celery_app = Celery(
+    "modemap",
+    broker=settings.redis_url,
+    backend=settings.redis_url,
+    include=["app.worker.tasks"],
+)
+
+celery_app.conf.update(
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    timezone="UTC",
+    # Poll queues in -Q order instead of round-robin, so lanes keep their priority.
+    broker_transport_options={"queue_order_strategy": "priority"},
+    beat_schedule={
+        "refresh-expiring-profiles": {
+            "task": "modemap.refresh_expiring_profiles",
+            "schedule": float(settings.profile_refresh_interval_seconds),
+        },
+        "drain-enrichment-queue": {
+            "task": "modemap.drain_enrichment_queue",
+            "schedule": float(settings.enrichment_drain_interval_seconds),
+        },
+        "warm-result-cache": {
+            "task": "modemap.warm_result_cache",
+            "schedule": float(settings.warmup_interval_seconds),
+        },
+    },
+)
+
+# One event loop per worker process, so pooled async DB connections stay bound
+# to the loop they were created on across task invocations.
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on the worker's persistent event loop.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
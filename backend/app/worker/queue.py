@@ -0,0 +1,125 @@
+"""Deduplicated, prioritized enrichment job queue backed by a Redis sorted set.
+
+Each pending job is a single member (the venue ID) of one sorted set, so a
+venue can only be queued once. The score encodes ``priority * LANE_WIDTH +
+enqueue time``: popping the lowest scores drains higher-priority lanes first and
+is FIFO within a lane. Enqueues use ``ZADD LT``, so re-enqueuing a pending venue
+at a higher priority promotes it while a same-or-lower priority enqueue keeps
+its original position. ``ZPOPMIN`` is atomic, so any number of worker processes
+can drain the queue without handing out the same job twice.
+
+Popped batches keep their lane: each lane's batches go to its own Celery queue
+(``Priority.queue``), which workers consume in priority order, so lane
+priority holds after a batch leaves the sorted set too.
+"""
+
+import enum
+import time
+import uuid
+from collections.abc import Iterable
+
+from redis.asyncio import Redis
+
+from app.db.redis import get_redis
+
+
+class Priority(int, enum.Enum):
+    """Enrichment priority lanes (lower drains first)."""
+
+    USER_VISIBLE = 0  # venues currently shown to users
+    NORMAL = 1
+    REFRESH = 2  # background refresh of expiring profiles
+
+    @property
+    def queue(self) -> str:
+        """Celery queue this lane's enrichment tasks are routed to."""
+        return f"enrich.{self.name.lower()}"
+
+
+# Wider than any epoch-seconds timestamp, so lanes never overlap.
+LANE_WIDTH = 1e10
+
+
+class EnrichmentQueue:
+    """Redis-backed queue of venue IDs awaiting enrichment."""
+
+    KEY = "enrich:queue"
+
+    def __init__(self, redis: Redis | None = None):
+        """Initialize the queue.
+
+        Args:
+            redis: Async Redis client. If None, uses the shared app client
+        """
+        self.redis = redis or get_redis()
+
+    async def enqueue(
+        self, venue_ids: Iterable[uuid.UUID], priority: Priority = Priority.NORMAL
+    ) -> int:
+        """Add venues to the queue, deduplicating by venue ID.
+
+        Args:
+            venue_ids: Venues to enrich
+            priority: Lane to enqueue into
+
+        Returns:
+            Number of venues that were newly added or promoted
+        """
+        base = priority * LANE_WIDTH + time.time()
+        mapping = {str(venue_id): base for venue_id in venue_ids}
+        if not mapping:
+            return 0
+        return await self.redis.zadd(self.KEY, mapping, lt=True, ch=True)
+
+    async def pop_batch(self, size: int) -> list[uuid.UUID]:
+        """Atomically remove and return up to ``size`` highest-priority venues.
+
+        Args:
+            size: Maximum batch size
+
+        Returns:
+            Venue IDs, highest priority (then oldest) first
+        """
+        return [venue_id for venue_id, _ in await self._pop(size)]
+
+    async def pop_batches(
+        self, batch_size: int, max_batches: int
+    ) -> list[tuple[Priority, list[uuid.UUID]]]:
+        """Pop up to ``max_batches`` batches of venues, stopping when the queue runs dry.
+
+        A batch never mixes lanes: venues popped across a lane boundary are
+        split into one batch per lane.
+
+        Args:
+            batch_size: Venues per batch
+            max_batches: Maximum number of pops of ``batch_size`` venues
+
+        Returns:
+            (lane, venue IDs) per non-empty batch, highest priority first
+        """
+        batches: list[tuple[Priority, list[uuid.UUID]]] = []
+        for _ in range(max_batches):
+            popped = await self._pop(batch_size)
+            for venue_id, priority in popped:
+                if batches and batches[-1][0] == priority and len(batches[-1][1]) < batch_size:
+                    batches[-1][1].append(venue_id)
+                else:
+                    batches.append((priority, [venue_id]))
+            if len(popped) < batch_size:
+                break
+        return batches
+
+    async def depth(self) -> int:
+        """Return the number of pending venues across all lanes."""
+        return await self.redis.zcard(self.KEY)
+
+    async def _pop(self, size: int) -> list[tuple[uuid.UUID, Priority]]:
+        popped = await self.redis.zpopmin(self.KEY, size)
+        return [
+            (uuid.UUID(_decode(member)), Priority(int(score // LANE_WIDTH)))
+            for member, score in popped
+        ]
+
+
+def _decode(member: bytes | str) -> str:
+    return member.decode() if isinstance(member, bytes) else member
@@ -0,0 +1,251 @@
+"""Scheduled refresh of expiring venue profiles.
+
+Each run scans ``venue_profiles`` for rows whose ``expires_at`` falls within the
+refresh horizon (an indexed range scan), orders them by recent impression volume
+so the venues users actually see are refreshed first, and re-profiles them in
+bounded concurrent batches (by default, handing them to the enrichment queue's
+refresh lane). New expiries are jittered so profiles created together do not
+all expire together. A venue whose refresh is skipped or fails has its expiry
+pushed back with exponential backoff (``defer_refresh``), so it does not stay
+at the head of the scan and crowd out venues that can be refreshed.
+
+Searches also queue the venues they show whose profile is missing or expiring
+(``enqueue_visible_venues``), ahead of the scheduled refreshes.
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from redis.exceptions import RedisError
+from sqlalchemy import DateTime, Interval, func, literal, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.user_event import EventType, UserEvent
+from app.models.venue import VenueProfile
+from app.providers.google import GooglePlacesClient
+from app.repositories.venue import find_unprofiled_venues
+from app.worker.queue import EnrichmentQueue, Priority
+
+logger = logging.getLogger(__name__)
+
+# Re-profiles one batch of venues using the given session.
+Reprofiler = Callable[[AsyncSession, list[uuid.UUID]], Awaitable[None]]
+
+
+@dataclass
+class RefreshResult:
+    """Summary of a single refresh run."""
+
+    scanned: int = 0
+    refreshed: int = 0
+    failed: int = 0
+
+
+def next_expiry(
+    now: datetime,
+    ttl: timedelta | None = None,
+    jitter: float | None = None,
+    rng: random.Random | None = None,
+) -> datetime:
+    """Compute a jittered expiry time for a freshly profiled venue.
+
+    Args:
+        now: Profiling time
+        ttl: Nominal profile lifetime (default: settings.profile_ttl_hours)
+        jitter: Fraction of ``ttl`` to spread by in either direction
+            (default: settings.profile_ttl_jitter)
+        rng: Optional random source (for deterministic tests)
+
+    Returns:
+        Expiry timestamp in ``[now + ttl * (1 - jitter), now + ttl * (1 + jitter)]``
+    """
+    ttl = ttl if ttl is not None else timedelta(hours=settings.profile_ttl_hours)
+    jitter = settings.profile_ttl_jitter if jitter is None else jitter
+    factor = (rng or random).uniform(1 - jitter, 1 + jitter)
+    return now + ttl * factor
+
+
+async def defer_refresh(
+    session: AsyncSession, venue_ids: list[uuid.UUID], now: datetime | None = None
+) -> None:
+    """Push back the expiry of profiles whose refresh was skipped or failed.
+
+    The n-th failure in a row retries ``profile_retry_minutes * 2 ** (n - 1)``
+    later, capped at ``profile_ttl_hours``. A successful profile write resets
+    the count. The caller commits.
+
+    Args:
+        session: Database session
+        venue_ids: Venues that were not re-profiled
+        now: Reference time (default: current UTC time)
+    """
+    if not venue_ids:
+        return
+    now = now or datetime.now(UTC)
+    retry = timedelta(minutes=settings.profile_retry_minutes)
+    max_factor = settings.profile_ttl_hours * 60 / settings.profile_retry_minutes
+    backoff = func.least(func.power(2, VenueProfile.refresh_failures), max_factor)
+    await session.execute(
+        update(VenueProfile)
+        .where(VenueProfile.venue_id.in_(venue_ids))
+        .values(
+            refresh_failures=VenueProfile.refresh_failures + 1,
+            expires_at=literal(now, DateTime(timezone=True)) + literal(retry, Interval()) * backoff,
+        )
+    )
+
+
+async def enqueue_visible_venues(
+    provider_ids: list[str],
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    now: datetime | None = None,
+) -> int:
+    """Queue shown venues with a missing or expiring profile in the user-visible lane.
+
+    Meant to run after a search response is sent: failures are logged, not
+    raised.
+
+    Args:
+        provider_ids: Provider IDs of the venues shown
+        session_factory: Session factory
+        now: Reference time (default: current UTC time)
+
+    Returns:
+        Number of venues newly queued or promoted
+    """
+    now = now or datetime.now(UTC)
+    horizon = timedelta(minutes=settings.profile_refresh_horizon_minutes)
+    try:
+        async with session_factory() as session:
+            venue_ids = await find_unprofiled_venues(
+                session, provider_ids, GooglePlacesClient.name, expiring_before=now + horizon
+            )
+        return await EnrichmentQueue().enqueue(venue_ids, Priority.USER_VISIBLE)
+    except (SQLAlchemyError, RedisError, OSError) as e:
+        logger.warning(f"Could not queue {len(provider_ids)} shown venues for enrichment: {e!r}")
+        return 0
+
+
+async def find_expiring_profiles(
+    session: AsyncSession,
+    now: datetime,
+    horizon: timedelta,
+    limit: int,
+    impression_window: timedelta,
+) -> list[uuid.UUID]:
+    """Find venues whose profiles expire soon, most-viewed first.
+
+    The expiring set is bounded through the ``expires_at`` index before any
+    impression counting, so the cost of a scan does not grow with the size of
+    ``user_events``.
+
+    Args:
+        session: Database session
+        now: Reference time
+        horizon: Include profiles expiring before ``now + horizon``
+        limit: Maximum number of venues to return
+        impression_window: How far back to count impressions
+
+    Returns:
+        Venue IDs ordered by impression volume (desc), then expiry (asc)
+    """
+    expiring = (
+        select(VenueProfile.venue_id, VenueProfile.expires_at)
+        .where(VenueProfile.expires_at <= now + horizon)
+        .order_by(VenueProfile.expires_at)
+        .limit(limit * 4)
+        .cte("expiring")
+    )
+    impressions = (
+        select(func.coalesce(func.sum(UserEvent.sample_weight), 0))
+        .where(
+            UserEvent.venue_id == expiring.c.venue_id,
+            UserEvent.event_type == EventType.IMPRESSION,
+            UserEvent.created_at >= now - impression_window,
+        )
+        .scalar_subquery()
+        .label("impressions")
+    )
+    stmt = (
+        select(expiring.c.venue_id, impressions)
+        .order_by(impressions.desc(), expiring.c.expires_at)
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    return [row.venue_id for row in result]
+
+
+async def enqueue_for_refresh(session: AsyncSession, venue_ids: list[uuid.UUID]) -> None:
+    """Hand a batch of expiring venues to the enrichment queue's refresh lane.
+
+    Args:
+        session: Database session (unused; enqueueing only touches Redis)
+        venue_ids: Venues to re-profile
+    """
+    await EnrichmentQueue().enqueue(venue_ids, Priority.REFRESH)
+
+
+async def refresh_expiring_profiles(
+    reprofile: Reprofiler = enqueue_for_refresh,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    now: datetime | None = None,
+    max_venues: int | None = None,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+) -> RefreshResult:
+    """Scan for expiring profiles and re-profile them in bounded batches.
+
+    Args:
+        reprofile: Coroutine that re-profiles one batch of venues
+        session_factory: Session factory (one session per batch)
+        now: Reference time (default: current UTC time)
+        max_venues: Cap on venues per run (default: settings)
+        batch_size: Venues per batch (default: settings)
+        concurrency: Maximum batches in flight (default: settings)
+
+    Returns:
+        RefreshResult summary
+    """
+    now = now or datetime.now(UTC)
+    max_venues = max_venues or settings.profile_refresh_max_venues
+    batch_size = batch_size or settings.profile_refresh_batch_size
+    concurrency = concurrency or settings.profile_refresh_concurrency
+
+    async with session_factory() as session:
+        venue_ids = await find_expiring_profiles(
+            session,
+            now=now,
+            horizon=timedelta(minutes=settings.profile_refresh_horizon_minutes),
+            limit=max_venues,
+            impression_window=timedelta(days=settings.impression_window_days),
+        )
+
+    result = RefreshResult(scanned=len(venue_ids))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_batch(batch: list[uuid.UUID]) -> None:
+        async with semaphore:
+            try:
+                async with session_factory() as session:
+                    await reprofile(session, batch)
+                result.refreshed += len(batch)
+            except Exception as e:
+                logger.error(f"Profile refresh batch of {len(batch)} venues failed: {e}")
+                result.failed += len(batch)
+
+    batches = [venue_ids[i : i + batch_size] for i in range(0, len(venue_ids), batch_size)]
+    await asyncio.gather(*(run_batch(batch) for batch in batches))
+
+    logger.info(
+        f"Profile refresh: scanned={result.scanned} refreshed={result.refreshed} "
+        f"failed={result.failed}"
+    )
+    return result
@@ -0,0 +1,65 @@
+"""Celery task definitions."""
+
+import uuid
+from dataclasses import asdict
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.enrichment.pipeline import enrich_venues
+from app.providers.registry import get_providers
+from app.services.warmup import warm_hot_tiles
+from app.worker.celery_app import celery_app, run_async
+from app.worker.queue import EnrichmentQueue
+from app.worker.refresh import refresh_expiring_profiles
+
+
+@celery_app.task(name="modemap.refresh_expiring_profiles")
+def refresh_expiring_profiles_task() -> dict[str, int]:
+    """Periodic task: queue venues whose profiles are about to expire."""
+    return asdict(run_async(refresh_expiring_profiles()))
+
+
+@celery_app.task(name="modemap.warm_result_cache")
+def warm_result_cache_task() -> dict[str, int]:
+    """Periodic task: cache the coming hour's busiest searches."""
+    return asdict(run_async(warm_hot_tiles(get_providers())))
+
+
+@celery_app.task(name="modemap.drain_enrichment_queue")
+def drain_enrichment_queue_task() -> int:
+    """Periodic task: pop queued venues and fan them out as batch tasks.
+
+    Each batch is sent to its lane's Celery queue.
+
+    Returns:
+        Number of venues dispatched
+    """
+    batches = run_async(
+        EnrichmentQueue().pop_batches(
+            batch_size=settings.enrichment_batch_size,
+            max_batches=settings.enrichment_max_batches_per_drain,
+        )
+    )
+    for priority, batch in batches:
+        enrich_venues_task.apply_async(
+            args=([str(venue_id) for venue_id in batch],), queue=priority.queue
+        )
+    return sum(len(batch) for _, batch in batches)
+
+
+@celery_app.task(name="modemap.enrich_venues")
+def enrich_venues_task(venue_ids: list[str]) -> int:
+    """Enrich a batch of venues (reviews ingestion + attribute scoring).
+
+    Args:
+        venue_ids: Venue IDs as strings (JSON-serializable task args)
+
+    Returns:
+        Number of profiles written
+    """
+    return run_async(_enrich_batch([uuid.UUID(venue_id) for venue_id in venue_ids]))
+
+
+async def _enrich_batch(venue_ids: list[uuid.UUID]) -> int:
+    async with AsyncSessionLocal() as session:
+        return await enrich_venues(session, venue_ids)
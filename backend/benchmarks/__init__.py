@@ -0,0 +1,7 @@
+"""Offline benchmarks: fake Places server, end-to-end and micro-benchmarks.
+
+Run from ``backend/``::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.compare base.json bench.json
+"""
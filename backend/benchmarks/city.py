@@ -0,0 +1,158 @@
+"""Synthetic city used to generate fake Google Places responses."""
+
+import math
+
+import numpy as np
+
+from app.geo import EARTH_RADIUS_M, METERS_PER_DEGREE_LAT
+
+_TYPES = (
+    ["cafe", "food", "point_of_interest", "establishment"],
+    ["restaurant", "food", "point_of_interest", "establishment"],
+    ["bar", "point_of_interest", "establishment"],
+    ["bakery", "cafe", "food", "store"],
+    ["meal_takeaway", "restaurant", "food"],
+)
+_PRICE_LEVELS = (
+    "PRICE_LEVEL_INEXPENSIVE",
+    "PRICE_LEVEL_MODERATE",
+    "PRICE_LEVEL_EXPENSIVE",
+    "PRICE_LEVEL_VERY_EXPENSIVE",
+)
+_PRICE_INDEX = {name: i + 1 for i, name in enumerate(_PRICE_LEVELS)}
+_WORDS = (
+    "Blue", "Golden", "Little", "Corner", "Mission", "Harbor", "Oak", "Salt",
+    "Copper", "Lantern", "Fog", "Hill", "Garden", "Union", "Pier", "Bay",
+)  # fmt: skip
+_KINDS = ("Coffee", "Kitchen", "Cafe", "Tavern", "Bakery", "Noodle Bar", "Bistro", "Taqueria")
+_REVIEWS = (
+    "Quiet spot with plenty of outlets, great for working on a laptop.",
+    "Candlelit and cozy, perfect for a date night.",
+    "Loud and crowded on weekends but the food is fast.",
+    "Reliable wifi and long tables, lots of people studying.",
+    "Romantic patio, intimate lighting and a great wine list.",
+    "Grabbed a quick bite, friendly staff.",
+)
+_WEEKDAY_TEXT = [
+    f"{day}: 7:00 AM – 10:00 PM"
+    for day in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+]
+
+
+class SyntheticCity:
+    """Deterministic set of places around a center with realistic clustering.
+
+    Most places sit in gaussian "neighborhoods" (dense downtown, sparser
+    outskirts); the rest are spread uniformly over the city disc, so searches
+    see anything from dozens to thousands of candidates depending on where
+    they land.
+    """
+
+    def __init__(
+        self,
+        center_lat: float = 37.7749,
+        center_lng: float = -122.4194,
+        radius_m: float = 8000.0,
+        n_places: int = 20_000,
+        n_neighborhoods: int = 12,
+        seed: int = 0,
+    ):
+        """Generate the city.
+
+        Args:
+            center_lat: City center latitude
+            center_lng: City center longitude
+            radius_m: City radius in meters
+            n_places: Number of places
+            n_neighborhoods: Number of dense clusters
+            seed: Random seed
+        """
+        self.center_lat = center_lat
+        self.center_lng = center_lng
+        self.radius_m = radius_m
+        self.rng = np.random.default_rng(seed)
+        rng = self.rng
+
+        n_clustered = int(n_places * 0.8)
+        hub_r = radius_m * np.sqrt(rng.random(n_neighborhoods)) * 0.8
+        hub_theta = rng.random(n_neighborhoods) * 2 * math.pi
+        # Neighborhoods near the center are bigger and denser.
+        hub_weight = np.exp(-hub_r / (radius_m / 3))
+        hub = rng.choice(n_neighborhoods, size=n_clustered, p=hub_weight / hub_weight.sum())
+        spread = radius_m * 0.06
+        dx = hub_r[hub] * np.cos(hub_theta[hub]) + rng.normal(0, spread, n_clustered)
+        dy = hub_r[hub] * np.sin(hub_theta[hub]) + rng.normal(0, spread, n_clustered)
+
+        n_uniform = n_places - n_clustered
+        r = radius_m * np.sqrt(rng.random(n_uniform))
+        theta = rng.random(n_uniform) * 2 * math.pi
+        dx = np.concatenate([dx, r * np.cos(theta)])
+        dy = np.concatenate([dy, r * np.sin(theta)])
+
+        meters_per_degree_lng = METERS_PER_DEGREE_LAT * math.cos(math.radians(center_lat))
+        self.lat = center_lat + dy / METERS_PER_DEGREE_LAT
+        self.lng = center_lng + dx / meters_per_degree_lng
+        self.rating = np.round(rng.uniform(3.0, 5.0, n_places), 1)
+        self.price = rng.integers(0, len(_PRICE_LEVELS), n_places)
+        self.open_now = rng.random(n_places) < 0.7
+        self.kind = rng.integers(0, len(_TYPES), n_places)
+        self.popularity = self.rating * rng.lognormal(0, 1, n_places)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def random_point(self, rng: np.random.Generator | None = None) -> tuple[float, float]:
+        """Return a search location weighted like the places (busy areas more often)."""
+        i = int((rng or self.rng).integers(len(self)))
+        return float(self.lat[i]), float(self.lng[i])
+
+    def search(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        max_results: int = 20,
+        open_now: bool = False,
+        price_level: str | None = None,
+    ) -> list[dict]:
+        """Places within ``radius_m``, most popular first, in Places API format."""
+        phi1, phi2 = math.radians(lat), np.radians(self.lat)
+        a = (
+            np.sin((phi2 - phi1) / 2) ** 2
+            + math.cos(phi1) * np.cos(phi2) * np.sin(np.radians(self.lng - lng) / 2) ** 2
+        )
+        mask = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a)) <= radius_m
+        if open_now:
+            mask &= self.open_now
+        if price_level is not None:
+            mask &= self.price == _PRICE_INDEX.get(price_level, -1) - 1
+        candidates = np.flatnonzero(mask)
+        order = candidates[np.argsort(-self.popularity[candidates], kind="stable")]
+        return [self.place(int(i)) for i in order[:max_results]]
+
+    def place(self, i: int) -> dict:
+        """Place ``i`` as a Places API (New) JSON object."""
+        name = (
+            f"{_WORDS[i % len(_WORDS)]} {_WORDS[(i // 7) % len(_WORDS)]} {_KINDS[i % len(_KINDS)]}"
+        )
+        return {
+            "id": f"fake-{i}",
+            "displayName": {"text": name, "languageCode": "en"},
+            "location": {"latitude": float(self.lat[i]), "longitude": float(self.lng[i])},
+            "rating": float(self.rating[i]),
+            "priceLevel": _PRICE_LEVELS[int(self.price[i])],
+            "types": _TYPES[int(self.kind[i])],
+            "formattedAddress": f"{100 + i % 900} {_WORDS[i % len(_WORDS)]} St, San Francisco, CA",
+            "currentOpeningHours": {
+                "openNow": bool(self.open_now[i]),
+                "weekdayText": _WEEKDAY_TEXT,
+                "periods": [],
+            },
+        }
+
+    def reviews(self, i: int, count: int = 5) -> list[dict]:
+        """Reviews for place ``i`` in Place Details format."""
+        return [
+            {"text": {"text": _REVIEWS[(i + k) % len(_REVIEWS)], "languageCode": "en"}}
+            for k in range(count)
+        ]
@@ -0,0 +1,76 @@
+"""Compare two benchmark result files.
+
+    python -m benchmarks.compare base.json head.json --threshold 10
+
+Prints every shared metric with its relative change and exits non-zero if a
+latency or throughput metric regressed by more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.results import HIGHER_IS_BETTER
+
+# Metrics checked against the threshold (others are informational).
+GATED_SUFFIXES = ("_ms", "_us", *HIGHER_IS_BETTER)
+
+
+def compare(base: dict, head: dict) -> list[dict]:
+    """Diff the ``results`` sections of two result documents.
+
+    Returns:
+        One row per shared metric with ``change_pct`` (positive = worse for
+        gated metrics)
+    """
+    rows = []
+    for bench in sorted(base["results"].keys() & head["results"].keys()):
+        old_metrics, new_metrics = base["results"][bench], head["results"][bench]
+        for metric in sorted(old_metrics.keys() & new_metrics.keys()):
+            old, new = old_metrics[metric], new_metrics[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+            rows.append(
+                {
+                    "benchmark": bench,
+                    "metric": metric,
+                    "base": old,
+                    "head": new,
+                    "change_pct": round(change, 1),
+                    "regression_pct": round(worse, 1) if metric.endswith(GATED_SUFFIXES) else None,
+                }
+            )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in %%")
+    parser.add_argument("--json", action="store_true", help="print rows as JSON")
+    args = parser.parse_args(argv)
+
+    base = json.loads(Path(args.base).read_text())
+    head = json.loads(Path(args.head).read_text())
+    rows = compare(base, head)
+    regressions = [
+        r for r in rows if r["regression_pct"] is not None and r["regression_pct"] > args.threshold
+    ]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"base {base['meta'].get('commit')}  ->  head {head['meta'].get('commit')}")
+        for r in rows:
+            flag = "  REGRESSION" if r in regressions else ""
+            print(
+                f"{r['benchmark']:<38} {r['metric']:<14} "
+                f"{r['base']:>12} {r['head']:>12} {r['change_pct']:>+8.1f}%{flag}"
+            )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""End-to-end benchmark of ``GET /venues/nearby`` against the fake Places server."""
+
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.models.user_event import Mode
+from benchmarks.city import SyntheticCity
+from benchmarks.results import latency_summary
+
+RADII_M = (500, 1000, 1500, 2000, 5000)
+
+
+def random_query(city: SyntheticCity, rng: random.Random) -> dict:
+    """Nearby-search query parameters at a realistic spot in ``city``."""
+    lat, lng = city.random_point()
+    params = {
+        "lat": round(lat, 6),
+        "lng": round(lng, 6),
+        "radius": rng.choice(RADII_M),
+        "mode": rng.choice(list(Mode)).value,
+        "limit": 20,
+    }
+    if rng.random() < 0.2:
+        params["open_now"] = "true"
+    if rng.random() < 0.1:
+        params["price_level"] = rng.randint(1, 4)
+    return params
+
+
+async def run_e2e(
+    client: httpx.AsyncClient,
+    city: SyntheticCity,
+    requests: int = 500,
+    concurrency: int = 16,
+    warmup: int = 20,
+    seed: int = 0,
+) -> dict[str, float]:
+    """Drive the nearby endpoint with ``concurrency`` workers.
+
+    Args:
+        client: HTTP client for the API (in-process ASGI or a running instance)
+        city: City the fake Places server serves (queries land inside it)
+        requests: Measured requests
+        concurrency: Requests in flight
+        warmup: Unmeasured requests sent first
+        seed: Query generator seed
+
+    Returns:
+        Throughput, latency percentiles, error and degraded rates
+    """
+    rng = random.Random(seed)
+    queries = [random_query(city, rng) for _ in range(warmup + requests)]
+    for params in queries[:warmup]:
+        await client.get("/venues/nearby", params=params)
+
+    pending = iter(queries[warmup:])
+    latencies: list[float] = []
+    errors = 0
+    degraded = 0
+
+    async def worker() -> None:
+        nonlocal errors, degraded
+        for params in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.get("/venues/nearby", params=params)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+            elif response.json().get("degraded"):
+                degraded += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        **latency_summary(latencies),
+        "error_rate": round(errors / requests, 4),
+        "degraded_rate": round(degraded / requests, 4),
+    }
@@ -0,0 +1,162 @@
+"""Fake Google Places (New) server backed by a synthetic city.
+
+Serves ``POST /v1/places:searchNearby`` and ``GET /v1/places/{id}`` with
+configurable latency, tail latency and error rate, so the real
+``GooglePlacesClient`` can be exercised offline::
+
+    python -m benchmarks.fake_places --port 8099 --latency-ms 80 --error-rate 0.01
+    GOOGLE_PLACES_BASE_URL=http://127.0.0.1:8099/v1 GOOGLE_PLACES_API_KEY=fake uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.city import SyntheticCity
+
+
+@dataclass
+class FakePlacesConfig:
+    """Behavior of the fake server."""
+
+    latency_ms: float = 50.0  # median upstream latency
+    jitter: float = 0.3  # lognormal sigma around the median
+    slow_rate: float = 0.0  # fraction of calls hitting the slow tail
+    slow_ms: float = 1500.0
+    error_rate: float = 0.0  # fraction of calls answered with HTTP 503
+    seed: int = 0
+
+
+def create_app(city: SyntheticCity, config: FakePlacesConfig | None = None) -> FastAPI:
+    """Build the fake Places API app.
+
+    Args:
+        city: Places to serve
+        config: Latency and error behavior
+
+    Returns:
+        FastAPI application
+    """
+    config = config or FakePlacesConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Fake Google Places")
+    app.state.calls = 0
+
+    async def upstream_delay() -> None:
+        app.state.calls += 1
+        delay_ms = config.latency_ms * rng.lognormvariate(0, config.jitter)
+        if rng.random() < config.slow_rate:
+            delay_ms += config.slow_ms
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        if rng.random() < config.error_rate:
+            raise HTTPException(status_code=503, detail="UNAVAILABLE")
+
+    @app.post("/v1/places:searchNearby")
+    async def search_nearby(request: Request, x_goog_api_key: str | None = Header(None)):
+        if not x_goog_api_key:
+            return JSONResponse({"error": {"code": 403, "status": "PERMISSION_DENIED"}}, 403)
+        await upstream_delay()
+        body = await request.json()
+        circle = body["locationRestriction"]["circle"]
+        places = city.search(
+            lat=circle["center"]["latitude"],
+            lng=circle["center"]["longitude"],
+            radius_m=circle["radius"],
+            max_results=min(int(body.get("maxResultCount", 20)), 20),
+            open_now=bool(body.get("openNow")),
+            price_level=body.get("priceLevel"),
+        )
+        return {"places": places} if places else {}
+
+    @app.get("/v1/places/{place_id}")
+    async def place_details(place_id: str):
+        await upstream_delay()
+        try:
+            i = int(place_id.removeprefix("fake-"))
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail="NOT_FOUND") from e
+        if not 0 <= i < len(city):
+            raise HTTPException(status_code=404, detail="NOT_FOUND")
+        return {"reviews": city.reviews(i)}
+
+    return app
+
+
+class FakePlacesServer:
+    """Run the fake server on a background thread (context manager).
+
+    Example::
+
+        with FakePlacesServer(create_app(SyntheticCity())) as server:
+            client = GooglePlacesClient(api_key="fake", base_url=server.base_url)
+    """
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.server = uvicorn.Server(
+            # loop="asyncio": uvloop would replace the caller's event loop policy.
+            uvicorn.Config(
+                app, host=host, port=port, log_level="warning", lifespan="off", loop="asyncio"
+            )
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.host = host
+
+    @property
+    def port(self) -> int:
+        return self.server.servers[0].sockets[0].getsockname()[1]
+
+    @property
+    def base_url(self) -> str:
+        """API root to pass as ``google_places_base_url``."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def __enter__(self) -> "FakePlacesServer":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Fake Places server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--places", type=int, default=20_000, help="places in the city")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=1500.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    city = SyntheticCity(n_places=args.places, seed=args.seed)
+    config = FakePlacesConfig(
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(city, config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
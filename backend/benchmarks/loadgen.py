@@ -0,0 +1,321 @@
+"""Open-loop load generator for a running ModeMap API.
+
+Replays a Zipf-distributed mix of nearby searches (hot spots, radii, modes,
+filters) at a fixed arrival rate and reports throughput, latency percentiles,
+error rate and cache hit ratio per time window::
+
+    python -m benchmarks.loadgen http://localhost:8000 --rate 1000 --duration 60 --processes 4
+    python -m benchmarks.loadgen http://localhost:8000 --replay events.jsonl
+
+``--replay`` takes a JSON-lines export of ``user_events`` (or bare
+``query_context`` objects) and samples queries with their observed
+frequencies, e.g.::
+
+    psql "$DATABASE_URL" -c "\\copy (SELECT json_build_object('mode', mode,
+        'query_context', query_context) FROM user_events
+        WHERE query_context IS NOT NULL) TO 'events.jsonl'"
+
+Arrivals are scheduled up front (Poisson process), and latency is measured
+from the scheduled send time, so a saturated server shows up as growing
+latency instead of a silently lower request rate. Requests that would exceed
+``--max-in-flight`` are counted as dropped. Cache hits are read from the
+``X-Cache`` response header.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from app.geo import METERS_PER_DEGREE_LAT
+from app.models.user_event import Mode
+from benchmarks.results import latency_summary, write_results
+
+RADII_M = (1000, 500, 2000, 1500, 5000)  # most common first
+CACHE_HEADER = "x-cache"
+
+
+def zipf_weights(n: int, s: float = 1.1) -> np.ndarray:
+    """Normalized Zipf weights for ranks 1..n."""
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+@dataclass
+class QueryMix:
+    """Synthetic query distribution around a city center.
+
+    Hot spots, radii and modes are each drawn by Zipf rank, so a few places,
+    radii and modes dominate traffic the way they do in production.
+    """
+
+    center_lat: float = 37.7749
+    center_lng: float = -122.4194
+    city_radius_m: float = 8000.0
+    hot_spots: int = 500
+    zipf_s: float = 1.1
+    spot_jitter_m: float = 150.0
+    open_now_rate: float = 0.25
+    price_filter_rate: float = 0.1
+
+    def sample(self, n: int, seed: int = 0) -> list[dict]:
+        """Draw ``n`` nearby-search query parameter dicts."""
+        rng = np.random.default_rng(seed)
+        # Hot spots are fixed for the mix (seeded independently of the draw).
+        spots = np.random.default_rng(12345)
+        r = self.city_radius_m * np.sqrt(spots.random(self.hot_spots))
+        theta = spots.random(self.hot_spots) * 2 * math.pi
+        meters_per_degree_lng = METERS_PER_DEGREE_LAT * math.cos(math.radians(self.center_lat))
+
+        spot = rng.choice(self.hot_spots, size=n, p=zipf_weights(self.hot_spots, self.zipf_s))
+        dx = r[spot] * np.cos(theta[spot]) + rng.normal(0, self.spot_jitter_m, n)
+        dy = r[spot] * np.sin(theta[spot]) + rng.normal(0, self.spot_jitter_m, n)
+        lat = self.center_lat + dy / METERS_PER_DEGREE_LAT
+        lng = self.center_lng + dx / meters_per_degree_lng
+        radius = rng.choice(RADII_M, size=n, p=zipf_weights(len(RADII_M), self.zipf_s))
+        modes = list(Mode)
+        mode = rng.choice(len(modes), size=n, p=zipf_weights(len(modes), self.zipf_s))
+        open_now = rng.random(n) < self.open_now_rate
+        price = np.where(rng.random(n) < self.price_filter_rate, rng.integers(1, 5, n), -1)
+
+        queries = []
+        for i in range(n):
+            params = {
+                "lat": round(float(lat[i]), 5),
+                "lng": round(float(lng[i]), 5),
+                "radius": int(radius[i]),
+                "mode": modes[mode[i]].value,
+            }
+            if open_now[i]:
+                params["open_now"] = "true"
+            if price[i] >= 0:
+                params["price_level"] = int(price[i])
+            queries.append(params)
+        return queries
+
+
+class ReplayMix:
+    """Query distribution taken from exported ``UserEvent.query_context`` rows."""
+
+    def __init__(self, path: str | Path):
+        """Load an export (one JSON object per line).
+
+        Lines may be bare query contexts or events with ``query_context`` and
+        ``mode`` keys. Lines without coordinates are skipped.
+        """
+        counts: Counter[str] = Counter()
+        for line in Path(path).read_text().splitlines():
+            if not line.strip():
+                continue
+            params = self.to_params(json.loads(line))
+            if params is not None:
+                counts[json.dumps(params, sort_keys=True)] += 1
+        if not counts:
+            raise ValueError(f"No replayable queries in {path}")
+        self.queries = [json.loads(key) for key in counts]
+        weights = np.array(list(counts.values()), dtype=np.float64)
+        self.weights = weights / weights.sum()
+
+    @staticmethod
+    def to_params(record: dict) -> dict | None:
+        """Convert one exported record to nearby-search query parameters."""
+        context = record.get("query_context", record) or {}
+        filters = {**context, **(context.get("filters") or {})}
+        if context.get("lat") is None or context.get("lng") is None:
+            return None
+        params = {
+            "lat": round(float(context["lat"]), 5),
+            "lng": round(float(context["lng"]), 5),
+            "radius": int(context.get("radius") or context.get("radius_m") or 1000),
+            "mode": record.get("mode") or context.get("mode") or Mode.WORK.value,
+        }
+        if filters.get("open_now"):
+            params["open_now"] = "true"
+        if filters.get("price_level") is not None:
+            params["price_level"] = int(filters["price_level"])
+        return params
+
+    def sample(self, n: int, seed: int = 0) -> list[dict]:
+        """Draw ``n`` queries with their observed frequencies."""
+        rng = np.random.default_rng(seed)
+        return [self.queries[i] for i in rng.choice(len(self.queries), size=n, p=self.weights)]
+
+
+# (scheduled offset s, latency s, status, cache) -- status is an HTTP code,
+# "error" (transport failure) or "dropped" (over --max-in-flight).
+Record = tuple[float, float, int | str, str | None]
+
+
+async def run_load(
+    target: str,
+    queries: list[dict],
+    rate: float,
+    start_at: float,
+    max_in_flight: int = 1000,
+    timeout_s: float = 10.0,
+    seed: int = 0,
+) -> list[Record]:
+    """Send ``queries`` to ``target`` as a Poisson arrival process.
+
+    Args:
+        target: API base URL
+        queries: Query parameters, in send order
+        rate: Mean arrivals per second
+        start_at: Wall-clock time (``time.time()``) of the first arrival
+        max_in_flight: Requests allowed in flight before arrivals are dropped
+        timeout_s: Per-request timeout
+        seed: Seed for inter-arrival times
+
+    Returns:
+        One record per query
+    """
+    rng = np.random.default_rng(seed)
+    offsets = np.cumsum(rng.exponential(1 / rate, len(queries)))
+    records: list[Record] = []
+    in_flight = 0
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=target, timeout=timeout_s, limits=limits) as client:
+        loop = asyncio.get_running_loop()
+        loop_start = loop.time() + (start_at - time.time())
+
+        async def send(offset: float, params: dict) -> None:
+            nonlocal in_flight
+            in_flight += 1
+            try:
+                response = await client.get("/venues/nearby", params=params)
+                status: int | str = response.status_code
+                cache = response.headers.get(CACHE_HEADER)
+            except httpx.HTTPError:
+                status, cache = "error", None
+            finally:
+                in_flight -= 1
+            records.append((offset, loop.time() - (loop_start + offset), status, cache))
+
+        tasks = []
+        for offset, params in zip(offsets, queries, strict=True):
+            delay = loop_start + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if in_flight >= max_in_flight:
+                records.append((float(offset), 0.0, "dropped", None))
+                continue
+            tasks.append(asyncio.create_task(send(float(offset), params)))
+        await asyncio.gather(*tasks)
+    return records
+
+
+def _run_process(args: tuple) -> list[Record]:
+    """Process-pool entry point: one event loop per process."""
+    return asyncio.run(run_load(*args))
+
+
+def summarize(records: list[Record], elapsed: float) -> dict[str, float]:
+    """Throughput, latency, error and cache statistics for a set of records."""
+    total = len(records)
+    if not total:
+        return {"requests": 0}
+    completed = [r for r in records if r[2] != "dropped"]
+    ok = [r for r in completed if r[2] == 200]
+    cached = [r for r in ok if r[3] is not None]
+    hits = sum(1 for r in cached if r[3] == "hit")
+    return {
+        "requests": total,
+        "throughput_rps": round(len(ok) / elapsed, 1) if elapsed > 0 else 0.0,
+        **latency_summary([r[1] for r in completed]),
+        "error_rate": round((len(completed) - len(ok)) / total, 4),
+        "dropped_rate": round((total - len(completed)) / total, 4),
+        "cache_hit_ratio": round(hits / len(cached), 4) if cached else None,
+    }
+
+
+def timeline(records: list[Record], window_s: float) -> list[dict]:
+    """Per-window statistics, keyed by when requests were scheduled."""
+    windows: dict[int, list[Record]] = {}
+    for record in records:
+        windows.setdefault(int(record[0] // window_s), []).append(record)
+    return [
+        {"t_s": index * window_s, **summarize(windows[index], window_s)}
+        for index in sorted(windows)
+    ]
+
+
+def _format_row(label: str, row: dict) -> str:
+    cache = row.get("cache_hit_ratio")
+    return (
+        f"{label:>8} {row.get('throughput_rps', 0):>9.1f} {row.get('p50_ms', 0):>9.1f} "
+        f"{row.get('p95_ms', 0):>9.1f} {row.get('p99_ms', 0):>9.1f} "
+        f"{row.get('error_rate', 0):>7.2%} {row.get('dropped_rate', 0):>8.2%} "
+        f"{'-' if cache is None else f'{cache:.1%}':>7}"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="ModeMap load generator")
+    parser.add_argument("target", help="API base URL, e.g. http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=200.0, help="requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--processes", type=int, default=1, help="client processes")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="per process")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--window", type=float, default=5.0, help="report window in seconds")
+    parser.add_argument("--replay", help="JSON-lines export of UserEvent.query_context")
+    parser.add_argument("--hot-spots", type=int, default=500)
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    mix = (
+        ReplayMix(args.replay)
+        if args.replay
+        else QueryMix(hot_spots=args.hot_spots, zipf_s=args.zipf_s)
+    )
+    per_process = max(int(args.rate * args.duration / args.processes), 1)
+    rate = args.rate / args.processes
+    start_at = time.time() + 1.0
+    jobs = [
+        (
+            args.target,
+            mix.sample(per_process, seed=args.seed + p),
+            rate,
+            start_at,
+            args.max_in_flight,
+            args.timeout,
+            args.seed + p,
+        )
+        for p in range(args.processes)
+    ]
+
+    if args.processes == 1:
+        records = _run_process(jobs[0])
+    else:
+        with ProcessPoolExecutor(args.processes) as pool:
+            records = [r for chunk in pool.map(_run_process, jobs) for r in chunk]
+    elapsed = max(r[0] + r[1] for r in records)
+
+    rows = timeline(records, args.window)
+    summary = summarize(records, elapsed)
+    header = ("window", "ok rps", "p50 ms", "p95 ms", "p99 ms", "errors", "dropped", "cache")
+    print("{:>8} {:>9} {:>9} {:>9} {:>9} {:>7} {:>8} {:>7}".format(*header))
+    for row in rows:
+        print(_format_row(f"{row['t_s']:.0f}s", row))
+    print(_format_row("total", summary))
+
+    if args.output:
+        write_results(
+            args.output, {"load.nearby": summary}, params=vars(args), extra={"timeline": rows}
+        )
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Micro-benchmarks for the nearby hot path (no I/O)."""
+
+import asyncio
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from app.cache import LocalCache, TieredCache
+from app.geo import encode_cells, geohash_encode_array
+from app.models.user_event import EventType, Mode
+from app.providers.fanout import dedupe_venues
+from app.providers.google import GooglePlacesClient
+from app.ranking.evaluation import BASELINE, Impressions, ModeMetrics, evaluate_impressions
+from app.ranking.features import DYNAMIC_FEATURES, FEATURES, build_feature_matrix
+from app.ranking.personalization import PreferenceUpdate, empty_vector, personalize, update_vector
+from app.ranking.scoring import MODES, score, top_k
+from app.schemas.search import NearbyResponse, RankedVenue
+from app.services.results import rerank
+from benchmarks.city import SyntheticCity
+from benchmarks.results import latency_summary
+
+
+def bench(func: Callable[[], object], repeat: int = 200, number: int = 10) -> dict[str, float]:
+    """Time ``func`` like ``timeit``: ``repeat`` samples of ``number`` calls each.
+
+    Returns:
+        Per-call latency summary (microseconds) and calls per second
+    """
+    func()  # warm up
+    samples = np.empty(repeat)
+    for r in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples[r] = (time.perf_counter() - start) / number
+    return {**latency_summary(samples, unit="us"), "calls_per_s": round(1 / samples.mean(), 1)}
+
+
+def run_micro(city: SyntheticCity, repeat: int = 200) -> dict[str, dict[str, float]]:
+    """Run all micro-benchmarks against places from ``city``.
+
+    Args:
+        city: Source of realistic place payloads
+        repeat: Samples per benchmark
+
+    Returns:
+        Metrics keyed by benchmark name
+    """
+    lat, lng = city.center_lat, city.center_lng
+    client = GooglePlacesClient(api_key="bench", base_url="http://unused")
+    places = city.search(lat, lng, radius_m=2000, max_results=20)
+    venues = [client._normalize_place(p) for p in places]
+    many = [client._normalize_place(p) for p in city.search(lat, lng, 4000, max_results=200)]
+    profiles = [{"quiet": 0.7, "laptop_friendly": 0.6, "romantic": 0.4}] * len(venues)
+
+    def normalize():
+        return [client._normalize_place(p) for p in places]
+
+    def rank(candidates):
+        def run():
+            features, _ = build_feature_matrix(candidates, lat, lng, 2000)
+            return top_k(score(features, Mode.WORK), 20)
+
+        return run
+
+    features, distances = build_feature_matrix(venues, lat, lng, 2000, profiles)
+    scores = score(features, Mode.WORK)
+    response = NearbyResponse(
+        mode=Mode.WORK,
+        count=len(venues),
+        venues=[
+            RankedVenue(
+                **v.model_dump(),
+                distance_m=float(distances[i]),
+                score=float(scores[i]),
+                attribute_scores=profiles[i],
+            )
+            for i, v in enumerate(venues)
+        ],
+    )
+
+    # A user with some engagement history, re-ranking 200 candidates.
+    many_features, _ = build_feature_matrix(many, lat, lng, 4000)
+    many_scores = score(many_features, Mode.WORK)
+    vector = empty_vector()
+    now = time.time()
+    for i in range(10):
+        vector = update_vector(
+            vector,
+            PreferenceUpdate(
+                EventType.SAVE,
+                at=now,
+                mode=Mode.WORK,
+                static_features=many_features[i, len(DYNAMIC_FEATURES) :],
+                price_level=many[i].price_level,
+            ),
+        )
+
+    # A million points, as for analytics over an event log.
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(lat - 0.5, lat + 0.5, 1_000_000)
+    lngs = rng.uniform(lng - 0.5, lng + 0.5, 1_000_000)
+    bulk_repeat = max(repeat // 40, 3)
+
+    # A slider drag: re-rank 100 cached candidates (L1 hit) and serialize.
+    searches = TieredCache("bench", ttl_s=60, local=LocalCache(64 << 20, 10))
+    rows = [
+        RankedVenue(**v.model_dump(), distance_m=0.0, score=0.0).model_dump() for v in many[:100]
+    ]
+    searches.local.set(
+        searches.key("s"),
+        {"mode": "work", "features": many_features[:100].tobytes(), "venues": rows},
+        size=1,
+        ttl_s=3600,
+    )
+    loop = asyncio.new_event_loop()
+
+    def slider():
+        weights = {"quiet": 0.6, "proximity": 0.4}
+        response = loop.run_until_complete(rerank("s", weights, 20, searches=searches))
+        return response.model_dump_json()
+
+    # Offline evaluation: 1M logged impressions, 10 per search.
+    impressions = Impressions(
+        query_ids=np.arange(1_000_000) // 10,
+        modes=np.repeat(rng.integers(0, len(MODES), 100_000), 10),
+        features=rng.random((1_000_000, len(FEATURES)), dtype=np.float32),
+        gains=(rng.random(1_000_000) < 0.05).astype(np.float32),
+    )
+
+    def evaluate_log():
+        evaluate_impressions(impressions, BASELINE, 10, {m: ModeMetrics() for m in MODES})
+
+    # Three providers returning overlapping pages, as in a fan-out.
+    shifted = [v.model_copy(update={"provider_id": f"b-{v.provider_id}"}) for v in venues]
+    fanout_pages = venues + shifted + many[20:40]
+
+    return {
+        "micro.normalize_places_20": bench(normalize, repeat),
+        "micro.serialize_nearby_response_20": bench(response.model_dump_json, repeat),
+        "micro.rank_20": bench(rank(venues), repeat),
+        "micro.rank_200": bench(rank(many), repeat),
+        "micro.dedupe_60": bench(lambda: dedupe_venues(fanout_pages), repeat),
+        "micro.geohash_cells_1m": bench(lambda: encode_cells(lats, lngs, 6), bulk_repeat, number=1),
+        "micro.geohash_strings_1m": bench(
+            lambda: geohash_encode_array(lats, lngs, 6), bulk_repeat, number=1
+        ),
+        "micro.rerank_100": bench(slider, repeat),
+        "micro.evaluate_1m": bench(evaluate_log, bulk_repeat, number=1),
+        "micro.personalize_200": bench(
+            lambda: personalize(many_scores, many_features, vector, Mode.WORK, now), repeat
+        ),
+    }
@@ -0,0 +1,81 @@
+"""Benchmark result summaries and the JSON results file.
+
+Results are flat ``{benchmark: {metric: value}}`` maps so two runs can be
+diffed key by key (see ``benchmarks.compare``). Latency metrics end in
+``_ms``/``_us``; throughput metrics end in ``_per_s`` or ``_rps``.
+"""
+
+import json
+import platform
+import subprocess
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+
+# Metric name suffixes where a higher value is better.
+HIGHER_IS_BETTER = ("_per_s", "_rps")
+
+
+def latency_summary(seconds: list[float] | np.ndarray, unit: str = "ms") -> dict[str, float]:
+    """Mean and tail percentiles of a latency sample.
+
+    Args:
+        seconds: Latencies in seconds
+        unit: "ms" or "us"
+
+    Returns:
+        Dict with mean/p50/p95/p99/max in ``unit``
+    """
+    scale = 1e3 if unit == "ms" else 1e6
+    values = np.asarray(seconds, dtype=np.float64) * scale
+    if values.size == 0:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        f"mean_{unit}": round(float(values.mean()), 3),
+        f"p50_{unit}": round(float(p50), 3),
+        f"p95_{unit}": round(float(p95), 3),
+        f"p99_{unit}": round(float(p99), 3),
+        f"max_{unit}": round(float(values.max()), 3),
+    }
+
+
+def git_revision() -> str | None:
+    """Current commit hash, if run inside a git checkout."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def write_results(
+    path: str | Path, results: dict[str, dict], params: dict, extra: dict | None = None
+) -> dict:
+    """Write a results file with run metadata.
+
+    Args:
+        path: Output JSON path
+        results: Benchmark metrics keyed by benchmark name
+        params: Parameters the run used
+        extra: Additional top-level sections (e.g. a load-test timeline)
+
+    Returns:
+        The document written
+    """
+    doc = {
+        "meta": {
+            "commit": git_revision(),
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "params": params,
+        },
+        "results": results,
+        **(extra or {}),
+    }
+    Path(path).write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n")
+    return doc
@@ -0,0 +1,97 @@
+"""Run the benchmark suite and write machine-readable results.
+
+Examples (from ``backend/``)::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --suite e2e --requests 2000 --concurrency 32 --error-rate 0.02
+    python -m benchmarks.run --suite micro --output micro.json
+
+The end-to-end suite runs the API in-process against a fake Places server
+started on a local port. Profile lookups use ``DATABASE_URL``; pass
+``--no-db`` to skip them (responses are then flagged degraded).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+import httpx
+
+from app.config import settings
+from benchmarks.city import SyntheticCity
+from benchmarks.e2e import run_e2e
+from benchmarks.fake_places import FakePlacesConfig, FakePlacesServer, create_app
+from benchmarks.micro import run_micro
+from benchmarks.results import write_results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ModeMap benchmarks")
+    parser.add_argument("--suite", choices=("all", "e2e", "micro"), default="all")
+    parser.add_argument("--output", default="bench.json", help="results JSON path")
+    parser.add_argument("--seed", type=int, default=0)
+    city = parser.add_argument_group("synthetic city")
+    city.add_argument("--places", type=int, default=20_000)
+    city.add_argument("--neighborhoods", type=int, default=12)
+    e2e = parser.add_argument_group("end-to-end")
+    e2e.add_argument("--requests", type=int, default=500)
+    e2e.add_argument("--concurrency", type=int, default=16)
+    e2e.add_argument("--latency-ms", type=float, default=50.0, help="median upstream latency")
+    e2e.add_argument("--jitter", type=float, default=0.3)
+    e2e.add_argument("--slow-rate", type=float, default=0.0)
+    e2e.add_argument("--slow-ms", type=float, default=1500.0)
+    e2e.add_argument("--error-rate", type=float, default=0.0)
+    e2e.add_argument("--no-db", action="store_true", help="skip profile lookups")
+    micro = parser.add_argument_group("micro")
+    micro.add_argument("--repeat", type=int, default=200)
+    return parser.parse_args(argv)
+
+
+async def _run_e2e(args: argparse.Namespace, city: SyntheticCity) -> dict[str, float]:
+    from app.main import app
+
+    config = FakePlacesConfig(
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    with FakePlacesServer(create_app(city, config)) as server:
+        settings.google_places_base_url = server.base_url
+        settings.google_places_api_key = "benchmark"
+        settings.places_providers = "google"
+        settings.trace_sample_rate = 0.0
+        if args.no_db:
+            settings.db_timeout_seconds = 0.0
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_e2e(
+                client,
+                city,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                seed=args.seed,
+            )
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    city = SyntheticCity(n_places=args.places, n_neighborhoods=args.neighborhoods, seed=args.seed)
+
+    results: dict[str, dict] = {}
+    if args.suite in ("all", "micro"):
+        results.update(run_micro(city, repeat=args.repeat))
+    if args.suite in ("all", "e2e"):
+        results["e2e.nearby"] = asyncio.run(_run_e2e(args, city))
+
+    doc = write_results(args.output, results, params=vars(args))
+    json.dump(doc["results"], sys.stdout, indent=2, sort_keys=True)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,14 @@
 import asyncio
 import os
 from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.cache import LocalCache, TieredCache, local_cache
+from app.config import settings
 from app.db.base import Base
 
 # Test database URL - use environment variable if set, otherwise default to local
@@ -24,6 +27,116 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def no_shared_cache(monkeypatch):
+    """Keep tests off Redis and out of each other's cache entries.
+
+    Cache tests re-enable caching with their own fake Redis.
+    """
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    yield
+    local_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def no_background_enrichment(monkeypatch):
+    """Keep search endpoints from queueing shown venues in the real Redis."""
+    monkeypatch.setattr(settings, "enrich_visible_venues", False)
+
+
+class FakeCacheRedis:
+    """Minimal in-memory stand-in for the commands the cache uses."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.sets: dict[str, set[bytes]] = {}
+        self.published: list[tuple[str, str]] = []
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def set(self, name, value, ex=None, nx=False):
+        if nx and name in self.values:
+            return None
+        self.values[name] = value
+        return True
+
+    async def mget(self, names):
+        return [self.values.get(name) for name in names]
+
+    async def smembers(self, name):
+        return set(self.sets.get(name, set()))
+
+    async def delete(self, *names):
+        for name in names:
+            self.values.pop(name, None)
+            self.sets.pop(name, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def pipeline(self, transaction=True):
+        return FakeCachePipeline(self)
+
+
+class FakeCachePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    def set(self, name, value, ex=None):
+        self.commands.append(lambda: self.redis.values.__setitem__(name, value))
+
+    def sadd(self, name, value):
+        self.commands.append(lambda: self.redis.sets.setdefault(name, set()).add(value.encode()))
+
+    def expire(self, name, seconds, **kwargs):
+        pass
+
+    async def execute(self):
+        for command in self.commands:
+            command()
+
+
+@pytest.fixture
+def make_cache(monkeypatch):
+    """Enable caching and build namespaces over one in-memory Redis.
+
+    Each namespace gets its own L1, like separate processes sharing a Redis.
+    """
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    redis = FakeCacheRedis()
+
+    def make(namespace: str = "test", ttl_s: float = 60) -> TieredCache:
+        return TieredCache(namespace, ttl_s=ttl_s, redis=redis, local=LocalCache(100_000, 1000))
+
+    return make
+
+
+@pytest.fixture
+def make_session_factory():
+    """Build session factory mocks whose sessions work as async context managers.
+
+    ``make(session)`` wraps the given session mock (default: a new ``AsyncMock``).
+    """
+
+    def make(session: AsyncMock | None = None) -> MagicMock:
+        factory = MagicMock()
+        factory.return_value.__aenter__.return_value = (
+            session if session is not None else AsyncMock()
+        )
+        factory.return_value.__aexit__.return_value = None
+        return factory
+
+    return make
+
+
 @pytest_asyncio.fixture(scope="function")
 async def test_engine():
     """Create a test database engine."""
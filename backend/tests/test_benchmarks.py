@@ -0,0 +1,122 @@
+"""Unit tests for the benchmark harness (fake server, load generator, compare)."""
+
+import json
+from collections import Counter
+
+import httpx
+import pytest
+
+from app.geo import haversine_m
+from app.providers import GooglePlacesClient
+from benchmarks.city import SyntheticCity
+from benchmarks.compare import compare
+from benchmarks.fake_places import FakePlacesConfig, FakePlacesServer, create_app
+from benchmarks.loadgen import QueryMix, ReplayMix, summarize, timeline
+
+CITY = SyntheticCity(n_places=2000, seed=1)
+
+
+def test_city_search_respects_radius_and_filters():
+    """Test that synthetic searches stay within the circle and honor filters."""
+    lat, lng = CITY.center_lat, CITY.center_lng
+    places = CITY.search(lat, lng, radius_m=1500, max_results=20, open_now=True)
+
+    assert 0 < len(places) <= 20
+    for place in places:
+        location = place["location"]
+        assert haversine_m(lat, lng, location["latitude"], location["longitude"]) <= 1500
+        assert place["currentOpeningHours"]["openNow"] is True
+    assert places == CITY.search(lat, lng, radius_m=1500, max_results=20, open_now=True)
+
+
+@pytest.mark.asyncio
+async def test_google_client_against_fake_server():
+    """Test the real client end to end against the fake server."""
+    app = create_app(CITY, FakePlacesConfig(latency_ms=0))
+    with FakePlacesServer(app) as server:
+        client = GooglePlacesClient(api_key="fake", base_url=server.base_url)
+        venues = await client.search_nearby(CITY.center_lat, CITY.center_lng, radius_m=2000)
+        reviews = await client.get_place_reviews(venues[0].provider_id)
+
+    assert len(venues) == 20
+    assert all(v.provider_name == "google" for v in venues)
+    assert reviews
+
+
+@pytest.mark.asyncio
+async def test_fake_server_injects_errors():
+    """Test that the configured error rate surfaces as HTTP errors."""
+    app = create_app(CITY, FakePlacesConfig(latency_ms=0, error_rate=1.0))
+    with FakePlacesServer(app) as server:
+        client = GooglePlacesClient(api_key="fake", base_url=server.base_url)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.search_nearby(CITY.center_lat, CITY.center_lng)
+
+
+def test_compare_flags_regressions_by_direction():
+    """Test that slower latency and lower throughput count as regressions."""
+    base = {"results": {"e2e": {"p95_ms": 100.0, "throughput_rps": 200.0, "error_rate": 0.0}}}
+    head = {"results": {"e2e": {"p95_ms": 120.0, "throughput_rps": 250.0, "error_rate": 0.0}}}
+
+    rows = {r["metric"]: r for r in compare(base, head)}
+
+    assert rows["p95_ms"]["regression_pct"] == 20.0
+    assert rows["throughput_rps"]["regression_pct"] == -25.0
+    assert rows["error_rate"]["regression_pct"] is None
+
+
+def test_query_mix_is_zipf_skewed_and_deterministic():
+    """Test that a few hot spots dominate the synthetic query mix."""
+    mix = QueryMix(hot_spots=200)
+    queries = mix.sample(5000, seed=3)
+
+    assert queries == mix.sample(5000, seed=3)
+    spots = Counter((round(q["lat"], 2), round(q["lng"], 2)) for q in queries)
+    top_share = sum(count for _, count in spots.most_common(10)) / len(queries)
+    assert top_share > 0.3
+    assert Counter(q["radius"] for q in queries).most_common(1)[0][0] == 1000
+
+
+def test_replay_mix_reads_event_exports(tmp_path):
+    """Test replaying exported events with their observed frequencies."""
+    export = tmp_path / "events.jsonl"
+    lines = [
+        {"mode": "date", "query_context": {"lat": 37.77, "lng": -122.41, "radius": 500}},
+        {"mode": "date", "query_context": {"lat": 37.77, "lng": -122.41, "radius": 500}},
+        {"lat": 37.78, "lng": -122.42, "filters": {"open_now": True, "price_level": 2}},
+        {"mode": "work", "query_context": None},
+    ]
+    export.write_text("\n".join(json.dumps(line) for line in lines))
+
+    mix = ReplayMix(export)
+
+    assert len(mix.queries) == 2
+    assert mix.weights.tolist() == pytest.approx([2 / 3, 1 / 3])
+    assert mix.queries[1] == {
+        "lat": 37.78,
+        "lng": -122.42,
+        "radius": 1000,
+        "mode": "work",
+        "open_now": "true",
+        "price_level": 2,
+    }
+
+
+def test_load_summary_and_timeline():
+    """Test throughput, error, drop and cache accounting per window."""
+    records = [
+        (0.1, 0.010, 200, "hit"),
+        (0.5, 0.020, 200, "miss"),
+        (1.2, 0.030, 503, None),
+        (1.4, 0.0, "dropped", None),
+    ]
+
+    summary = summarize(records, elapsed=2.0)
+    rows = timeline(records, window_s=1.0)
+
+    assert summary["throughput_rps"] == 1.0
+    assert summary["error_rate"] == 0.25
+    assert summary["dropped_rate"] == 0.25
+    assert summary["cache_hit_ratio"] == 0.5
+    assert [row["t_s"] for row in rows] == [0.0, 1.0]
+    assert rows[1]["requests"] == 2
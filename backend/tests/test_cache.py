@@ -0,0 +1,282 @@
+"""Unit tests for the two-level cache, its codec and invalidation."""
+
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.cache import (
+    CacheDecodeError,
+    LocalCache,
+    TieredCache,
+    decode,
+    encode,
+    invalidate,
+    venue_tag,
+)
+from app.cache.codec import PLAIN, ZSTD
+from app.cache.invalidation import InvalidationListener, apply_message, tag_key
+from app.config import settings
+from app.deadline import Deadline, bind_deadline, current_deadline
+from app.providers import CachedPlacesProvider, StubPlacesProvider
+from app.schemas.venue import VenueCreate, VenueWithProfile
+from app.services.venues import get_venues
+
+
+def test_codec_round_trips_and_compresses_large_payloads():
+    """Test msgpack round trips, type conversion and zstd for large payloads."""
+    venue_id = uuid.uuid4()
+    at = datetime(2026, 1, 1, tzinfo=UTC)
+    assert decode(encode({"id": venue_id, "at": at})) == {"id": str(venue_id), "at": at.isoformat()}
+
+    small, large = encode([1, 2, 3]), encode(["quiet cafe"] * 500)
+    assert small[:1] == PLAIN
+    assert large[:1] == ZSTD
+    assert len(large) < 500
+    assert decode(large) == ["quiet cafe"] * 500
+
+
+def test_codec_rejects_corrupt_payloads():
+    """Test that unknown markers and truncated payloads raise CacheDecodeError."""
+    with pytest.raises(CacheDecodeError):
+        decode(b"\x09abc")
+    with pytest.raises(CacheDecodeError):
+        decode(encode(["quiet cafe"] * 500)[:20])
+
+
+def test_local_cache_evicts_least_recently_used_by_size():
+    """Test size-aware LRU eviction and rejection of oversized entries."""
+    cache = LocalCache(max_bytes=100, max_entries=10)
+    cache.set("a", 1, size=40, ttl_s=60, now=0)
+    cache.set("b", 2, size=40, ttl_s=60, now=0)
+    assert cache.get("a", now=1) == 1  # b is now least recently used
+    cache.set("c", 3, size=40, ttl_s=60, now=2)
+
+    assert cache.get("b", now=3) is None
+    assert cache.get("a", now=3) == 1
+    assert cache.size_bytes == 80
+    assert not cache.set("huge", 4, size=101, ttl_s=60)
+
+
+def test_local_cache_expires_and_deletes_by_tag():
+    """Test per-entry TTLs and tag-based deletion."""
+    cache = LocalCache(max_bytes=1000, max_entries=2)
+    cache.set("a", 1, size=1, ttl_s=10, tags=["venue:1"], now=0)
+    cache.set("b", 2, size=1, ttl_s=100, tags=["venue:2"], now=0)
+
+    assert cache.get("a", now=11) is None
+    assert cache.delete(tags=["venue:2"]) == 1
+    assert len(cache) == 0
+    cache.set("c", 3, size=1, ttl_s=10, now=0)
+    cache.set("d", 4, size=1, ttl_s=10, now=0)
+    cache.set("e", 5, size=1, ttl_s=10, now=0)
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_reads_l1_then_l2(make_cache):
+    """Test that L2 hits are promoted into the L1 and many keys use one MGET."""
+    writer, reader = make_cache(), make_cache()
+    redis = writer.redis
+
+    await writer.set("k1", {"n": 1}, tags=["venue:1"])
+    await writer.set("k2", [2])
+
+    assert redis.sets[tag_key("venue:1")] == {b"cache:test:k1"}
+    assert await reader.get("k1") == {"n": 1}  # from Redis
+    assert reader.local.get("cache:test:k1") == {"n": 1}
+    assert await reader.get_many(["k1", "k2", "k3"]) == {"k1": {"n": 1}, "k2": [2]}
+    assert await reader.get("k3", "default") == "default"
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_degrades_to_l1_when_redis_fails(make_cache):
+    """Test that Redis errors are treated as misses and writes still fill the L1."""
+    down = AsyncMock(side_effect=RedisConnectionError("down"))
+    cache = make_cache()
+    redis = cache.redis
+    redis.get = redis.mget = down
+
+    assert await cache.get("k") is None
+    assert await cache.get_many(["k"]) == {}
+    with patch.object(type(redis.pipeline()), "execute", down):
+        await cache.set("k", 1)
+    assert await cache.get("k") == 1
+    assert redis.values == {}
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_is_inert_when_disabled():
+    """Test that a disabled cache never reads or writes Redis."""
+    redis = MagicMock()
+    cache = TieredCache("test", ttl_s=60, redis=redis, local=LocalCache(1000, 10))
+
+    await cache.set("k", 1)
+    assert await cache.get("k") is None
+    redis.pipeline.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_shares_one_load_between_concurrent_misses(make_cache):
+    """Test single-flight loading and that loader errors are not cached."""
+    cache = make_cache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [1]
+
+    results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5)))
+
+    assert results == [[1]] * 5
+    assert len(calls) == 1
+    failing = AsyncMock(side_effect=ValueError("boom"))
+    with pytest.raises(ValueError):
+        await cache.get_or_load("other", failing)
+    assert await cache.get("other") is None
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_survives_the_first_caller_being_cancelled(make_cache):
+    """Test that a short-deadline caller timing out does not fail the others."""
+    cache = make_cache()
+    calls = []
+
+    async def loader():
+        calls.append(current_deadline())
+        await asyncio.sleep(0.05)
+        return [1]
+
+    with bind_deadline(Deadline(0.01)):
+        first = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.get_or_load("k", loader))
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(first, timeout=0.01)
+    assert await second == [1]
+    assert calls == [None]  # one load, not bound to the first caller's deadline
+    assert await cache.get("k") == [1]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_tagged_entries_everywhere(make_cache):
+    """Test that invalidation clears Redis and publishes keys for other L1s."""
+    cache, other = make_cache(), make_cache()
+    redis = cache.redis
+    await cache.set("k1", 1, tags=[venue_tag("v1")])
+    await cache.set("k2", 2)
+    await other.get("k1")  # another process's L1 copy
+
+    await invalidate(tags=[venue_tag("v1")], redis=redis, local=cache.local)
+
+    assert "cache:test:k1" not in redis.values
+    assert "cache:test:k2" in redis.values
+    assert cache.local.get("cache:test:k1") is None
+    channel, message = redis.published[0]
+    assert channel == settings.cache_invalidation_channel
+    assert json.loads(message)["keys"] == ["cache:test:k1"]
+    assert apply_message(message, other.local) == 1
+    assert await other.get("k1") is None
+
+
+class FakePubSub:
+    """Subscription that fails when listened to, or idles until cancelled."""
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.closed = False
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        if self.fail:
+            raise RedisConnectionError("connection reset")
+        await asyncio.Event().wait()
+        yield {}
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_listener_closes_each_subscription_it_replaces():
+    """Test that reconnecting closes the dropped subscription's connection."""
+    subscriptions = [FakePubSub(fail=True), FakePubSub(fail=False)]
+    redis = MagicMock()
+    redis.pubsub.side_effect = subscriptions
+    listener = InvalidationListener(redis=redis, local=LocalCache(100_000, 1000))
+
+    with patch("app.cache.invalidation.RECONNECT_DELAY_S", 0):
+        listener.start()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        await listener.stop()
+
+    assert [pubsub.closed for pubsub in subscriptions] == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_cached_provider_reuses_results_within_a_tile(make_cache):
+    """Test that searches from the same tile share one upstream call."""
+    venue = VenueCreate(
+        provider_id="p1", provider_name="stub", name="Cafe", lat=37.7749, lng=-122.4194
+    )
+    upstream = StubPlacesProvider(venues=[venue])
+    upstream.search_nearby = AsyncMock(wraps=upstream.search_nearby)
+    provider = CachedPlacesProvider(upstream, cache=make_cache())
+
+    first = await provider.search_nearby(37.7749, -122.4194)
+    second = await provider.search_nearby(37.77491, -122.41941)
+    await provider.search_nearby(37.7749, -122.4194, open_now=True)
+
+    assert first == second == [venue]
+    assert provider.name == "stub"
+    assert upstream.search_nearby.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_venues_fetches_only_misses(make_cache, make_session_factory):
+    """Test that venue lookups query the database only for uncached venues."""
+    cached_id, missing_id = uuid.uuid4(), uuid.uuid4()
+    now = datetime.now(UTC)
+
+    def _row(venue_id):
+        return VenueWithProfile(
+            id=venue_id,
+            provider_id=str(venue_id),
+            provider_name="google",
+            name="Cafe",
+            categories=[],
+            lat=0.0,
+            lng=0.0,
+            address=None,
+            rating=None,
+            price_level=None,
+            hours=None,
+            raw_hours=None,
+            last_seen_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+
+    cache = make_cache()
+    await cache.set(str(cached_id), _row(cached_id).model_dump())
+    factory = make_session_factory()
+
+    with patch(
+        "app.services.venues.get_venues_with_profiles",
+        AsyncMock(return_value=[_row(missing_id)]),
+    ) as load:
+        venues = await get_venues([cached_id, missing_id], session_factory=factory, cache=cache)
+
+    assert set(venues) == {cached_id, missing_id}
+    assert load.call_args.kwargs["venue_ids"] == [missing_id]
+    assert await cache.get(str(missing_id)) is not None
+    assert cache.local.get(f"cache:test:{missing_id}") is not None
@@ -0,0 +1,133 @@
+"""Unit tests for SQL statement timing, slow-query logging and N+1 detection."""
+
+import logging
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.instrumentation import (
+    QueryTrackingMiddleware,
+    fingerprint,
+    instrument_engine,
+    track_queries,
+)
+
+
+@pytest.fixture
+def mock_settings():
+    with patch("app.db.instrumentation.settings") as mock_settings:
+        mock_settings.sql_instrumentation = True
+        mock_settings.sql_slow_query_ms = 10_000
+        mock_settings.sql_explain_slow = False
+        mock_settings.sql_n_plus_one_threshold = 3
+        yield mock_settings
+
+
+@pytest_asyncio.fixture
+async def engine(mock_settings):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine.sync_engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE venue_profiles (venue_id INTEGER, quiet REAL)"))
+        await conn.execute(text("INSERT INTO venue_profiles VALUES (1, 0.9), (2, 0.4)"))
+    yield engine
+    await engine.dispose()
+
+
+def test_fingerprint_collapses_literals_params_and_in_lists():
+    """Test that statements differing only in values share a shape."""
+    a = fingerprint("SELECT * FROM venues WHERE id = %(id_1)s AND name = 'Nopa'")
+    b = fingerprint("SELECT *  FROM venues\nWHERE id = %(id_1)s AND name = 'Zuni'")
+    assert a == b == "SELECT * FROM venues WHERE id = ? AND name = ?"
+    assert fingerprint("SELECT 1 FROM t WHERE id IN ($1, $2, $3)") == (
+        "SELECT ? FROM t WHERE id IN (?)"
+    )
+
+
+@pytest.mark.asyncio
+async def test_detects_n_plus_one_within_request(engine, caplog):
+    """Test that a SELECT repeated per row is flagged once."""
+    before = (
+        REGISTRY.get_sample_value("modemap_db_n_plus_one_total", {"table": "venue_profiles"}) or 0.0
+    )
+
+    with caplog.at_level(logging.WARNING), track_queries("GET /venues") as stats:
+        async with engine.connect() as conn:
+            for venue_id in range(1, 6):
+                await conn.execute(
+                    text("SELECT quiet FROM venue_profiles WHERE venue_id = :id"),
+                    {"id": venue_id},
+                )
+            await conn.execute(text("SELECT count(*) FROM venue_profiles"))
+
+    assert stats.count == 6
+    assert len(stats.n_plus_one) == 1
+    assert "Possible N+1 in GET /venues" in caplog.text
+    after = REGISTRY.get_sample_value("modemap_db_n_plus_one_total", {"table": "venue_profiles"})
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_logs_slow_queries_with_params_and_plan(engine, mock_settings, caplog):
+    """Test that slow statements are logged with parameters and EXPLAIN output."""
+    mock_settings.sql_slow_query_ms = 0
+    mock_settings.sql_explain_slow = True
+
+    with caplog.at_level(logging.WARNING):
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text("SELECT quiet FROM venue_profiles WHERE venue_id = :id"), {"id": 2}
+            )
+            assert result.scalar_one() == 0.4
+
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow query")]
+    assert len(slow) == 1
+    assert "(2,)" in slow[0]
+    assert "SCAN venue_profiles" in slow[0]
+
+
+@pytest.mark.asyncio
+async def test_untracked_statements_are_only_timed(engine):
+    """Test that statements outside a request still record latency."""
+    before = REGISTRY.get_sample_value(
+        "modemap_db_query_duration_seconds_count", {"operation": "SELECT"}
+    )
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    after = REGISTRY.get_sample_value(
+        "modemap_db_query_duration_seconds_count", {"operation": "SELECT"}
+    )
+    assert after == before + 1
+
+
+def test_middleware_stops_counting_at_the_response(engine, caplog):
+    """Test that background task statements are not charged to the request."""
+    background_app = FastAPI()
+    background_app.add_middleware(QueryTrackingMiddleware)
+    query = text("SELECT quiet FROM venue_profiles WHERE venue_id = :id")
+
+    async def prefetch():
+        async with engine.connect() as conn:
+            for venue_id in range(1, 6):
+                await conn.execute(query, {"id": venue_id})
+
+    @background_app.get("/background")
+    async def with_background(tasks: BackgroundTasks):
+        async with engine.connect() as conn:
+            await conn.execute(query, {"id": 1})
+        tasks.add_task(prefetch)
+        return {}
+
+    before = REGISTRY.get_sample_value("modemap_db_queries_per_request_sum") or 0.0
+
+    with caplog.at_level(logging.WARNING):
+        TestClient(background_app).get("/background")
+
+    assert REGISTRY.get_sample_value("modemap_db_queries_per_request_sum") == before + 1
+    assert "Possible N+1" not in caplog.text
@@ -0,0 +1,69 @@
+"""Unit tests for engine options and read-replica routing."""
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.db.routing import RoutingSession
+from app.db.session import _engine_options, engine
+
+metadata = MetaData()
+venues = Table("venues", metadata, Column("id", Integer, primary_key=True), Column("name", String))
+
+
+def test_engine_uses_configured_pool():
+    """Test that the app engine is pooled with pre-ping."""
+    assert engine.pool.size() == 10
+    assert engine.pool._pre_ping is True
+
+
+def test_prepared_statements_only_for_psycopg():
+    """Test that the prepare threshold is passed to psycopg only."""
+    pg = _engine_options("postgresql+psycopg://u:p@db/modemap")
+    assert pg["connect_args"] == {"prepare_threshold": 2}
+    assert "connect_args" not in _engine_options("postgresql+asyncpg://u:p@db/modemap")
+
+
+def test_routing_sends_reads_to_replica_and_writes_to_primary():
+    """Test bind selection for reads, writes, locking reads and raw SQL."""
+    primary = create_engine("sqlite://")
+    replica = create_engine("sqlite://")
+    session = RoutingSession(bind=primary, info={"replicas": [replica]})
+
+    assert session.get_bind(clause=select(venues)) is replica
+    assert session.get_bind(clause=select(venues).with_for_update()) is primary
+    assert session.get_bind(clause=None) is primary
+    assert session.get_bind(clause=insert(venues)) is primary
+    # Sticky: after a write, reads go to the primary too.
+    assert session.get_bind(clause=select(venues)) is primary
+
+
+def test_routing_without_replicas_uses_primary():
+    """Test that routing is a no-op when no replicas are configured."""
+    primary = create_engine("sqlite://")
+    session = Session(bind=primary)
+    routing = RoutingSession(bind=primary)
+    assert routing.get_bind(clause=select(venues)) is session.get_bind(clause=select(venues))
+
+
+@pytest.mark.asyncio
+async def test_async_session_reads_replica_until_it_writes(tmp_path):
+    """Test routing end to end through an AsyncSession."""
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for db, name in ((primary, "primary"), (replica, "replica")):
+        async with db.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(insert(venues).values(id=1, name=name))
+
+    async with AsyncSession(
+        primary, sync_session_class=RoutingSession, info={"replicas": [replica.sync_engine]}
+    ) as session:
+        assert await session.scalar(select(venues.c.name)) == "replica"
+        await session.execute(insert(venues).values(id=2, name="new"))
+        assert await session.scalar(select(venues.c.name).where(venues.c.id == 2)) == "new"
+        await session.commit()
+
+    await primary.dispose()
+    await replica.dispose()
@@ -0,0 +1,51 @@
+"""Unit tests for request-scoped deadlines."""
+
+import time
+from unittest.mock import patch
+
+from app.deadline import Deadline, bind_deadline, current_deadline, stage_timeout
+
+
+def test_deadline_remaining_and_expiry():
+    """Test that remaining budget counts down and never goes negative."""
+    deadline = Deadline(0.05)
+    assert 0 < deadline.remaining() <= 0.05
+    assert not deadline.expired
+
+    time.sleep(0.06)
+
+    assert deadline.remaining() == 0.0
+    assert deadline.expired
+    assert deadline.timeout(cap=1.0) == 0.0
+
+
+def test_deadline_timeout_cap_and_reserve():
+    """Test that a stage timeout is capped and leaves the reserve untouched."""
+    deadline = Deadline(10.0)
+    assert deadline.timeout(cap=0.5) == 0.5
+    assert 8.9 < deadline.timeout(reserve=1.0) <= 9.0
+
+
+def test_deadline_from_header_defaults_and_clamps():
+    """Test default, explicit and clamped header budgets."""
+    with patch("app.deadline.settings") as mock_settings:
+        mock_settings.request_deadline_ms = 2000
+        mock_settings.request_deadline_max_ms = 5000
+
+        assert Deadline.from_header(None).budget_s == 2.0
+        assert Deadline.from_header(0).budget_s == 2.0
+        assert Deadline.from_header(300).budget_s == 0.3
+        assert Deadline.from_header(60000).budget_s == 5.0
+
+
+def test_bind_deadline_scopes_context():
+    """Test that the bound deadline is visible only inside the block."""
+    deadline = Deadline(1.0)
+    assert current_deadline() is None
+    assert stage_timeout(3.0) == 3.0
+
+    with bind_deadline(deadline):
+        assert current_deadline() is deadline
+        assert stage_timeout(3.0) <= 1.0
+
+    assert current_deadline() is None
@@ -0,0 +1,308 @@
+"""Unit tests for the enrichment queue, attribute scoring and batch pipeline."""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.enrichment import attributes
+from app.enrichment.attributes import (
+    VOCABULARY,
+    AttributeProfile,
+    score_attributes,
+    score_attributes_parallel,
+    term_counts,
+)
+from app.enrichment.pipeline import enrich_venues, upsert_profiles
+from app.models.venue import Venue
+from app.worker.queue import EnrichmentQueue, Priority
+
+
+class FakeSortedSetRedis:
+    """Minimal in-memory stand-in for the sorted-set commands the queue uses."""
+
+    def __init__(self):
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    async def zadd(self, name, mapping, lt=False, ch=False):
+        zset = self.zsets.setdefault(name, {})
+        changed = 0
+        for member, score in mapping.items():
+            if member not in zset or (lt and score < zset[member]):
+                zset[member] = score
+                changed += 1
+        return changed
+
+    async def zpopmin(self, name, count):
+        zset = self.zsets.get(name, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return [(member.encode(), score) for member, score in popped]
+
+    async def zcard(self, name):
+        return len(self.zsets.get(name, {}))
+
+
+# ============================================================================
+# EnrichmentQueue Tests
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_queue_deduplicates_venue_ids():
+    """Test that enqueuing the same venue twice keeps a single job."""
+    queue = EnrichmentQueue(redis=FakeSortedSetRedis())
+    venue_id = uuid.uuid4()
+
+    assert await queue.enqueue([venue_id]) == 1
+    assert await queue.enqueue([venue_id]) == 0
+    assert await queue.depth() == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_drains_higher_priority_lanes_first():
+    """Test that user-visible venues pop before normal and refresh work."""
+    queue = EnrichmentQueue(redis=FakeSortedSetRedis())
+    refresh, normal, visible = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    await queue.enqueue([refresh], Priority.REFRESH)
+    await queue.enqueue([normal], Priority.NORMAL)
+    await queue.enqueue([visible], Priority.USER_VISIBLE)
+
+    assert await queue.pop_batch(3) == [visible, normal, refresh]
+
+
+@pytest.mark.asyncio
+async def test_queue_promotes_but_never_demotes():
+    """Test that re-enqueuing at a higher priority promotes a pending venue."""
+    queue = EnrichmentQueue(redis=FakeSortedSetRedis())
+    first, promoted = uuid.uuid4(), uuid.uuid4()
+
+    await queue.enqueue([first, promoted], Priority.NORMAL)
+    assert await queue.enqueue([promoted], Priority.USER_VISIBLE) == 1
+    assert await queue.enqueue([first], Priority.REFRESH) == 0
+
+    assert await queue.pop_batch(2) == [promoted, first]
+
+
+@pytest.mark.asyncio
+async def test_queue_pop_batches_stops_when_dry():
+    """Test that batch popping returns full batches then the remainder."""
+    queue = EnrichmentQueue(redis=FakeSortedSetRedis())
+    await queue.enqueue([uuid.uuid4() for _ in range(5)])
+
+    batches = await queue.pop_batches(batch_size=2, max_batches=10)
+
+    assert [len(b) for _, b in batches] == [2, 2, 1]
+    assert await queue.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_pop_batches_never_mix_lanes():
+    """Test that batches are split at lane boundaries and tagged with their lane."""
+    queue = EnrichmentQueue(redis=FakeSortedSetRedis())
+    visible = [uuid.uuid4() for _ in range(3)]
+    refresh = [uuid.uuid4() for _ in range(3)]
+    await queue.enqueue(refresh, Priority.REFRESH)
+    await queue.enqueue(visible, Priority.USER_VISIBLE)
+
+    batches = await queue.pop_batches(batch_size=4, max_batches=10)
+
+    assert [(p, len(b)) for p, b in batches] == [
+        (Priority.USER_VISIBLE, 3),
+        (Priority.REFRESH, 3),  # the next pop fills the lane's short batch
+    ]
+    assert sorted(batches[0][1]) == sorted(visible)
+
+
+def test_drain_routes_batches_to_lane_queues():
+    """Test that each batch is sent to its lane's Celery queue."""
+    from app.worker import tasks
+
+    visible, refresh = uuid.uuid4(), uuid.uuid4()
+    queue = MagicMock()
+    queue.return_value.pop_batches = AsyncMock(
+        return_value=[(Priority.USER_VISIBLE, [visible]), (Priority.REFRESH, [refresh])]
+    )
+
+    with (
+        patch.object(tasks, "EnrichmentQueue", queue),
+        patch.object(tasks.enrich_venues_task, "apply_async") as apply_async,
+    ):
+        assert tasks.drain_enrichment_queue_task() == 2
+
+    assert [c.kwargs["queue"] for c in apply_async.call_args_list] == [
+        "enrich.user_visible",
+        "enrich.refresh",
+    ]
+    assert apply_async.call_args_list[0].kwargs["args"] == ([str(visible)],)
+
+
+# ============================================================================
+# Attribute Scoring Tests
+# ============================================================================
+
+
+def test_score_attributes_from_reviews():
+    """Test that keyword evidence moves scores and selects snippets."""
+    venue_id = uuid.uuid4()
+    reviews = {
+        venue_id: [
+            "Super quiet and peaceful, lots of outlets and fast wifi.",
+            "Brought my laptop, stayed all day working.",
+            "The pastries were fine.",
+        ]
+    }
+
+    profile = score_attributes(reviews)[venue_id]
+
+    assert profile.attribute_scores["quiet"] > 0.5
+    assert profile.attribute_scores["laptop_friendly"] > profile.attribute_scores["quiet"]
+    assert profile.attribute_scores["romantic"] == 0.5
+    assert profile.evidence_snippets["laptop_friendly"][0].startswith("Super quiet")
+    assert "The pastries were fine." not in profile.evidence_snippets["quiet"]
+    assert profile.evidence_snippets["romantic"] == []
+
+
+def test_score_attributes_negative_evidence():
+    """Test that negative keywords push a score below neutral."""
+    venue_id = uuid.uuid4()
+    profile = score_attributes({venue_id: ["Way too loud and noisy"]})[venue_id]
+
+    assert profile.attribute_scores["quiet"] < 0.5
+
+
+def test_score_attributes_no_reviews_is_neutral():
+    """Test that a venue without reviews gets neutral scores."""
+    venue_id = uuid.uuid4()
+    profile = score_attributes({venue_id: []})[venue_id]
+
+    assert set(profile.attribute_scores.values()) == {0.5}
+
+
+def test_term_counts_is_sparse_vocabulary_counts():
+    """Test that only vocabulary terms are counted, with repeats summed."""
+    matrix = term_counts(["quiet quiet cafe", "no keywords here", "wifi"])
+
+    assert matrix.shape == (3, len(VOCABULARY))
+    assert matrix[0, VOCABULARY["quiet"]] == 2
+    assert matrix[1].nnz == 0
+    assert matrix.nnz == 2
+
+
+def test_score_attributes_caps_evidence_per_attribute():
+    """Test that at most three snippets are kept, strongest first."""
+    venue_id = uuid.uuid4()
+    reviews = {venue_id: ["quiet", "quiet calm", "quiet calm peaceful", "calm", "quiet"]}
+
+    evidence = score_attributes(reviews)[venue_id].evidence_snippets["quiet"]
+
+    assert evidence == ["quiet calm peaceful", "quiet calm", "quiet"]
+
+
+def test_score_attributes_many_venues_are_independent():
+    """Test that batching venues together does not mix their evidence."""
+    reviews = {uuid.uuid4(): ["so romantic, candlelit"] if i % 2 else [] for i in range(10)}
+
+    profiles = score_attributes(reviews)
+
+    for i, venue_id in enumerate(reviews):
+        expected = ["so romantic, candlelit"] if i % 2 else []
+        assert profiles[venue_id].evidence_snippets["romantic"] == expected
+        assert (profiles[venue_id].attribute_scores["romantic"] > 0.5) == bool(i % 2)
+
+
+def test_score_attributes_parallel_matches_serial(monkeypatch):
+    """Test that process-pool scoring returns the same profiles as inline."""
+    monkeypatch.setattr(attributes, "PARALLEL_MIN_VENUES", 0)
+    reviews = {uuid.uuid4(): [f"quiet wifi {i}", "so loud" if i % 3 else "calm"] for i in range(40)}
+
+    parallel = score_attributes_parallel(reviews, workers=2, chunk_size=7)
+
+    assert parallel == score_attributes(reviews)
+
+
+# ============================================================================
+# Pipeline Tests
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_upsert_profiles_is_single_on_conflict_statement():
+    """Test that profiles are written with one bulk upsert keyed on venue_id."""
+    session = AsyncMock()
+    profiles = {
+        uuid.uuid4(): AttributeProfile({"quiet": 0.8}, {"quiet": ["calm"]}) for _ in range(3)
+    }
+
+    with (
+        patch("app.enrichment.pipeline.refresh_static_scores", AsyncMock()) as refresh,
+        patch("app.enrichment.pipeline.invalidate_venues", AsyncMock()) as invalidate,
+    ):
+        written = await upsert_profiles(session, profiles)
+
+    assert written == 3
+    refresh.assert_awaited_once_with(session, list(profiles))
+    invalidate.assert_awaited_once_with(list(profiles))
+    session.execute.assert_awaited_once()
+    sql = str(session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (venue_id) DO UPDATE" in sql
+    assert "attribute_scores = excluded.attribute_scores" in sql
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_upsert_profiles_empty_is_noop():
+    """Test that an empty batch issues no statement."""
+    session = AsyncMock()
+    assert await upsert_profiles(session, {}) == 0
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_enrich_venues_skips_failed_review_fetches():
+    """Test that venues whose reviews fail to load or parse keep their old profile."""
+    ok = Venue(id=uuid.uuid4(), provider_id="ok", provider_name="google", name="A", lat=0, lng=0)
+    bad = Venue(id=uuid.uuid4(), provider_id="bad", provider_name="google", name="B", lat=0, lng=0)
+    malformed, missing = (
+        Venue(id=uuid.uuid4(), provider_id=pid, provider_name="google", name=pid, lat=0, lng=0)
+        for pid in ("malformed", "missing")
+    )
+
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    session.execute.return_value.scalars.return_value.all.return_value = [
+        ok,
+        bad,
+        malformed,
+        missing,
+    ]
+
+    async def get_place_reviews(place_id, http_client=None):
+        if place_id == "bad":
+            raise httpx.ConnectError("down")
+        if place_id == "malformed":
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+        if place_id == "missing":
+            raise KeyError("reviews")
+        return ["quiet and calm"]
+
+    client = MagicMock()
+    client.get_place_reviews = get_place_reviews
+
+    other = uuid.uuid4()  # not a Google venue: filtered out by the query
+    with (
+        patch("app.enrichment.pipeline.upsert_profiles", AsyncMock(return_value=1)) as upsert,
+        patch("app.enrichment.pipeline.defer_refresh", AsyncMock()) as defer,
+    ):
+        written = await enrich_venues(
+            session, [ok.id, bad.id, malformed.id, missing.id, other], client=client
+        )
+
+    assert written == 1
+    profiles = upsert.call_args[0][1]
+    assert list(profiles) == [ok.id]
+    defer.assert_awaited_once_with(session, [bad.id, malformed.id, missing.id, other])
@@ -0,0 +1,152 @@
+"""Unit tests for the offline ranking evaluator."""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.user_event import Mode
+from app.ranking.evaluation import (
+    BASELINE,
+    Impressions,
+    ModeMetrics,
+    RankingConfig,
+    build_impressions,
+    evaluate,
+    evaluate_impressions,
+    format_report,
+    impressions_statement,
+)
+from app.ranking.features import FEATURE_INDEX, FEATURES
+from app.ranking.scoring import MODES
+
+T0 = datetime(2026, 10, 1, 12, tzinfo=UTC)
+
+
+def _row(user, seconds, venue_lat, gain=0.0, mode=Mode.WORK, rating=None, quiet=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        user_id=user,
+        created_at=T0 + timedelta(seconds=seconds),
+        mode=mode,
+        query_lat=37.7749,
+        query_lng=-122.4194,
+        radius=1000.0,
+        lat=venue_lat,
+        lng=-122.4194,
+        rating=rating,
+        price_level=None,
+        quiet=quiet,
+        laptop_friendly=None,
+        romantic=None,
+        gain=gain,
+    )
+
+
+def _metrics():
+    return {mode: ModeMetrics() for mode in MODES}
+
+
+def test_metrics_match_hand_computed_values():
+    """Test NDCG, MRR and CTR@k on two searches with known rankings."""
+    features = np.zeros((5, len(FEATURES)), dtype=np.float32)
+    features[:, FEATURE_INDEX["proximity"]] = [0.9, 0.5, 0.1, 0.8, 0.2]
+    impressions = Impressions(
+        query_ids=np.array([0, 0, 0, 1, 1]),
+        modes=np.full(5, MODES.index(Mode.QUICK_BITE)),
+        features=features,
+        gains=np.array([0, 1, 0, 0, 0], dtype=np.float32),  # search 1 has no positives
+    )
+    metrics = _metrics()
+
+    evaluate_impressions(impressions, BASELINE, k=2, metrics=metrics)
+
+    m = metrics[Mode.QUICK_BITE]
+    assert (m.queries, m.judged) == (2, 1)
+    assert m.ndcg == pytest.approx(1 / np.log2(3))  # the positive is ranked second
+    assert m.mrr == pytest.approx(0.5)
+    assert m.ctr == pytest.approx(1 / 4)  # 1 positive in 2 x 2 top slots
+    assert metrics[Mode.WORK].queries == 0
+
+
+def test_candidate_config_can_beat_baseline():
+    """Test that weights favoring the engaged feature score higher."""
+    rows = [
+        _row("u1", 0, 37.7750, rating=4.5, quiet=0.1),  # nearest
+        _row("u1", 1, 37.7800, rating=2.0, quiet=0.9, gain=2.0),
+        _row("u1", 2, 37.7760, rating=3.0, quiet=0.2),
+    ]
+    impressions = build_impressions(rows)
+    quiet = RankingConfig.from_mode_weights("quiet", {"work": {"quiet": 1.0}})
+    results = {"baseline": _metrics(), "quiet": _metrics()}
+
+    for config in (BASELINE, quiet):
+        evaluate_impressions(impressions, config, k=3, metrics=results[config.name])
+
+    assert results["quiet"][Mode.WORK].ndcg == pytest.approx(1.0)
+    assert results["baseline"][Mode.WORK].ndcg < 1.0
+    assert "ndcg@3" in format_report(results, k=3)
+    with pytest.raises(ValueError):
+        RankingConfig.from_mode_weights("bad", {"work": {"loud": 1.0}})
+
+
+def test_build_impressions_splits_searches():
+    """Test search boundaries on user, mode and time gaps, and neutral missing data."""
+    rows = [
+        _row("u1", 0, 37.775),
+        _row("u1", 10, 37.776),
+        _row("u1", 500, 37.775),  # gap: a new search
+        _row("u1", 501, 37.775, mode=Mode.DATE),
+        _row("u2", 501, 37.775, mode=Mode.DATE),
+    ]
+
+    impressions = build_impressions(rows)
+
+    assert impressions.query_ids.tolist() == [0, 0, 1, 2, 3]
+    assert impressions.features[0, FEATURE_INDEX["rating"]] == pytest.approx(0.5)
+    assert 0 < impressions.features[1, FEATURE_INDEX["proximity"]] < 1
+
+
+@pytest.mark.asyncio
+async def test_evaluate_streams_chunks_without_splitting_searches(make_session_factory):
+    """Test that chunked evaluation matches evaluating the whole log at once."""
+    rng = np.random.default_rng(7)
+    rows = [
+        _row(
+            f"u{i // 6}",
+            i,
+            37.7749 + float(rng.uniform(0, 0.01)),
+            gain=float(rng.integers(0, 2)),
+            mode=MODES[(i // 6) % len(MODES)],
+            rating=float(rng.uniform(1, 5)),
+        )
+        for i in range(30)
+    ]
+    chunks = [rows[i : i + 4] for i in range(0, len(rows), 4)] + [[]]
+    session = AsyncMock()
+    session.execute.side_effect = chunks
+    factory = make_session_factory(session)
+
+    streamed = await evaluate(factory, [BASELINE], k=3, chunk_size=4)
+    whole = _metrics()
+    evaluate_impressions(build_impressions(rows), BASELINE, k=3, metrics=whole)
+
+    assert session.execute.await_count == len(chunks) - 1
+    for mode in MODES:
+        assert streamed["baseline"][mode] == whole[mode]
+
+
+def test_impressions_statement_uses_keyset_and_labels():
+    """Test the chunk query's shape."""
+    stmt = impressions_statement(
+        T0 - timedelta(days=1), T0, after=("u1", T0, uuid.uuid4()), limit=100
+    )
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "(user_events.user_id, user_events.created_at, user_events.id) >" in sql
+    assert "max(CASE" in sql
+    assert "ORDER BY user_events.user_id, user_events.created_at, user_events.id" in sql
@@ -0,0 +1,113 @@
+"""Unit tests for ingest-side impression deduplication and sampling."""
+
+import uuid
+from itertools import cycle
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.events import EventIngestor, IngestQueueFull
+from app.events.sampling import WindowedBloomFilter, dedup_key, parse_sample_rates
+from app.models.user_event import EventType, Mode
+from app.schemas.venue import UserEventCreate
+
+VENUE = uuid.uuid4()
+
+
+def _impression(user="u1", venue=VENUE, **context):
+    return UserEventCreate(
+        user_id=user,
+        event_type=EventType.IMPRESSION,
+        venue_id=venue,
+        mode=Mode.WORK,
+        query_context={"tile": "9q8yy", "radius": 1000, **context},
+    )
+
+
+def test_bloom_filter_remembers_keys_for_one_to_two_windows():
+    """Test repeat detection, rotation and expiry."""
+    now = [0.0]
+    bloom = WindowedBloomFilter(capacity=1000, window_s=60, clock=lambda: now[0])
+
+    assert not bloom.add("a")
+    assert bloom.add("a")
+    assert "b" not in bloom
+    assert not bloom.add("b")
+    now[0] = 90  # rotated: "a" is in the previous generation
+    assert bloom.add("a")
+    now[0] = 250  # two windows idle: everything expired
+    assert not bloom.add("a")
+
+
+def test_bloom_filter_false_positive_rate_at_capacity():
+    """Test that a full filter stays near its target error rate."""
+    bloom = WindowedBloomFilter(capacity=10_000, window_s=60, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"seen-{i}")
+
+    false_positives = sum(f"new-{i}" in bloom for i in range(10_000))
+
+    assert false_positives < 200
+    assert bloom.size_bits < 10_000 * 10  # ~9.6 bits per key at 1%
+
+
+def test_dedup_key_covers_user_venue_and_search():
+    """Test which events are deduplicated and what makes two impressions equal."""
+    assert dedup_key(_impression()) == dedup_key(_impression())
+    assert dedup_key(_impression()) != dedup_key(_impression(tile="9q8yz"))
+    assert dedup_key(_impression()) != dedup_key(_impression(user="u2"))
+    assert dedup_key(_impression(search_id="s1")) != dedup_key(_impression(search_id="s2"))
+    assert dedup_key(_impression(user=None)) is None
+    click = UserEventCreate(user_id="u1", event_type=EventType.CLICK, venue_id=VENUE)
+    assert dedup_key(click) is None
+
+
+def test_parse_sample_rates():
+    """Test the settings format and its validation."""
+    assert parse_sample_rates("") == {}
+    assert parse_sample_rates("impression=0.1, click=1") == {
+        EventType.IMPRESSION: 0.1,
+        EventType.CLICK: 1.0,
+    }
+    with pytest.raises(ValueError):
+        parse_sample_rates("impression=0")
+    with pytest.raises(ValueError):
+        parse_sample_rates("hover=0.5")
+    with pytest.raises(ValueError, match="cannot be sampled"):
+        parse_sample_rates("impression=0.1,click=0.5")
+
+
+def test_ingestor_drops_repeats_and_weights_sampled_events():
+    """Test dedup before sampling and 1/rate weights on kept events."""
+    ingestor = EventIngestor(
+        session_factory=MagicMock(),
+        store=MagicMock(),
+        max_queued=100,
+        dedup_window_s=60,
+        sample_rates={EventType.IMPRESSION: 0.25},
+        rng=cycle([0.1, 0.9]).__next__,  # keep every other impression
+    )
+    venues = [uuid.uuid4() for _ in range(4)]
+    impressions = [_impression(venue=v) for v in venues]
+    click = UserEventCreate(user_id="u1", event_type=EventType.CLICK, venue_id=venues[0])
+
+    accepted = ingestor.submit(impressions + impressions + [click])
+
+    queued = ingestor._drain(100)
+    assert accepted == 9
+    assert [q.event.venue_id for q in queued] == [venues[0], venues[2], venues[0]]
+    assert [q.sample_weight for q in queued] == [4.0, 4.0, 1.0]
+
+
+def test_rejected_batches_are_not_remembered():
+    """Test that a batch refused for a full queue is not deduplicated on resend."""
+    ingestor = EventIngestor(
+        session_factory=MagicMock(), store=MagicMock(), max_queued=1, dedup_window_s=60
+    )
+    batch = [_impression(venue=uuid.uuid4()), _impression(venue=uuid.uuid4())]
+
+    with pytest.raises(IngestQueueFull):
+        ingestor.submit(batch)
+    ingestor.submit(batch[:1])
+
+    assert ingestor.depth == 1
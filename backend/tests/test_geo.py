@@ -0,0 +1,118 @@
+"""Unit tests for distance and vectorized geohash helpers."""
+
+import numpy as np
+import pytest
+
+from app.geo import (
+    bbox_cells,
+    cell_size_deg,
+    cells_to_geohashes,
+    covering_cells,
+    decode_cells,
+    encode_cells,
+    geohash_decode_array,
+    geohash_encode,
+    geohash_encode_array,
+    geohashes_to_cells,
+    haversine_m,
+    haversine_m_array,
+    neighbor_cells,
+)
+
+SF = (37.7749, -122.4194)
+
+
+def _points(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-90, 90, n), rng.uniform(-180, 180, n)
+
+
+@pytest.mark.parametrize("precision", [1, 5, 6, 9, 12])
+def test_vectorized_encode_matches_scalar(precision):
+    """Test that array encoding agrees with the scalar encoder at every precision."""
+    lats, lngs = _points()
+    expected = [geohash_encode(a, b, precision) for a, b in zip(lats, lngs, strict=True)]
+    assert geohash_encode_array(lats, lngs, precision).tolist() == expected
+
+
+def test_encode_handles_bounds():
+    """Test the extreme corners of the coordinate range."""
+    assert geohash_encode_array([90.0, -90.0], [180.0, -180.0], 5).tolist() == ["zzzzz", "00000"]
+
+
+def test_string_and_cell_round_trip():
+    """Test that cell ids and geohash strings convert losslessly."""
+    lats, lngs = _points()
+    cells = encode_cells(lats, lngs, 7)
+    np.testing.assert_array_equal(geohashes_to_cells(cells_to_geohashes(cells, 7)), cells)
+    assert geohashes_to_cells(["9Q8YY"])[0] == geohashes_to_cells(["9q8yy"])[0]
+
+
+def test_decode_returns_cell_centers_containing_points():
+    """Test that decoded centers are within half a cell of the encoded points."""
+    lats, lngs = _points()
+    centers_lat, centers_lng = decode_cells(encode_cells(lats, lngs, 6), 6)
+    lat_size, lng_size = cell_size_deg(6)
+    assert np.all(np.abs(centers_lat - lats) <= lat_size / 2)
+    assert np.all(np.abs(centers_lng - lngs) <= lng_size / 2)
+
+    lat, lng = geohash_decode_array(["u4pruydqqvj"])
+    assert lat[0] == pytest.approx(57.64911, abs=1e-5)
+    assert lng[0] == pytest.approx(10.40744, abs=1e-5)
+
+
+def test_invalid_geohashes_are_rejected():
+    """Test validation of alphabet, lengths and precision."""
+    with pytest.raises(ValueError, match="character"):
+        geohashes_to_cells(["9q8ya"])
+    with pytest.raises(ValueError, match="same length"):
+        geohashes_to_cells(["9q8yy", "9q8y"])
+    with pytest.raises(ValueError, match="same length"):
+        geohashes_to_cells(["9q8", "9q8yy"])  # longer than the first: would be truncated
+    with pytest.raises(ValueError, match="precision"):
+        encode_cells([0.0], [0.0], 13)
+
+
+def test_neighbors_form_three_by_three_block():
+    """Test neighbors against known values, including the antimeridian wrap."""
+    block = cells_to_geohashes(neighbor_cells(geohashes_to_cells(["9q8yy"]), 5), 5)
+    assert block.reshape(3, 3).tolist() == [
+        ["9q8yt", "9q8yw", "9q8yx"],
+        ["9q8yv", "9q8yy", "9q8yz"],
+        ["9q8zj", "9q8zn", "9q8zp"],
+    ]
+    east_edge = geohashes_to_cells([geohash_encode(0.01, 179.99, 5)])
+    wrapped = cells_to_geohashes(neighbor_cells(east_edge, 5), 5)
+    assert geohash_encode(0.01, -179.99, 5) in wrapped
+
+
+def test_bbox_covering_crosses_antimeridian():
+    """Test that a box with min_lng > max_lng spans the antimeridian."""
+    cells = cells_to_geohashes(bbox_cells(0.0, 179.99, 0.01, -179.99, 5), 5)
+    assert sorted(cells.tolist()) == sorted(
+        [geohash_encode(0.005, 179.995, 5), geohash_encode(0.005, -179.995, 5)]
+    )
+    with pytest.raises(ValueError, match="cells"):
+        bbox_cells(-10, -10, 10, 10, 6, max_cells=100)
+
+
+def test_circle_covering_contains_every_point_in_radius():
+    """Test that the covering includes the cell of every point inside the circle."""
+    rng = np.random.default_rng(1)
+    lats = SF[0] + rng.uniform(-0.03, 0.03, 5000)
+    lngs = SF[1] + rng.uniform(-0.04, 0.04, 5000)
+    inside = haversine_m_array(SF[0], SF[1], lats, lngs) <= 2000
+    covering = set(covering_cells(*SF, 2000, 6).tolist())
+
+    assert set(encode_cells(lats[inside], lngs[inside], 6).tolist()) <= covering
+    # Corner cells of the bounding box are dropped.
+    assert len(covering) < len(
+        bbox_cells(SF[0] - 0.018, SF[1] - 0.023, SF[0] + 0.018, SF[1] + 0.023, 6)
+    )
+
+
+def test_haversine_array_matches_scalar():
+    """Test that vectorized distances broadcast and match the scalar formula."""
+    lats, lngs = _points(100)
+    expected = [haversine_m(*SF, a, b) for a, b in zip(lats, lngs, strict=True)]
+    np.testing.assert_allclose(haversine_m_array(*SF, lats, lngs), expected, rtol=1e-9)
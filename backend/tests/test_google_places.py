@@ -284,3 +284,28 @@ class TestGooglePlacesClient:
         assert venue.hours is not None
         assert venue.hours["open_now"] is False
         assert "Monday: 9:00 AM – 6:00 PM" in venue.hours["weekday_text"]
+
+    @pytest.mark.asyncio
+    async def test_get_place_reviews(self):
+        """Test fetching review texts via Place Details."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "reviews": [
+                {"text": {"text": "Quiet spot with plenty of outlets", "languageCode": "en"}},
+                {"rating": 4},  # Rating-only review has no text
+                {"text": {"text": "Great for a date night"}},
+            ]
+        }
+        mock_response.raise_for_status = MagicMock()
+
+        http_client = AsyncMock()
+        http_client.get = AsyncMock(return_value=mock_response)
+
+        client = GooglePlacesClient(api_key="test_key")
+        reviews = await client.get_place_reviews("place123", http_client=http_client)
+
+        assert reviews == ["Quiet spot with plenty of outlets", "Great for a date night"]
+        url = http_client.get.call_args[0][0]
+        headers = http_client.get.call_args[1]["headers"]
+        assert url.endswith("/places/place123")
+        assert headers["X-Goog-FieldMask"] == "reviews"
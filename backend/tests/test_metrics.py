@@ -0,0 +1,113 @@
+"""Unit tests for Prometheus metrics and timing helpers."""
+
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.db.session import TimedQueuePool, engine
+from app.main import app
+from app.observability import observe_duration, record_cache, timed
+from app.observability.metrics import (
+    CACHE_REQUESTS,
+    PROVIDER_REQUEST_DURATION,
+    RANKING_DURATION,
+    MetricsMiddleware,
+)
+
+
+def _count(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(f"{name}_count", labels) or 0.0
+
+
+def test_metrics_endpoint_exposes_collectors():
+    """Test that /metrics serves the text exposition format."""
+    client = TestClient(app)
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in (
+        "modemap_http_request_duration_seconds",
+        "modemap_provider_request_duration_seconds",
+        "modemap_db_pool_checkout_wait_seconds",
+        "modemap_event_ingest_queue_depth",
+    ):
+        assert name in response.text
+
+
+def test_middleware_labels_by_route_template():
+    """Test that request latency is labeled by route template and status."""
+    labels = {"method": "GET", "route": "/health", "status": "200"}
+    before = _count("modemap_http_request_duration_seconds", **labels)
+
+    TestClient(app).get("/health")
+
+    assert _count("modemap_http_request_duration_seconds", **labels) == before + 1
+
+
+def test_middleware_excludes_background_tasks():
+    """Test that latency stops at the last body chunk, before background tasks."""
+    background_app = FastAPI()
+    background_app.add_middleware(MetricsMiddleware)
+
+    @background_app.get("/background")
+    async def with_background(tasks: BackgroundTasks):
+        tasks.add_task(asyncio.sleep, 0.3)
+        return {}
+
+    labels = {"method": "GET", "route": "/background", "status": "200"}
+    before = REGISTRY.get_sample_value("modemap_http_request_duration_seconds_sum", labels) or 0
+
+    TestClient(background_app).get("/background")
+
+    after = REGISTRY.get_sample_value("modemap_http_request_duration_seconds_sum", labels)
+    assert _count("modemap_http_request_duration_seconds", **labels) == 1
+    assert after - before < 0.3
+
+
+def test_observe_duration_fills_labels_late():
+    """Test that labels set inside the block are used for the observation."""
+    labels = {"provider": "test", "sku": "sku", "status": "503"}
+    before = _count("modemap_provider_request_duration_seconds", **labels)
+
+    with observe_duration(
+        PROVIDER_REQUEST_DURATION, provider="test", sku="sku", status="error"
+    ) as current:
+        current["status"] = "503"
+
+    assert _count("modemap_provider_request_duration_seconds", **labels) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_timed_decorator_sync_and_async():
+    """Test that the decorator records sync and async calls."""
+    labels = {"mode": "timed-test"}
+    before = _count("modemap_ranking_duration_seconds", **labels)
+
+    @timed(RANKING_DURATION, **labels)
+    def work():
+        return 1
+
+    @timed(RANKING_DURATION, **labels)
+    async def async_work():
+        await asyncio.sleep(0)
+        return 2
+
+    assert work() == 1
+    assert await async_work() == 2
+    assert _count("modemap_ranking_duration_seconds", **labels) == before + 2
+
+
+def test_record_cache():
+    """Test cache hit/miss/stale counting."""
+    before = CACHE_REQUESTS.labels(cache="test", result="stale")._value.get()
+    record_cache("test", "stale")
+    assert CACHE_REQUESTS.labels(cache="test", result="stale")._value.get() == before + 1
+
+
+def test_engine_uses_timed_pool():
+    """Test that the engine's pool records checkout waits."""
+    assert isinstance(engine.pool, TimedQueuePool)
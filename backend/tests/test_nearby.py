@@ -0,0 +1,569 @@
+"""Unit tests for the deadline-bounded nearby search service and endpoint."""
+
+import asyncio
+import uuid
+from dataclasses import replace
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache.invalidation import invalidate, venue_tag
+from app.config import settings
+from app.deadline import Deadline
+from app.main import app
+from app.models.user_event import Mode
+from app.providers import CachedPlacesProvider, StubPlacesProvider
+from app.schemas.venue import VenueCreate, VenueWithProfile
+from app.services.nearby import NearbyQuery, compare_modes, search_nearby_venues
+from app.services.results import (
+    Cursor,
+    InvalidCursor,
+    SearchExpired,
+    rerank,
+    search_batch,
+    search_nearby_page,
+)
+
+
+def _venue(provider_id, lat=37.7749, lng=-122.4194, **kwargs):
+    return VenueCreate(
+        provider_id=provider_id,
+        provider_name="stub",
+        name=f"Venue {provider_id}",
+        lat=lat,
+        lng=lng,
+        **kwargs,
+    )
+
+
+def _known(provider_id, lat, **kwargs):
+    return VenueWithProfile(
+        id=uuid.uuid4(),
+        provider_id=provider_id,
+        provider_name="google",
+        name=provider_id,
+        categories=[],
+        lat=lat,
+        lng=-122.4194,
+        address=None,
+        rating=None,
+        price_level=None,
+        hours=None,
+        raw_hours=None,
+        last_seen_at=NOW,
+        created_at=NOW,
+        updated_at=NOW,
+        **kwargs,
+    )
+
+
+def _caches(make_cache):
+    return {"results": make_cache("ranked"), "searches": make_cache("search")}
+
+
+NOW = datetime(2026, 10, 1, tzinfo=UTC)
+
+QUERY = NearbyQuery(lat=37.7749, lng=-122.4194, radius_m=1000, mode=Mode.WORK, limit=5)
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_with_profiles(make_session_factory):
+    """Test that profiled attributes feed into the mode ranking."""
+    provider = StubPlacesProvider(venues=[_venue("plain"), _venue("workspace")])
+    profiles = {"workspace": (uuid.uuid4(), {"laptop_friendly": 0.95, "quiet": 0.9})}
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value=profiles)):
+        response = await search_nearby_venues(
+            QUERY, [provider], Deadline(2.0), session_factory=make_session_factory()
+        )
+
+    assert not response.degraded
+    assert [v.provider_id for v in response.venues] == ["workspace", "plain"]
+    assert response.venues[0].attribute_scores == profiles["workspace"][1]
+    assert response.venues[0].score > response.venues[1].score
+
+
+@pytest.mark.asyncio
+async def test_search_degrades_when_provider_is_slow(make_session_factory):
+    """Test that a slow provider is dropped within the budget and flagged."""
+    fast = StubPlacesProvider(venues=[_venue("fast")])
+    slow = StubPlacesProvider(name="slow", latency_s=5.0)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        response = await search_nearby_venues(
+            QUERY, [fast, slow], Deadline(0.3), session_factory=make_session_factory()
+        )
+
+    assert loop.time() - started < 0.3
+    assert response.degraded
+    assert [v.provider_id for v in response.venues] == ["fast"]
+
+
+@pytest.mark.asyncio
+async def test_search_degrades_when_db_is_slow(make_session_factory):
+    """Test that a slow profile lookup is abandoned and ranking still happens."""
+    provider = StubPlacesProvider(venues=[_venue("a")])
+
+    async def slow_lookup(session, provider_ids):
+        await asyncio.sleep(5)
+
+    with patch("app.services.nearby.load_attribute_scores", slow_lookup):
+        response = await search_nearby_venues(
+            QUERY, [provider], Deadline(0.3), session_factory=make_session_factory()
+        )
+
+    assert response.degraded
+    assert response.venues[0].score is not None
+    assert response.venues[0].attribute_scores is None
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_static_scores_when_providers_fail(make_session_factory):
+    """Test that a provider outage serves the region's best known venues."""
+    best, second, far = _known("best", 37.775), _known("second", 37.776), _known("far", 37.80)
+    top = [(best.id, 0.9), (far.id, 0.8), (second.id, 0.7)]
+    down = StubPlacesProvider(name="down")
+    down.search_nearby = AsyncMock(side_effect=RuntimeError("upstream unavailable"))
+
+    with (
+        patch("app.services.nearby.top_static_candidates", AsyncMock(return_value=top)),
+        patch(
+            "app.services.nearby.get_venues_with_profiles",
+            AsyncMock(return_value=[second, far, best]),
+        ),
+    ):
+        response = await search_nearby_venues(
+            QUERY, [down], Deadline(2.0), session_factory=make_session_factory()
+        )
+
+    assert response.degraded
+    assert {v.provider_id for v in response.venues} == {"best", "second"}
+
+
+@pytest.mark.asyncio
+async def test_search_returns_unranked_when_budget_exhausted(make_session_factory):
+    """Test that an exhausted budget skips ranking but still returns venues."""
+    provider = StubPlacesProvider(venues=[_venue("a"), _venue("b")])
+
+    response = await search_nearby_venues(
+        QUERY, [provider], Deadline(0.0), session_factory=make_session_factory()
+    )
+
+    assert response.degraded
+    assert all(v.score is None for v in response.venues)
+
+
+def test_nearby_endpoint_uses_deadline_header():
+    """Test the endpoint end to end with the stub provider."""
+    client = TestClient(app)
+
+    with (
+        patch("app.providers.registry.settings") as mock_settings,
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+    ):
+        mock_settings.places_providers = "stub"
+        response = client.get(
+            "/venues/nearby",
+            params={"lat": 37.7749, "lng": -122.4194, "mode": "budget", "limit": 5},
+            headers={"X-Deadline-Ms": "1500"},
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "budget"
+    assert body["count"] == 5
+    assert body["degraded"] is False
+    scores = [v["score"] for v in body["venues"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_nearby_endpoint_validates_params():
+    """Test query parameter validation."""
+    client = TestClient(app)
+    response = client.get("/venues/nearby", params={"lat": 95, "lng": 0})
+    assert response.status_code == 422
+    assert client.get("/venues/nearby", params={"lat": 37.7}).status_code == 422
+    assert client.get("/venues/nearby", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_page_cursors_read_one_cached_ranking(make_cache, make_session_factory):
+    """Test that later pages slice the cached ranking without searching again."""
+    provider = StubPlacesProvider(
+        venues=[_venue(str(i), lat=37.7749 + i * 0.001, rating=i / 2) for i in range(7)]
+    )
+    provider.search_nearby = AsyncMock(wraps=provider.search_nearby)
+    caches = _caches(make_cache)
+    position = Cursor(replace(QUERY, limit=3, mode=Mode.DATE), bucket=1)
+    pages = []
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        while position is not None:
+            page, hit = await search_nearby_page(
+                position, [provider], Deadline(2.0), make_session_factory(), **caches
+            )
+            pages.append((page, hit))
+            position = page.next_cursor and Cursor.decode(page.next_cursor, limit=3)
+
+    assert [hit for _, hit in pages] == [False, True, True]
+    assert [v.provider_id for page, _ in pages for v in page.venues] == [
+        "6",
+        "5",
+        "4",
+        "3",
+        "2",
+        "1",
+        "0",
+    ]
+    provider.search_nearby.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_page_recenters_distances_and_skips_caching_degraded_results(
+    make_cache, make_session_factory
+):
+    """Test per-caller distances on shared rankings and no caching of degraded ones."""
+    provider = StubPlacesProvider(venues=[_venue("a")])
+    caches = _caches(make_cache)
+    first = Cursor(QUERY, bucket=1)
+    nearby = Cursor(replace(QUERY, lat=QUERY.lat + 0.0002), bucket=1)  # same tile
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        await search_nearby_page(first, [provider], Deadline(2.0), make_session_factory(), **caches)
+        page, hit = await search_nearby_page(
+            nearby, [provider], Deadline(2.0), make_session_factory(), **caches
+        )
+        degraded, _ = await search_nearby_page(
+            Cursor(QUERY, bucket=2), [provider], Deadline(0.0), make_session_factory(), **caches
+        )
+
+    assert hit
+    assert page.venues[0].distance_m == pytest.approx(22.2, abs=0.2)
+    assert degraded.degraded
+    assert await caches["results"].get(Cursor(QUERY, bucket=2).key) is None
+
+
+@pytest.mark.asyncio
+async def test_degraded_first_pages_have_no_cursor(make_cache, make_session_factory):
+    """Test that a ranking that was not cached is not offered for paging."""
+    provider = StubPlacesProvider(venues=[_venue(str(i)) for i in range(5)])
+    slow = StubPlacesProvider(name="slow", latency_s=5.0)
+    caches = _caches(make_cache)
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        page, _ = await search_nearby_page(
+            Cursor(replace(QUERY, limit=2), bucket=1),
+            [provider, slow],
+            Deadline(0.3),
+            make_session_factory(),
+            **caches,
+        )
+
+    assert page.degraded
+    assert page.count == 2
+    assert page.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_profile_writes_invalidate_rankings_that_used_them(make_cache, make_session_factory):
+    """Test that result sets are tagged with the profiled candidates' venues."""
+    provider = StubPlacesProvider(venues=[_venue("profiled"), _venue("plain")])
+    caches = _caches(make_cache)
+    venue_id = uuid.uuid4()
+    profiles = {"profiled": (venue_id, {"quiet": 0.9})}
+    cursor = Cursor(QUERY, bucket=1)
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value=profiles)):
+        first, _ = await search_nearby_page(
+            cursor, [provider], Deadline(2.0), make_session_factory(), **caches
+        )
+        for cache in caches.values():
+            await invalidate(tags=[venue_tag(venue_id)], redis=cache.redis, local=cache.local)
+        _, hit = await search_nearby_page(
+            cursor, [provider], Deadline(2.0), make_session_factory(), **caches
+        )
+
+    assert not hit
+    assert await caches["searches"].get(first.search_id) is None
+
+
+def test_cursor_round_trips_and_rejects_tampering():
+    """Test that cursors decode to the same position and bad tokens raise."""
+    cursor = Cursor(
+        replace(QUERY, price_level=2, open_now=True, min_results=30), bucket=42, offset=20
+    )
+    decoded = Cursor.decode(cursor.encode(), limit=QUERY.limit)
+
+    assert decoded == cursor
+    with pytest.raises(InvalidCursor):
+        Cursor.decode("AAAA")
+    tampered = Cursor(replace(QUERY, lat=0.0), bucket=1, offset=-5).encode()
+    with pytest.raises(InvalidCursor):
+        Cursor.decode(tampered)
+
+
+def test_nearby_endpoint_pages_with_cursor():
+    """Test following next_cursor through the endpoint."""
+    client = TestClient(app)
+
+    with (
+        patch("app.providers.registry.settings") as mock_settings,
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+    ):
+        mock_settings.places_providers = "stub"
+        first = client.get("/venues/nearby", params={"lat": 37.7749, "lng": -122.4194, "limit": 5})
+        second = client.get(
+            "/venues/nearby", params={"cursor": first.json()["next_cursor"], "limit": 5}
+        )
+
+    assert first.headers["x-cache"] == "miss"  # caching is off in tests
+    assert second.status_code == 200
+    first_ids = {v["provider_id"] for v in first.json()["venues"]}
+    second_ids = {v["provider_id"] for v in second.json()["venues"]}
+    assert len(second_ids) == 5
+    assert not first_ids & second_ids
+
+
+@pytest.mark.asyncio
+async def test_rerank_rescores_cached_candidates(make_cache, make_session_factory):
+    """Test that a search ID re-ranks its candidates without searching again."""
+    provider = StubPlacesProvider(
+        venues=[_venue("near"), _venue("quiet", lat=37.7769)]  # ~220 m away
+    )
+    provider.search_nearby = AsyncMock(wraps=provider.search_nearby)
+    caches = _caches(make_cache)
+    profiles = {"near": (uuid.uuid4(), {"quiet": 0.1}), "quiet": (uuid.uuid4(), {"quiet": 0.9})}
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value=profiles)):
+        page, _ = await search_nearby_page(
+            Cursor(replace(QUERY, mode=Mode.QUICK_BITE), bucket=1),
+            [provider],
+            Deadline(2.0),
+            make_session_factory(),
+            **caches,
+        )
+    reranked = await rerank(page.search_id, {"quiet": 1.0}, searches=caches["searches"])
+
+    assert [v.provider_id for v in page.venues] == ["near", "quiet"]
+    assert [v.provider_id for v in reranked.venues] == ["quiet", "near"]
+    assert reranked.venues[0].score == pytest.approx(0.9)
+    assert reranked.mode == Mode.QUICK_BITE
+    assert reranked.venues[0].attribute_scores == {"quiet": 0.9}
+    provider.search_nearby.assert_awaited_once()
+    with pytest.raises(SearchExpired):
+        await rerank("unknown", {"quiet": 1.0}, searches=caches["searches"])
+
+
+@pytest.mark.asyncio
+async def test_rerank_of_an_empty_search_is_empty(make_cache, make_session_factory):
+    """Test that a search without candidates re-ranks to an empty response."""
+    caches = _caches(make_cache)
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        page, _ = await search_nearby_page(
+            Cursor(QUERY, bucket=1),
+            [StubPlacesProvider(venues=[])],
+            Deadline(2.0),
+            make_session_factory(),
+            **caches,
+        )
+    reranked = await rerank(page.search_id, {"quiet": 1.0}, searches=caches["searches"])
+
+    assert page.count == 0
+    assert reranked.count == 0
+    assert reranked.venues == []
+
+
+def test_rerank_endpoint_maps_errors():
+    """Test 404 for unknown searches and 422 for invalid or non-finite weights."""
+    client = TestClient(app)
+
+    missing = client.post("/venues/rerank", json={"search_id": "x", "weights": {"quiet": 1}})
+    invalid = client.post("/venues/rerank", json={"search_id": "x", "weights": {"loud": 1}})
+    non_finite = [
+        client.post(
+            "/venues/rerank",
+            content=f'{{"search_id": "x", "weights": {{"quiet": {weight}}}}}',
+            headers={"Content-Type": "application/json"},
+        )
+        for weight in ("NaN", "Infinity")
+    ]
+
+    assert missing.status_code == 404
+    assert invalid.status_code == 422
+    assert [r.status_code for r in non_finite] == [422, 422]
+
+
+@pytest.mark.asyncio
+async def test_compare_modes_ranks_one_candidate_set_for_every_mode(make_session_factory):
+    """Test that all modes match single-mode searches from one provider call."""
+    provider = StubPlacesProvider(density=30, seed=3)
+    provider.search_nearby = AsyncMock(wraps=provider.search_nearby)
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        comparison = await compare_modes(QUERY, [provider], Deadline(2.0), make_session_factory())
+        provider.search_nearby.assert_awaited_once()
+        singles = {
+            mode: await search_nearby_venues(
+                replace(QUERY, mode=mode), [provider], Deadline(2.0), make_session_factory()
+            )
+            for mode in Mode
+        }
+
+    assert [r.mode for r in comparison.rankings] == list(Mode)
+    ids = [v.provider_id for v in comparison.venues]
+    assert len(ids) == len(set(ids))
+    for ranking in comparison.rankings:
+        single = singles[ranking.mode]
+        assert [ids[i] for i in ranking.venues] == [v.provider_id for v in single.venues]
+        assert ranking.scores == [v.score for v in single.venues]
+
+
+def test_nearby_modes_endpoint_shares_venue_payloads():
+    """Test the all-modes endpoint end to end with the stub provider."""
+    client = TestClient(app)
+
+    with (
+        patch("app.providers.registry.settings") as mock_settings,
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+    ):
+        mock_settings.places_providers = "stub"
+        response = client.get(
+            "/venues/nearby/modes", params={"lat": 37.7749, "lng": -122.4194, "limit": 5}
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["mode"] for r in body["rankings"]] == [m.value for m in Mode]
+    assert all(len(r["venues"]) == 5 for r in body["rankings"])
+    assert len(body["venues"]) < 5 * len(Mode)  # modes share some venues
+
+
+@pytest.mark.asyncio
+async def test_batch_shares_retrieval_within_a_tile_and_keeps_order(
+    make_cache, make_session_factory
+):
+    """Test one provider call per tile group, cache reuse and input-order results."""
+    provider = StubPlacesProvider(density=20, seed=5)
+    provider.search_nearby = AsyncMock(wraps=provider.search_nearby)
+    caches = _caches(make_cache)
+    elsewhere = replace(QUERY, lat=40.7128, lng=-74.006)
+    queries = [
+        replace(QUERY, mode=Mode.DATE),
+        elsewhere,
+        QUERY,
+        replace(QUERY, lat=QUERY.lat + 0.0002),  # same tile and mode as QUERY
+    ]
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        pages = await search_batch(
+            queries, [provider], Deadline(2.0), make_session_factory(), concurrency=1, **caches
+        )
+        assert provider.search_nearby.await_count == 2
+        singles = [
+            await search_nearby_venues(q, [provider], Deadline(2.0), make_session_factory())
+            for q in queries[:3]
+        ]
+        again = await search_batch(queries, [provider], Deadline(2.0), **caches)
+
+    assert [p.mode for p in pages] == [q.mode for q in queries]
+    assert pages[2].search_id == pages[3].search_id
+    assert pages[1].venues[0].lat == pytest.approx(40.7128, abs=0.05)
+    for page, single in zip(pages, singles, strict=False):
+        assert [v.provider_id for v in page.venues] == [v.provider_id for v in single.venues]
+    assert [p.search_id for p in again] == [p.search_id for p in pages]
+    assert provider.search_nearby.await_count == 2 + len(singles)
+
+
+@pytest.mark.asyncio
+async def test_batch_static_fallback_is_chosen_per_mode(make_cache, make_session_factory):
+    """Test that a tile's provider outage serves each mode its own best venues."""
+    cafe, bar = _known("cafe", 37.775), _known("bar", 37.775)
+    best = {Mode.WORK: cafe, Mode.DATE: bar}
+    down = StubPlacesProvider(name="down")
+    down.search_nearby = AsyncMock(side_effect=RuntimeError("upstream unavailable"))
+
+    async def top_static_candidates(session, mode, cells, limit):
+        return [(best[mode].id, 0.9)]
+
+    async def get_venues_with_profiles(session, venue_ids):
+        return [v for v in (cafe, bar) if v.id in venue_ids]
+
+    with (
+        patch("app.services.nearby.top_static_candidates", top_static_candidates),
+        patch("app.services.nearby.get_venues_with_profiles", get_venues_with_profiles),
+    ):
+        pages = await search_batch(
+            [QUERY, replace(QUERY, mode=Mode.DATE)],
+            [down],
+            Deadline(2.0),
+            make_session_factory(),
+            **_caches(make_cache),
+        )
+
+    assert [[v.provider_id for v in page.venues] for page in pages] == [["cafe"], ["bar"]]
+    assert all(page.degraded for page in pages)
+    down.search_nearby.assert_awaited_once()
+
+
+def test_batch_endpoint_returns_results_in_order():
+    """Test the batch endpoint end to end and its size limits."""
+    client = TestClient(app)
+    queries = [
+        {"lat": 37.7749, "lng": -122.4194, "mode": "date", "limit": 3},
+        {"lat": 40.7128, "lng": -74.006, "limit": 2},
+    ]
+
+    with (
+        patch("app.providers.registry.settings") as mock_settings,
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+    ):
+        mock_settings.places_providers = "stub"
+        response = client.post("/venues/nearby/batch", json=queries)
+        empty = client.post("/venues/nearby/batch", json=[])
+        too_many = client.post("/venues/nearby/batch", json=queries * 26)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["mode"] for r in results] == ["date", "work"]
+    assert [r["count"] for r in results] == [3, 2]
+    assert empty.status_code == too_many.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_adaptive_radius_expands_in_rings_reusing_cached_ones(
+    make_cache, make_session_factory
+):
+    """Test ring expansion to min_results, inner-ring cache reuse and the ring cap."""
+    # One venue ~0.5, 1.5, 3 and 6 km north of the center.
+    upstream = StubPlacesProvider(
+        venues=[_venue(str(km), lat=QUERY.lat + km / 111.2) for km in (0.5, 1.5, 3, 6)]
+    )
+    upstream.search_nearby = AsyncMock(wraps=upstream.search_nearby)
+    provider = CachedPlacesProvider(upstream, cache=make_cache())
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})):
+        sparse = await search_nearby_venues(
+            replace(QUERY, min_results=3), [provider], Deadline(2.0), make_session_factory()
+        )
+        assert upstream.search_nearby.await_count == 3  # 1, 2 and 4 km
+        wider = await search_nearby_venues(
+            replace(QUERY, min_results=4), [provider], Deadline(2.0), make_session_factory()
+        )
+        assert upstream.search_nearby.await_count == 4  # only the 8 km ring is new
+        with patch.object(settings, "adaptive_max_rings", 2):
+            capped = await search_nearby_venues(
+                replace(QUERY, min_results=4), [upstream], Deadline(2.0), make_session_factory()
+            )
+        assert upstream.search_nearby.await_count == 6
+        fixed = await search_nearby_venues(QUERY, [provider], Deadline(2.0), make_session_factory())
+
+    assert (sparse.count, sparse.radius_m) == (3, 4000)
+    assert (wider.count, wider.radius_m) == (4, 8000)
+    assert (capped.count, capped.radius_m) == (2, 2000)
+    assert (fixed.count, fixed.radius_m) == (1, 1000)
+    assert sparse.venues[0].provider_id == "0.5"
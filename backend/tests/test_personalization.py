@@ -0,0 +1,340 @@
+"""Unit tests for preference vectors, personalized re-ranking and event ingest."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.deadline import Deadline
+from app.events.ingest import EventIngestor, IngestQueueFull
+from app.main import app
+from app.models.user_event import EventType, Mode
+from app.observability.metrics import EVENT_INGEST_DROPPED
+from app.providers import StubPlacesProvider
+from app.ranking.features import STATIC_FEATURES, build_feature_matrix
+from app.ranking.personalization import (
+    FEATURE_SLOTS,
+    MASS_SLOT,
+    PRICE_SLOT,
+    VECTOR_SIZE,
+    PreferenceStore,
+    PreferenceUpdate,
+    empty_vector,
+    mode_affinities,
+    personalize,
+    update_vector,
+)
+from app.ranking.scoring import score
+from app.schemas.venue import UserEventCreate, VenueCreate
+from app.services.nearby import NearbyQuery, search_nearby_venues
+
+NOW = 1_750_000_000.0
+DAY = 86400.0
+QUIET = STATIC_FEATURES.index("quiet")
+
+
+class FakeKeyValueRedis:
+    """Minimal in-memory stand-in for GET/SET."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def set(self, name, value, ex=None):
+        self.values[name] = value
+        self.ttls[name] = ex
+
+
+def _venue(provider_id, **kwargs):
+    return VenueCreate(
+        provider_id=provider_id,
+        provider_name="stub",
+        name=f"Venue {provider_id}",
+        lat=37.7749,
+        lng=-122.4194,
+        **kwargs,
+    )
+
+
+def _static(quiet=0.5, rating=0.5):
+    row = np.full(len(STATIC_FEATURES), 0.5, dtype=np.float32)
+    row[QUIET] = quiet
+    row[STATIC_FEATURES.index("rating")] = rating
+    return row
+
+
+def _update(event_type=EventType.SAVE, at=NOW, quiet=0.9, **kwargs):
+    return PreferenceUpdate(event_type, at=at, static_features=_static(quiet), **kwargs)
+
+
+def test_update_vector_learns_signed_feature_preferences():
+    """Test that positive events pull toward a venue's features, negative away."""
+    liked = update_vector(empty_vector(), _update(EventType.THUMBS_UP, quiet=0.9))
+    disliked = update_vector(empty_vector(), _update(EventType.THUMBS_DOWN, quiet=0.9))
+
+    assert liked[FEATURE_SLOTS][QUIET] == pytest.approx(0.4)
+    assert disliked[FEATURE_SLOTS][QUIET] == pytest.approx(-0.4)
+    assert liked[MASS_SLOT] == disliked[MASS_SLOT] == 2.0
+
+
+def test_update_vector_ignores_impressions_and_unknown_venues():
+    """Test that impressions and events without venue data change nothing."""
+    vector = empty_vector()
+    assert np.array_equal(update_vector(vector, _update(EventType.IMPRESSION)), vector)
+    unknown = PreferenceUpdate(EventType.CLICK, at=NOW)
+    assert np.array_equal(update_vector(vector, unknown), vector)
+
+
+def test_update_vector_decays_old_evidence():
+    """Test that evidence one half-life old counts half as much as a new event."""
+    half_life = 10 * DAY
+    vector = update_vector(empty_vector(), _update(quiet=1.0, at=NOW), half_life)
+    vector = update_vector(vector, _update(quiet=0.0, at=NOW + half_life), half_life)
+
+    # Weights 1 (decayed 2) and 2 -> (1 * 0.5 + 2 * -0.5) / 3
+    assert vector[FEATURE_SLOTS][QUIET] == pytest.approx(-1 / 6, abs=1e-3)
+    assert vector[MASS_SLOT] == pytest.approx(3.0, rel=1e-3)
+
+
+def test_update_vector_tracks_price_tolerance_and_mode_affinity():
+    """Test price tolerance from positive events and per-mode engagement shares."""
+    vector = empty_vector()
+    vector = update_vector(vector, _update(mode=Mode.WORK, price_level=1))
+    vector = update_vector(vector, _update(mode=Mode.WORK, price_level=3))
+    vector = update_vector(vector, _update(EventType.THUMBS_DOWN, mode=Mode.DATE, price_level=4))
+
+    assert vector[PRICE_SLOT] == pytest.approx(0.5)
+    affinities = mode_affinities(vector)
+    assert affinities[0] == pytest.approx(2 / 3)
+    assert affinities.sum() == pytest.approx(1.0)
+
+
+def test_personalize_reranks_toward_preferred_features():
+    """Test that a user who saves quiet places sees the quiet venue first."""
+    venues = [_venue("loud", rating=4.5), _venue("quiet", rating=4.5)]
+    features, _ = build_feature_matrix(
+        venues, 37.7749, -122.4194, 1000, [{"quiet": 0.2}, {"quiet": 0.9}]
+    )
+    base = score(features, Mode.QUICK_BITE)  # quiet has no weight in this mode
+    assert base[0] == base[1]
+
+    vector = empty_vector()
+    for _ in range(5):
+        vector = update_vector(vector, _update(quiet=0.95, mode=Mode.QUICK_BITE))
+    personalized = personalize(base, features, vector, Mode.QUICK_BITE, now=NOW)
+
+    assert personalized[1] > personalized[0]
+    assert np.array_equal(personalize(base, features, None, Mode.QUICK_BITE), base)
+
+
+def test_personalize_penalizes_venues_above_price_tolerance():
+    """Test that a budget-minded user sees pricey venues pushed down."""
+    venues = [_venue("cheap", price_level=1), _venue("pricey", price_level=4)]
+    features, _ = build_feature_matrix(venues, 37.7749, -122.4194, 1000)
+    vector = empty_vector()
+    for _ in range(5):
+        vector = update_vector(vector, _update(price_level=1))
+    base = np.zeros(2, dtype=np.float32)
+
+    personalized = personalize(base, features, vector, Mode.WORK, now=NOW)
+
+    assert personalized[1] < personalized[0]
+
+
+@pytest.mark.asyncio
+async def test_store_round_trips_compact_vector():
+    """Test that vectors are stored as fixed-size float32 bytes with a TTL."""
+    redis = FakeKeyValueRedis()
+    store = PreferenceStore(redis=redis)
+
+    assert await store.get("u1") is None
+    stored = await store.apply("u1", [_update(), _update(EventType.CLICK, at=NOW + 60)])
+
+    assert len(redis.values["prefs:u1"]) == VECTOR_SIZE * 4
+    assert redis.ttls["prefs:u1"] > 0
+    np.testing.assert_array_equal(await store.get("u1"), stored)
+
+
+def _ingest_session(rows):
+    session = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = rows
+    session.execute.side_effect = [result, None]
+    return session
+
+
+@pytest.mark.asyncio
+async def test_ingest_flush_writes_batch_and_updates_each_user_once(make_session_factory):
+    """Test one INSERT per batch and one preference update per engaged user."""
+    venue_id = uuid.uuid4()
+    row = SimpleNamespace(
+        id=venue_id, rating=4.0, price_level=2, attribute_scores={"quiet": 0.9}, lat=0, lng=0
+    )
+    session = _ingest_session([row])
+    factory = make_session_factory(session)
+    store = MagicMock()
+    store.apply = AsyncMock()
+    ingestor = EventIngestor(session_factory=factory, store=store, max_queued=10)
+
+    events = [
+        UserEventCreate(user_id="u1", event_type=EventType.SAVE, venue_id=venue_id),
+        UserEventCreate(user_id="u1", event_type=EventType.CLICK, venue_id=venue_id),
+        UserEventCreate(user_id="u2", event_type=EventType.IMPRESSION, venue_id=venue_id),
+        UserEventCreate(event_type=EventType.CLICK, venue_id=venue_id),  # anonymous
+    ]
+    ingestor.submit(events)
+    written = await ingestor.flush(ingestor._drain(10))
+
+    assert written == 4
+    insert_sql = str(session.execute.call_args_list[1].args[0])
+    assert insert_sql.startswith("INSERT INTO user_events")
+    session.commit.assert_awaited_once()
+    store.apply.assert_awaited_once()
+    user_id, updates = store.apply.call_args.args
+    assert user_id == "u1"
+    assert [u.event_type for u in updates] == [EventType.SAVE, EventType.CLICK]
+    assert updates[0].static_features[QUIET] == pytest.approx(0.9)
+
+
+@pytest.mark.asyncio
+async def test_ingest_flush_drops_only_events_for_unknown_venues(make_session_factory):
+    """Test that one unknown venue_id does not fail the whole batch's INSERT."""
+    known = uuid.uuid4()
+    row = SimpleNamespace(id=known, rating=4.0, price_level=2, attribute_scores=None, lat=0, lng=0)
+    session = _ingest_session([row])
+    factory = make_session_factory(session)
+    ingestor = EventIngestor(session_factory=factory, store=MagicMock(), max_queued=10)
+    events = [
+        UserEventCreate(user_id="u1", event_type=EventType.CLICK, venue_id=known),
+        UserEventCreate(user_id="u2", event_type=EventType.CLICK, venue_id=uuid.uuid4()),
+        UserEventCreate(user_id="u3", event_type=EventType.IMPRESSION),  # no venue
+    ]
+    ingestor.submit(events)
+    dropped = EVENT_INGEST_DROPPED.labels("click", "unknown_venue")
+    before = dropped._value.get()
+
+    with patch.object(settings, "personalization_enabled", False):
+        written = await ingestor.flush(ingestor._drain(10))
+
+    assert written == 2
+    inserted = session.execute.call_args_list[1].args[0].compile().params
+    assert {value for key, value in inserted.items() if key.startswith("user_id")} == {"u1", "u3"}
+    assert dropped._value.get() == before + 1
+
+
+def test_ingest_queue_rejects_batches_it_cannot_hold():
+    """Test that a full queue rejects the whole batch."""
+    ingestor = EventIngestor(session_factory=MagicMock(), store=MagicMock(), max_queued=2)
+    event = UserEventCreate(event_type=EventType.IMPRESSION)
+
+    assert ingestor.submit([event]) == 1
+    with pytest.raises(IngestQueueFull):
+        ingestor.submit([event, event])
+    assert ingestor.depth == 1
+
+
+def test_events_endpoint_queues_and_sheds_load():
+    """Test that POST /events accepts with 202 and returns 503 when saturated."""
+    client = TestClient(app)
+    payload = [{"event_type": "click", "user_id": "u1", "venue_id": str(uuid.uuid4())}]
+
+    with patch("app.main.event_ingestor") as ingestor:
+        ingestor.submit.return_value = 1
+        accepted = client.post("/events", json=payload)
+        ingestor.submit.side_effect = IngestQueueFull("full")
+        rejected = client.post("/events", json=payload)
+
+    assert accepted.status_code == 202
+    assert accepted.json() == {"accepted": 1}
+    assert rejected.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_search_personalizes_for_user(make_session_factory):
+    """Test that a search with a user ID re-ranks by the user's vector."""
+    provider = StubPlacesProvider(venues=[_venue("loud"), _venue("quiet")])
+    profiles = {"loud": (uuid.uuid4(), {"quiet": 0.1}), "quiet": (uuid.uuid4(), {"quiet": 0.95})}
+    vector = empty_vector()
+    for _ in range(10):
+        vector = update_vector(vector, _update(quiet=1.0, mode=Mode.QUICK_BITE))
+    store = MagicMock()
+    store.get = AsyncMock(return_value=vector)
+    factory = make_session_factory()
+    query = NearbyQuery(lat=37.7749, lng=-122.4194, mode=Mode.QUICK_BITE, user_id="u1")
+
+    with (
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value=profiles)),
+        patch("app.ranking.personalization.time.time", return_value=NOW),
+    ):
+        anonymous = await search_nearby_venues(
+            NearbyQuery(lat=37.7749, lng=-122.4194, mode=Mode.QUICK_BITE),
+            [provider],
+            Deadline(2.0),
+            session_factory=factory,
+        )
+        personal = await search_nearby_venues(
+            query, [provider], Deadline(2.0), session_factory=factory, preferences=store
+        )
+
+    store.get.assert_awaited_once_with("u1")
+    assert [v.provider_id for v in anonymous.venues] == ["loud", "quiet"]
+    assert [v.provider_id for v in personal.venues] == ["quiet", "loud"]
+    assert not personal.degraded
+
+
+@pytest.mark.asyncio
+async def test_events_for_shown_venues_personalize_later_searches(make_session_factory):
+    """Test search -> event on a shown venue -> re-ranked search for that user."""
+    provider = StubPlacesProvider(venues=[_venue("loud"), _venue("quiet")])
+    ids = {"loud": uuid.uuid4(), "quiet": uuid.uuid4()}
+    profiles = {
+        "loud": (ids["loud"], {"quiet": 0.1}),
+        "quiet": (ids["quiet"], {"quiet": 0.95}),
+    }
+    store = PreferenceStore(redis=FakeKeyValueRedis())
+    query = NearbyQuery(lat=37.7749, lng=-122.4194, mode=Mode.QUICK_BITE, user_id="u1")
+
+    with patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value=profiles)):
+        before = await search_nearby_venues(
+            query, [provider], Deadline(2.0), make_session_factory(), preferences=store
+        )
+        shown = {v.provider_id: v.venue_id for v in before.venues}
+        row = SimpleNamespace(
+            id=shown["quiet"],
+            rating=None,
+            price_level=None,
+            attribute_scores={"quiet": 0.95},
+            lat=37.7749,
+            lng=-122.4194,
+        )
+        ingestor = EventIngestor(
+            session_factory=make_session_factory(_ingest_session([row])),
+            store=store,
+            max_queued=10,
+        )
+        ingestor.submit(
+            [
+                UserEventCreate(
+                    user_id="u1",
+                    event_type=event_type,
+                    venue_id=shown["quiet"],
+                    mode=Mode.QUICK_BITE,
+                )
+                for event_type in (EventType.SAVE, EventType.THUMBS_UP, EventType.NAVIGATE)
+            ]
+        )
+        await ingestor.flush(ingestor._drain(10))
+        after = await search_nearby_venues(
+            query, [provider], Deadline(2.0), make_session_factory(), preferences=store
+        )
+
+    assert shown == ids
+    assert [v.provider_id for v in before.venues] == ["loud", "quiet"]
+    assert [v.provider_id for v in after.venues] == ["quiet", "loud"]
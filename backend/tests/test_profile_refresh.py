@@ -0,0 +1,172 @@
+"""Unit tests for the venue profile refresh scheduler."""
+
+import asyncio
+import random
+import uuid
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.main import app
+from app.worker import celery_app
+from app.worker.queue import Priority
+from app.worker.refresh import (
+    defer_refresh,
+    enqueue_visible_venues,
+    find_expiring_profiles,
+    next_expiry,
+    refresh_expiring_profiles,
+)
+
+
+def test_next_expiry_is_jittered_within_bounds():
+    """Test that expiries spread around the TTL instead of landing on one instant."""
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    ttl = timedelta(hours=100)
+    rng = random.Random(42)
+
+    expiries = [next_expiry(now, ttl=ttl, jitter=0.1, rng=rng) for _ in range(200)]
+
+    assert all(now + ttl * 0.9 <= e <= now + ttl * 1.1 for e in expiries)
+    assert len(set(expiries)) > 150
+
+
+def test_next_expiry_without_jitter():
+    """Test that zero jitter yields exactly now + ttl."""
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    assert next_expiry(now, ttl=timedelta(hours=1), jitter=0) == now + timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+async def test_find_expiring_profiles_query_shape():
+    """Test that the scan filters on expires_at and orders by impressions."""
+    session = AsyncMock()
+    session.execute.return_value = []
+
+    await find_expiring_profiles(
+        session,
+        now=datetime(2026, 1, 1, tzinfo=UTC),
+        horizon=timedelta(hours=1),
+        limit=10,
+        impression_window=timedelta(days=7),
+    )
+
+    stmt = session.execute.call_args[0][0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "venue_profiles.expires_at <=" in sql
+    assert "ORDER BY venue_profiles.expires_at" in sql
+    assert "impressions DESC" in sql
+
+
+@pytest.mark.asyncio
+async def test_refresh_batches_with_bounded_concurrency(make_session_factory):
+    """Test that venues are re-profiled in batches with at most N in flight."""
+    venue_ids = [uuid.uuid4() for _ in range(10)]
+    factory = make_session_factory()
+    in_flight = 0
+    max_in_flight = 0
+    batches = []
+
+    async def reprofile(session, batch):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        batches.append(batch)
+        in_flight -= 1
+
+    with patch("app.worker.refresh.find_expiring_profiles", AsyncMock(return_value=venue_ids)):
+        result = await refresh_expiring_profiles(
+            reprofile=reprofile,
+            session_factory=factory,
+            batch_size=3,
+            concurrency=2,
+        )
+
+    assert result.scanned == 10
+    assert result.refreshed == 10
+    assert result.failed == 0
+    assert sorted(len(b) for b in batches) == [1, 3, 3, 3]
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_counts_failed_batches(make_session_factory):
+    """Test that a failing batch is counted and does not abort the run."""
+    venue_ids = [uuid.uuid4() for _ in range(4)]
+    factory = make_session_factory()
+
+    async def reprofile(session, batch):
+        if venue_ids[0] in batch:
+            raise RuntimeError("boom")
+
+    with patch("app.worker.refresh.find_expiring_profiles", AsyncMock(return_value=venue_ids)):
+        result = await refresh_expiring_profiles(
+            reprofile=reprofile, session_factory=factory, batch_size=2, concurrency=2
+        )
+
+    assert result.refreshed == 2
+    assert result.failed == 2
+
+
+@pytest.mark.asyncio
+async def test_defer_refresh_backs_off_exponentially():
+    """Test that skipped refreshes push expires_at back by a doubling, capped delay."""
+    session = AsyncMock()
+
+    await defer_refresh(session, [uuid.uuid4()], now=datetime(2026, 1, 1, tzinfo=UTC))
+
+    stmt = session.execute.call_args[0][0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "refresh_failures=(venue_profiles.refresh_failures +" in sql
+    assert "least(power(" in sql
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    assert timedelta(minutes=settings.profile_retry_minutes) in params.values()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_visible_venues_uses_the_user_visible_lane(make_session_factory):
+    """Test that shown venues needing a profile jump ahead of refreshes."""
+    factory = make_session_factory()
+    stale = [uuid.uuid4()]
+    queue = MagicMock()
+    queue.return_value.enqueue = AsyncMock(return_value=1)
+
+    with (
+        patch("app.worker.refresh.find_unprofiled_venues", AsyncMock(return_value=stale)) as find,
+        patch("app.worker.refresh.EnrichmentQueue", queue),
+    ):
+        queued = await enqueue_visible_venues(["p1", "p2"], session_factory=factory)
+
+    assert queued == 1
+    assert find.call_args[0][1:] == (["p1", "p2"], "google")
+    queue.return_value.enqueue.assert_awaited_once_with(stale, Priority.USER_VISIBLE)
+
+
+def test_nearby_miss_queues_shown_venues():
+    """Test that a freshly ranked page queues its venues for enrichment."""
+    client = TestClient(app)
+
+    with (
+        patch("app.providers.registry.settings") as mock_settings,
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+        patch("app.main.enqueue_visible_venues", AsyncMock()) as enqueue,
+        patch.object(settings, "enrich_visible_venues", True),
+    ):
+        mock_settings.places_providers = "stub"
+        first = client.get("/venues/nearby", params={"lat": 37.7749, "lng": -122.4194})
+
+    enqueue.assert_awaited_once()
+    assert enqueue.call_args[0][0] == [v["provider_id"] for v in first.json()["venues"]]
+
+
+def test_refresh_task_is_scheduled():
+    """Test that the refresh task is registered and on the beat schedule."""
+    schedule = celery_app.conf.beat_schedule
+    assert schedule["refresh-expiring-profiles"]["task"] == "modemap.refresh_expiring_profiles"
+    celery_app.loader.import_default_modules()
+    assert "modemap.refresh_expiring_profiles" in celery_app.tasks
@@ -0,0 +1,203 @@
+"""Unit tests for the provider abstraction, stub provider and fan-out search."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.geo import haversine_m
+from app.providers import (
+    GooglePlacesClient,
+    PlacesProvider,
+    StubPlacesProvider,
+    dedupe_venues,
+    get_providers,
+    search_all,
+)
+from app.providers.fanout import name_similarity, normalize_name
+from app.schemas.venue import VenueCreate
+
+
+def _venue(provider: str, provider_id: str, name: str, lat: float, lng: float, **kwargs):
+    return VenueCreate(
+        provider_id=provider_id, provider_name=provider, name=name, lat=lat, lng=lng, **kwargs
+    )
+
+
+class FailingProvider(PlacesProvider):
+    """Provider whose searches always fail."""
+
+    name = "failing"
+
+    async def search_nearby(self, lat, lng, radius_m=1000, max_results=20, **kwargs):
+        raise RuntimeError("upstream unavailable")
+
+
+# ============================================================================
+# Provider Abstraction Tests
+# ============================================================================
+
+
+def test_google_client_is_a_places_provider():
+    """Test that the Google client implements the provider interface."""
+    client = GooglePlacesClient(api_key="test_key")
+    assert isinstance(client, PlacesProvider)
+    assert client.name == "google"
+
+
+def test_get_providers_builds_in_priority_order():
+    """Test building providers from a comma-separated list."""
+    with patch("app.providers.google.settings") as mock_settings:
+        mock_settings.google_places_api_key = "test_key"
+        providers = get_providers("stub, google")
+    assert [p.name for p in providers] == ["stub", "google"]
+
+
+def test_get_providers_unknown_name():
+    """Test that an unknown provider name raises ValueError."""
+    with pytest.raises(ValueError, match="Unknown places provider"):
+        get_providers("yelp")
+
+
+@pytest.mark.asyncio
+async def test_stub_provider_is_deterministic_and_within_radius():
+    """Test that synthesized venues are stable and inside the search circle."""
+    provider = StubPlacesProvider(density=15, seed=7)
+
+    first = await provider.search_nearby(lat=37.7749, lng=-122.4194, radius_m=500)
+    second = await provider.search_nearby(lat=37.7749, lng=-122.4194, radius_m=500)
+
+    assert first == second
+    assert len(first) == 15
+    assert all(haversine_m(37.7749, -122.4194, v.lat, v.lng) <= 500 for v in first)
+    assert all(v.provider_name == "stub" for v in first)
+
+
+@pytest.mark.asyncio
+async def test_stub_provider_filters_fixtures():
+    """Test that fixture venues are filtered by radius, open_now and price."""
+    near_open = _venue("stub", "a", "Near", 37.7749, -122.4194, price_level=2)
+    near_open = near_open.model_copy(update={"hours": {"open_now": True}})
+    near_closed = _venue("stub", "b", "Closed", 37.7750, -122.4194, price_level=2)
+    far = _venue("stub", "c", "Far", 37.80, -122.4194, price_level=2)
+    provider = StubPlacesProvider(venues=[near_open, near_closed, far])
+
+    results = await provider.search_nearby(37.7749, -122.4194, radius_m=500, open_now=True)
+
+    assert [v.name for v in results] == ["Near"]
+
+
+# ============================================================================
+# Deduplication Tests
+# ============================================================================
+
+
+def test_normalize_name():
+    """Test name normalization strips accents, punctuation and stopwords."""
+    assert normalize_name("The Café de l'Opéra & Bar") == "cafe de l opera bar"
+
+
+def test_name_similarity_containment_needs_two_tokens():
+    """Test that a one-word generic name does not match longer names."""
+    assert name_similarity("blue bottle coffee", "blue bottle coffee mint plaza") == 1.0
+    assert name_similarity("cafe", "cafe luna") < 0.8
+
+
+def test_dedupe_merges_cross_provider_duplicates():
+    """Test that nearby, similarly named venues merge and fill missing fields."""
+    google = _venue("google", "g1", "Blue Bottle Coffee", 37.77490, -122.41940, rating=4.5)
+    yelp = _venue(
+        "yelp", "y1", "Blue Bottle Coffee - Mint Plaza", 37.77500, -122.41945, price_level=2
+    )
+
+    merged = dedupe_venues([google, yelp])
+
+    assert len(merged) == 1
+    assert merged[0].provider_name == "google"
+    assert merged[0].rating == 4.5
+    assert merged[0].price_level == 2
+
+
+def test_dedupe_keeps_distinct_neighbors_and_far_namesakes():
+    """Test that different names nearby, or the same name far away, stay separate."""
+    a = _venue("google", "g1", "Tartine Bakery", 37.7614, -122.4241)
+    b = _venue("yelp", "y1", "Zuni Cafe", 37.7615, -122.4241)
+    c = _venue("yelp", "y2", "Tartine Bakery", 37.7800, -122.4241)
+
+    assert len(dedupe_venues([a, b, c])) == 3
+
+
+def test_dedupe_matches_across_grid_cell_boundary():
+    """Test that duplicates straddling a grid cell edge are still found."""
+    # 75 m cells: these points are ~20 m apart but fall in adjacent cells.
+    cell_deg = 75 / 111_320
+    edge = 37.0 // cell_deg * cell_deg + cell_deg
+    a = _venue("google", "g1", "Souvla", edge - cell_deg * 0.1, -122.0)
+    b = _venue("yelp", "y1", "Souvla", edge + cell_deg * 0.1, -122.0)
+
+    assert len(dedupe_venues([a, b], max_distance_m=75)) == 1
+
+
+def test_dedupe_never_merges_venues_from_one_provider():
+    """Test that a provider's own nearby namesakes (two branches) are both kept."""
+    a = _venue("google", "g1", "Starbucks", 37.77490, -122.41940)
+    b = _venue("google", "g2", "Starbucks", 37.77520, -122.41940)  # ~33 m away
+    c = _venue("stub", "s1", "Blue Bottle Coffee #0", 37.7749, -122.4194)
+    d = _venue("stub", "s2", "Blue Bottle Coffee #7", 37.7749, -122.4195)
+    yelp = _venue("yelp", "y1", "Starbucks", 37.77491, -122.41940)
+
+    assert len(dedupe_venues([a, b, c, d])) == 4
+    # A cross-provider duplicate joins one branch, not both.
+    assert [v.provider_id for v in dedupe_venues([a, yelp, b])] == ["g1", "g2"]
+
+
+def test_dedupe_drops_repeated_provider_ids():
+    """Test that the same provider record returned twice is kept once."""
+    a = _venue("google", "g1", "Nopa", 37.77, -122.43)
+    assert dedupe_venues([a, a]) == [a]
+
+
+# ============================================================================
+# Fan-out Tests
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_search_all_merges_providers_and_dedupes():
+    """Test that results from all providers are merged without duplicate pins."""
+    shared = _venue("google", "g1", "Nopa", 37.7749, -122.4194)
+    google = StubPlacesProvider(venues=[shared], name="google")
+    yelp = StubPlacesProvider(
+        venues=[
+            _venue("yelp", "y1", "NOPA", 37.77491, -122.41941),
+            _venue("yelp", "y2", "Souvla", 37.7751, -122.4194),
+        ],
+        name="yelp",
+    )
+
+    result = await search_all([google, yelp], lat=37.7749, lng=-122.4194)
+
+    assert [v.provider_id for v in result.venues] == ["g1", "y2"]
+    assert not result.partial
+
+
+@pytest.mark.asyncio
+async def test_search_all_returns_partial_results_on_timeout_and_error():
+    """Test that slow and failing providers don't block the others."""
+    fast = StubPlacesProvider(venues=[_venue("stub", "s1", "Nopa", 37.7749, -122.4194)])
+    slow = StubPlacesProvider(name="slow", latency_s=5.0)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    result = await search_all(
+        [fast, slow, FailingProvider()],
+        lat=37.7749,
+        lng=-122.4194,
+        timeout_s=1.0,
+        timeouts={"slow": 0.05},
+    )
+
+    assert loop.time() - started < 1.0
+    assert [v.provider_id for v in result.venues] == ["s1"]
+    assert result.failed == ["slow", "failing"]
+    assert result.partial
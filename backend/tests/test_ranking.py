@@ -0,0 +1,134 @@
+"""Unit tests for the ranking feature matrix and mode scoring."""
+
+import numpy as np
+import pytest
+
+from app.models.user_event import Mode
+from app.ranking import FEATURES, MODE_WEIGHTS, MODES, build_feature_matrix, score, top_k
+from app.ranking.features import DYNAMIC_FEATURES, FEATURE_INDEX, NEUTRAL
+from app.ranking.scoring import (
+    MODE_FEATURE_WEIGHTS,
+    custom_weights,
+    score_modes,
+    static_scores,
+    weight_vector,
+)
+from app.schemas.venue import VenueCreate
+
+
+def _venue(name, lat=37.7749, lng=-122.4194, **kwargs):
+    return VenueCreate(
+        provider_id=name, provider_name="stub", name=name, lat=lat, lng=lng, **kwargs
+    )
+
+
+def test_mode_weights_cover_every_mode_and_sum_to_one():
+    """Test that every mode has a weight column summing to 1."""
+    assert MODE_WEIGHTS.shape == (len(FEATURES), len(MODES))
+    assert set(MODE_FEATURE_WEIGHTS) == set(Mode)
+    np.testing.assert_allclose(MODE_WEIGHTS.sum(axis=0), 1.0, rtol=1e-6)
+
+
+def test_weight_vector_rejects_unknown_feature():
+    """Test that a typo in a weight table is caught."""
+    with pytest.raises(ValueError, match="Unknown ranking feature"):
+        weight_vector({"quietness": 1.0})
+
+
+def test_score_modes_matches_per_mode_scores():
+    """Test that the one-product all-modes matrix equals scoring each mode."""
+    venues = [_venue(f"v{i}", lat=37.7749 + i * 0.001, rating=i / 2) for i in range(6)]
+    features, _ = build_feature_matrix(venues, 37.7749, -122.4194, 1000, [{"quiet": 0.4}] * 6)
+
+    scores = score_modes(features)
+
+    assert scores.shape == (6, len(MODES))
+    for j, mode in enumerate(MODES):
+        np.testing.assert_allclose(scores[:, j], score(features, mode), rtol=1e-6)
+
+
+def test_custom_weights_normalize_and_validate():
+    """Test that slider weights are scaled to sum to 1 and bad input is rejected."""
+    vector = custom_weights({"quiet": 3.0, "proximity": 1.0})
+    assert vector[FEATURE_INDEX["quiet"]] == pytest.approx(0.75)
+    assert vector.sum() == pytest.approx(1.0)
+    with pytest.raises(ValueError, match="non-negative"):
+        custom_weights({"quiet": -1.0})
+    with pytest.raises(ValueError, match="positive"):
+        custom_weights({"quiet": 0.0})
+    for weight in (float("nan"), float("inf")):
+        with pytest.raises(ValueError, match="finite"):
+            custom_weights({"quiet": weight})
+    with pytest.raises(ValueError, match="too large"):
+        custom_weights({"quiet": 3e38, "rating": 3e38})
+
+
+def test_build_feature_matrix_scales_and_defaults():
+    """Test feature scaling and neutral defaults for missing data."""
+    venues = [
+        _venue("full", rating=5.0, price_level=0, hours={"open_now": False}),
+        _venue("empty", lat=37.7749 + 0.009),  # ~1 km north
+    ]
+
+    features, distances = build_feature_matrix(
+        venues, 37.7749, -122.4194, radius_m=1000, attribute_scores=[{"quiet": 0.9}, None]
+    )
+
+    assert features.dtype == np.float32
+    assert features.shape == (2, len(FEATURES))
+    assert features[0, FEATURE_INDEX["proximity"]] == pytest.approx(1.0)
+    assert features[0, FEATURE_INDEX["rating"]] == pytest.approx(1.0)
+    assert features[0, FEATURE_INDEX["affordability"]] == pytest.approx(1.0)
+    assert features[0, FEATURE_INDEX["open_now"]] == 0.0
+    assert features[0, FEATURE_INDEX["quiet"]] == pytest.approx(0.9)
+    assert features[1, FEATURE_INDEX["proximity"]] == pytest.approx(0.0, abs=0.01)
+    assert features[1, FEATURE_INDEX["rating"]] == NEUTRAL
+    assert distances[1] == pytest.approx(1000, rel=0.01)
+
+
+def test_modes_rank_differently():
+    """Test that budget prefers cheap venues and date prefers romantic ones."""
+    venues = [
+        _venue("cheap", rating=3.5, price_level=1),
+        _venue("fancy", rating=4.8, price_level=4),
+    ]
+    features, _ = build_feature_matrix(
+        venues,
+        37.7749,
+        -122.4194,
+        radius_m=1000,
+        attribute_scores=[{"romantic": 0.1}, {"romantic": 0.9}],
+    )
+
+    assert top_k(score(features, Mode.BUDGET), 2).tolist() == [0, 1]
+    assert top_k(score(features, Mode.DATE), 2).tolist() == [1, 0]
+
+
+def test_static_plus_dynamic_scores_match_full_score():
+    """Test that precomputed static scores completed at request time equal score()."""
+    venues = [
+        _venue("a", rating=4.5, price_level=3, hours={"open_now": True}),
+        _venue("b", lat=37.78, rating=3.9, price_level=1),
+        _venue("c", lng=-122.41),
+    ]
+    attributes = [{"quiet": 0.9, "laptop_friendly": 0.7}, {"romantic": 0.8}, None]
+    features, _ = build_feature_matrix(venues, 37.7749, -122.4194, 1500, attributes)
+    split = len(DYNAMIC_FEATURES)
+
+    static = static_scores(features[:, split:])
+
+    assert static.shape == (3, len(MODES))
+    for j, mode in enumerate(MODES):
+        np.testing.assert_allclose(
+            static[:, j] + features[:, :split] @ MODE_WEIGHTS[:split, j],
+            score(features, mode),
+            rtol=1e-6,
+        )
+
+
+def test_top_k_partial_and_stable():
+    """Test top-k ordering, truncation and tie-breaking by input order."""
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.1], dtype=np.float32)
+
+    assert top_k(scores, 3).tolist() == [1, 3, 2]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0, 4]
@@ -0,0 +1,167 @@
+"""Unit tests for the venue repository (batched, projected and JSONB reads)."""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.db.jsonb import json_text
+from app.models.venue import Venue, VenueProfile
+from app.repositories import (
+    find_venues_by_attributes,
+    get_venues_with_profiles,
+    load_attribute_scores,
+    venue_with_profile_from_row,
+)
+from app.repositories.venue import PROFILE_FIELDS, PROFILE_PREFIX, venues_with_profiles_statement
+from app.schemas.venue import venue_to_response
+
+
+def _models(with_profile: bool = True):
+    venue_id = uuid.uuid4()
+    now = datetime(2024, 5, 1, 12, 0)
+    venue = Venue(
+        id=venue_id,
+        provider_id="g1",
+        provider_name="google",
+        name="Nopa",
+        categories=["Restaurant"],
+        lat=37.7749,
+        lng=-122.4194,
+        address="560 Divisadero St",
+        rating=4.6,
+        price_level=2,
+        hours={"open_now": True},
+        raw_hours=None,
+        last_seen_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    profile = VenueProfile(
+        id=uuid.uuid4(),
+        venue_id=venue_id,
+        attribute_scores={"quiet": 0.3, "romantic": 0.8},
+        evidence_snippets={"romantic": ["Candlelit"]},
+        embedding_ref=None,
+        profiled_at=now,
+        expires_at=None,
+    )
+    venue.profile = profile if with_profile else None
+    return venue, profile
+
+
+def _row(venue: Venue, profile: VenueProfile | None):
+    """Row as returned by venues_with_profiles_statement()."""
+    values = {name: getattr(venue, name) for name in venue_to_response(venue).model_fields}
+    for name in PROFILE_FIELDS:
+        values[PROFILE_PREFIX + name] = getattr(profile, name) if profile else None
+    return SimpleNamespace(_mapping=values)
+
+
+def _session(rows):
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=rows)
+    return session
+
+
+def test_statement_is_one_outer_join_with_array_parameter():
+    """Test that the read is a single projected query with stable SQL text."""
+    sql = str(venues_with_profiles_statement().compile(dialect=postgresql.psycopg.dialect()))
+    assert sql.count("SELECT") == 1
+    assert "LEFT OUTER JOIN venue_profiles" in sql
+    assert "venue_profiles.attribute_scores AS profile_attribute_scores" in sql
+
+
+def test_row_fast_path_matches_orm_conversion():
+    """Test that building from rows gives the same payload as model_validate."""
+    venue, profile = _models()
+    expected = venue_to_response(venue, include_profile=True)
+
+    fast = venue_with_profile_from_row(_row(venue, profile))
+
+    assert fast.model_dump() == expected.model_dump()
+    assert fast.model_dump_json() == expected.model_dump_json()
+
+
+def test_row_fast_path_without_profile():
+    """Test that unprofiled venues (NULL profile columns) get profile=None."""
+    venue, _ = _models(with_profile=False)
+    assert venue_with_profile_from_row(_row(venue, None)).profile is None
+
+
+@pytest.mark.asyncio
+async def test_get_venues_with_profiles_runs_one_query():
+    """Test that a candidate set is fetched with a single execute."""
+    rows = [_row(*_models()), _row(*_models())]
+    session = _session(rows)
+
+    venues = await get_venues_with_profiles(session, venue_ids=[uuid.uuid4(), uuid.uuid4()])
+
+    assert len(venues) == 2
+    session.execute.assert_awaited_once()
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.psycopg.dialect()))
+    assert "venues.id = ANY (%(venue_ids)s::UUID[])" in sql
+
+
+@pytest.mark.asyncio
+async def test_empty_candidate_sets_skip_the_database():
+    """Test that empty inputs return without querying."""
+    session = _session([])
+    assert await get_venues_with_profiles(session, provider_ids=[]) == []
+    assert await load_attribute_scores(session, []) == {}
+    session.execute.assert_not_called()
+    with pytest.raises(ValueError):
+        await get_venues_with_profiles(session)
+
+
+def test_profile_relationship_never_lazy_loads():
+    """Test that Venue.profile raises instead of issuing per-row queries."""
+    assert Venue.profile.property.lazy == "raise_on_sql"
+
+
+# ============================================================================
+# Attribute Threshold Queries
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_find_by_attributes_uses_indexed_expressions():
+    """Test that thresholds compile to the expressions the indexes are built on."""
+    session = _session([_row(*_models())])
+
+    venues = await find_venues_by_attributes(
+        session, {"romantic": 0.7, "quiet": 0.5}, open_now=True, limit=10
+    )
+
+    assert [v.name for v in venues] == ["Nopa"]
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.psycopg.dialect()))
+    assert "CAST(venue_profiles.attribute_scores ->> 'romantic' AS FLOAT) >= " in sql
+    assert "CAST(venue_profiles.attribute_scores ->> 'quiet' AS FLOAT) >= " in sql
+    assert "venues.hours @> " in sql
+    assert "JOIN venue_profiles" in sql and "OUTER" not in sql
+    assert "ORDER BY CAST(venue_profiles.attribute_scores ->> 'romantic' AS FLOAT) DESC" in sql
+
+
+def test_index_expressions_match_query_expressions():
+    """Test that model indexes use the same inline-key expression as queries."""
+    ddl = {
+        index.name: str(CreateIndex(index).compile(dialect=postgresql.psycopg.dialect()))
+        for index in VenueProfile.__table__.indexes
+    }
+    assert "CAST(attribute_scores ->> 'quiet' AS FLOAT)" in ddl["ix_venue_profiles_quiet"]
+    assert (
+        "USING gin (attribute_scores jsonb_path_ops)" in (ddl["ix_venue_profiles_attribute_scores"])
+    )
+
+
+@pytest.mark.asyncio
+async def test_find_by_attributes_rejects_unindexed_attributes():
+    """Test that only indexed attributes can be filtered."""
+    with pytest.raises(ValueError, match="not indexed"):
+        await find_venues_by_attributes(_session([]), {"cozy": 0.5})
+    with pytest.raises(ValueError):
+        json_text(VenueProfile.attribute_scores, "quiet'; DROP TABLE venues; --")
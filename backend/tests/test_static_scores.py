@@ -0,0 +1,165 @@
+"""Unit tests for precomputed per-mode static scores."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.geo import geohash_encode
+from app.models.user_event import Mode
+from app.models.venue import STATIC_SCORE_MODES, Venue, VenueProfile, VenueStaticScore
+from app.ranking.features import DYNAMIC_FEATURES, build_feature_matrix
+from app.ranking.scoring import MODE_WEIGHTS, MODES, score
+from app.repositories.scores import (
+    changed_venue_ids,
+    refresh_static_scores,
+    static_score_rows,
+    top_static_candidates,
+    upsert_statement,
+)
+from app.schemas.venue import VenueCreate
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.psycopg.dialect()))
+
+
+def _input_row(**overrides):
+    values = {
+        "id": uuid.uuid4(),
+        "lat": 37.7749,
+        "lng": -122.4194,
+        "rating": 4.4,
+        "price_level": 2,
+        "attribute_scores": {"quiet": 0.8, "laptop_friendly": 0.9},
+    }
+    return SimpleNamespace(**{**values, **overrides})
+
+
+def test_geohash_encode_known_values():
+    """Test geohash encoding against reference values."""
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash_encode(37.7749, -122.4194, 5) == "9q8yy"
+
+
+def test_static_score_columns_cover_every_mode():
+    """Test that venue_static_scores has one (cell, score) index per mode."""
+    assert STATIC_SCORE_MODES == tuple(mode.value for mode in MODES)
+    columns = VenueStaticScore.__table__.c
+    indexes = {index.name for index in VenueStaticScore.__table__.indexes}
+    for mode in STATIC_SCORE_MODES:
+        assert mode in columns
+        assert f"ix_venue_static_scores_cell_{mode}" in indexes
+
+
+def test_stored_scores_plus_dynamic_part_match_full_score():
+    """Test that stored static scores completed at request time reproduce score()."""
+    row = _input_row()
+    venue = VenueCreate(
+        provider_id="g1",
+        provider_name="google",
+        name="Cafe",
+        lat=37.78,
+        lng=-122.42,
+        rating=row.rating,
+        price_level=row.price_level,
+        hours={"open_now": True},
+    )
+    features, _ = build_feature_matrix([venue], row.lat, row.lng, 2000, [row.attribute_scores])
+
+    [stored] = static_score_rows([row])
+
+    assert stored["venue_id"] == row.id
+    assert stored["cell"] == "9q8yy"
+    dynamic = len(DYNAMIC_FEATURES)
+    for j, mode in enumerate(MODES):
+        combined = stored[mode.value] + features[:, :dynamic] @ MODE_WEIGHTS[:dynamic, j]
+        np.testing.assert_allclose(combined, score(features, mode), rtol=1e-6)
+
+
+def test_session_class_refreshes_static_scores_on_flush():
+    """Test that the app's session class carries the after_flush hook."""
+    from sqlalchemy import event
+
+    from app.db.routing import RoutingSession
+    from app.db.session import _refresh_static_scores
+
+    assert event.contains(RoutingSession, "after_flush", _refresh_static_scores)
+
+
+def test_upsert_statement_is_single_on_conflict_update():
+    """Test that refreshed rows overwrite every mode column in one statement."""
+    sql = _compile(upsert_statement(static_score_rows([_input_row(), _input_row()])))
+    assert sql.count("INSERT INTO venue_static_scores") == 1
+    assert "ON CONFLICT (venue_id) DO UPDATE" in sql
+    for mode in STATIC_SCORE_MODES:
+        assert f"{mode} = excluded.{mode}" in sql
+
+
+@pytest.mark.asyncio
+async def test_refresh_reads_primary_then_upserts():
+    """Test that a refresh reads score inputs from the primary and writes once."""
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(side_effect=[[_input_row()], None])
+
+    written = await refresh_static_scores(session, [uuid.uuid4()])
+
+    assert written == 1
+    assert session.info["primary"] is True
+    select_sql, upsert_sql = (_compile(call.args[0]) for call in session.execute.call_args_list)
+    assert "LEFT OUTER JOIN venue_profiles" in select_sql
+    assert "= ANY (%(venue_ids)s::UUID[])" in select_sql
+    assert "INSERT INTO venue_static_scores" in upsert_sql
+
+
+@pytest.mark.asyncio
+async def test_refresh_with_no_venues_is_noop():
+    """Test that an empty refresh issues no statement."""
+    session = AsyncMock()
+    assert await refresh_static_scores(session, []) == 0
+    session.execute.assert_not_awaited()
+
+
+def test_changed_venue_ids_only_counts_score_inputs():
+    """Test that only new rows and changes to score inputs trigger a refresh."""
+    session = Session()
+    new_venue = Venue(id=uuid.uuid4(), provider_id="new", name="New", lat=1.0, lng=2.0)
+    profile = VenueProfile(id=uuid.uuid4(), venue_id=uuid.uuid4(), attribute_scores={})
+    renamed = Venue(id=uuid.uuid4(), provider_id="a", name="A", lat=1.0, lng=2.0, rating=4.0)
+    rerated = Venue(id=uuid.uuid4(), provider_id="b", name="B", lat=1.0, lng=2.0, rating=4.0)
+    for venue in (renamed, rerated):
+        make_transient_to_detached(venue)
+    session.add_all([new_venue, profile, renamed, rerated])
+
+    renamed.name = "A2"
+    rerated.rating = 3.5
+
+    assert changed_venue_ids(session) == {new_venue.id, profile.venue_id, rerated.id}
+
+
+@pytest.mark.asyncio
+async def test_top_static_candidates_scans_each_cell_by_index():
+    """Test that each cell is an ordered, limited scan merged into one query."""
+    venue_id = uuid.uuid4()
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=[SimpleNamespace(venue_id=venue_id, score=0.7)])
+
+    result = await top_static_candidates(session, Mode.WORK, ["9q8yy", "9q8yz", "9q8yy"], 10)
+
+    assert result == [(venue_id, 0.7)]
+    sql = _compile(session.execute.call_args[0][0])
+    assert sql.count("ORDER BY venue_static_scores.work DESC") == 2
+    assert "UNION ALL" in sql
+
+
+@pytest.mark.asyncio
+async def test_top_static_candidates_without_cells_is_noop():
+    """Test that an empty region issues no query."""
+    session = AsyncMock()
+    assert await top_static_candidates(session, Mode.DATE, []) == []
+    session.execute.assert_not_awaited()
@@ -0,0 +1,166 @@
+"""Unit tests for request tracing."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.main import app
+from app.observability.tracing import (
+    TracingMiddleware,
+    current_trace,
+    debug_header_allowed,
+    export_trace,
+    span,
+    start_trace,
+    trace_engine,
+)
+
+
+def _names(nodes):
+    """Flatten a span tree into span names (depth first)."""
+    names = []
+    for node in nodes:
+        names.append(node["name"])
+        names.extend(_names(node["children"]))
+    return names
+
+
+def test_span_is_noop_when_not_sampled():
+    """Test that spans record nothing outside a sampled trace."""
+    with start_trace("request", sampled=False) as trace, span("work") as current:
+        assert trace is None
+        assert current is None
+    assert current_trace() is None
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks():
+    """Test that child tasks attach their spans to the current span."""
+
+    async def provider(name):
+        with span("provider.search", provider=name):
+            await asyncio.sleep(0)
+
+    with start_trace("request", sampled=True, export=False) as trace:
+        with span("fanout"):
+            await asyncio.gather(provider("a"), provider("b"))
+        with pytest.raises(ValueError), span("ranking"):
+            raise ValueError("boom")
+
+    (root,) = trace.tree()
+    assert root["name"] == "request"
+    fanout, ranking = root["children"]
+    assert [c["attributes"]["provider"] for c in fanout["children"]] == ["a", "b"]
+    assert ranking["status"] == "error"
+    assert all(s.end is not None for s in trace.spans)
+
+
+@pytest.mark.asyncio
+async def test_trace_engine_records_queries():
+    """Test that SQL statements become db.query spans."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    trace_engine(engine.sync_engine)
+
+    with start_trace("request", sampled=True, export=False) as trace:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+
+    queries = [s for s in trace.spans if s.name == "db.query"]
+    assert [q.attributes["statement"] for q in queries] == ["SELECT 1"]
+    assert queries[0].parent_id == trace.spans[0].span_id
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    """Test that finished traces are appended as JSON lines."""
+    path = tmp_path / "traces.jsonl"
+    with start_trace("request", sampled=True, export=False) as trace, span("work"):
+        pass
+
+    with patch("app.observability.tracing.settings") as mock_settings:
+        mock_settings.trace_exporter = "file"
+        mock_settings.trace_export_path = str(path)
+        export_trace(trace)
+        export_trace(trace)
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert _names(json.loads(lines[0])["spans"]) == ["request", "work"]
+
+
+def test_debug_header_requires_token_outside_dev():
+    """Test that the debug header is honored only with the configured token."""
+    with patch("app.observability.tracing.settings") as mock_settings:
+        mock_settings.trace_debug_token = "s3cret"
+        assert debug_header_allowed("s3cret")
+        assert not debug_header_allowed("1")
+
+        mock_settings.trace_debug_token = ""
+        mock_settings.env = "prod"
+        assert not debug_header_allowed("1")
+        mock_settings.env = "dev"
+        assert debug_header_allowed("1")
+
+
+def test_debug_header_returns_span_tree():
+    """Test that a forced request returns its span tree in the response."""
+    client = TestClient(app)
+
+    with (
+        patch("app.providers.registry.settings") as mock_settings,
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+        patch("app.observability.tracing.export_trace") as mock_export,
+    ):
+        mock_settings.places_providers = "stub"
+        response = client.get(
+            "/venues/nearby",
+            params={"lat": 37.7749, "lng": -122.4194, "limit": 3},
+            headers={"X-Debug-Trace": "1"},
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 3
+    assert response.headers["x-trace-id"] == body["trace"]["trace_id"]
+    names = _names(body["trace"]["spans"])
+    assert names[0] == "GET /venues/nearby"
+    assert {"provider.search", "profiles.load", "ranking"} <= set(names)
+    mock_export.assert_called_once()
+
+
+def test_forced_trace_ends_before_background_tasks():
+    """Test that the response and root span do not wait for background tasks."""
+    background_app = FastAPI()
+    background_app.add_middleware(TracingMiddleware)
+
+    @background_app.get("/background")
+    async def with_background(tasks: BackgroundTasks):
+        tasks.add_task(asyncio.sleep, 0.3)
+        return {"ok": True}
+
+    with (
+        patch("app.observability.tracing.debug_header_allowed", return_value=True),
+        patch("app.observability.tracing.export_trace"),
+    ):
+        response = TestClient(background_app).get("/background", headers={"X-Debug-Trace": "1"})
+
+    body = response.json()
+    assert body["ok"]
+    assert body["trace"]["spans"][0]["duration_ms"] < 300
+    assert body["trace"]["duration_ms"] < 300
+
+
+def test_unsampled_request_has_no_trace():
+    """Test that requests without the header are untouched when not sampled."""
+    client = TestClient(app)
+    with patch("app.observability.tracing.should_sample", return_value=False):
+        response = client.get("/health")
+
+    assert response.json() == {"status": "ok"}
+    assert "x-trace-id" not in response.headers
@@ -0,0 +1,146 @@
+"""Unit tests for result cache warm-up and neighbor-tile prefetch."""
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.deadline import Deadline
+from app.geo import cell_size_deg, geohash_encode
+from app.main import app
+from app.models.user_event import Mode
+from app.providers import StubPlacesProvider
+from app.schemas.search import NearbyResponse
+from app.services.nearby import NearbyQuery
+from app.services.results import Cursor, search_nearby_page, time_bucket
+from app.services.warmup import (
+    hour_of_week,
+    prefetch_neighbors,
+    warm_hot_tiles,
+)
+from app.worker import celery_app
+
+NOW = datetime(2026, 10, 19, 8, 55, tzinfo=UTC)  # Monday, 5 minutes before 09:00
+
+
+def test_hour_of_week_starts_monday():
+    """Test hour-of-week numbering (Monday 00:00 is 0, Sunday 23:00 is 167)."""
+    assert hour_of_week(datetime(2026, 10, 19, 0, 30, tzinfo=UTC)) == 0
+    assert hour_of_week(datetime(2026, 10, 21, 8, tzinfo=UTC)) == 2 * 24 + 8
+    assert hour_of_week(datetime(2026, 10, 25, 23, 59, tzinfo=UTC)) == 167
+
+
+@pytest.mark.asyncio
+async def test_warmed_search_is_a_hit_for_later_searches_in_its_tile(
+    make_cache, make_session_factory
+):
+    """Test that a hot query warms the result set that searches from its tile read."""
+    precision = settings.result_cache_precision
+    lat_size, lng_size = cell_size_deg(precision)
+    # Mean location of a tile's events, near its south-west corner.
+    south, west = 37.7749 // lat_size * lat_size, -122.4194 // lng_size * lng_size
+    session = AsyncMock()
+    session.execute.return_value = [
+        SimpleNamespace(
+            lat=south + lat_size * 0.1, lng=west + lng_size * 0.1, radius=800.0, mode=Mode.DATE
+        )
+    ]
+    caches = {"results": make_cache("ranked"), "searches": make_cache("search")}
+    provider = StubPlacesProvider(density=10, seed=1)
+    later = NearbyQuery(
+        lat=south + lat_size * 0.9, lng=west + lng_size * 0.9, radius_m=800, mode=Mode.DATE
+    )
+
+    with (
+        patch("app.services.results.result_cache", caches["results"]),
+        patch("app.services.results.search_cache", caches["searches"]),
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+    ):
+        result = await warm_hot_tiles(
+            [provider], make_session_factory(session), now=NOW, redis=caches["results"].redis
+        )
+        _, hit = await search_nearby_page(
+            Cursor(later, time_bucket()), [provider], Deadline(2.0), make_session_factory(session)
+        )
+
+    assert result.queries == 1
+    assert result.degraded == 0
+    assert hit
+
+
+@pytest.mark.asyncio
+async def test_warm_hot_tiles_searches_the_coming_hour(make_cache, make_session_factory):
+    """Test that one run per time bucket warms the hour starting within the lead time."""
+    session = AsyncMock()
+    session.execute.return_value = [
+        SimpleNamespace(lat=37.7749, lng=-122.4194, radius=1000.0, mode=Mode.WORK, events=3),
+        SimpleNamespace(lat=40.7128, lng=-74.006, radius=1000.0, mode=Mode.BUDGET, events=2),
+    ]
+    pages = [
+        NearbyResponse(mode=Mode.WORK, count=0, venues=[]),
+        NearbyResponse(mode=Mode.BUDGET, count=0, venues=[], degraded=True),
+    ]
+    redis = make_cache().redis
+
+    with patch("app.services.warmup.search_batch", AsyncMock(return_value=pages)) as batch:
+        result = await warm_hot_tiles([], make_session_factory(session), now=NOW, redis=redis)
+        # Another worker starting in the same bucket.
+        again = await warm_hot_tiles([], make_session_factory(session), now=NOW, redis=redis)
+
+    assert again.skipped
+    batch.assert_awaited_once()
+    assert not result.skipped
+    assert result.hour_of_week == 9
+    assert result.queries == 2
+    assert result.degraded == 1
+    queries = batch.call_args[0][0]
+    assert [q.mode for q in queries] == [Mode.WORK, Mode.BUDGET]
+    assert all(q.user_id is None for q in queries)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_neighbors_searches_adjacent_tiles():
+    """Test that the eight surrounding tiles are searched with the same filters."""
+    query = NearbyQuery(lat=37.7749, lng=-122.4194, radius_m=500, mode=Mode.DATE, open_now=True)
+    precision = settings.result_cache_precision
+    center = geohash_encode(query.lat, query.lng, precision)
+
+    with patch("app.services.warmup.search_batch", AsyncMock(return_value=[])) as batch:
+        searched = await prefetch_neighbors(query, [])
+
+    neighbors = batch.call_args[0][0]
+    tiles = {geohash_encode(q.lat, q.lng, precision) for q in neighbors}
+    assert searched == 8
+    assert len(tiles) == 8
+    assert center not in tiles
+    assert all(t[:5] == center[:5] for t in tiles)  # adjacent, not far away
+    assert all((q.radius_m, q.mode, q.open_now) == (500, Mode.DATE, True) for q in neighbors)
+
+
+def test_nearby_endpoint_prefetches_neighbors_after_a_miss():
+    """Test that the optional prefetch runs for first pages only."""
+    client = TestClient(app)
+
+    with (
+        patch("app.providers.registry.settings") as mock_settings,
+        patch("app.services.nearby.load_attribute_scores", AsyncMock(return_value={})),
+        patch("app.main.prefetch_neighbors", AsyncMock()) as prefetch,
+        patch.object(settings, "prefetch_neighbors", True),
+    ):
+        mock_settings.places_providers = "stub"
+        first = client.get("/venues/nearby", params={"lat": 37.7749, "lng": -122.4194})
+        client.get("/venues/nearby", params={"cursor": first.json()["next_cursor"]})
+
+    prefetch.assert_awaited_once()
+    assert prefetch.call_args[0][0].lat == 37.7749
+
+
+def test_warmup_task_is_scheduled():
+    """Test that the warm-up task is registered and on the beat schedule."""
+    schedule = celery_app.conf.beat_schedule
+    assert schedule["warm-result-cache"]["task"] == "modemap.warm_result_cache"
+    celery_app.loader.import_default_modules()
+    assert "modemap.warm_result_cache" in celery_app.tasks